@@ -210,9 +210,12 @@ class DataService:
             # 默认搜索今天
             start_date = end_date = datetime.now()
 
+        from trendradar.utils.text import fold_title
+
         # 收集所有匹配的新闻
         results = []
         platform_distribution = Counter()
+        keyword_lower = keyword.lower()
 
         # 遍历日期范围
         current_date = start_date
@@ -228,7 +231,7 @@ class DataService:
                     platform_name = id_to_name.get(platform_id, platform_id)
 
                     for title, info in titles.items():
-                        if keyword.lower() in title.lower():
+                        if keyword_lower in fold_title(title):
                             # 计算平均排名
                             avg_rank = sum(info["ranks"]) / len(info["ranks"]) if info["ranks"] else 0
 
@@ -351,7 +354,9 @@ class DataService:
                 f"不支持的模式: {mode}。支持的模式: daily, current"
             )
 
-        # 统计词频
+        # 统计词频（词的写法与爬虫一致：同义词组 / 整词 / 正则 / 邻近）
+        from trendradar.core.matcher import display_term, term_matches
+
         word_frequency = Counter()
         keyword_to_news = {}
 
@@ -363,12 +368,13 @@ class DataService:
                     all_words = group.get("required", []) + group.get("normal", [])
 
                     for word in all_words:
-                        if word and word in title:
-                            word_frequency[word] += 1
+                        if word and term_matches(word, title):
+                            keyword = display_term(word)
+                            word_frequency[keyword] += 1
 
-                            if word not in keyword_to_news:
-                                keyword_to_news[word] = []
-                            keyword_to_news[word].append(title)
+                            if keyword not in keyword_to_news:
+                                keyword_to_news[keyword] = []
+                            keyword_to_news[keyword].append(title)
 
         # 获取TOP N关键词
         top_keywords = word_frequency.most_common(top_n)
@@ -5,7 +5,6 @@
 支持从 SQLite 数据库和 TXT 文件两种数据源读取。
 """
 
-import re
 import sqlite3
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
@@ -40,7 +39,7 @@ class ParserService:
     @staticmethod
     def clean_title(title: str) -> str:
         """
-        清理标题文本
+        清理标题文本（合并连续空白、去除首尾空白，结果在进程内驻留）
 
         Args:
             title: 原始标题
@@ -48,11 +47,9 @@ class ParserService:
         Returns:
             清理后的标题
         """
-        # 移除多余空白
-        title = re.sub(r'\s+', ' ', title)
-        # 移除特殊字符
-        title = title.strip()
-        return title
+        from trendradar.utils.text import clean_title_text
+
+        return clean_title_text(title)
 
     def parse_txt_file(self, file_path: Path) -> Tuple[Dict, Dict]:
         """
@@ -350,7 +347,10 @@ class ParserService:
         all_timestamps = {}
 
         try:
-            conn = sqlite3.connect(str(db_path))
+            # 自动合并分片存储（news.shard*.db），未分片时等同于直接连接
+            from trendradar.storage.sharded import connect_merged
+
+            conn = connect_merged(db_path)
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -363,23 +363,32 @@ class ParserService:
                 conn.close()
                 return None
 
+            # 入库时已保存的规范化列（旧数据库或无法迁移的分片为空）
+            from trendradar.utils.text import register_title_forms
+
+            columns = {col[1] for col in cursor.execute("PRAGMA table_info(news_items)")}
+            if "title_clean" in columns and "title_fold" in columns:
+                normalized_select = ", n.title_clean, n.title_fold"
+            else:
+                normalized_select = ""
+
             # 构建查询
             if platform_ids:
                 placeholders = ','.join(['?' for _ in platform_ids])
                 query = f"""
                     SELECT n.id, n.platform_id, p.name as platform_name, n.title,
                            n.rank, n.url, n.mobile_url,
-                           n.first_crawl_time, n.last_crawl_time, n.crawl_count
+                           n.first_crawl_time, n.last_crawl_time, n.crawl_count{normalized_select}
                     FROM news_items n
                     LEFT JOIN platforms p ON n.platform_id = p.id
                     WHERE n.platform_id IN ({placeholders})
                 """
                 cursor.execute(query, platform_ids)
             else:
-                cursor.execute("""
+                cursor.execute(f"""
                     SELECT n.id, n.platform_id, p.name as platform_name, n.title,
                            n.rank, n.url, n.mobile_url,
-                           n.first_crawl_time, n.last_crawl_time, n.crawl_count
+                           n.first_crawl_time, n.last_crawl_time, n.crawl_count{normalized_select}
                     FROM news_items n
                     LEFT JOIN platforms p ON n.platform_id = p.id
                 """)
@@ -410,6 +419,9 @@ class ParserService:
                 platform_id = row['platform_id']
                 platform_name = row['platform_name'] or platform_id
                 title = row['title']
+                if normalized_select:
+                    # 预填驻留表，搜索 / 统计直接取小写形式，不再逐条 lower()
+                    register_title_forms(title, row['title_clean'], row['title_fold'])
 
                 # 更新 id_to_name
                 if platform_id not in id_to_name:
@@ -544,11 +556,14 @@ class ParserService:
         """
         解析关键词配置文件
 
+        与爬虫共用 trendradar.core.frequency 的解析结果缓存（按路径 + mtime + 内容哈希），
+        文件未变化时不会重复读取，修改后自动重新加载。
+
         Args:
             words_file: 关键词文件路径，默认为 config/frequency_words.txt
 
         Returns:
-            词组列表
+            词组列表（required / normal / filter_words / group_key / max_count）
 
         Raises:
             FileParseError: 文件解析错误
@@ -561,48 +576,11 @@ class ParserService:
         if not words_file.exists():
             return []
 
-        word_groups = []
-
         try:
-            with open(words_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-
-                    # 使用 | 分隔符
-                    parts = [p.strip() for p in line.split("|")]
-                    if not parts:
-                        continue
-
-                    group = {
-                        "required": [],
-                        "normal": [],
-                        "filter_words": []
-                    }
-
-                    for part in parts:
-                        if not part:
-                            continue
-
-                        words = [w.strip() for w in part.split(",")]
-                        for word in words:
-                            if not word:
-                                continue
-                            if word.endswith("+"):
-                                # 必须词
-                                group["required"].append(word[:-1])
-                            elif word.endswith("!"):
-                                # 过滤词
-                                group["filter_words"].append(word[:-1])
-                            else:
-                                # 普通词
-                                group["normal"].append(word)
-
-                    if group["required"] or group["normal"]:
-                        word_groups.append(group)
+            from trendradar.core.frequency import get_frequency_rules
 
+            rules = get_frequency_rules(str(words_file))
         except Exception as e:
             raise FileParseError(str(words_file), str(e))
 
-        return word_groups
+        return rules.word_groups
@@ -21,6 +21,14 @@ from ..utils.validators import (
 from ..utils.errors import MCPError, InvalidParameterError, DataNotFoundError
 
 
+# MCP 排序使用的权重配置（排名 60% / 频次 30% / 热度 10%）
+MCP_WEIGHT_CONFIG = {
+    "RANK_WEIGHT": 0.6,
+    "FREQUENCY_WEIGHT": 0.3,
+    "HOTNESS_WEIGHT": 0.1,
+}
+
+
 def calculate_news_weight(news_data: Dict, rank_threshold: int = 5) -> float:
     """
     计算新闻权重（用于排序）
@@ -29,6 +37,8 @@ def calculate_news_weight(news_data: Dict, rank_threshold: int = 5) -> float:
     - 频次权重 (30%)：新闻出现的次数
     - 热度权重 (10%)：高排名出现的比例
 
+    与爬虫共用 trendradar.core.scoring 的实现。
+
     Args:
         news_data: 新闻数据字典，包含 ranks 和 count 字段
         rank_threshold: 高排名阈值，默认5
@@ -36,41 +46,24 @@ def calculate_news_weight(news_data: Dict, rank_threshold: int = 5) -> float:
     Returns:
         权重分数（0-100之间的浮点数）
     """
-    ranks = news_data.get("ranks", [])
-    if not ranks:
-        return 0.0
-
-    count = news_data.get("count", len(ranks))
-
-    # 权重配置（与 config.yaml 保持一致）
-    RANK_WEIGHT = 0.6
-    FREQUENCY_WEIGHT = 0.3
-    HOTNESS_WEIGHT = 0.1
-
-    # 1. 排名权重：Σ(11 - min(rank, 10)) / 出现次数
-    rank_scores = []
-    for rank in ranks:
-        score = 11 - min(rank, 10)
-        rank_scores.append(score)
+    from trendradar.core.scoring import calculate_news_weight as _calculate
 
-    rank_weight = sum(rank_scores) / len(ranks) if ranks else 0
+    return _calculate(news_data, rank_threshold, MCP_WEIGHT_CONFIG)
 
-    # 2. 频次权重：min(出现次数, 10) × 10
-    frequency_weight = min(count, 10) * 10
 
-    # 3. 热度加成：高排名次数 / 总出现次数 × 100
-    high_rank_count = sum(1 for rank in ranks if rank <= rank_threshold)
-    hotness_ratio = high_rank_count / len(ranks) if ranks else 0
-    hotness_weight = hotness_ratio * 100
+def sort_news_by_weight(news_list: List[Dict], rank_threshold: int = 5) -> None:
+    """
+    按权重从高到低原地排序（权重批量计算，权重相同保持原顺序）
 
-    # 综合权重
-    total_weight = (
-        rank_weight * RANK_WEIGHT
-        + frequency_weight * FREQUENCY_WEIGHT
-        + hotness_weight * HOTNESS_WEIGHT
-    )
+    Args:
+        news_list: 新闻数据字典列表，包含 ranks 和 count 字段
+        rank_threshold: 高排名阈值，默认5
+    """
+    from trendradar.core.scoring import score_news_items
 
-    return total_weight
+    weights = score_news_items(news_list, rank_threshold, MCP_WEIGHT_CONFIG)
+    order = sorted(range(len(news_list)), key=weights.__getitem__, reverse=True)
+    news_list[:] = [news_list[i] for i in order]
 
 
 class AnalyticsTools:
@@ -309,6 +302,10 @@ class AnalyticsTools:
             trend_data = []
             current_date = start_date
 
+            from trendradar.utils.text import fold_title
+
+            topic_lower = topic.lower() if topic else ""
+
             while current_date <= end_date:
                 try:
                     all_titles, _, _ = self.data_service.parser.read_all_titles_for_date(
@@ -321,7 +318,7 @@ class AnalyticsTools:
 
                     for _, titles in all_titles.items():
                         for title in titles.keys():
-                            if topic.lower() in title.lower():
+                            if topic_lower in fold_title(title):
                                 count += 1
                                 matched_titles.append(title)
 
@@ -449,6 +446,10 @@ class AnalyticsTools:
 
             # 遍历日期范围
             current_date = start_date
+            from trendradar.utils.text import fold_title
+
+            topic_lower = topic.lower() if topic else ""
+
             while current_date <= end_date:
                 try:
                     all_titles, id_to_name, _ = self.data_service.parser.read_all_titles_for_date(
@@ -463,7 +464,7 @@ class AnalyticsTools:
                             platform_stats[platform_name]["unique_titles"].add(title)
 
                             # 如果指定了话题，统计包含话题的新闻
-                            if topic and topic.lower() in title.lower():
+                            if topic and topic_lower in fold_title(title):
                                 platform_stats[platform_name]["topic_mentions"] += 1
 
                             # 提取关键词（简单分词）
@@ -694,6 +695,10 @@ class AnalyticsTools:
             all_news_items = []
             current_date = start_date
 
+            from trendradar.utils.text import fold_title
+
+            topic_lower = topic.lower() if topic else ""
+
             while current_date <= end_date:
                 try:
                     all_titles, id_to_name, _ = self.data_service.parser.read_all_titles_for_date(
@@ -706,7 +711,7 @@ class AnalyticsTools:
                         platform_name = id_to_name.get(platform_id, platform_id)
                         for title, info in titles.items():
                             # 如果指定了话题，只收集包含话题的标题
-                            if topic and topic.lower() not in title.lower():
+                            if topic and topic_lower not in fold_title(title):
                                 continue
 
                             news_item = {
@@ -754,10 +759,7 @@ class AnalyticsTools:
 
             # 按权重排序（如果启用）
             if sort_by_weight:
-                deduplicated_news.sort(
-                    key=lambda x: calculate_news_weight(x),
-                    reverse=True
-                )
+                sort_news_by_weight(deduplicated_news)
 
             # 限制返回数量
             selected_news = deduplicated_news[:limit]
@@ -1115,10 +1117,7 @@ class AnalyticsTools:
 
             # 按权重排序（如果启用）
             if sort_by_weight:
-                related_news.sort(
-                    key=lambda x: calculate_news_weight(x),
-                    reverse=True
-                )
+                sort_news_by_weight(related_news)
             else:
                 # 按排名排序
                 related_news.sort(key=lambda x: x["rank"])
@@ -1207,6 +1206,8 @@ class AnalyticsTools:
             all_titles_list = []
 
             current_date = start_date
+            from trendradar.utils.text import fold_title
+
             while current_date <= end_date:
                 try:
                     all_titles, id_to_name, _ = self.data_service.parser.read_all_titles_for_date(
@@ -1287,7 +1288,7 @@ class AnalyticsTools:
                 for news in all_titles_list:
                     # 简单权重：统计包含TOP关键词的次数
                     score = 0
-                    title_lower = news['title'].lower()
+                    title_lower = fold_title(news['title'])
                     for keyword, count in all_keywords.most_common(10):
                         if keyword.lower() in title_lower:
                             score += count
@@ -1509,6 +1510,10 @@ class AnalyticsTools:
             # 收集话题历史数据
             lifecycle_data = []
             current_date = start_date
+            from trendradar.utils.text import fold_title
+
+            topic_lower = topic.lower() if topic else ""
+
             while current_date <= end_date:
                 try:
                     all_titles, _, _ = self.data_service.parser.read_all_titles_for_date(
@@ -1519,7 +1524,7 @@ class AnalyticsTools:
                     count = 0
                     for _, titles in all_titles.items():
                         for title in titles.keys():
-                            if topic.lower() in title.lower():
+                            if topic_lower in fold_title(title):
                                 count += 1
 
                     lifecycle_data.append({
@@ -187,8 +187,8 @@ class SearchTools:
             if sort_by == "relevance":
                 all_matches.sort(key=lambda x: x.get("similarity_score", 1.0), reverse=True)
             elif sort_by == "weight":
-                from .analytics import calculate_news_weight
-                all_matches.sort(key=lambda x: calculate_news_weight(x), reverse=True)
+                from .analytics import sort_news_by_weight
+                sort_news_by_weight(all_matches)
             elif sort_by == "date":
                 all_matches.sort(key=lambda x: x.get("date", ""), reverse=True)
 
@@ -259,6 +259,8 @@ class SearchTools:
         Returns:
             匹配的新闻列表
         """
+        from trendradar.utils.text import fold_title
+
         matches = []
         query_lower = query.lower()
 
@@ -267,7 +269,7 @@ class SearchTools:
 
             for title, info in titles.items():
                 # 精确包含判断
-                if query_lower in title.lower():
+                if query_lower in fold_title(title):
                     news_item = {
                         "title": title,
                         "platform": platform_id,
@@ -399,8 +401,10 @@ class SearchTools:
         Returns:
             相似度分数 (0-1之间)
         """
-        # 使用 difflib.SequenceMatcher 计算序列相似度
-        return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+        from trendradar.utils.text import fold_title
+
+        # 使用 difflib.SequenceMatcher 计算序列相似度（小写形式在进程内驻留，不重复计算）
+        return SequenceMatcher(None, fold_title(text1), fold_title(text2)).ratio()
 
     def _fuzzy_match(self, query: str, text: str, threshold: float = 0.3) -> Tuple[bool, float]:
         """
@@ -414,8 +418,10 @@ class SearchTools:
         Returns:
             (是否匹配, 相似度分数)
         """
+        from trendradar.utils.text import fold_title
+
         # 直接包含判断
-        if query.lower() in text.lower():
+        if fold_title(query) in fold_title(text):
             return True, 1.0
 
         # 计算整体相似度
@@ -6,16 +6,19 @@ TrendRadar 主程序
 支持: python -m trendradar
 """
 
+import multiprocessing
 import os
 import webbrowser
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 
 import requests
 
 from trendradar.context import AppContext
 from trendradar import __version__
 from trendradar.core import load_config
+from trendradar.core.loader import build_tenant_config
 from trendradar.crawler import DataFetcher
 from trendradar.storage import convert_crawl_results_to_news_data
 
@@ -99,13 +102,18 @@ class NewsAnalyzer:
         },
     }
 
-    def __init__(self):
-        # 加载配置
-        print("正在加载配置...")
-        config = load_config()
-        print(f"TrendRadar v{__version__} 配置加载完成")
-        print(f"监控平台数量: {len(config['PLATFORMS'])}")
-        print(f"时区: {config.get('TIMEZONE', 'Asia/Shanghai')}")
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: 已加载的配置（多租户分析进程传入租户配置），默认从配置文件加载
+        """
+        if config is None:
+            # 加载配置
+            print("正在加载配置...")
+            config = load_config()
+            print(f"TrendRadar v{__version__} 配置加载完成")
+            print(f"监控平台数量: {len(config['PLATFORMS'])}")
+            print(f"时区: {config.get('TIMEZONE', 'Asia/Shanghai')}")
 
         # 创建应用上下文
         self.ctx = AppContext(config)
@@ -123,7 +131,7 @@ class NewsAnalyzer:
         # 初始化存储管理器（使用 AppContext）
         self._init_storage_manager()
 
-        if self.is_github_actions:
+        if self.is_github_actions and not self.ctx.tenant_name:
             self._check_version_update()
 
     def _init_storage_manager(self) -> None:
@@ -155,8 +163,12 @@ class NewsAnalyzer:
             return False
 
     def _should_open_browser(self) -> bool:
-        """判断是否应该打开浏览器"""
-        return not self.is_github_actions and not self.is_docker_container
+        """判断是否应该打开浏览器（租户进程不打开）"""
+        return (
+            not self.is_github_actions
+            and not self.is_docker_container
+            and not self.ctx.tenant_name
+        )
 
     def _setup_proxy(self) -> None:
         """设置代理配置"""
@@ -305,9 +317,9 @@ class NewsAnalyzer:
         global_filters: Optional[List[str]] = None,
         quiet: bool = False,
     ) -> Tuple[List[Dict], Optional[str]]:
-        """统一的分析流水线：数据处理 → 统计计算 → HTML生成"""
+        """统一的分析流水线：数据处理 → 统计计算（含相似标题聚类）→ HTML生成"""
 
-        # 统计计算（使用 AppContext）
+        # 统计计算（使用 AppContext），各词组在截断前合并多个平台的相似标题，报告和推送都使用合并后的结果
         stats, total_titles = self.ctx.count_frequency(
             data_source,
             word_groups,
@@ -383,14 +395,17 @@ class NewsAnalyzer:
 
             # 使用 NotificationDispatcher 发送到所有渠道
             dispatcher = self.ctx.create_notification_dispatcher()
-            results = dispatcher.dispatch_all(
-                report_data=report_data,
-                report_type=report_type,
-                update_info=update_info_to_send,
-                proxy_url=self.proxy_url,
-                mode=mode,
-                html_file_path=html_file_path,
-            )
+            try:
+                results = dispatcher.dispatch_all(
+                    report_data=report_data,
+                    report_type=report_type,
+                    update_info=update_info_to_send,
+                    proxy_url=self.proxy_url,
+                    mode=mode,
+                    html_file_path=html_file_path,
+                )
+            finally:
+                dispatcher.close()
 
             if not results:
                 print("未配置任何通知渠道，跳过通知发送")
@@ -437,6 +452,18 @@ class NewsAnalyzer:
 
         return False
 
+    def _drain_notification_outbox(self) -> None:
+        """补发推送队列中发送失败的批次（每次运行都执行，不受推送窗口和报告内容影响）"""
+        cfg = self.ctx.config
+        if not cfg["ENABLE_NOTIFICATION"] or not self._has_notification_configured():
+            return
+
+        dispatcher = self.ctx.create_notification_dispatcher()
+        try:
+            dispatcher.drain_outbox(proxy_url=self.proxy_url)
+        finally:
+            dispatcher.close()
+
     def _generate_summary_report(self, mode_strategy: Dict) -> Optional[str]:
         """生成汇总报告（带通知）"""
         summary_type = (
@@ -700,6 +727,57 @@ class NewsAnalyzer:
 
         return summary_html
 
+    def _run_with_tenants(
+        self,
+        mode_strategy: Dict,
+        results: Dict,
+        id_to_name: Dict,
+        failed_ids: List,
+        tenants: Dict,
+    ) -> None:
+        """
+        多租户分析：主配置在当前进程分析，各租户在进程池中并行分析
+
+        抓取结果已写入当天的 SQLite，租户进程各自只读打开数据库读取历史数据，
+        本次抓取结果（体积很小）随任务参数传入。
+        """
+        tenant_list = tenants["LIST"]
+        workers = tenants.get("WORKERS") or min(len(tenant_list), os.cpu_count() or 1)
+        print(f"[多租户] {len(tenant_list)} 个租户，{workers} 个分析进程")
+
+        # 异步上传 / 复制完成后租户进程才能读到本次数据
+        self.storage_manager.flush()
+
+        # spawn：不继承父进程的数据库连接和后台上传线程
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            futures = {
+                executor.submit(
+                    _run_tenant_worker,
+                    self.ctx.config,
+                    tenant,
+                    results,
+                    id_to_name,
+                    failed_ids,
+                    self.update_info,
+                ): tenant["NAME"]
+                for tenant in tenant_list
+            }
+
+            self._execute_mode_strategy(mode_strategy, results, id_to_name, failed_ids)
+
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                    print(f"[多租户] 租户 {name} 分析完成")
+                except Exception as e:
+                    print(f"[多租户] 租户 {name} 分析失败: {e}")
+        finally:
+            executor.shutdown(wait=True)
+
     def run(self) -> None:
         """执行分析流程"""
         try:
@@ -709,7 +787,15 @@ class NewsAnalyzer:
 
             results, id_to_name, failed_ids = self._crawl_data()
 
-            self._execute_mode_strategy(mode_strategy, results, id_to_name, failed_ids)
+            tenants = self.ctx.config.get("TENANTS", {})
+            if tenants.get("ENABLED") and tenants.get("LIST"):
+                self._run_with_tenants(
+                    mode_strategy, results, id_to_name, failed_ids, tenants
+                )
+            else:
+                self._execute_mode_strategy(mode_strategy, results, id_to_name, failed_ids)
+
+            self._drain_notification_outbox()
 
         except Exception as e:
             print(f"分析流程执行出错: {e}")
@@ -719,6 +805,27 @@ class NewsAnalyzer:
             self.ctx.cleanup()
 
 
+def _run_tenant_worker(
+    base_config: Dict[str, Any],
+    tenant: Dict[str, Any],
+    results: Dict,
+    id_to_name: Dict,
+    failed_ids: List,
+    update_info: Optional[Dict] = None,
+) -> None:
+    """租户分析进程入口：使用租户配置执行分析、报告和推送（不抓取）"""
+    config = build_tenant_config(base_config, tenant)
+    print(f"[多租户] 租户 {tenant['NAME']} 开始分析（进程 {os.getpid()}）")
+    analyzer = NewsAnalyzer(config)
+    analyzer.update_info = update_info
+    try:
+        analyzer._execute_mode_strategy(
+            analyzer._get_mode_strategy(), results, id_to_name, failed_ids
+        )
+    finally:
+        analyzer.ctx.cleanup()
+
+
 def main():
     """主程序入口"""
     try:
@@ -24,6 +24,8 @@ from trendradar.core import (
     detect_latest_new_titles,
     is_first_crawl_today,
     count_word_frequency,
+    AnalysisState,
+    cluster_similar_titles,
 )
 from trendradar.report import (
     clean_title,
@@ -36,7 +38,10 @@ from trendradar.notification import (
     render_dingtalk_content,
     split_content_into_batches,
     NotificationDispatcher,
+    NotificationOutbox,
+    DeltaNotifier,
     PushRecordManager,
+    FilePushRecordStore,
 )
 from trendradar.storage import get_storage_manager
 
@@ -72,9 +77,20 @@ class AppContext:
         """
         self.config = config
         self._storage_manager = None
+        self._analysis_state: Optional[AnalysisState] = None
 
     # === 配置访问 ===
 
+    @property
+    def tenant_name(self) -> str:
+        """租户名称（多租户分析进程中非空）"""
+        return self.config.get("TENANT_NAME", "")
+
+    @property
+    def report_output_dir(self) -> str:
+        """报告输出目录（租户为 output/tenants/<租户名>）"""
+        return self.config.get("REPORT_OUTPUT_DIR", "output")
+
     @property
     def timezone(self) -> str:
         """获取配置的时区"""
@@ -132,6 +148,8 @@ class AppContext:
             remote_config = storage_config.get("REMOTE", {})
             local_config = storage_config.get("LOCAL", {})
             pull_config = storage_config.get("PULL", {})
+            duckdb_config = storage_config.get("DUCKDB", {})
+            sharding_config = storage_config.get("SHARDING", {})
 
             self._storage_manager = get_storage_manager(
                 backend_type=storage_config.get("BACKEND", "auto"),
@@ -144,18 +162,29 @@ class AppContext:
                     "secret_access_key": remote_config.get("SECRET_ACCESS_KEY", ""),
                     "endpoint_url": remote_config.get("ENDPOINT_URL", ""),
                     "region": remote_config.get("REGION", ""),
+                    "async_upload": remote_config.get("ASYNC_UPLOAD", False),
+                    "upload_coalesce_seconds": remote_config.get("UPLOAD_COALESCE_SECONDS", 5.0),
                 },
                 local_retention_days=local_config.get("RETENTION_DAYS", 0),
                 remote_retention_days=remote_config.get("RETENTION_DAYS", 0),
                 pull_enabled=pull_config.get("ENABLED", False),
                 pull_days=pull_config.get("DAYS", 7),
                 timezone=self.timezone,
+                duckdb_path=duckdb_config.get("PATH", ""),
+                sharding_config={
+                    "shard_count": sharding_config.get("SHARD_COUNT", 4),
+                    "platform_groups": sharding_config.get("PLATFORM_GROUPS", []),
+                },
+                # 租户进程不复用从父进程继承的单例（连接不能跨进程共享），
+                # 并以只读方式打开主进程写入的数据库
+                force_new=bool(self.tenant_name),
+                read_only=bool(self.tenant_name),
             )
         return self._storage_manager
 
     def get_output_path(self, subfolder: str, filename: str) -> str:
         """获取输出路径"""
-        output_dir = Path("output") / self.format_date() / subfolder
+        output_dir = Path(self.report_output_dir) / self.format_date() / subfolder
         output_dir.mkdir(parents=True, exist_ok=True)
         return str(output_dir / filename)
 
@@ -169,8 +198,31 @@ class AppContext:
     def read_today_titles(
         self, platform_ids: Optional[List[str]] = None, quiet: bool = False
     ) -> Tuple[Dict, Dict, Dict]:
-        """读取当天所有标题"""
-        return read_all_today_titles(self.get_storage_manager(), platform_ids, quiet=quiet)
+        """读取当天所有标题（启用增量分析状态时只读取变化行）"""
+        return read_all_today_titles(
+            self.get_storage_manager(),
+            platform_ids,
+            quiet=quiet,
+            analysis_state=self.get_analysis_state(),
+        )
+
+    def get_analysis_state(self) -> Optional[AnalysisState]:
+        """
+        获取当天的增量分析状态
+
+        未启用（storage.analysis_state: false）或存储后端不支持时返回 None。
+        """
+        if not self.config.get("STORAGE", {}).get("ANALYSIS_STATE", True):
+            return None
+        state_path = self.get_storage_manager().get_analysis_state_path()
+        if state_path is None:
+            return None
+        if self.tenant_name:
+            # 各租户的匹配缓存不同，状态文件放在租户目录，避免并发覆盖
+            state_path = Path(self.get_output_path("", state_path.name))
+        if self._analysis_state is None or self._analysis_state.path != state_path:
+            self._analysis_state = AnalysisState.load(state_path)
+        return self._analysis_state
 
     def detect_new_titles(
         self, platform_ids: Optional[List[str]] = None, quiet: bool = False
@@ -187,8 +239,8 @@ class AppContext:
     def load_frequency_words(
         self, frequency_file: Optional[str] = None
     ) -> Tuple[List[Dict], List[str], List[str]]:
-        """加载频率词配置"""
-        return load_frequency_words(frequency_file)
+        """加载频率词配置（默认使用配置中的 FREQUENCY_WORDS_PATH，如租户的频率词文件）"""
+        return load_frequency_words(frequency_file or self.config.get("FREQUENCY_WORDS_PATH"))
 
     def matches_word_groups(
         self,
@@ -214,8 +266,19 @@ class AppContext:
         global_filters: Optional[List[str]] = None,
         quiet: bool = False,
     ) -> Tuple[List[Dict], int]:
-        """统计词频"""
-        return count_word_frequency(
+        """统计词频（启用 report.cluster_similar_titles 时在截断前合并相似标题）"""
+        analysis_state = self.get_analysis_state()
+        cluster_counts = [0, 0]
+
+        def merge_titles(titles: List[Dict]) -> List[Dict]:
+            merged = cluster_similar_titles(
+                titles, threshold=self.config.get("CLUSTER_SIMILARITY", 0.8)
+            )
+            cluster_counts[0] += len(titles)
+            cluster_counts[1] += len(merged)
+            return merged
+
+        result = count_word_frequency(
             results=results,
             word_groups=word_groups,
             filter_words=filter_words,
@@ -231,7 +294,16 @@ class AppContext:
             is_first_crawl_func=self.is_first_crawl,
             convert_time_func=self.convert_time_display,
             quiet=quiet,
+            match_cache=analysis_state,
+            merge_titles_func=(
+                merge_titles if self.config.get("CLUSTER_SIMILAR_TITLES", False) else None
+            ),
         )
+        if analysis_state is not None:
+            analysis_state.save()
+        if not quiet and cluster_counts[1] < cluster_counts[0]:
+            print(f"[标题聚类] {cluster_counts[0]} 条标题合并为 {cluster_counts[1]} 条")
+        return result
 
     # === 报告生成 ===
 
@@ -277,13 +349,13 @@ class AppContext:
             is_daily_summary=is_daily_summary,
             update_info=update_info,
             rank_threshold=self.rank_threshold,
-            output_dir="output",
+            output_dir=self.report_output_dir,
             date_folder=self.format_date(),
             time_filename=self.format_time(),
             render_html_func=lambda *args, **kwargs: self.render_html(*args, **kwargs),
             matches_word_groups_func=self.matches_word_groups,
             load_frequency_words_func=self.load_frequency_words,
-            enable_index_copy=True,
+            enable_index_copy=not self.tenant_name,
         )
 
     def render_html(
@@ -371,12 +443,40 @@ class AppContext:
             config=self.config,
             get_time_func=self.get_time,
             split_content_func=self.split_content,
+            outbox=self.create_notification_outbox(),
+            delta=self.create_delta_notifier(),
+        )
+
+    def create_notification_outbox(self) -> Optional[NotificationOutbox]:
+        """创建推送队列（租户共用数据库，不启用推送队列）"""
+        if not self.config.get("OUTBOX_ENABLED", True) or self.tenant_name:
+            return None
+        return NotificationOutbox(
+            storage_backend=self.get_storage_manager(),
+            get_time_func=self.get_time,
+            max_attempts=self.config.get("OUTBOX_MAX_ATTEMPTS", 8),
+            lookback_days=self.config.get("OUTBOX_LOOKBACK_DAYS", 1),
+        )
+
+    def create_delta_notifier(self) -> Optional[DeltaNotifier]:
+        """创建增量推送（租户共用数据库，不启用增量推送）"""
+        if not self.config.get("DELTA_ENABLED", False) or self.tenant_name:
+            return None
+        return DeltaNotifier(
+            storage_backend=self.get_storage_manager(),
+            get_time_func=self.get_time,
+            full_refresh_minutes=self.config.get("DELTA_FULL_REFRESH_MINUTES", 360),
+            min_rank_change=self.config.get("DELTA_MIN_RANK_CHANGE", 3),
         )
 
     def create_push_manager(self) -> PushRecordManager:
-        """创建推送记录管理器"""
+        """创建推送记录管理器（租户使用各自目录下的推送记录）"""
+        if self.tenant_name:
+            storage_backend = FilePushRecordStore(self.report_output_dir, self.get_time)
+        else:
+            storage_backend = self.get_storage_manager()
         return PushRecordManager(
-            storage_backend=self.get_storage_manager(),
+            storage_backend=storage_backend,
             get_time_func=self.get_time,
         )
 
@@ -385,6 +485,9 @@ class AppContext:
     def cleanup(self):
         """清理资源"""
         if self._storage_manager:
-            self._storage_manager.cleanup_old_data()
+            # 租户只读共享数据，过期数据由主进程清理
+            if not self.tenant_name:
+                self._storage_manager.cleanup_old_data()
             self._storage_manager.cleanup()
             self._storage_manager = None
+        self._analysis_state = None
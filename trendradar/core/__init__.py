@@ -10,7 +10,14 @@ from trendradar.core.config import (
     get_account_at_index,
 )
 from trendradar.core.loader import load_config
-from trendradar.core.frequency import load_frequency_words, matches_word_groups
+from trendradar.core.frequency import (
+    FrequencyRules,
+    load_frequency_words,
+    get_frequency_rules,
+    clear_frequency_rules_cache,
+    matches_word_groups,
+)
+from trendradar.core.matcher import WordGroupMatcher, compile_word_groups
 from trendradar.core.data import (
     save_titles_to_file,
     read_all_today_titles_from_storage,
@@ -20,10 +27,12 @@ from trendradar.core.data import (
     is_first_crawl_today,
 )
 from trendradar.core.analyzer import (
-    calculate_news_weight,
     format_time_display,
     count_word_frequency,
 )
+from trendradar.core.scoring import calculate_news_weight, calculate_news_weights, score_news_items
+from trendradar.core.analysis_state import AnalysisState
+from trendradar.core.cluster import cluster_similar_stats, cluster_similar_titles
 
 __all__ = [
     "parse_multi_account_config",
@@ -32,7 +41,12 @@ __all__ = [
     "get_account_at_index",
     "load_config",
     "load_frequency_words",
+    "FrequencyRules",
+    "get_frequency_rules",
+    "clear_frequency_rules_cache",
     "matches_word_groups",
+    "WordGroupMatcher",
+    "compile_word_groups",
     # 数据处理
     "save_titles_to_file",
     "read_all_today_titles_from_storage",
@@ -42,6 +56,13 @@ __all__ = [
     "is_first_crawl_today",
     # 统计分析
     "calculate_news_weight",
+    "calculate_news_weights",
+    "score_news_items",
+    # 增量分析
+    "AnalysisState",
     "format_time_display",
     "count_word_frequency",
+    # 相似标题聚类
+    "cluster_similar_stats",
+    "cluster_similar_titles",
 ]
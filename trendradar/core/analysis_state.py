@@ -0,0 +1,301 @@
+# coding=utf-8
+"""
+增量分析状态
+
+每次运行（cron 触发）都从头读取全天数据并逐条匹配频率词，代价随全天数据量增长。
+增量分析状态把以下内容保存在当天数据库旁边（output/<日期>/analysis_state.jsonl）：
+- 新闻行（id → 标题、平台、排名历史、首末时间、次数等），只从数据库增量读取变化行
+- 标题 → 命中词组 的匹配结果（频率词配置变化时自动失效）
+
+下次运行只读取 last_crawl_time >= 上次最新抓取时间 的行、只匹配新出现的标题。
+行数与数据库不一致（数据库被重建、手动修改等）时自动全量重建。
+
+文件为 JSON Lines：第一行是完整快照，之后每次运行只追加本次变化的行和匹配结果，
+写入量与新增数据成正比；追加次数达到 MAX_JOURNAL_ENTRIES、频率词变化或全量重建时重写快照。
+末尾不完整的行（写入中断）在加载时忽略，下次保存时重写快照。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+STATE_VERSION = 2
+
+# 快照之后最多追加的增量条数，超过后重写快照（压缩）
+MAX_JOURNAL_ENTRIES = 48
+
+
+class CachedMatcher:
+    """
+    带匹配结果缓存的匹配器（接口与 WordGroupMatcher.match 相同）
+
+    缓存值：None 表示未匹配，列表表示匹配及命中的词组序号。
+    """
+
+    def __init__(self, matcher, cache: Dict[str, Optional[List[int]]], state: "AnalysisState"):
+        self._matcher = matcher
+        self._cache = cache
+        self._state = state
+
+    def match(self, title) -> Tuple[bool, List[int]]:
+        cached = self._cache.get(title, False)
+        if cached is False:
+            matched, group_ids = self._matcher.match(title)
+            cached = group_ids if matched else None
+            if isinstance(title, str):
+                self._cache[title] = cached
+                self._state.record_match(title, cached)
+        if cached is None:
+            return False, []
+        return True, cached
+
+
+def rules_digest(
+    word_groups: List[Dict],
+    filter_words: List[str],
+    global_filters: Optional[List[str]] = None,
+) -> str:
+    """计算影响匹配结果的频率词配置摘要"""
+    payload = [
+        [[group.get("required", []), group.get("normal", [])] for group in word_groups],
+        list(filter_words or []),
+        list(global_filters or []),
+    ]
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AnalysisState:
+    """
+    当天的增量分析状态
+
+    典型用法：
+        state = AnalysisState.load(storage_manager.get_analysis_state_path())
+        if state.refresh(storage_manager):
+            all_results, id_to_name, title_info = state.to_titles(platform_ids)
+        ...
+        count_word_frequency(..., match_cache=state)
+        state.save()
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # id → [title, platform_id, rank, url, mobile_url, first_time, last_time, count, ranks]
+        self.rows: Dict[int, list] = {}
+        self.platforms: Dict[str, str] = {}
+        self.last_crawl_time = ""
+        self.rules_digest = ""
+        self.matches: Dict[str, Optional[List[int]]] = {}
+        # 上次保存之后的变化（追加写入）
+        self._changed_rows: set = set()
+        self._new_matches: Dict[str, Optional[List[int]]] = {}
+        self._platforms_changed = False
+        # 需要重写快照（文件不存在 / 不完整、频率词变化、全量重建、追加条数超限）
+        self._rewrite = True
+        self._journal_entries = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "AnalysisState":
+        """加载状态文件（快照 + 增量），不存在或格式不兼容时返回空状态"""
+        state = cls(path)
+        try:
+            with open(state.path, "r", encoding="utf-8") as f:
+                snapshot = json.loads(f.readline())
+                if snapshot.get("version") != STATE_VERSION:
+                    return state
+                state._merge(snapshot)
+                state._rewrite = False
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 写入中断留下的不完整行：忽略，下次保存时重写快照
+                        state._rewrite = True
+                        break
+                    state._merge(entry)
+                    state._journal_entries += 1
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"[增量分析] 状态文件无效，将全量重建: {e}")
+            state = cls(path)
+        return state
+
+    def _merge(self, entry: Dict) -> None:
+        for news_id, row in entry.get("rows", {}).items():
+            self.rows[int(news_id)] = row
+        self.matches.update(entry.get("matches", {}))
+        if "platforms" in entry:
+            self.platforms = entry["platforms"]
+        self.last_crawl_time = entry.get("last_crawl_time", self.last_crawl_time)
+        self.rules_digest = entry.get("rules_digest", self.rules_digest)
+
+    def record_match(self, title: str, group_ids: Optional[List[int]]) -> None:
+        """记录新的匹配结果（下次保存时追加）"""
+        self._new_matches[title] = group_ids
+
+    @property
+    def dirty(self) -> bool:
+        return bool(
+            self._rewrite and (self.rows or self.matches)
+            or self._changed_rows or self._new_matches or self._platforms_changed
+        )
+
+    def save(self) -> None:
+        """有变化时保存：追加本次变化，必要时重写完整快照"""
+        if not self.dirty:
+            return
+        if self._rewrite or self._journal_entries >= MAX_JOURNAL_ENTRIES:
+            self._write_snapshot()
+        else:
+            self._append_entry()
+
+    def _write_snapshot(self) -> None:
+        data = {
+            "version": STATE_VERSION,
+            "last_crawl_time": self.last_crawl_time,
+            "rules_digest": self.rules_digest,
+            "platforms": self.platforms,
+            "rows": {str(news_id): row for news_id, row in self.rows.items()},
+            "matches": self.matches,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+            os.replace(tmp_path, self.path)
+            self._rewrite = False
+            self._journal_entries = 0
+            self._clear_changes()
+        except OSError as e:
+            print(f"[增量分析] 保存状态失败: {e}")
+
+    def _append_entry(self) -> None:
+        entry = {
+            "last_crawl_time": self.last_crawl_time,
+            "rows": {str(news_id): self.rows[news_id] for news_id in self._changed_rows},
+            "matches": self._new_matches,
+        }
+        if self._platforms_changed:
+            entry["platforms"] = self.platforms
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+            self._journal_entries += 1
+            self._clear_changes()
+        except OSError as e:
+            print(f"[增量分析] 保存状态失败: {e}")
+            self._rewrite = True
+
+    def _clear_changes(self) -> None:
+        self._changed_rows = set()
+        self._new_matches = {}
+        self._platforms_changed = False
+
+    def refresh(self, storage_manager) -> bool:
+        """
+        从存储后端读取上次之后变化的新闻行
+
+        Args:
+            storage_manager: 存储管理器（需支持 get_news_rows_since）
+
+        Returns:
+            是否成功（False 表示后端不支持或无数据，调用方应回退为全量读取）
+        """
+        delta = storage_manager.get_news_rows_since(self.last_crawl_time)
+        if delta is None:
+            return False
+
+        if not self._apply(delta) and self.rows:
+            # 行数对不上：状态与数据库不一致，全量重建
+            print("[增量分析] 状态与数据库不一致，全量重建")
+            self.rows = {}
+            self.last_crawl_time = ""
+            self._changed_rows = set()
+            self._rewrite = True
+            delta = storage_manager.get_news_rows_since("")
+            if delta is None:
+                return False
+            self._apply(delta)
+
+        return bool(self.rows)
+
+    def _apply(self, delta: Dict) -> bool:
+        """合并增量行，返回合并后行数是否与数据库一致"""
+        rows = delta.get("rows", [])
+        for news_id, *row in rows:
+            self.rows[news_id] = list(row)
+            self._changed_rows.add(news_id)
+            last_time = row[6]
+            if last_time and last_time > self.last_crawl_time:
+                self.last_crawl_time = last_time
+        if delta.get("platforms", {}) != self.platforms:
+            self.platforms = delta.get("platforms", {})
+            self._platforms_changed = True
+        return len(self.rows) == delta.get("total", len(self.rows))
+
+    def to_titles(
+        self, current_platform_ids: Optional[List[str]] = None
+    ) -> Tuple[Dict, Dict, Dict]:
+        """
+        转换为 read_all_today_titles_from_storage 相同的结构
+
+        行按 (平台, last_time, id) 排序，与 get_today_all_data 的读取顺序一致。
+
+        Returns:
+            (all_results, id_to_name, title_info)
+        """
+        all_results: Dict[str, Dict] = {}
+        id_to_name: Dict[str, str] = {}
+        title_info: Dict[str, Dict] = {}
+
+        ordered = sorted(self.rows.items(), key=lambda kv: (kv[1][1], kv[1][6], kv[0]))
+        for _, (title, source_id, _, url, mobile_url, first_time, last_time, count, ranks) in ordered:
+            if current_platform_ids is not None and source_id not in current_platform_ids:
+                continue
+
+            source_titles = all_results.get(source_id)
+            if source_titles is None:
+                id_to_name[source_id] = self.platforms.get(source_id) or source_id
+                source_titles = all_results[source_id] = {}
+                title_info[source_id] = {}
+
+            source_titles[title] = {
+                "ranks": ranks,
+                "url": url,
+                "mobileUrl": mobile_url,
+            }
+            title_info[source_id][title] = {
+                "first_time": first_time,
+                "last_time": last_time,
+                "count": count,
+                "ranks": ranks,
+                "url": url,
+                "mobileUrl": mobile_url,
+            }
+
+        return all_results, id_to_name, title_info
+
+    def bind_matcher(
+        self,
+        matcher,
+        word_groups: List[Dict],
+        filter_words: List[str],
+        global_filters: Optional[List[str]] = None,
+    ) -> CachedMatcher:
+        """
+        包装匹配器，复用已保存的匹配结果
+
+        频率词配置与保存时不同则清空匹配缓存。
+        """
+        digest = rules_digest(word_groups, filter_words, global_filters)
+        if digest != self.rules_digest:
+            self.rules_digest = digest
+            self.matches = {}
+            self._new_matches = {}
+            self._rewrite = True
+        return CachedMatcher(matcher, self.matches, self)
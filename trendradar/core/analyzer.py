@@ -3,61 +3,21 @@
 统计分析模块
 
 提供新闻统计和分析功能：
-- calculate_news_weight: 计算新闻权重
 - format_time_display: 格式化时间显示
 - count_word_frequency: 统计词频
 """
 
+import heapq
 from typing import Dict, List, Tuple, Optional, Callable
 
-from trendradar.core.frequency import matches_word_groups
+from trendradar.core.frequency import get_matcher
+from trendradar.core.scoring import (
+    DEFAULT_WEIGHT_CONFIG,
+    calculate_news_weights,
+)
 
-
-def calculate_news_weight(
-    title_data: Dict,
-    rank_threshold: int,
-    weight_config: Dict,
-) -> float:
-    """
-    计算新闻权重，用于排序
-
-    Args:
-        title_data: 标题数据，包含 ranks 和 count
-        rank_threshold: 排名阈值
-        weight_config: 权重配置 {RANK_WEIGHT, FREQUENCY_WEIGHT, HOTNESS_WEIGHT}
-
-    Returns:
-        float: 计算出的权重值
-    """
-    ranks = title_data.get("ranks", [])
-    if not ranks:
-        return 0.0
-
-    count = title_data.get("count", len(ranks))
-
-    # 排名权重：Σ(11 - min(rank, 10)) / 出现次数
-    rank_scores = []
-    for rank in ranks:
-        score = 11 - min(rank, 10)
-        rank_scores.append(score)
-
-    rank_weight = sum(rank_scores) / len(ranks) if ranks else 0
-
-    # 频次权重：min(出现次数, 10) × 10
-    frequency_weight = min(count, 10) * 10
-
-    # 热度加成：高排名次数 / 总出现次数 × 100
-    high_rank_count = sum(1 for rank in ranks if rank <= rank_threshold)
-    hotness_ratio = high_rank_count / len(ranks) if ranks else 0
-    hotness_weight = hotness_ratio * 100
-
-    total_weight = (
-        rank_weight * weight_config["RANK_WEIGHT"]
-        + frequency_weight * weight_config["FREQUENCY_WEIGHT"]
-        + hotness_weight * weight_config["HOTNESS_WEIGHT"]
-    )
-
-    return total_weight
+# 分块打分的块大小：足够摊薄批量计算的开销，又不必保留全部命中标题
+SCORE_CHUNK_SIZE = 4096
 
 
 def format_time_display(
@@ -87,6 +47,148 @@ def format_time_display(
         return f"[{first_display} ~ {last_display}]"
 
 
+def _iter_title_entries(results: Dict, title_info: Dict):
+    """按结果顺序产出 (source_id, title, title_data, 历史信息或 None)"""
+    for source_id, titles_data in results.items():
+        source_info = title_info.get(source_id, {})
+        for title, title_data in titles_data.items():
+            yield source_id, title, title_data, source_info.get(title)
+
+
+def _pack_records(records: List["_TitleRecord"]) -> Tuple[List[int], List[int], List[int]]:
+    """把记录的排名打包为不等长数组 (offsets, values, counts)"""
+    offsets = [0]
+    values: List[int] = []
+    counts = []
+    for record in records:
+        values.extend(record.ranks)
+        offsets.append(len(values))
+        counts.append(record.count)
+    return offsets, values, counts
+
+
+class _TitleRecord:
+    """
+    单个标题的预计算记录
+
+    历史信息在构建时合并一次，权重由 calculate_news_weights 批量计算后写入排序键；
+    输出字典只为最终进入 top-k 的标题构建。
+    """
+
+    __slots__ = (
+        "source_id", "title", "first_time", "last_time", "count", "ranks",
+        "url", "mobile_url", "is_new", "rank_threshold", "seq", "sort_key",
+    )
+
+    def __init__(
+        self,
+        source_id: str,
+        title: str,
+        title_data: Dict,
+        info: Optional[Dict],
+        seq: int,
+        is_new: bool,
+        rank_threshold: int,
+    ):
+        self.source_id = source_id
+        self.title = title
+        self.is_new = is_new
+        self.rank_threshold = rank_threshold
+
+        ranks = title_data.get("ranks", []) or []
+        url = title_data.get("url", "")
+        mobile_url = title_data.get("mobileUrl", "")
+        if info is not None:
+            # 有历史统计信息时使用完整数据
+            self.first_time = info.get("first_time", "")
+            self.last_time = info.get("last_time", "")
+            self.count = info.get("count", 1)
+            if info.get("ranks"):
+                ranks = info["ranks"]
+            url = info.get("url", url)
+            mobile_url = info.get("mobileUrl", mobile_url)
+        else:
+            self.first_time = ""
+            self.last_time = ""
+            self.count = 1
+        self.ranks = ranks if ranks else [99]
+        self.url = url
+        self.mobile_url = mobile_url
+
+        self.seq = seq
+        self.sort_key: Tuple = ()
+
+    def set_weight(self, weight: float) -> None:
+        # 堆中"越大越好"：权重高、排名小、次数多、先出现
+        self.sort_key = (weight, -min(self.ranks), self.count, -self.seq)
+
+    def __lt__(self, other: "_TitleRecord") -> bool:
+        return self.sort_key < other.sort_key
+
+    def to_dict(self, id_to_name: Dict, convert_time_func: Callable[[str], str]) -> Dict:
+        """构建输出给报告层的标题字典"""
+        return {
+            "title": self.title,
+            "source_name": id_to_name.get(self.source_id, self.source_id),
+            "first_time": self.first_time,
+            "last_time": self.last_time,
+            "time_display": format_time_display(
+                self.first_time, self.last_time, convert_time_func
+            ),
+            "count": self.count,
+            "ranks": self.ranks,
+            "rank_threshold": self.rank_threshold,
+            "url": self.url,
+            "mobileUrl": self.mobile_url,
+            "is_new": self.is_new,
+            "weight": self.sort_key[0] if self.sort_key else 0.0,
+        }
+
+
+class _GroupBuckets:
+    """
+    每个词组的精确计数 + 有界 top-k
+
+    有数量限制的词组使用大小为 k 的最小堆（堆顶是当前最差的标题），
+    不限制的词组保留全部记录，最后统一排序。
+    """
+
+    def __init__(self, limits: List[int]):
+        self.limits = limits
+        self.counts = [0] * len(limits)
+        self.heaps: List[List[_TitleRecord]] = [[] for _ in limits]
+
+    def push(self, slot: int, record: _TitleRecord) -> None:
+        self.counts[slot] += 1
+        heap = self.heaps[slot]
+        limit = self.limits[slot]
+        if limit <= 0:
+            heap.append(record)
+        elif len(heap) < limit:
+            heapq.heappush(heap, record)
+        elif heap[0] < record:
+            heapq.heapreplace(heap, record)
+
+    def push_scored(
+        self,
+        slots: List[int],
+        records: List[_TitleRecord],
+        rank_threshold: int,
+        weight_config: Dict,
+    ) -> None:
+        """批量计算一块记录的权重，再放入所属词组的堆"""
+        weights = calculate_news_weights(
+            *_pack_records(records), rank_threshold, weight_config
+        )
+        for slot, record, weight in zip(slots, records, weights):
+            record.set_weight(weight)
+            self.push(slot, record)
+
+    def top(self, slot: int) -> List[_TitleRecord]:
+        """按权重从高到低返回保留的记录"""
+        return sorted(self.heaps[slot], reverse=True)
+
+
 def count_word_frequency(
     results: Dict,
     word_groups: List[Dict],
@@ -103,6 +205,8 @@ def count_word_frequency(
     is_first_crawl_func: Optional[Callable[[], bool]] = None,
     convert_time_func: Optional[Callable[[str], str]] = None,
     quiet: bool = False,
+    match_cache=None,
+    merge_titles_func: Optional[Callable[[List[Dict]], List[Dict]]] = None,
 ) -> Tuple[List[Dict], int]:
     """
     统计词频，支持必须词、频率词、过滤词、全局过滤词，并标记新增标题
@@ -123,17 +227,16 @@ def count_word_frequency(
         is_first_crawl_func: 检测是否是当天第一次爬取的函数
         convert_time_func: 时间格式转换函数
         quiet: 是否静默模式（不打印日志）
+        match_cache: 增量分析状态（AnalysisState，可选），复用已保存的标题匹配结果
+        merge_titles_func: 合并词组内相似标题的函数（可选，如 cluster_similar_titles），
+            在按数量限制截断之前调用，合并后词组仍显示满 max_count 条
 
     Returns:
         Tuple[List[Dict], int]: (统计结果列表, 总标题数)
     """
     # 默认权重配置
     if weight_config is None:
-        weight_config = {
-            "RANK_WEIGHT": 0.4,
-            "FREQUENCY_WEIGHT": 0.3,
-            "HOTNESS_WEIGHT": 0.3,
-        }
+        weight_config = DEFAULT_WEIGHT_CONFIG
 
     # 默认时间转换函数
     if convert_time_func is None:
@@ -149,306 +252,154 @@ def count_word_frequency(
         word_groups = [{"required": [], "normal": [], "group_key": "全部新闻"}]
         filter_words = []  # 清空过滤词，显示所有新闻
 
+    # 复用缓存中已编译的匹配器（或现场编译一次），所有标题共用
+    matcher = get_matcher(word_groups, filter_words, global_filters)
+    if match_cache is not None:
+        matcher = match_cache.bind_matcher(matcher, word_groups, filter_words, global_filters)
+
     is_first_today = is_first_crawl_func()
+    show_all = len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新闻"
+
+    if title_info is None:
+        title_info = {}
+    if new_titles is None:
+        new_titles = {}
 
     # 确定处理的数据源和新增标记逻辑
     if mode == "incremental":
         if is_first_today:
             # 增量模式 + 当天第一次：处理所有新闻，都标记为新增
             results_to_process = results
-            all_news_are_new = True
         else:
             # 增量模式 + 当天非第一次：只处理新增的新闻
-            results_to_process = new_titles if new_titles else {}
-            all_news_are_new = True
-    elif mode == "current":
-        # current 模式：只处理当前时间批次的新闻，但统计信息来自全部历史
-        if title_info:
-            latest_time = None
-            for source_titles in title_info.values():
-                for title_data in source_titles.values():
-                    last_time = title_data.get("last_time", "")
-                    if last_time:
-                        if latest_time is None or last_time > latest_time:
-                            latest_time = last_time
-
-            # 只处理 last_time 等于最新时间的新闻
-            if latest_time:
-                results_to_process = {}
-                for source_id, source_titles in results.items():
-                    if source_id in title_info:
-                        filtered_titles = {}
-                        for title, title_data in source_titles.items():
-                            if title in title_info[source_id]:
-                                info = title_info[source_id][title]
-                                if info.get("last_time") == latest_time:
-                                    filtered_titles[title] = title_data
-                        if filtered_titles:
-                            results_to_process[source_id] = filtered_titles
-
-                print(
-                    f"当前榜单模式：最新时间 {latest_time}，筛选出 {sum(len(titles) for titles in results_to_process.values())} 条当前榜单新闻"
-                )
-            else:
-                results_to_process = results
-        else:
-            results_to_process = results
-        all_news_are_new = False
+            results_to_process = new_titles
+        all_news_are_new = True
     else:
-        # 当日汇总模式：处理所有新闻
+        # current 模式只保留最新批次的新闻，最新时间在扫描结果时顺带得出（见下方分桶）
         results_to_process = results
         all_news_are_new = False
-        total_input_news = sum(len(titles) for titles in results.values())
-        filter_status = (
-            "全部显示"
-            if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新闻"
-            else "频率词过滤"
-        )
-        print(f"当日汇总模式：处理 {total_input_news} 条新闻，模式：{filter_status}")
-
-    word_stats = {}
-    total_titles = 0
-    processed_titles = {}
-    matched_new_count = 0
-
-    if title_info is None:
-        title_info = {}
-    if new_titles is None:
-        new_titles = {}
+        if mode != "current":
+            total_input_news = sum(len(titles) for titles in results.values())
+            filter_status = "全部显示" if show_all else "频率词过滤"
+            print(f"当日汇总模式：处理 {total_input_news} 条新闻，模式：{filter_status}")
 
+    # 相同 group_key 的词组合并统计：位置取最后一个，数量限制取最后一个（与配置顺序一致）
+    group_slots: Dict[str, int] = {}
+    slot_of_group = []
     for group in word_groups:
-        group_key = group["group_key"]
-        word_stats[group_key] = {"count": 0, "titles": {}}
-
-    for source_id, titles_data in results_to_process.items():
-        total_titles += len(titles_data)
-
-        if source_id not in processed_titles:
-            processed_titles[source_id] = {}
-
-        for title, title_data in titles_data.items():
-            if title in processed_titles.get(source_id, {}):
-                continue
-
-            # 使用统一的匹配逻辑
-            matches_frequency_words = matches_word_groups(
-                title, word_groups, filter_words, global_filters
+        slot_of_group.append(group_slots.setdefault(group["group_key"], len(group_slots)))
+    slot_keys = list(group_slots)
+    slot_position = [0] * len(slot_keys)
+    slot_limit = [0] * len(slot_keys)
+    for idx, group in enumerate(word_groups):
+        slot = slot_of_group[idx]
+        slot_position[slot] = idx
+        # 最大显示数量（优先级：单独配置 > 全局配置）
+        slot_limit[slot] = group.get("max_count", 0) or max_news_per_keyword
+
+    # current 模式：扫描结果时按 last_time 分桶（不再单独遍历 title_info 求最新时间），
+    # 只对最新批次的标题做匹配和打分
+    if mode == "current" and title_info:
+        by_time: Dict[Optional[str], List[Tuple]] = {}
+        for entry in _iter_title_entries(results, title_info):
+            info = entry[3]
+            # 无历史信息的标题单独成桶，只在没有任何时间信息时才会被选中
+            bucket_key = info.get("last_time", "") if info is not None else None
+            bucket = by_time.get(bucket_key)
+            if bucket is None:
+                bucket = by_time[bucket_key] = []
+            bucket.append(entry)
+
+        latest_time = max((key for key in by_time if key), default="")
+        if latest_time:
+            entries = by_time[latest_time]
+            print(
+                f"当前榜单模式：最新时间 {latest_time}，筛选出 {len(entries)} 条当前榜单新闻"
             )
+        else:
+            entries = list(_iter_title_entries(results, title_info))
+        total_titles = len(entries)
+    else:
+        entries = _iter_title_entries(results_to_process, title_info)
+        total_titles = sum(len(titles) for titles in results_to_process.values())
+
+    # 单遍扫描：每个标题只匹配一次，命中的标题生成预计算记录；
+    # 每攒够 SCORE_CHUNK_SIZE 条批量打分并放入所属词组的有界堆，
+    # 未进入 top-k 的记录随即释放，内存只与块大小和各词组的显示数量有关
+    # 合并相似标题需要看到词组的全部标题，此时先不限制数量，合并后再截断
+    selected = _GroupBuckets([0] * len(slot_limit) if merge_titles_func else slot_limit)
+    slots = []
+    records = []
+    for seq, (source_id, title, title_data, info) in enumerate(entries):
+        # 一次扫描同时得到是否匹配和命中的词组（标题只归入第一个命中的词组）
+        matched, group_ids = matcher.match(title)
+        if not matched or not group_ids:
+            continue
+
+        is_new = all_news_are_new or title in new_titles.get(source_id, ())
+        slots.append(slot_of_group[group_ids[0]])
+        records.append(
+            _TitleRecord(source_id, title, title_data, info, seq, is_new, rank_threshold)
+        )
+        if len(records) >= SCORE_CHUNK_SIZE:
+            selected.push_scored(slots, records, rank_threshold, weight_config)
+            slots = []
+            records = []
 
-            if not matches_frequency_words:
-                continue
-
-            # 如果是增量模式或 current 模式第一次，统计匹配的新增新闻数量
-            if (mode == "incremental" and all_news_are_new) or (
-                mode == "current" and is_first_today
-            ):
-                matched_new_count += 1
-
-            source_ranks = title_data.get("ranks", [])
-            source_url = title_data.get("url", "")
-            source_mobile_url = title_data.get("mobileUrl", "")
-
-            # 找到匹配的词组（防御性转换确保类型安全）
-            title_lower = str(title).lower() if not isinstance(title, str) else title.lower()
-            for group in word_groups:
-                required_words = group["required"]
-                normal_words = group["normal"]
-
-                # 如果是"全部新闻"模式，所有标题都匹配第一个（唯一的）词组
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新闻":
-                    group_key = group["group_key"]
-                    word_stats[group_key]["count"] += 1
-                    if source_id not in word_stats[group_key]["titles"]:
-                        word_stats[group_key]["titles"][source_id] = []
-                else:
-                    # 原有的匹配逻辑
-                    if required_words:
-                        all_required_present = all(
-                            req_word.lower() in title_lower
-                            for req_word in required_words
-                        )
-                        if not all_required_present:
-                            continue
-
-                    if normal_words:
-                        any_normal_present = any(
-                            normal_word.lower() in title_lower
-                            for normal_word in normal_words
-                        )
-                        if not any_normal_present:
-                            continue
-
-                    group_key = group["group_key"]
-                    word_stats[group_key]["count"] += 1
-                    if source_id not in word_stats[group_key]["titles"]:
-                        word_stats[group_key]["titles"][source_id] = []
-
-                first_time = ""
-                last_time = ""
-                count_info = 1
-                ranks = source_ranks if source_ranks else []
-                url = source_url
-                mobile_url = source_mobile_url
-
-                # 对于 current 模式，从历史统计信息中获取完整数据
-                if (
-                    mode == "current"
-                    and title_info
-                    and source_id in title_info
-                    and title in title_info[source_id]
-                ):
-                    info = title_info[source_id][title]
-                    first_time = info.get("first_time", "")
-                    last_time = info.get("last_time", "")
-                    count_info = info.get("count", 1)
-                    if "ranks" in info and info["ranks"]:
-                        ranks = info["ranks"]
-                    url = info.get("url", source_url)
-                    mobile_url = info.get("mobileUrl", source_mobile_url)
-                elif (
-                    title_info
-                    and source_id in title_info
-                    and title in title_info[source_id]
-                ):
-                    info = title_info[source_id][title]
-                    first_time = info.get("first_time", "")
-                    last_time = info.get("last_time", "")
-                    count_info = info.get("count", 1)
-                    if "ranks" in info and info["ranks"]:
-                        ranks = info["ranks"]
-                    url = info.get("url", source_url)
-                    mobile_url = info.get("mobileUrl", source_mobile_url)
-
-                if not ranks:
-                    ranks = [99]
-
-                time_display = format_time_display(first_time, last_time, convert_time_func)
-
-                source_name = id_to_name.get(source_id, source_id)
-
-                # 判断是否为新增
-                is_new = False
-                if all_news_are_new:
-                    # 增量模式下所有处理的新闻都是新增，或者当天第一次的所有新闻都是新增
-                    is_new = True
-                elif new_titles and source_id in new_titles:
-                    # 检查是否在新增列表中
-                    new_titles_for_source = new_titles[source_id]
-                    is_new = title in new_titles_for_source
-
-                word_stats[group_key]["titles"][source_id].append(
-                    {
-                        "title": title,
-                        "source_name": source_name,
-                        "first_time": first_time,
-                        "last_time": last_time,
-                        "time_display": time_display,
-                        "count": count_info,
-                        "ranks": ranks,
-                        "rank_threshold": rank_threshold,
-                        "url": url,
-                        "mobileUrl": mobile_url,
-                        "is_new": is_new,
-                    }
-                )
-
-                if source_id not in processed_titles:
-                    processed_titles[source_id] = {}
-                processed_titles[source_id][title] = True
+    if records:
+        selected.push_scored(slots, records, rank_threshold, weight_config)
 
-                break
+    matched_count = sum(selected.counts)
 
     # 最后统一打印汇总信息
     if mode == "incremental":
         if is_first_today:
             total_input_news = sum(len(titles) for titles in results.values())
-            filter_status = (
-                "全部显示"
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新闻"
-                else "频率词匹配"
-            )
+            filter_status = "全部显示" if show_all else "频率词匹配"
             print(
-                f"增量模式：当天第一次爬取，{total_input_news} 条新闻中有 {matched_new_count} 条{filter_status}"
+                f"增量模式：当天第一次爬取，{total_input_news} 条新闻中有 {matched_count} 条{filter_status}"
             )
         else:
             if new_titles:
                 total_new_count = sum(len(titles) for titles in new_titles.values())
-                filter_status = (
-                    "全部显示"
-                    if len(word_groups) == 1
-                    and word_groups[0]["group_key"] == "全部新闻"
-                    else "匹配频率词"
-                )
+                filter_status = "全部显示" if show_all else "匹配频率词"
                 print(
-                    f"增量模式：{total_new_count} 条新增新闻中，有 {matched_new_count} 条{filter_status}"
+                    f"增量模式：{total_new_count} 条新增新闻中，有 {matched_count} 条{filter_status}"
                 )
-                if matched_new_count == 0 and len(word_groups) > 1:
+                if matched_count == 0 and len(word_groups) > 1:
                     print("增量模式：没有新增新闻匹配频率词，将不会发送通知")
             else:
                 print("增量模式：未检测到新增新闻")
     elif mode == "current":
-        total_input_news = sum(len(titles) for titles in results_to_process.values())
+        filter_status = "全部显示" if show_all else "频率词匹配"
         if is_first_today:
-            filter_status = (
-                "全部显示"
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新闻"
-                else "频率词匹配"
-            )
             print(
-                f"当前榜单模式：当天第一次爬取，{total_input_news} 条当前榜单新闻中有 {matched_new_count} 条{filter_status}"
+                f"当前榜单模式：当天第一次爬取，{total_titles} 条当前榜单新闻中有 {matched_count} 条{filter_status}"
             )
         else:
-            matched_count = sum(stat["count"] for stat in word_stats.values())
-            filter_status = (
-                "全部显示"
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新闻"
-                else "频率词匹配"
-            )
             print(
-                f"当前榜单模式：{total_input_news} 条当前榜单新闻中有 {matched_count} 条{filter_status}"
+                f"当前榜单模式：{total_titles} 条当前榜单新闻中有 {matched_count} 条{filter_status}"
             )
 
     stats = []
-    # 创建 group_key 到位置和最大数量的映射
-    group_key_to_position = {
-        group["group_key"]: idx for idx, group in enumerate(word_groups)
-    }
-    group_key_to_max_count = {
-        group["group_key"]: group.get("max_count", 0) for group in word_groups
-    }
-
-    for group_key, data in word_stats.items():
-        all_titles = []
-        for source_id, title_list in data["titles"].items():
-            all_titles.extend(title_list)
-
-        # 按权重排序
-        sorted_titles = sorted(
-            all_titles,
-            key=lambda x: (
-                -calculate_news_weight(x, rank_threshold, weight_config),
-                min(x["ranks"]) if x["ranks"] else 999,
-                -x["count"],
-            ),
-        )
-
-        # 应用最大显示数量限制（优先级：单独配置 > 全局配置）
-        group_max_count = group_key_to_max_count.get(group_key, 0)
-        if group_max_count == 0:
-            # 使用全局配置
-            group_max_count = max_news_per_keyword
-
-        if group_max_count > 0:
-            sorted_titles = sorted_titles[:group_max_count]
-
+    for slot, group_key in enumerate(slot_keys):
+        count = selected.counts[slot]
+        titles = [
+            record.to_dict(id_to_name, convert_time_func)
+            for record in selected.top(slot)
+        ]
+        if merge_titles_func is not None:
+            titles = merge_titles_func(titles)
+            if slot_limit[slot] > 0:
+                titles = titles[:slot_limit[slot]]
         stats.append(
             {
                 "word": group_key,
-                "count": data["count"],
-                "position": group_key_to_position.get(group_key, 999),
-                "titles": sorted_titles,
+                "count": count,
+                "position": slot_position[slot],
+                "titles": titles,
                 "percentage": (
-                    round(data["count"] / total_titles * 100, 2)
+                    round(count / total_titles * 100, 2)
                     if total_titles > 0
                     else 0
                 ),
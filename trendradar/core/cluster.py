@@ -0,0 +1,213 @@
+# coding=utf-8
+"""
+相似标题聚类
+
+同一事件会以略有差异的标题出现在多个平台上，逐条列出会让 HTML 报告和推送消息明显变长。
+本模块在统计分析（count_word_frequency）按数量限制截断每个词组之前，
+把词组内的近似重复标题合并为一条（合并后仍能显示满 max_count 条）：
+
+- 签名：标题归一化（小写、去空白和标点）后的字符 n-gram 集合计算 MinHash
+- 候选：MinHash 分段（LSH）落入同一桶的标题才比较，整体近似线性时间
+- 确认：候选对的 n-gram Jaccard 相似度不低于阈值才合并（并查集传递合并）
+- 只合并不同平台的标题：每个聚类中每个平台至多一条（同一平台的相似标题通常是不同消息）
+
+中文短标题只差一两个字就可能是不同事件（"股价大涨" / "股价大跌"），
+因此使用三元组和较高的阈值，宁可少合并也不误合并。
+
+合并后的标题保留权重最高的一条作为代表，来源为所有平台（"平台A、平台B"），
+权重为成员权重之和，词组内按合并后的权重重新排序。
+"""
+
+import random
+import zlib
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from trendradar.utils.text import fold_title
+
+# 默认相似度阈值（字符 n-gram 的 Jaccard 相似度）
+DEFAULT_SIMILARITY = 0.8
+
+NGRAM_SIZE = 3
+NUM_PERM = 32
+LSH_BANDS = 16
+_ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 固定种子，保证同样的标题在不同进程中得到同样的签名
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+def title_shingles(title: str, n: int = NGRAM_SIZE) -> FrozenSet[str]:
+    """标题归一化后的字符 n-gram 集合"""
+    text = "".join(ch for ch in fold_title(title) if ch.isalnum())
+    if len(text) <= n:
+        return frozenset((text,)) if text else frozenset()
+    return frozenset(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def minhash_signature(shingles: FrozenSet[str]) -> Tuple[int, ...]:
+    """计算 n-gram 集合的 MinHash 签名（空集合返回空元组）"""
+    if not shingles:
+        return ()
+    hashes = [zlib.crc32(gram.encode("utf-8")) for gram in shingles]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def cluster_titles(
+    titles: Sequence[str],
+    threshold: float = DEFAULT_SIMILARITY,
+    sources: Optional[Sequence[str]] = None,
+) -> List[List[int]]:
+    """
+    对标题列表做近似重复聚类
+
+    Args:
+        titles: 标题列表
+        threshold: Jaccard 相似度阈值
+        sources: 每个标题的来源（可选，传入时同一来源的标题不会进入同一聚类）
+
+    Returns:
+        聚类列表，每个聚类为标题下标（升序），聚类按首个成员的位置排列
+    """
+    parent = list(range(len(titles)))
+    # 聚类根 -> 聚类中的来源集合
+    cluster_sources = [{source} for source in sources] if sources is not None else None
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    shingles = [title_shingles(title) for title in titles]
+    signatures: Dict[FrozenSet[str], Tuple[int, ...]] = {}
+    buckets: Dict[Tuple, List[int]] = {}
+    for i, grams in enumerate(shingles):
+        signature = signatures.get(grams)
+        if signature is None:
+            signature = signatures[grams] = minhash_signature(grams)
+        if not signature:
+            continue
+        for band in range(LSH_BANDS):
+            start = band * _ROWS_PER_BAND
+            key = (band,) + signature[start:start + _ROWS_PER_BAND]
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [i]
+                continue
+            for j in bucket:
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    continue
+                other = shingles[j]
+                if cluster_sources is not None and (
+                    cluster_sources[root_i] & cluster_sources[root_j]
+                ):
+                    continue
+                if grams == other or (
+                    len(grams & other) / len(grams | other) >= threshold
+                ):
+                    # 根取较小下标，保证代表是最先出现（权重最高）的标题
+                    root, child = (root_i, root_j) if root_i < root_j else (root_j, root_i)
+                    parent[child] = root
+                    if cluster_sources is not None:
+                        cluster_sources[root] |= cluster_sources[child]
+            bucket.append(i)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(titles)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def _merge_cluster(members: List[Dict]) -> Dict:
+    """合并一个聚类：以第一条为代表，汇总来源平台、权重和新增标记"""
+    merged = dict(members[0])
+    if len(members) == 1:
+        return merged
+
+    sources = []
+    for member in members:
+        if member["source_name"] not in sources:
+            sources.append(member["source_name"])
+    merged["source_name"] = "、".join(sources)
+    merged["sources"] = sources
+    merged["cluster_size"] = len(members)
+    merged["weight"] = sum(member.get("weight", 0.0) for member in members)
+    merged["count"] = max(member.get("count", 1) for member in members)
+    merged["is_new"] = any(member.get("is_new", False) for member in members)
+    return merged
+
+
+def cluster_similar_titles(
+    titles: List[Dict], threshold: float = DEFAULT_SIMILARITY
+) -> List[Dict]:
+    """
+    合并一个词组内的相似标题（只合并不同平台的标题）
+
+    Args:
+        titles: 按权重从高到低排列的标题字典列表
+        threshold: Jaccard 相似度阈值
+
+    Returns:
+        合并后的标题列表（按合并后的权重重新排序，不修改输入）
+    """
+    if len(titles) < 2:
+        return titles
+
+    clusters = cluster_titles(
+        [title["title"] for title in titles],
+        threshold,
+        sources=[title.get("source_name", "") for title in titles],
+    )
+    merged_titles = [
+        _merge_cluster([titles[i] for i in members]) for members in clusters
+    ]
+    if len(merged_titles) < len(titles):
+        # 合并后按权重重新排序（稳定排序，权重相同时保持原顺序）
+        merged_titles.sort(key=lambda title: -title.get("weight", 0.0))
+    return merged_titles
+
+
+def cluster_similar_stats(
+    stats: List[Dict],
+    threshold: float = DEFAULT_SIMILARITY,
+    quiet: bool = False,
+) -> List[Dict]:
+    """
+    对已生成的统计结果按词组合并相似标题
+
+    各词组的标题已按数量限制截断时合并后会少于 max_count 条，
+    分析流程应改为向 count_word_frequency 传入 cluster_similar_titles（截断前合并）。
+    词组的 count / percentage 仍是合并前的匹配数（精确值），只有 titles 被合并。
+
+    Args:
+        stats: count_word_frequency 返回的统计结果
+        threshold: Jaccard 相似度阈值
+        quiet: 是否静默模式
+
+    Returns:
+        新的统计结果列表（不修改输入）
+    """
+    clustered_stats = []
+    total_before = 0
+    total_after = 0
+    for stat in stats:
+        titles = stat["titles"]
+        merged_titles = cluster_similar_titles(titles, threshold)
+        total_before += len(titles)
+        total_after += len(merged_titles)
+        clustered_stats.append(stat if merged_titles is titles else {**stat, "titles": merged_titles})
+
+    if not quiet and total_after < total_before:
+        print(f"[标题聚类] {total_before} 条标题合并为 {total_after} 条")
+    return clustered_stats
@@ -153,6 +153,7 @@ def read_all_today_titles(
     storage_manager,
     current_platform_ids: Optional[List[str]] = None,
     quiet: bool = False,
+    analysis_state=None,
 ) -> Tuple[Dict, Dict, Dict]:
     """
     读取当天所有标题（从存储后端）
@@ -161,13 +162,21 @@ def read_all_today_titles(
         storage_manager: 存储管理器实例
         current_platform_ids: 当前监控的平台 ID 列表（用于过滤）
         quiet: 是否静默模式（不打印日志）
+        analysis_state: 增量分析状态（AnalysisState，可选），
+            提供时只从存储后端读取上次之后变化的行
 
     Returns:
         Tuple[Dict, Dict, Dict]: (all_results, id_to_name, title_info)
     """
-    all_results, final_id_to_name, title_info = read_all_today_titles_from_storage(
-        storage_manager, current_platform_ids
-    )
+    if analysis_state is not None and analysis_state.refresh(storage_manager):
+        all_results, final_id_to_name, title_info = analysis_state.to_titles(
+            current_platform_ids
+        )
+        analysis_state.save()
+    else:
+        all_results, final_id_to_name, title_info = read_all_today_titles_from_storage(
+            storage_manager, current_platform_ids
+        )
 
     if not quiet:
         if all_results:
@@ -8,23 +8,213 @@
 - 过滤词（!前缀）
 - 全局过滤词（[GLOBAL_FILTER] 区域）
 - 最大显示数量（@前缀）
+- 同义词组（a|b）、英文整词（"AI"）、正则（/regex/）、邻近匹配（a~b、a~20~b），
+  需在文件中声明 [EXTENDED_SYNTAX]，未声明时按普通字面词匹配（兼容旧配置）
+
+解析结果和编译后的匹配器按 文件路径 + mtime + 内容哈希 缓存在进程内，
+文件修改后下次调用自动重新加载；爬虫流程和 MCP Server 共用同一份缓存。
+调用方自行构造的词组配置按内容缓存编译结果，不会每次匹配都重新编译。
 """
 
+import hashlib
+import json
 import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+from trendradar.core.matcher import (
+    LITERAL_PREFIX,
+    WordGroupMatcher,
+    compile_word_groups,
+    display_term,
+    uses_extended_syntax,
+)
+
+# 启用高级词写法的声明（单独一行，可放在文件任意位置）
+EXTENDED_SYNTAX_MARKER = "[EXTENDED_SYNTAX]"
+
+
+@dataclass
+class FrequencyRules:
+    """已解析并编译的频率词配置（共享只读，调用方不应修改其中的列表）"""
+
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str                     # 文件内容 sha256
+    word_groups: List[Dict]
+    filter_words: List[str]
+    global_filters: List[str]
+    matcher: WordGroupMatcher
+
+
+_rules_cache: Dict[str, FrequencyRules] = {}
+_rules_lock = threading.Lock()
+
+# 非文件缓存的配置：最近使用的配置对象（按身份命中）和按内容缓存的匹配器
+MAX_COMPILED_MATCHERS = 32
+_recent_matchers: List[Tuple[List[Dict], List[str], Optional[List[str]], WordGroupMatcher]] = []
+_compiled_matchers: Dict[str, WordGroupMatcher] = {}
+
+
+def _resolve_frequency_path(frequency_file: Optional[str] = None) -> Path:
+    """解析频率词文件路径（默认从环境变量 FREQUENCY_WORDS_PATH 获取）"""
+    if frequency_file is None:
+        frequency_file = os.environ.get(
+            "FREQUENCY_WORDS_PATH", "config/frequency_words.txt"
+        )
+    return Path(frequency_file)
+
+
+def get_frequency_rules(frequency_file: Optional[str] = None) -> FrequencyRules:
+    """
+    获取频率词配置（带缓存和热加载）
+
+    - 文件 mtime 和大小未变化：直接返回缓存，不读取文件
+    - 文件被改写但内容哈希相同：只刷新缓存的 mtime
+    - 内容变化：重新解析并编译匹配器
+
+    Args:
+        frequency_file: 频率词配置文件路径
+
+    Returns:
+        FrequencyRules 实例
+
+    Raises:
+        FileNotFoundError: 频率词文件不存在
+    """
+    frequency_path = _resolve_frequency_path(frequency_file)
+    if not frequency_path.exists():
+        raise FileNotFoundError(f"频率词文件 {frequency_path} 不存在")
+
+    cache_key = str(frequency_path.resolve())
+    stat = frequency_path.stat()
+
+    with _rules_lock:
+        cached = _rules_cache.get(cache_key)
+        if cached and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+            return cached
+
+        with open(frequency_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if cached and cached.digest == digest:
+            cached.mtime_ns = stat.st_mtime_ns
+            cached.size = stat.st_size
+            return cached
+
+        word_groups, filter_words, global_filters = parse_frequency_words(raw.decode("utf-8"))
+        rules = FrequencyRules(
+            path=cache_key,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            digest=digest,
+            word_groups=word_groups,
+            filter_words=filter_words,
+            global_filters=global_filters,
+            matcher=compile_word_groups(word_groups, filter_words, global_filters),
+        )
+        if cached:
+            print(f"[频率词] 检测到配置变更，已重新加载: {frequency_path}")
+        _rules_cache[cache_key] = rules
+        return rules
+
+
+def clear_frequency_rules_cache() -> None:
+    """清空频率词缓存（下次调用重新读取文件）"""
+    with _rules_lock:
+        _rules_cache.clear()
+        _recent_matchers.clear()
+        _compiled_matchers.clear()
+
+
+def _content_key(
+    word_groups: List[Dict],
+    filter_words: List[str],
+    global_filters: Optional[List[str]],
+) -> str:
+    raw = json.dumps(
+        [word_groups, filter_words, global_filters],
+        ensure_ascii=False, sort_keys=True, default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_matcher(
+    word_groups: List[Dict],
+    filter_words: List[str],
+    global_filters: Optional[List[str]] = None,
+) -> Optional[WordGroupMatcher]:
+    """
+    查找与给定配置对象对应的已编译匹配器
+
+    仅当参数就是 load_frequency_words 返回的缓存对象本身时命中
+    （按对象身份比较，避免对内容做哈希）。
+
+    Returns:
+        命中返回 WordGroupMatcher，否则返回 None
+    """
+    with _rules_lock:
+        for rules in _rules_cache.values():
+            if (
+                rules.word_groups is word_groups
+                and rules.filter_words is filter_words
+                and rules.global_filters is global_filters
+            ):
+                return rules.matcher
+    return None
+
+
+def get_matcher(
+    word_groups: List[Dict],
+    filter_words: List[str],
+    global_filters: Optional[List[str]] = None,
+) -> WordGroupMatcher:
+    """
+    获取匹配器
+
+    依次查找：文件缓存中的配置对象 → 最近使用的配置对象（按身份）→ 按内容缓存的匹配器，
+    都未命中时才编译（同一内容只编译一次）。
+    """
+    matcher = get_cached_matcher(word_groups, filter_words, global_filters)
+    if matcher is not None:
+        return matcher
+
+    with _rules_lock:
+        for entry in _recent_matchers:
+            if entry[0] is word_groups and entry[1] is filter_words and entry[2] is global_filters:
+                return entry[3]
+
+    key = _content_key(word_groups, filter_words, global_filters)
+    with _rules_lock:
+        matcher = _compiled_matchers.get(key)
+    if matcher is None:
+        matcher = compile_word_groups(word_groups, filter_words, global_filters)
+
+    with _rules_lock:
+        if len(_compiled_matchers) >= MAX_COMPILED_MATCHERS:
+            _compiled_matchers.pop(next(iter(_compiled_matchers)))
+        _compiled_matchers[key] = matcher
+        # 持有配置对象本身的引用，身份比较不会因对象回收、id 复用而误命中
+        _recent_matchers.insert(0, (word_groups, filter_words, global_filters, matcher))
+        del _recent_matchers[MAX_COMPILED_MATCHERS:]
+    return matcher
+
 
 def load_frequency_words(
     frequency_file: Optional[str] = None,
 ) -> Tuple[List[Dict], List[str], List[str]]:
     """
-    加载频率词配置
+    加载频率词配置（带缓存，文件变化时自动重新加载）
 
     配置文件格式说明：
     - 每个词组由空行分隔
     - [GLOBAL_FILTER] 区域定义全局过滤词
     - [WORD_GROUPS] 区域定义词组（默认）
+    - [EXTENDED_SYNTAX] 启用下面的高级词写法（未声明时含 | ~ / " 的词按普通字面词匹配）
 
     词组语法：
     - 普通词：直接写入，任意匹配即可
@@ -32,6 +222,12 @@ def load_frequency_words(
     - !词：过滤词，匹配则排除
     - @数字：该词组最多显示的条数
 
+    词的写法（可与 + / ! 前缀组合，需声明 [EXTENDED_SYNTAX]，以 \\ 开头的词始终按字面匹配）：
+    - 华为|Huawei：同义词组，命中任意一个即可
+    - "AI"：英文整词匹配
+    - /正则/：正则表达式
+    - 苹果~发布会 / 苹果~20~发布会：两个词间隔不超过 10（或指定）个字符
+
     Args:
         frequency_file: 频率词配置文件路径，默认从环境变量 FREQUENCY_WORDS_PATH 获取或使用 config/frequency_words.txt
 
@@ -41,23 +237,42 @@ def load_frequency_words(
     Raises:
         FileNotFoundError: 频率词文件不存在
     """
-    if frequency_file is None:
-        frequency_file = os.environ.get(
-            "FREQUENCY_WORDS_PATH", "config/frequency_words.txt"
-        )
+    rules = get_frequency_rules(frequency_file)
+    return rules.word_groups, rules.filter_words, rules.global_filters
 
-    frequency_path = Path(frequency_file)
-    if not frequency_path.exists():
-        raise FileNotFoundError(f"频率词文件 {frequency_file} 不存在")
 
-    with open(frequency_path, "r", encoding="utf-8") as f:
-        content = f.read()
+def parse_frequency_words(content: str) -> Tuple[List[Dict], List[str], List[str]]:
+    """
+    解析频率词配置内容（语法见 load_frequency_words）
+
+    Args:
+        content: 配置文件内容
+
+    Returns:
+        (词组列表, 词组内过滤词, 全局过滤词)
+    """
+    extended = any(
+        line.strip().upper() == EXTENDED_SYNTAX_MARKER for line in content.split("\n")
+    )
+    if extended:
+        content = "\n".join(
+            "" if line.strip().upper() == EXTENDED_SYNTAX_MARKER else line
+            for line in content.split("\n")
+        )
 
     word_groups = [group.strip() for group in content.split("\n\n") if group.strip()]
 
     processed_groups = []
     filter_words = []
     global_filters = []
+    legacy_terms = []
+
+    def term(word: str) -> str:
+        # 未声明高级写法：含特殊字符的旧词加字面前缀，保持原有的子串匹配语义
+        if extended or not uses_extended_syntax(word):
+            return word
+        legacy_terms.append(word)
+        return LITERAL_PREFIX + word
 
     # 默认区域（向后兼容）
     current_section = "WORD_GROUPS"
@@ -83,7 +298,7 @@ def load_frequency_words(
                 if line.startswith(("!", "+", "@")):
                     continue  # 全局过滤区不支持特殊语法
                 if line:
-                    global_filters.append(line)
+                    global_filters.append(term(line))
             continue
 
         # 处理词组区域
@@ -104,18 +319,19 @@ def load_frequency_words(
                 except (ValueError, IndexError):
                     pass  # 忽略无效的@数字格式
             elif word.startswith("!"):
-                filter_words.append(word[1:])
-                group_filter_words.append(word[1:])
+                filter_word = term(word[1:])
+                filter_words.append(filter_word)
+                group_filter_words.append(filter_word)
             elif word.startswith("+"):
-                group_required_words.append(word[1:])
+                group_required_words.append(term(word[1:]))
             else:
-                group_normal_words.append(word)
+                group_normal_words.append(term(word))
 
         if group_required_words or group_normal_words:
             if group_normal_words:
-                group_key = " ".join(group_normal_words)
+                group_key = " ".join(display_term(w) for w in group_normal_words)
             else:
-                group_key = " ".join(group_required_words)
+                group_key = " ".join(display_term(w) for w in group_required_words)
 
             processed_groups.append(
                 {
@@ -123,9 +339,17 @@ def load_frequency_words(
                     "normal": group_normal_words,
                     "group_key": group_key,
                     "max_count": group_max_count,
+                    "filter_words": group_filter_words,
                 }
             )
 
+    if legacy_terms:
+        preview = "、".join(dict.fromkeys(legacy_terms[:10]))
+        print(
+            f"[频率词] {len(legacy_terms)} 个词包含 | ~ / \" 等高级写法字符，"
+            f"文件未声明 {EXTENDED_SYNTAX_MARKER}，仍按普通字面词匹配: {preview}"
+        )
+
     return processed_groups, filter_words, global_filters
 
 
@@ -147,48 +371,5 @@ def matches_word_groups(
     Returns:
         是否匹配
     """
-    # 防御性类型检查：确保 title 是有效字符串
-    if not isinstance(title, str):
-        title = str(title) if title is not None else ""
-    if not title.strip():
-        return False
-
-    title_lower = title.lower()
-
-    # 全局过滤检查（优先级最高）
-    if global_filters:
-        if any(global_word.lower() in title_lower for global_word in global_filters):
-            return False
-
-    # 如果没有配置词组，则匹配所有标题（支持显示全部新闻）
-    if not word_groups:
-        return True
-
-    # 过滤词检查
-    if any(filter_word.lower() in title_lower for filter_word in filter_words):
-        return False
-
-    # 词组匹配检查
-    for group in word_groups:
-        required_words = group["required"]
-        normal_words = group["normal"]
-
-        # 必须词检查
-        if required_words:
-            all_required_present = all(
-                req_word.lower() in title_lower for req_word in required_words
-            )
-            if not all_required_present:
-                continue
-
-        # 普通词检查
-        if normal_words:
-            any_normal_present = any(
-                normal_word.lower() in title_lower for normal_word in normal_words
-            )
-            if not any_normal_present:
-                continue
-
-        return True
-
-    return False
+    # 已编译的匹配器按配置对象和内容缓存（词的写法见 trendradar.core.matcher）
+    return get_matcher(word_groups, filter_words, global_filters).matches(title)
@@ -5,9 +5,11 @@
 负责从 YAML 配置文件和环境变量加载配置。
 """
 
+import copy
 import os
+import re
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 import yaml
 
@@ -68,6 +70,7 @@ def _load_report_config(config_data: Dict) -> Dict:
     sort_by_position_env = _get_env_bool("SORT_BY_POSITION_FIRST")
     reverse_content_env = _get_env_bool("REVERSE_CONTENT_ORDER")
     max_news_env = _get_env_int("MAX_NEWS_PER_KEYWORD")
+    cluster_titles_env = _get_env_bool("CLUSTER_SIMILAR_TITLES")
 
     return {
         "REPORT_MODE": _get_env_str("REPORT_MODE") or report_config.get("mode", "daily"),
@@ -75,13 +78,40 @@ def _load_report_config(config_data: Dict) -> Dict:
         "SORT_BY_POSITION_FIRST": sort_by_position_env if sort_by_position_env is not None else report_config.get("sort_by_position_first", False),
         "MAX_NEWS_PER_KEYWORD": max_news_env or report_config.get("max_news_per_keyword", 0),
         "REVERSE_CONTENT_ORDER": reverse_content_env if reverse_content_env is not None else report_config.get("reverse_content_order", False),
+        "CLUSTER_SIMILAR_TITLES": cluster_titles_env if cluster_titles_env is not None else report_config.get("cluster_similar_titles", False),
+        "CLUSTER_SIMILARITY": report_config.get("cluster_similarity", 0.8),
     }
 
 
+def _load_rate_limits(rate_limits: Optional[Dict]) -> Dict[str, Tuple[float, int]]:
+    """
+    加载渠道速率限制覆盖配置
+
+    Args:
+        rate_limits: {渠道: {per_minute: 每分钟条数, burst: 突发容量}}
+
+    Returns:
+        {渠道: (每分钟条数, 突发容量)}，未配置的渠道使用默认限制
+    """
+    result = {}
+    for channel, limit in (rate_limits or {}).items():
+        if not isinstance(limit, dict) or not limit.get("per_minute"):
+            continue
+        per_minute = float(limit["per_minute"])
+        burst = int(limit.get("burst") or 1)
+        if per_minute > 0:
+            result[str(channel).lower()] = (per_minute, max(1, burst))
+    return result
+
+
 def _load_notification_config(config_data: Dict) -> Dict:
     """加载通知配置"""
     notification = config_data.get("notification", {})
     enable_notification_env = _get_env_bool("ENABLE_NOTIFICATION")
+    outbox = notification.get("outbox", {})
+    outbox_enabled_env = _get_env_bool("OUTBOX_ENABLED")
+    delta = notification.get("delta", {})
+    delta_enabled_env = _get_env_bool("DELTA_ENABLED")
 
     return {
         "ENABLE_NOTIFICATION": enable_notification_env if enable_notification_env is not None else notification.get("enable_notification", True),
@@ -90,9 +120,20 @@ def _load_notification_config(config_data: Dict) -> Dict:
         "FEISHU_BATCH_SIZE": notification.get("feishu_batch_size", 29000),
         "BARK_BATCH_SIZE": notification.get("bark_batch_size", 3600),
         "SLACK_BATCH_SIZE": notification.get("slack_batch_size", 4000),
-        "BATCH_SEND_INTERVAL": notification.get("batch_send_interval", 1.0),
+        "BATCH_SEND_INTERVAL": notification.get("batch_send_interval", 0),
+        "RATE_LIMITS": _load_rate_limits(notification.get("rate_limits")),
+        "DELIVERY_MAX_RETRIES": notification.get("max_retries", 3),
         "FEISHU_MESSAGE_SEPARATOR": notification.get("feishu_message_separator", "---"),
         "MAX_ACCOUNTS_PER_CHANNEL": _get_env_int("MAX_ACCOUNTS_PER_CHANNEL") or notification.get("max_accounts_per_channel", 3),
+        "DISPATCH_WORKERS": _get_env_int("DISPATCH_WORKERS") or notification.get("dispatch_workers", 8),
+        "EMAIL_MAX_CONNECTIONS": notification.get("email_max_connections", 2),
+        "EMAIL_RECIPIENTS_PER_MESSAGE": notification.get("email_recipients_per_message", 50),
+        "OUTBOX_ENABLED": outbox_enabled_env if outbox_enabled_env is not None else outbox.get("enabled", True),
+        "OUTBOX_MAX_ATTEMPTS": outbox.get("max_attempts", 8),
+        "OUTBOX_LOOKBACK_DAYS": outbox.get("lookback_days", 1),
+        "DELTA_ENABLED": delta_enabled_env if delta_enabled_env is not None else delta.get("enabled", False),
+        "DELTA_FULL_REFRESH_MINUTES": delta.get("full_refresh_minutes", 360),
+        "DELTA_MIN_RANK_CHANGE": delta.get("min_rank_change", 3),
     }
 
 
@@ -132,13 +173,21 @@ def _load_storage_config(config_data: Dict) -> Dict:
     local = storage.get("local", {})
     remote = storage.get("remote", {})
     pull = storage.get("pull", {})
+    duckdb_cfg = storage.get("duckdb", {})
+    sharding = storage.get("sharding", {})
 
     txt_enabled_env = _get_env_bool("STORAGE_TXT_ENABLED")
     html_enabled_env = _get_env_bool("STORAGE_HTML_ENABLED")
     pull_enabled_env = _get_env_bool("PULL_ENABLED")
+    async_upload_env = _get_env_bool("S3_ASYNC_UPLOAD")
+    analysis_state_env = _get_env_bool("STORAGE_ANALYSIS_STATE")
 
     return {
         "BACKEND": _get_env_str("STORAGE_BACKEND") or storage.get("backend", "auto"),
+        "ANALYSIS_STATE": (
+            analysis_state_env if analysis_state_env is not None
+            else storage.get("analysis_state", True)
+        ),
         "FORMATS": {
             "SQLITE": formats.get("sqlite", True),
             "TXT": txt_enabled_env if txt_enabled_env is not None else formats.get("txt", True),
@@ -155,47 +204,144 @@ def _load_storage_config(config_data: Dict) -> Dict:
             "SECRET_ACCESS_KEY": _get_env_str("S3_SECRET_ACCESS_KEY") or remote.get("secret_access_key", ""),
             "REGION": _get_env_str("S3_REGION") or remote.get("region", ""),
             "RETENTION_DAYS": _get_env_int("REMOTE_RETENTION_DAYS") or remote.get("retention_days", 0),
+            "ASYNC_UPLOAD": async_upload_env if async_upload_env is not None else remote.get("async_upload", False),
+            "UPLOAD_COALESCE_SECONDS": remote.get("upload_coalesce_seconds", 5),
         },
         "PULL": {
             "ENABLED": pull_enabled_env if pull_enabled_env is not None else pull.get("enabled", False),
             "DAYS": _get_env_int("PULL_DAYS") or pull.get("days", 7),
         },
+        "DUCKDB": {
+            "PATH": _get_env_str("DUCKDB_PATH") or duckdb_cfg.get("path", ""),
+        },
+        "SHARDING": {
+            "SHARD_COUNT": _get_env_int("STORAGE_SHARD_COUNT") or sharding.get("shard_count", 4),
+            "PLATFORM_GROUPS": sharding.get("platform_groups", []) or [],
+        },
     }
 
 
-def _load_webhook_config(config_data: Dict) -> Dict:
-    """加载 Webhook 配置"""
+def _load_webhook_config(config_data: Dict, use_env: bool = True) -> Dict:
+    """
+    加载 Webhook 配置
+
+    Args:
+        config_data: 包含 notification.webhooks 的配置数据
+        use_env: 是否允许环境变量覆盖（租户的 Webhook 不继承主配置的环境变量）
+    """
     notification = config_data.get("notification", {})
     webhooks = notification.get("webhooks", {})
+    env = _get_env_str if use_env else (lambda key, default="": default)
 
     return {
         # 飞书
-        "FEISHU_WEBHOOK_URL": _get_env_str("FEISHU_WEBHOOK_URL") or webhooks.get("feishu_url", ""),
+        "FEISHU_WEBHOOK_URL": env("FEISHU_WEBHOOK_URL") or webhooks.get("feishu_url", ""),
         # 钉钉
-        "DINGTALK_WEBHOOK_URL": _get_env_str("DINGTALK_WEBHOOK_URL") or webhooks.get("dingtalk_url", ""),
+        "DINGTALK_WEBHOOK_URL": env("DINGTALK_WEBHOOK_URL") or webhooks.get("dingtalk_url", ""),
         # 企业微信
-        "WEWORK_WEBHOOK_URL": _get_env_str("WEWORK_WEBHOOK_URL") or webhooks.get("wework_url", ""),
-        "WEWORK_MSG_TYPE": _get_env_str("WEWORK_MSG_TYPE") or webhooks.get("wework_msg_type", "markdown"),
+        "WEWORK_WEBHOOK_URL": env("WEWORK_WEBHOOK_URL") or webhooks.get("wework_url", ""),
+        "WEWORK_MSG_TYPE": env("WEWORK_MSG_TYPE") or webhooks.get("wework_msg_type", "markdown"),
         # Telegram
-        "TELEGRAM_BOT_TOKEN": _get_env_str("TELEGRAM_BOT_TOKEN") or webhooks.get("telegram_bot_token", ""),
-        "TELEGRAM_CHAT_ID": _get_env_str("TELEGRAM_CHAT_ID") or webhooks.get("telegram_chat_id", ""),
+        "TELEGRAM_BOT_TOKEN": env("TELEGRAM_BOT_TOKEN") or webhooks.get("telegram_bot_token", ""),
+        "TELEGRAM_CHAT_ID": env("TELEGRAM_CHAT_ID") or webhooks.get("telegram_chat_id", ""),
         # 邮件
-        "EMAIL_FROM": _get_env_str("EMAIL_FROM") or webhooks.get("email_from", ""),
-        "EMAIL_PASSWORD": _get_env_str("EMAIL_PASSWORD") or webhooks.get("email_password", ""),
-        "EMAIL_TO": _get_env_str("EMAIL_TO") or webhooks.get("email_to", ""),
-        "EMAIL_SMTP_SERVER": _get_env_str("EMAIL_SMTP_SERVER") or webhooks.get("email_smtp_server", ""),
-        "EMAIL_SMTP_PORT": _get_env_str("EMAIL_SMTP_PORT") or webhooks.get("email_smtp_port", ""),
+        "EMAIL_FROM": env("EMAIL_FROM") or webhooks.get("email_from", ""),
+        "EMAIL_PASSWORD": env("EMAIL_PASSWORD") or webhooks.get("email_password", ""),
+        "EMAIL_TO": env("EMAIL_TO") or webhooks.get("email_to", ""),
+        "EMAIL_SMTP_SERVER": env("EMAIL_SMTP_SERVER") or webhooks.get("email_smtp_server", ""),
+        "EMAIL_SMTP_PORT": env("EMAIL_SMTP_PORT") or webhooks.get("email_smtp_port", ""),
         # ntfy
-        "NTFY_SERVER_URL": _get_env_str("NTFY_SERVER_URL") or webhooks.get("ntfy_server_url") or "https://ntfy.sh",
-        "NTFY_TOPIC": _get_env_str("NTFY_TOPIC") or webhooks.get("ntfy_topic", ""),
-        "NTFY_TOKEN": _get_env_str("NTFY_TOKEN") or webhooks.get("ntfy_token", ""),
+        "NTFY_SERVER_URL": env("NTFY_SERVER_URL") or webhooks.get("ntfy_server_url") or "https://ntfy.sh",
+        "NTFY_TOPIC": env("NTFY_TOPIC") or webhooks.get("ntfy_topic", ""),
+        "NTFY_TOKEN": env("NTFY_TOKEN") or webhooks.get("ntfy_token", ""),
         # Bark
-        "BARK_URL": _get_env_str("BARK_URL") or webhooks.get("bark_url", ""),
+        "BARK_URL": env("BARK_URL") or webhooks.get("bark_url", ""),
         # Slack
-        "SLACK_WEBHOOK_URL": _get_env_str("SLACK_WEBHOOK_URL") or webhooks.get("slack_webhook_url", ""),
+        "SLACK_WEBHOOK_URL": env("SLACK_WEBHOOK_URL") or webhooks.get("slack_webhook_url", ""),
     }
 
 
+_TENANT_NAME_PATTERN = re.compile(r"^[0-9A-Za-z_.-]+$")
+
+
+def _load_tenants_config(config_data: Dict) -> Dict:
+    """
+    加载多租户配置
+
+    每个租户使用独立的频率词文件、报告模式和通知渠道，
+    抓取只执行一次，分析 / 报告 / 推送按租户并行执行。
+    """
+    tenants = config_data.get("tenants", {}) or {}
+    enabled_env = _get_env_bool("TENANTS_ENABLED")
+
+    tenant_list = []
+    seen_names = set()
+    for tenant in tenants.get("list", []) or []:
+        name = str(tenant.get("name", "")).strip()
+        if not _TENANT_NAME_PATTERN.match(name) or name in (".", ".."):
+            print(f"[多租户] 租户名称无效（只允许字母、数字、_ . -），已跳过: {name!r}")
+            continue
+        if name in seen_names:
+            print(f"[多租户] 租户名称重复，已跳过: {name}")
+            continue
+        seen_names.add(name)
+
+        tenant_list.append({
+            "NAME": name,
+            "FREQUENCY_FILE": tenant.get("frequency_file", ""),
+            "REPORT_MODE": tenant.get("report_mode", ""),
+            # 租户 Webhook 不读取环境变量，避免继承主配置的推送渠道
+            "WEBHOOKS": _load_webhook_config(
+                {"notification": {"webhooks": tenant.get("webhooks", {}) or {}}},
+                use_env=False,
+            ),
+        })
+
+    return {
+        "ENABLED": enabled_env if enabled_env is not None else tenants.get("enabled", False),
+        "WORKERS": _get_env_int("TENANT_WORKERS") or tenants.get("workers", 0),
+        "LIST": tenant_list,
+    }
+
+
+def build_tenant_config(base_config: Dict[str, Any], tenant: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    基于主配置生成单个租户的配置
+
+    - 频率词文件、报告模式、通知渠道替换为租户自己的配置
+    - HTML 报告写入 <数据目录>/tenants/<租户名>/，不覆盖根目录 index.html
+    - 抓取数据只读共享：不保存 TXT、不执行过期数据清理、不启用异步上传
+      （上传日志属于主进程，租户进程不能接管）
+
+    Args:
+        base_config: load_config 返回的主配置
+        tenant: TENANTS.LIST 中的一项
+
+    Returns:
+        租户配置（深拷贝，不影响主配置）
+    """
+    config = copy.deepcopy(base_config)
+    name = tenant["NAME"]
+    data_dir = config["STORAGE"]["LOCAL"].get("DATA_DIR", "output")
+
+    config["TENANT_NAME"] = name
+    config["TENANTS"] = {"ENABLED": False, "WORKERS": 0, "LIST": []}
+    config["REPORT_OUTPUT_DIR"] = str(Path(data_dir) / "tenants" / name)
+    if tenant.get("FREQUENCY_FILE"):
+        config["FREQUENCY_WORDS_PATH"] = tenant["FREQUENCY_FILE"]
+    if tenant.get("REPORT_MODE"):
+        config["REPORT_MODE"] = tenant["REPORT_MODE"]
+    config.update(tenant["WEBHOOKS"])
+
+    config["STORAGE"]["FORMATS"]["TXT"] = False
+    config["STORAGE"]["RETENTION_DAYS"] = 0
+    config["STORAGE"]["LOCAL"]["RETENTION_DAYS"] = 0
+    config["STORAGE"]["REMOTE"]["RETENTION_DAYS"] = 0
+    config["STORAGE"]["REMOTE"]["ASYNC_UPLOAD"] = False
+    config["STORAGE"]["PULL"]["ENABLED"] = False
+    return config
+
+
 def _print_notification_sources(config: Dict) -> None:
     """打印通知渠道配置来源信息"""
     notification_sources = []
@@ -326,6 +472,9 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     # Webhook 配置
     config.update(_load_webhook_config(config_data))
 
+    # 多租户配置
+    config["TENANTS"] = _load_tenants_config(config_data)
+
     # 打印通知渠道配置来源
     _print_notification_sources(config)
 
@@ -0,0 +1,429 @@
+# coding=utf-8
+"""
+频率词编译匹配器
+
+将 load_frequency_words 的输出编译为一次性构建的匹配器：
+- 所有词（普通词 / 必须词 / 过滤词 / 全局过滤词）小写去重，每个词占位集中的一位
+- 字面词和同义词组的每个别名构建同一个 Aho–Corasick 自动机
+- 正则 / 整词 / 邻近规则提取锚点字面量放进同一个自动机，
+  只有锚点出现时才运行对应正则确认
+- 每个词组预先编译为 必须词掩码 / 普通词掩码，用位运算判断是否匹配
+
+词的写法（可与 + / ! 前缀组合，全局过滤区同样适用）：
+- 华为              字面子串（大小写不敏感）
+- \\a|b              以 \\ 开头：强制按字面子串匹配（不解析下面的高级写法）
+- 华为|Huawei|HW    同义词组，命中任意一个即视为命中该词
+- "AI"              英文整词匹配，前后不能紧邻字母 / 数字 / 下划线（不会匹配 MAIL）
+- /iphone ?1[5-7]/  正则表达式（大小写不敏感）
+- 苹果~发布会        邻近匹配，两个词间隔不超过 10 个字符（顺序不限）
+- 苹果~20~发布会     邻近匹配，指定最大间隔字符数
+
+高级写法需要在频率词文件中声明 [EXTENDED_SYNTAX]（见 trendradar.core.frequency），
+未声明时解析阶段会给含这些字符的词加上 \\ 前缀，保持旧配置的字面匹配语义。
+
+匹配语义与 matches_word_groups 完全一致，
+并额外返回命中的词组序号，count_word_frequency 无需再逐组扫描。
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from trendradar.utils.text import fold_title
+
+try:
+    from re import _parser as _sre_parse, _constants as _sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_constants
+
+_LITERAL = _sre_constants.LITERAL
+
+# 邻近匹配的默认最大间隔字符数
+DEFAULT_PROXIMITY = 10
+
+# 整词边界：只把英文字母、数字、下划线视为词的一部分，中文紧邻不影响整词判断
+_WORD_CHARS = "0-9a-z_"
+
+# 强制字面匹配的前缀
+LITERAL_PREFIX = "\\"
+
+
+
+def _regex_anchor(source: str) -> str:
+    """
+    提取正则的锚点：顶层连续字面字符中最长的一段（小写）
+
+    顶层是分支、或没有连续字面字符时返回空串。
+    """
+    try:
+        parsed = _sre_parse.parse(source, re.IGNORECASE)
+    except Exception:
+        return ""
+
+    best = ""
+    run = []
+    for op, value in list(parsed) + [(None, None)]:
+        if op is _LITERAL:
+            run.append(chr(value))
+            continue
+        candidate = "".join(run).lower()
+        if len(candidate) > len(best):
+            best = candidate
+        run = []
+    return best
+
+
+def parse_term(word: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    解析单个词的写法
+
+    Args:
+        word: 配置中的词（已去掉 + / ! 前缀）
+
+    Returns:
+        (类型, 内容)：
+        - ("literal", (别名, ...))：字面子串，同义词组有多个别名
+        - ("regex", (正则源码, 锚点))：正则 / 整词 / 邻近规则统一转换为正则，
+          锚点是匹配时必然出现的小写字面子串（无法确定时为空串）
+    """
+    term = str(word)
+
+    if term.startswith(LITERAL_PREFIX):
+        return "literal", (term[len(LITERAL_PREFIX):].lower(),)
+
+    if len(term) > 2 and term.startswith("/") and term.endswith("/"):
+        source = term[1:-1]
+        try:
+            re.compile(source, re.IGNORECASE)
+            return "regex", (source, _regex_anchor(source))
+        except re.error as e:
+            print(f"[频率词] 正则表达式无效，按普通词处理: {term} ({e})")
+            return "literal", (term.lower(),)
+
+    if len(term) > 2 and term.startswith('"') and term.endswith('"'):
+        inner = term[1:-1].lower()
+        return "regex", (
+            f"(?<![{_WORD_CHARS}]){re.escape(inner)}(?![{_WORD_CHARS}])",
+            inner,
+        )
+
+    if "~" in term:
+        parts = term.split("~")
+        window = DEFAULT_PROXIMITY
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            window = int(parts[1])
+            parts = [parts[0], parts[2]]
+        if len(parts) == 2 and parts[0] and parts[1]:
+            left, right = parts[0].lower(), parts[1].lower()
+            gap = f".{{0,{window}}}?"
+            source = (
+                f"{re.escape(left)}{gap}{re.escape(right)}"
+                f"|{re.escape(right)}{gap}{re.escape(left)}"
+            )
+            return "regex", (source, max(left, right, key=len))
+
+    if "|" in term:
+        aliases = tuple(dict.fromkeys(alias.lower() for alias in term.split("|") if alias))
+        if len(aliases) > 1:
+            return "literal", aliases
+
+    return "literal", (term.lower(),)
+
+
+def uses_extended_syntax(word: str) -> bool:
+    """词是否会被解析为高级写法（同义词组 / 整词 / 正则 / 邻近）"""
+    kind, payload = parse_term(word)
+    return kind == "regex" or len(payload) > 1
+
+
+def display_term(word: str) -> str:
+    """词的显示形式（去掉强制字面匹配前缀）"""
+    word = str(word)
+    return word[len(LITERAL_PREFIX):] if word.startswith(LITERAL_PREFIX) else word
+
+
+@lru_cache(maxsize=1024)
+def _compile_single_term(word: str):
+    kind, payload = parse_term(word)
+    if kind == "regex":
+        pattern = re.compile(payload[0], re.IGNORECASE | re.DOTALL)
+        return lambda text: pattern.search(text) is not None
+    return lambda text: any(alias in text for alias in payload)
+
+
+def term_matches(word: str, title: str) -> bool:
+    """
+    检查单个词是否出现在标题中（支持全部词写法，大小写不敏感）
+
+    用于按词统计等无需整组匹配的场景。
+    """
+    return _compile_single_term(str(word))(str(title).lower())
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick 多模式匹配自动机（纯 Python 实现）
+
+    状态转移使用 dict，fail 链在构建时合并输出，
+    匹配时每个字符只需一次 dict 查找（失配时沿 fail 回退）。
+    """
+
+    def __init__(self, patterns: List[Tuple[str, int]]):
+        """
+        构建自动机
+
+        Args:
+            patterns: (模式串, 输出位序号) 列表，多个模式可共用同一位（空串忽略）
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [0]  # 以该状态结尾的模式位集
+
+        for pattern, index in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(0)
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state] |= 1 << index
+
+        # BFS 计算 fail 指针，并把 fail 链上的输出合并到当前状态
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def scan(self, text: str) -> int:
+        """
+        扫描文本，返回命中模式的位集
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            int 位集，第 i 位为 1 表示输出位为 i 的某个模式出现在文本中
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        found = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found |= output[state]
+        return found
+
+
+class WordGroupMatcher:
+    """
+    编译后的频率词匹配器
+
+    构建一次，对任意多个标题复用。match() 一次扫描同时返回
+    是否匹配以及命中的词组序号（按配置顺序）。
+    """
+
+    def __init__(
+        self,
+        word_groups: List[Dict],
+        filter_words: List[str],
+        global_filters: Optional[List[str]] = None,
+    ):
+        """
+        编译匹配器
+
+        Args:
+            word_groups: 词组列表（load_frequency_words 返回值）
+            filter_words: 过滤词列表
+            global_filters: 全局过滤词列表
+        """
+        self.word_groups = word_groups
+        self._term_index: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        # 空串在 Python 子串语义下总是命中，单独记录
+        self._always_present = 0
+
+        self._global_mask = self._mask(global_filters or [])
+        self._filter_mask = self._mask(filter_words)
+
+        # 每个词组：(必须词掩码, 普通词掩码)
+        self._group_masks: List[Tuple[int, int]] = [
+            (self._mask(group.get("required", [])), self._mask(group.get("normal", [])))
+            for group in word_groups
+        ]
+
+        # 词 → 包含该词的词组位集，用于只检查候选词组
+        term_groups = [0] * len(self._term_index)
+        self._unconditional_groups = 0  # 无需命中任何词即可匹配的词组（如无词词组）
+        for group_id, (required, normal) in enumerate(self._group_masks):
+            if self._group_matches(self._always_present, required, normal):
+                self._unconditional_groups |= 1 << group_id
+                continue
+            terms = (required | normal) & ~self._always_present
+            while terms:
+                low_bit = terms & -terms
+                term_groups[low_bit.bit_length() - 1] |= 1 << group_id
+                terms ^= low_bit
+        self._term_groups = term_groups
+
+        literal_patterns = []
+        regex_terms = []
+        for (kind, payload), index in self._term_index.items():
+            if kind == "regex":
+                source, anchor = payload
+                regex_terms.append((index, source, anchor))
+                if anchor:
+                    literal_patterns.append((anchor, index))
+            else:
+                literal_patterns.extend((alias, index) for alias in payload)
+        self._automaton = AhoCorasick(literal_patterns)
+        self._compile_regex_terms(regex_terms)
+
+    def _compile_regex_terms(self, regex_terms: List[Tuple[int, str, str]]) -> None:
+        """
+        编译正则类的词
+
+        每个正则的锚点字面量（匹配时必然出现的子串）已经和字面词一起放进
+        Aho–Corasick 自动机，输出位就是该词自己的位：扫描后该位为 1 只表示
+        "可能命中"，再用对应正则确认。没有锚点的正则每个标题都要确认。
+        """
+        flags = re.IGNORECASE | re.DOTALL
+        self._regex_patterns: Dict[int, "re.Pattern"] = {}
+        self._regex_mask = 0
+        self._unanchored_mask = 0
+        for index, source, anchor in regex_terms:
+            self._regex_patterns[1 << index] = re.compile(source, flags)
+            self._regex_mask |= 1 << index
+            if not anchor:
+                self._unanchored_mask |= 1 << index
+
+    def _confirm_regex(self, text: str, found: int) -> int:
+        """用正则确认候选位，返回修正后的 found"""
+        candidates = (found & self._regex_mask) | self._unanchored_mask
+        found &= ~self._regex_mask
+        patterns = self._regex_patterns
+        while candidates:
+            low_bit = candidates & -candidates
+            candidates ^= low_bit
+            if patterns[low_bit].search(text):
+                found |= low_bit
+        return found
+
+    @staticmethod
+    def _group_matches(found: int, required: int, normal: int) -> bool:
+        """必须词全部命中，且（如有普通词）至少命中一个普通词"""
+        if found & required != required:
+            return False
+        return not normal or bool(found & normal)
+
+    def _mask(self, words: List[str]) -> int:
+        """将词列表转换为位集（小写去重）"""
+        mask = 0
+        for word in words:
+            term = parse_term(word)
+            index = self._term_index.get(term)
+            if index is None:
+                index = len(self._term_index)
+                self._term_index[term] = index
+                if term == ("literal", ("",)):
+                    self._always_present |= 1 << index
+            mask |= 1 << index
+        return mask
+
+    def match(self, title) -> Tuple[bool, List[int]]:
+        """
+        匹配标题
+
+        Args:
+            title: 标题文本
+
+        Returns:
+            (是否匹配, 命中的词组序号列表)。
+            未配置词组时匹配所有未被全局过滤的标题，词组序号列表为空。
+        """
+        if not isinstance(title, str):
+            title = str(title) if title is not None else ""
+        if not title.strip():
+            return False, []
+
+        text = fold_title(title)
+        found = self._automaton.scan(text) | self._always_present
+        if self._regex_mask:
+            found = self._confirm_regex(text, found)
+
+        # 全局过滤（优先级最高）
+        if found & self._global_mask:
+            return False, []
+
+        # 未配置词组：匹配所有标题
+        if not self._group_masks:
+            return True, []
+
+        if found & self._filter_mask:
+            return False, []
+
+        candidates = self._unconditional_groups
+        term_groups = self._term_groups
+        terms = found
+        while terms:
+            low_bit = terms & -terms
+            candidates |= term_groups[low_bit.bit_length() - 1]
+            terms ^= low_bit
+
+        matched = []
+        group_masks = self._group_masks
+        while candidates:
+            low_bit = candidates & -candidates
+            group_id = low_bit.bit_length() - 1
+            candidates ^= low_bit
+            required, normal = group_masks[group_id]
+            if found & required == required and (not normal or found & normal):
+                matched.append(group_id)
+
+        return bool(matched), matched
+
+    def matches(self, title) -> bool:
+        """检查标题是否匹配（与 matches_word_groups 等价）"""
+        return self.match(title)[0]
+
+    def first_group(self, title) -> Optional[int]:
+        """返回标题命中的第一个词组序号，未命中返回 None"""
+        matched, group_ids = self.match(title)
+        if not matched or not group_ids:
+            return None
+        return group_ids[0]
+
+
+def compile_word_groups(
+    word_groups: List[Dict],
+    filter_words: List[str],
+    global_filters: Optional[List[str]] = None,
+) -> WordGroupMatcher:
+    """
+    编译频率词配置
+
+    Args:
+        word_groups: 词组列表
+        filter_words: 过滤词列表
+        global_filters: 全局过滤词列表
+
+    Returns:
+        WordGroupMatcher 实例
+    """
+    return WordGroupMatcher(word_groups, filter_words, global_filters)
@@ -0,0 +1,218 @@
+# coding=utf-8
+"""
+新闻权重计算模块
+
+爬虫报告（core/analyzer.py）和 MCP 分析工具（mcp_server/tools/analytics.py）共用：
+- calculate_news_weight: 单条新闻权重
+- calculate_news_weights: 批量计算，排名以不等长数组（offsets + values）表示
+- score_news_items: 直接对新闻字典列表批量打分
+
+安装 NumPy 时批量计算向量化执行（pip install numpy），
+未安装或批次很小时退化为纯 Python 循环，结果与 calculate_news_weight 逐位一致。
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+# 爬虫默认权重（与 config.yaml 的 weight 段一致）
+DEFAULT_WEIGHT_CONFIG = {
+    "RANK_WEIGHT": 0.4,
+    "FREQUENCY_WEIGHT": 0.3,
+    "HOTNESS_WEIGHT": 0.3,
+}
+
+# 少于该数量的批次直接用纯 Python 计算（NumPy 的固定开销更大）
+NUMPY_MIN_BATCH = 64
+
+
+def calculate_news_weight(
+    title_data: Dict,
+    rank_threshold: int,
+    weight_config: Dict,
+) -> float:
+    """
+    计算新闻权重，用于排序
+
+    Args:
+        title_data: 标题数据，包含 ranks 和 count
+        rank_threshold: 排名阈值
+        weight_config: 权重配置 {RANK_WEIGHT, FREQUENCY_WEIGHT, HOTNESS_WEIGHT}
+
+    Returns:
+        float: 计算出的权重值
+    """
+    ranks = title_data.get("ranks", [])
+    if not ranks:
+        return 0.0
+
+    count = title_data.get("count", len(ranks))
+
+    # 排名权重：Σ(11 - min(rank, 10)) / 出现次数
+    rank_scores = []
+    for rank in ranks:
+        score = 11 - min(rank, 10)
+        rank_scores.append(score)
+
+    rank_weight = sum(rank_scores) / len(ranks) if ranks else 0
+
+    # 频次权重：min(出现次数, 10) × 10
+    frequency_weight = min(count, 10) * 10
+
+    # 热度加成：高排名次数 / 总出现次数 × 100
+    high_rank_count = sum(1 for rank in ranks if rank <= rank_threshold)
+    hotness_ratio = high_rank_count / len(ranks) if ranks else 0
+    hotness_weight = hotness_ratio * 100
+
+    total_weight = (
+        rank_weight * weight_config["RANK_WEIGHT"]
+        + frequency_weight * weight_config["FREQUENCY_WEIGHT"]
+        + hotness_weight * weight_config["HOTNESS_WEIGHT"]
+    )
+
+    return total_weight
+
+
+def pack_ranks(rank_lists: Iterable[Sequence[int]]) -> Tuple[List[int], List[int]]:
+    """
+    把多条新闻的排名列表打包为不等长数组
+
+    Args:
+        rank_lists: 每条新闻的排名列表
+
+    Returns:
+        (offsets, values)：第 i 条新闻的排名为 values[offsets[i]:offsets[i + 1]]，
+        offsets 长度为新闻数 + 1
+    """
+    offsets = [0]
+    values: List[int] = []
+    for ranks in rank_lists:
+        if ranks:
+            values.extend(ranks)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def calculate_news_weights(
+    offsets: Sequence[int],
+    values: Sequence[int],
+    counts: Sequence[int],
+    rank_threshold: int,
+    weight_config: Dict,
+) -> List[float]:
+    """
+    批量计算新闻权重（与逐条调用 calculate_news_weight 结果一致）
+
+    Args:
+        offsets: 排名偏移数组（长度为新闻数 + 1，见 pack_ranks）
+        values: 所有新闻的排名拼接而成的数组
+        counts: 每条新闻的出现次数
+        rank_threshold: 排名阈值
+        weight_config: 权重配置 {RANK_WEIGHT, FREQUENCY_WEIGHT, HOTNESS_WEIGHT}
+
+    Returns:
+        每条新闻的权重列表
+    """
+    total = len(offsets) - 1
+    if total <= 0:
+        return []
+
+    if not HAS_NUMPY or total < NUMPY_MIN_BATCH:
+        return _calculate_news_weights_python(
+            offsets, values, counts, rank_threshold, weight_config
+        )
+
+    offsets_arr = np.asarray(offsets, dtype=np.int64)
+    values_arr = np.asarray(values, dtype=np.int64)
+    counts_arr = np.asarray(counts, dtype=np.int64)
+    lengths = np.diff(offsets_arr)
+    has_ranks = lengths > 0
+    safe_lengths = np.where(has_ranks, lengths, 1)
+
+    # 每个排名所属的新闻序号，用 bincount 做分段求和（空段为 0）
+    segment = np.repeat(np.arange(total), lengths)
+    rank_sum = np.bincount(
+        segment, weights=11 - np.minimum(values_arr, 10), minlength=total
+    )
+    high_rank_count = np.bincount(
+        segment, weights=values_arr <= rank_threshold, minlength=total
+    )
+
+    rank_weight = rank_sum / safe_lengths
+    frequency_weight = np.minimum(counts_arr, 10) * 10
+    hotness_weight = high_rank_count / safe_lengths * 100
+
+    total_weight = (
+        rank_weight * weight_config["RANK_WEIGHT"]
+        + frequency_weight * weight_config["FREQUENCY_WEIGHT"]
+        + hotness_weight * weight_config["HOTNESS_WEIGHT"]
+    )
+    return np.where(has_ranks, total_weight, 0.0).tolist()
+
+
+def _calculate_news_weights_python(
+    offsets: Sequence[int],
+    values: Sequence[int],
+    counts: Sequence[int],
+    rank_threshold: int,
+    weight_config: Dict,
+) -> List[float]:
+    """纯 Python 批量计算（运算顺序与 calculate_news_weight 相同，结果逐位一致）"""
+    rank_factor = weight_config["RANK_WEIGHT"]
+    frequency_factor = weight_config["FREQUENCY_WEIGHT"]
+    hotness_factor = weight_config["HOTNESS_WEIGHT"]
+    weights = []
+    start = offsets[0]
+    for i in range(len(offsets) - 1):
+        end = offsets[i + 1]
+        length = end - start
+        if not length:
+            weights.append(0.0)
+            start = end
+            continue
+        rank_sum = 0
+        high_rank_count = 0
+        for rank in values[start:end]:
+            rank_sum += 11 - (rank if rank < 10 else 10)
+            if rank <= rank_threshold:
+                high_rank_count += 1
+        count = counts[i]
+        weights.append(
+            rank_sum / length * rank_factor
+            + min(count, 10) * 10 * frequency_factor
+            + high_rank_count / length * 100 * hotness_factor
+        )
+        start = end
+    return weights
+
+
+def score_news_items(
+    items: Sequence[Dict],
+    rank_threshold: int,
+    weight_config: Optional[Dict] = None,
+) -> List[float]:
+    """
+    对新闻字典列表批量打分
+
+    Args:
+        items: 新闻字典列表，包含 ranks 和 count（缺省为排名个数）
+        rank_threshold: 排名阈值
+        weight_config: 权重配置，默认 DEFAULT_WEIGHT_CONFIG
+
+    Returns:
+        与 items 一一对应的权重列表
+    """
+    if weight_config is None:
+        weight_config = DEFAULT_WEIGHT_CONFIG
+    rank_lists = [item.get("ranks", []) for item in items]
+    offsets, values = pack_ranks(rank_lists)
+    counts = [
+        item.get("count", len(ranks)) for item, ranks in zip(items, rank_lists)
+    ]
+    return calculate_news_weights(offsets, values, counts, rank_threshold, weight_config)
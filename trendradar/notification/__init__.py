@@ -13,11 +13,16 @@
 - batch: 批次处理工具
 - renderer: 通知内容渲染
 - splitter: 消息分批拆分
+- delivery: 推送节奏控制（令牌桶限速、限流重试）
+- outbox: 持久化推送队列（发送失败的批次跨运行补发）
+- delta: 增量推送（只推送与上次送达报告相比的变化）
+- sessions: 推送 HTTP 会话池（连接复用）
+- mailer: 邮件投递（MIME 预构建、SMTP 连接复用、收件人分组并行）
 - senders: 消息发送器（各渠道发送函数）
 - dispatcher: 多账号通知调度器
 """
 
-from trendradar.notification.push_manager import PushRecordManager
+from trendradar.notification.push_manager import PushRecordManager, FilePushRecordStore
 from trendradar.notification.formatters import (
     strip_markdown,
     convert_markdown_to_mrkdwn,
@@ -34,8 +39,22 @@ from trendradar.notification.renderer import (
 )
 from trendradar.notification.splitter import (
     split_content_into_batches,
+    SplitContentCache,
     DEFAULT_BATCH_SIZES,
 )
+from trendradar.notification.delivery import (
+    DeliveryScheduler,
+    TokenBucket,
+    DEFAULT_RATE_LIMITS,
+    OutboundRequest,
+)
+from trendradar.notification.outbox import NotificationOutbox
+from trendradar.notification.delta import (
+    DeltaNotifier,
+    compute_report_delta,
+    report_fingerprint,
+)
+from trendradar.notification.sessions import SessionRegistry
 from trendradar.notification.senders import (
     send_to_feishu,
     send_to_dingtalk,
@@ -45,13 +64,14 @@ from trendradar.notification.senders import (
     send_to_ntfy,
     send_to_bark,
     send_to_slack,
-    SMTP_CONFIGS,
 )
+from trendradar.notification.mailer import SMTP_CONFIGS, EmailDelivery, SmtpSettings
 from trendradar.notification.dispatcher import NotificationDispatcher
 
 __all__ = [
     # 推送记录管理
     "PushRecordManager",
+    "FilePushRecordStore",
     # 格式转换
     "strip_markdown",
     "convert_markdown_to_mrkdwn",
@@ -65,7 +85,21 @@ __all__ = [
     "render_dingtalk_content",
     # 消息分批
     "split_content_into_batches",
+    "SplitContentCache",
     "DEFAULT_BATCH_SIZES",
+    # 推送节奏控制
+    "DeliveryScheduler",
+    "TokenBucket",
+    "DEFAULT_RATE_LIMITS",
+    "OutboundRequest",
+    # 推送队列
+    "NotificationOutbox",
+    # 增量推送
+    "DeltaNotifier",
+    "compute_report_delta",
+    "report_fingerprint",
+    # HTTP 会话池
+    "SessionRegistry",
     # 消息发送器
     "send_to_feishu",
     "send_to_dingtalk",
@@ -76,6 +110,9 @@ __all__ = [
     "send_to_bark",
     "send_to_slack",
     "SMTP_CONFIGS",
+    # 邮件投递
+    "EmailDelivery",
+    "SmtpSettings",
     # 通知调度器
     "NotificationDispatcher",
 ]
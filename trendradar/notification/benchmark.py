@@ -0,0 +1,549 @@
+# coding=utf-8
+"""
+通知推送基准测试
+
+用可复现的合成报告数据（固定随机种子）测量消息分批（split_content_into_batches）
+在各推送格式下的耗时、批次数和总字节数。
+
+--dispatch 模式测量端到端推送：启动本地模拟 Webhook 服务（mock_server），
+通过 NotificationDispatcher.dispatch_all 向各渠道推送，统计分批耗时、完整消息渲染耗时、
+每批字节数、各渠道批次数以及推送总耗时（可模拟延迟、429、413）。
+
+结果可保存为 JSON（包含参数和 git 版本），并与之前的结果对比，
+便于在不同提交之间比较分批和推送性能。
+
+用法:
+    python -m trendradar.notification.benchmark
+    python -m trendradar.notification.benchmark --groups 40 --titles-per-group 60 --repeat 20
+    python -m trendradar.notification.benchmark --output split.json --compare baseline.json
+    python -m trendradar.notification.benchmark --dispatch --latency-ms 80 --throttle-rate 0.05
+    python -m trendradar.notification.benchmark --dispatch --no-rate-limits --accounts 3 --repeat 3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from trendradar.notification.dispatcher import NotificationDispatcher
+from trendradar.notification.mock_server import (
+    MOCK_CHANNELS,
+    MockWebhookBehavior,
+    MockWebhookServer,
+)
+from trendradar.notification.renderer import render_dingtalk_content, render_feishu_content
+from trendradar.notification.splitter import split_content_into_batches
+from trendradar.report.formatter import clear_title_fragment_cache
+
+
+# 各格式使用的批次大小（与默认配置一致）
+SPLIT_FORMATS = {
+    "feishu": 29000,
+    "dingtalk": 20000,
+    "wework": 4000,
+    "telegram": 4000,
+    "ntfy": 3800,
+    "bark": 3600,
+    "slack": 4000,
+}
+
+# 合成标题用词
+_WORDS = [
+    "人工智能", "新能源", "芯片", "比亚迪", "华为", "苹果", "特斯拉", "股市", "A股", "美联储",
+    "降息", "世界杯", "国足", "演唱会", "电影", "票房", "高考", "地震", "台风", "航天",
+    "火箭", "卫星", "医保", "房价", "楼市", "汽车", "手机", "发布会", "科技", "教育",
+]
+
+_SOURCES = ["知乎", "微博", "百度热搜", "今日头条", "抖音", "B站", "华尔街见闻", "财联社"]
+
+# 固定时间，保证批次头尾（时间戳）在不同运行之间一致
+_FIXED_NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@dataclass
+class SplitBenchmarkConfig:
+    """基准测试参数（写入结果文件，用于判断两次结果是否可比）"""
+
+    groups: int = 30                # 词组数量
+    titles_per_group: int = 40      # 每个词组的标题数
+    new_sources: int = 8            # 新增热点的来源数
+    new_per_source: int = 15        # 每个来源的新增标题数
+    failed_ids: int = 2             # 获取失败的平台数
+    repeat: int = 10                # 每种格式重复次数
+    mode: str = "daily"
+    reverse_content_order: bool = False
+    seed: int = 42
+
+
+@dataclass
+class SplitStats:
+    """单种格式的分批统计"""
+
+    max_bytes: int = 0
+    batches: int = 0
+    total_bytes: int = 0
+    p50_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+@dataclass
+class SplitBenchmarkResult:
+    """基准测试结果"""
+
+    config: SplitBenchmarkConfig
+    formats: Dict[str, SplitStats] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    environment: Dict[str, str] = field(default_factory=dict)
+
+
+def _synthetic_title(rng: random.Random, index: int, source_name: str, is_new: bool) -> Dict:
+    words = rng.sample(_WORDS, rng.randint(3, 6))
+    title = "".join(words) + f"：第{index}条消息" + ("（附视频）" if rng.random() < 0.2 else "")
+    ranks = sorted(rng.sample(range(1, 51), rng.randint(1, 4)))
+    return {
+        "title": title,
+        "source_name": source_name,
+        "time_display": f"[{rng.randint(0, 11):02d}:{rng.randint(0, 59):02d} ~ 12:00]",
+        "count": len(ranks),
+        "ranks": ranks,
+        "rank_threshold": 5,
+        "url": f"https://example.com/{source_name}/{index}",
+        "mobile_url": f"https://m.example.com/{source_name}/{index}" if rng.random() < 0.5 else "",
+        "is_new": is_new,
+    }
+
+
+def build_report_data(config: SplitBenchmarkConfig) -> Dict:
+    """
+    生成合成报告数据（结构与 prepare_report_data 的返回值一致）
+
+    Args:
+        config: 基准测试参数
+
+    Returns:
+        报告数据字典（stats / new_titles / failed_ids / total_new_count）
+    """
+    rng = random.Random(config.seed)
+    index = 0
+
+    stats = []
+    for g in range(config.groups):
+        titles = []
+        for _ in range(config.titles_per_group):
+            index += 1
+            titles.append(_synthetic_title(rng, index, rng.choice(_SOURCES), rng.random() < 0.1))
+        stats.append({
+            "word": " ".join(rng.sample(_WORDS, 2)),
+            "count": len(titles) + rng.randint(0, 20),
+            "titles": titles,
+            "percentage": round(rng.random() * 100, 2),
+        })
+
+    new_titles = []
+    for s in range(config.new_sources):
+        source_name = _SOURCES[s % len(_SOURCES)]
+        titles = []
+        for _ in range(config.new_per_source):
+            index += 1
+            titles.append(_synthetic_title(rng, index, source_name, True))
+        new_titles.append({
+            "source_id": f"source{s}",
+            "source_name": source_name,
+            "titles": titles,
+        })
+
+    return {
+        "stats": stats,
+        "new_titles": new_titles,
+        "failed_ids": [f"platform{i}" for i in range(config.failed_ids)],
+        "total_new_count": sum(len(source["titles"]) for source in new_titles),
+    }
+
+
+def _environment() -> Dict[str, str]:
+    """记录运行环境，便于判断结果是否可比"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def run_split_benchmark(config: SplitBenchmarkConfig) -> SplitBenchmarkResult:
+    """
+    执行分批基准测试
+
+    Args:
+        config: 基准测试参数
+
+    Returns:
+        SplitBenchmarkResult
+    """
+    report_data = build_report_data(config)
+    result = SplitBenchmarkResult(config=config, environment=_environment())
+
+    wall_start = time.perf_counter()
+    for format_type, max_bytes in SPLIT_FORMATS.items():
+        latencies = []
+        batches: List[str] = []
+        for _ in range(max(1, config.repeat)):
+            start = time.perf_counter()
+            batches = split_content_into_batches(
+                report_data=report_data,
+                format_type=format_type,
+                max_bytes=max_bytes,
+                mode=config.mode,
+                reverse_content_order=config.reverse_content_order,
+                get_time_func=lambda: _FIXED_NOW,
+            )
+            latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        result.formats[format_type] = SplitStats(
+            max_bytes=max_bytes,
+            batches=len(batches),
+            total_bytes=sum(len(batch.encode("utf-8")) for batch in batches),
+            p50_ms=round(latencies[len(latencies) // 2] * 1000, 3),
+            max_ms=round(latencies[-1] * 1000, 3),
+        )
+    result.wall_seconds = round(time.perf_counter() - wall_start, 3)
+    return result
+
+
+def format_split_result(result: SplitBenchmarkResult, baseline: Optional[dict] = None) -> str:
+    """格式化结果表格（可选与基线对比 p50）"""
+    config = result.config
+    lines = [
+        f"词组: {config.groups}  每组标题: {config.titles_per_group}  "
+        f"新增来源: {config.new_sources}  每源新增: {config.new_per_source}  "
+        f"重复: {config.repeat}  模式: {config.mode}  种子: {config.seed}",
+        f"总耗时: {result.wall_seconds}s  提交: {result.environment.get('git_commit') or '-'}",
+        "",
+        f"{'格式':<12}{'上限(B)':>9}{'批次':>6}{'总字节':>10}{'p50(ms)':>11}{'max(ms)':>11}",
+    ]
+
+    baseline_formats = (baseline or {}).get("formats", {})
+    for format_type, stats in result.formats.items():
+        line = (
+            f"{format_type:<12}{stats.max_bytes:>9}{stats.batches:>6}{stats.total_bytes:>10}"
+            f"{stats.p50_ms:>11.2f}{stats.max_ms:>11.2f}"
+        )
+        base = baseline_formats.get(format_type)
+        if base and base.get("p50_ms"):
+            speedup = base["p50_ms"] / stats.p50_ms if stats.p50_ms else 0.0
+            line += f"   {speedup:.1f}x (基线 {base['p50_ms']:.2f})"
+            if base.get("total_bytes") != stats.total_bytes or base.get("batches") != stats.batches:
+                line += " ⚠️ 输出与基线不同"
+        lines.append(line)
+
+    if baseline and baseline.get("config") != asdict(config):
+        lines.append("")
+        lines.append("⚠️ 基线参数与本次不同，对比结果仅供参考")
+    return "\n".join(lines)
+
+
+@dataclass
+class DispatchBenchmarkConfig:
+    """端到端推送基准测试参数"""
+
+    report: SplitBenchmarkConfig = field(default_factory=SplitBenchmarkConfig)
+    channels: List[str] = field(default_factory=lambda: list(MOCK_CHANNELS))
+    accounts: int = 1                       # 每个渠道的账号数
+    workers: int = 8                        # 并发推送线程数（DISPATCH_WORKERS）
+    max_retries: int = 3
+    rate_limits: bool = True                # 是否使用各渠道默认速率限制
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: Optional[float] = 1.0
+    max_body_bytes: int = 0
+
+
+@dataclass
+class DispatchChannelStats:
+    """单个渠道的推送统计（取最后一次推送）"""
+
+    success: bool = False
+    batches: int = 0                        # 成功送达的批次数
+    requests: int = 0                       # 模拟服务收到的请求数（含重试）
+    throttled: int = 0                      # 429 次数
+    too_large: int = 0                      # 413 次数
+    total_bytes: int = 0
+    avg_batch_bytes: int = 0
+    max_batch_bytes: int = 0
+    split_ms: float = 0.0                   # 该渠道格式的分批耗时
+
+
+@dataclass
+class DispatchBenchmarkResult:
+    """端到端推送基准测试结果"""
+
+    config: DispatchBenchmarkConfig
+    channels: Dict[str, DispatchChannelStats] = field(default_factory=dict)
+    render_ms: Dict[str, float] = field(default_factory=dict)
+    dispatch_p50_s: float = 0.0
+    dispatch_max_s: float = 0.0
+    environment: Dict[str, str] = field(default_factory=dict)
+
+
+# 推送渠道 -> 分批格式
+_CHANNEL_FORMATS = {
+    "feishu": "feishu",
+    "dingtalk": "dingtalk",
+    "wework": "wework",
+    "ntfy": "ntfy",
+    "bark": "bark",
+    "slack": "slack",
+}
+
+
+def _time_renderers(report_data: Dict, mode: str, reverse: bool) -> Dict[str, float]:
+    """完整消息渲染耗时（清空标题片段缓存后测量，即冷启动渲染）"""
+    renderers = {
+        "feishu": lambda: render_feishu_content(
+            report_data, mode=mode, reverse_content_order=reverse, get_time_func=lambda: _FIXED_NOW
+        ),
+        "dingtalk": lambda: render_dingtalk_content(
+            report_data, mode=mode, reverse_content_order=reverse, get_time_func=lambda: _FIXED_NOW
+        ),
+    }
+    render_ms = {}
+    for name, render in renderers.items():
+        clear_title_fragment_cache()
+        start = time.perf_counter()
+        render()
+        render_ms[name] = round((time.perf_counter() - start) * 1000, 3)
+    return render_ms
+
+
+def run_dispatch_benchmark(
+    config: DispatchBenchmarkConfig, verbose: bool = False
+) -> DispatchBenchmarkResult:
+    """
+    执行端到端推送基准测试
+
+    Args:
+        config: 基准测试参数
+        verbose: 是否输出发送器日志
+
+    Returns:
+        DispatchBenchmarkResult
+    """
+    report_config = config.report
+    report_data = build_report_data(report_config)
+    result = DispatchBenchmarkResult(config=config, environment=_environment())
+    result.render_ms = _time_renderers(
+        report_data, report_config.mode, report_config.reverse_content_order
+    )
+
+    split_ms: Dict[str, float] = {}
+
+    def timed_split(report_data, format_type, update_info=None, max_bytes=None, mode="daily"):
+        start = time.perf_counter()
+        batches = split_content_into_batches(
+            report_data=report_data,
+            format_type=format_type,
+            update_info=update_info,
+            max_bytes=max_bytes,
+            mode=mode,
+            reverse_content_order=report_config.reverse_content_order,
+            get_time_func=lambda: _FIXED_NOW,
+        )
+        split_ms[format_type] = split_ms.get(format_type, 0.0) + (time.perf_counter() - start) * 1000
+        return batches
+
+    behavior = MockWebhookBehavior(
+        latency_ms=config.latency_ms,
+        jitter_ms=config.jitter_ms,
+        throttle_rate=config.throttle_rate,
+        retry_after=config.retry_after,
+        max_body_bytes=config.max_body_bytes,
+        seed=report_config.seed,
+    )
+    durations = []
+    results: Dict[str, bool] = {}
+    with MockWebhookServer(behavior) as server:
+        dispatcher_config = {
+            **server.channel_config(config.channels, config.accounts),
+            "MAX_ACCOUNTS_PER_CHANNEL": config.accounts,
+            "DISPATCH_WORKERS": config.workers,
+            "DELIVERY_MAX_RETRIES": config.max_retries,
+            "REVERSE_CONTENT_ORDER": report_config.reverse_content_order,
+        }
+        if not config.rate_limits:
+            dispatcher_config["RATE_LIMITS"] = {channel: (600000, 10000) for channel in MOCK_CHANNELS}
+
+        for _ in range(max(1, report_config.repeat)):
+            # 每次推送使用新的调度器（令牌桶、连接池从零开始），只保留最后一次的统计
+            dispatcher = NotificationDispatcher(dispatcher_config, lambda: _FIXED_NOW, timed_split)
+            server.reset()
+            split_ms.clear()
+            clear_title_fragment_cache()
+            output = io.StringIO()
+            redirect = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(output)
+            start = time.perf_counter()
+            try:
+                with redirect:
+                    results = dispatcher.dispatch_all(
+                        report_data, "当日汇总", mode=report_config.mode
+                    )
+            finally:
+                dispatcher.close()
+            durations.append(time.perf_counter() - start)
+        summary = server.summary()
+
+    durations.sort()
+    result.dispatch_p50_s = round(durations[len(durations) // 2], 3)
+    result.dispatch_max_s = round(durations[-1], 3)
+
+    for channel in config.channels:
+        stats = summary.get(channel)
+        channel_stats = DispatchChannelStats(
+            success=bool(results.get(channel)),
+            split_ms=round(split_ms.get(_CHANNEL_FORMATS.get(channel, channel), 0.0), 3),
+        )
+        if stats is not None:
+            channel_stats.batches = stats.delivered
+            channel_stats.requests = stats.requests
+            channel_stats.throttled = stats.throttled
+            channel_stats.too_large = stats.too_large
+            channel_stats.total_bytes = stats.total_bytes
+            channel_stats.max_batch_bytes = stats.max_bytes
+            if stats.delivered:
+                channel_stats.avg_batch_bytes = stats.total_bytes // stats.delivered
+        result.channels[channel] = channel_stats
+    return result
+
+
+def format_dispatch_result(result: DispatchBenchmarkResult, baseline: Optional[dict] = None) -> str:
+    """格式化端到端推送结果表格（可选与基线对比推送耗时和批次数）"""
+    config = result.config
+    report = config.report
+    lines = [
+        f"词组: {report.groups}  每组标题: {report.titles_per_group}  "
+        f"新增来源: {report.new_sources}  每源新增: {report.new_per_source}  "
+        f"重复: {report.repeat}  模式: {report.mode}",
+        f"账号/渠道: {config.accounts}  线程: {config.workers}  "
+        f"速率限制: {'默认' if config.rate_limits else '关闭'}  延迟: {config.latency_ms:g}ms"
+        f"(+{config.jitter_ms:g})  429 比例: {config.throttle_rate:g}  "
+        f"请求体上限: {config.max_body_bytes or '-'}",
+        f"推送耗时: p50 {result.dispatch_p50_s}s  max {result.dispatch_max_s}s  "
+        f"提交: {result.environment.get('git_commit') or '-'}",
+        "渲染耗时: " + "  ".join(f"{name} {ms:.2f}ms" for name, ms in result.render_ms.items()),
+        "",
+        f"{'渠道':<10}{'结果':>6}{'批次':>6}{'请求':>6}{'429':>5}{'413':>5}"
+        f"{'总字节':>10}{'平均/批':>9}{'最大/批':>9}{'分批(ms)':>10}",
+    ]
+
+    baseline_channels = (baseline or {}).get("channels", {})
+    for channel, stats in result.channels.items():
+        line = (
+            f"{channel:<10}{'成功' if stats.success else '失败':>6}{stats.batches:>6}{stats.requests:>6}"
+            f"{stats.throttled:>5}{stats.too_large:>5}{stats.total_bytes:>10}"
+            f"{stats.avg_batch_bytes:>9}{stats.max_batch_bytes:>9}{stats.split_ms:>10.2f}"
+        )
+        base = baseline_channels.get(channel)
+        if base and (base.get("batches") != stats.batches or base.get("total_bytes") != stats.total_bytes):
+            line += f"   ⚠️ 基线 {base.get('batches')} 批 / {base.get('total_bytes')} 字节"
+        lines.append(line)
+
+    if baseline and baseline.get("dispatch_p50_s"):
+        speedup = baseline["dispatch_p50_s"] / result.dispatch_p50_s if result.dispatch_p50_s else 0.0
+        lines.append("")
+        lines.append(f"推送耗时对比: {speedup:.2f}x (基线 p50 {baseline['dispatch_p50_s']}s)")
+    if baseline and baseline.get("config") != asdict(config):
+        lines.append("")
+        lines.append("⚠️ 基线参数与本次不同，对比结果仅供参考")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TrendRadar 通知推送基准测试")
+    parser.add_argument("--groups", type=int, default=SplitBenchmarkConfig.groups)
+    parser.add_argument("--titles-per-group", type=int, default=SplitBenchmarkConfig.titles_per_group)
+    parser.add_argument("--new-sources", type=int, default=SplitBenchmarkConfig.new_sources)
+    parser.add_argument("--new-per-source", type=int, default=SplitBenchmarkConfig.new_per_source)
+    parser.add_argument("--failed-ids", type=int, default=SplitBenchmarkConfig.failed_ids)
+    parser.add_argument("--repeat", type=int, default=SplitBenchmarkConfig.repeat)
+    parser.add_argument("--mode", default="daily", choices=["daily", "current", "incremental"])
+    parser.add_argument("--reverse", action="store_true", help="新增热点在前")
+    parser.add_argument("--seed", type=int, default=SplitBenchmarkConfig.seed)
+    parser.add_argument("--output", help="保存 JSON 结果")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比")
+    # 端到端推送（模拟 Webhook 服务）
+    parser.add_argument("--dispatch", action="store_true", help="测量端到端推送（本地模拟 Webhook 服务）")
+    parser.add_argument("--channels", default=",".join(MOCK_CHANNELS), help="推送渠道，逗号分隔")
+    parser.add_argument("--accounts", type=int, default=DispatchBenchmarkConfig.accounts, help="每个渠道的账号数")
+    parser.add_argument("--workers", type=int, default=DispatchBenchmarkConfig.workers, help="并发推送线程数")
+    parser.add_argument("--max-retries", type=int, default=DispatchBenchmarkConfig.max_retries)
+    parser.add_argument("--no-rate-limits", action="store_true", help="关闭各渠道速率限制（只测发送路径）")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="模拟服务的响应延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="模拟服务的随机延迟上限")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="返回 429 的比例")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 响应的 Retry-After 秒数（负数表示不带该头）")
+    parser.add_argument("--max-body-bytes", type=int, default=0, help="请求体上限，超过返回 413")
+    parser.add_argument("--verbose", action="store_true", help="输出发送器日志")
+    args = parser.parse_args()
+
+    config = SplitBenchmarkConfig(
+        groups=args.groups,
+        titles_per_group=args.titles_per_group,
+        new_sources=args.new_sources,
+        new_per_source=args.new_per_source,
+        failed_ids=args.failed_ids,
+        repeat=args.repeat,
+        mode=args.mode,
+        reverse_content_order=args.reverse,
+        seed=args.seed,
+    )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.dispatch:
+        if args.repeat == SplitBenchmarkConfig.repeat:
+            # 推送包含网络往返和速率限制等待，默认只重复 3 次
+            config.repeat = 3
+        dispatch_config = DispatchBenchmarkConfig(
+            report=config,
+            channels=[c.strip() for c in args.channels.split(",") if c.strip() in MOCK_CHANNELS],
+            accounts=args.accounts,
+            workers=args.workers,
+            max_retries=args.max_retries,
+            rate_limits=not args.no_rate_limits,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after if args.retry_after >= 0 else None,
+            max_body_bytes=args.max_body_bytes,
+        )
+        result = run_dispatch_benchmark(dispatch_config, verbose=args.verbose)
+        print(format_dispatch_result(result, baseline))
+    else:
+        result = run_split_benchmark(config)
+        print(format_split_result(result, baseline))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(asdict(result), f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
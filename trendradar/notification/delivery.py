@@ -0,0 +1,344 @@
+# coding=utf-8
+"""
+推送节奏控制模块
+
+每个渠道的每个账号（Webhook）对应一个令牌桶，按该渠道的速率限制发放发送配额：
+- 配额充足时同一账号的多个批次连续发送，不再固定等待
+- 收到 429（或渠道在响应体中返回的限流错误码）时按 Retry-After 暂停该账号，再重试
+- 5xx 和连接错误按带抖动的指数退避重试
+- 按渠道统计发送数、限流次数、重试次数、等待时间和吞吐量
+
+使用示例:
+    scheduler = DeliveryScheduler()
+    response = scheduler.deliver("feishu", webhook_url, lambda: requests.post(...))
+    print(scheduler.format_metrics())
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+
+# 各渠道默认速率限制：(每分钟条数, 突发容量)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "feishu": (100, 5),      # 自定义机器人：100 次/分钟，5 次/秒
+    "dingtalk": (20, 20),    # 自定义机器人：20 条/分钟
+    "wework": (20, 20),      # 群机器人：20 条/分钟
+    "telegram": (60, 1),     # 同一聊天约 1 条/秒
+    "ntfy": (12, 60),        # ntfy.sh：突发 60 条，之后每 5 秒恢复 1 条
+    "bark": (60, 5),
+    "slack": (60, 1),        # Incoming Webhook：约 1 条/秒
+}
+FALLBACK_RATE_LIMIT: Tuple[float, int] = (60, 1)
+
+DEFAULT_MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+@dataclass
+class OutboundRequest:
+    """
+    一个待发送批次的请求体
+
+    URL 和鉴权信息（Webhook 地址、Bot Token、Authorization 头）在发送时绑定，
+    不随请求保存，因此请求可以安全地写入推送队列。
+    """
+
+    batch_num: int              # 批次编号（用户视角，从 1 开始）
+    total: int                  # 批次总数
+    content: str                # 批次正文（用于日志和幂等键）
+    json: Optional[Dict] = None
+    data: Optional[bytes] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        """正文字节数"""
+        return len(self.content.encode("utf-8"))
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+    acquire 按先来先到预约令牌并阻塞到可发送的时刻；
+    penalize 在收到限流响应后暂停发放，并清空突发配额。
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        min_interval: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发条数）
+            min_interval: 相邻两次发放的最小间隔（秒）
+            clock: 单调时钟
+            sleep: 等待函数
+        """
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(1, int(capacity))
+        self.min_interval = max(0.0, min_interval)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._last_grant: Optional[float] = None
+        self._blocked_until = 0.0
+
+    def acquire(self) -> float:
+        """获取一个令牌，返回等待的秒数"""
+        with self._lock:
+            now = self._clock()
+            ready = max(now, self._updated, self._blocked_until)
+            if self._last_grant is not None:
+                ready = max(ready, self._last_grant + self.min_interval)
+
+            tokens = min(self.capacity, self._tokens + (ready - self._updated) * self.rate)
+            if tokens < 1:
+                ready += (1 - tokens) / self.rate
+                tokens = 1.0
+
+            self._tokens = tokens - 1
+            self._updated = ready
+            self._last_grant = ready
+
+        wait = ready - now
+        if wait > 0:
+            self._sleep(wait)
+        return max(wait, 0.0)
+
+    def penalize(self, delay: float) -> None:
+        """暂停发放 delay 秒（清空突发配额）"""
+        with self._lock:
+            blocked_until = max(self._blocked_until, self._clock() + max(delay, 0.0))
+            self._blocked_until = blocked_until
+            # 暂停结束时只允许立即发送一条，之后按速率补充
+            self._tokens = 1.0
+            self._updated = max(self._updated, blocked_until)
+
+
+@dataclass
+class ChannelMetrics:
+    """单个渠道的推送统计"""
+
+    requests: int = 0           # 实际发出的请求数（含重试）
+    delivered: int = 0          # 最终得到非限流、非 5xx 响应的批次数
+    throttled: int = 0          # 收到限流响应的次数
+    retries: int = 0            # 重试次数
+    failed: int = 0             # 重试耗尽仍失败的批次数
+    wait_seconds: float = 0.0   # 等待配额的总时间
+    send_seconds: float = 0.0   # 请求耗时总和
+    first_start: Optional[float] = None
+    last_end: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """每秒送达批次数（从第一次请求到最后一次响应）"""
+        if self.first_start is None:
+            return 0.0
+        elapsed = self.last_end - self.first_start
+        return self.delivered / elapsed if elapsed > 0 else 0.0
+
+
+def parse_retry_after(response: requests.Response) -> Optional[float]:
+    """
+    解析限流响应中的等待时间
+
+    支持 Retry-After 头（秒数或 HTTP 日期）和 Telegram 的 parameters.retry_after。
+
+    Returns:
+        等待秒数，无法解析时返回 None
+    """
+    value = response.headers.get("Retry-After") if response.headers else None
+    if value:
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    if isinstance(body, dict):
+        retry_after = (body.get("parameters") or {}).get("retry_after")
+        if isinstance(retry_after, (int, float)):
+            return max(0.0, float(retry_after))
+    return None
+
+
+class DeliveryScheduler:
+    """
+    按渠道、账号控制推送节奏的调度器
+
+    同一个调度器可被多个线程共享（NotificationDispatcher 并发推送各账号时共用一个）。
+    """
+
+    def __init__(
+        self,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        min_interval: float = 0.0,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            rate_limits: 渠道 -> (每分钟条数, 突发容量)，覆盖 DEFAULT_RATE_LIMITS
+            min_interval: 同一账号相邻批次的最小间隔（秒，0 表示只受速率限制约束）
+            max_retries: 限流、5xx、连接错误时的最大重试次数
+            clock: 单调时钟
+            sleep: 等待函数
+        """
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.min_interval = min_interval
+        self.max_retries = max(0, max_retries)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._metrics: Dict[str, ChannelMetrics] = {}
+
+    def bucket(self, channel: str, account: str) -> TokenBucket:
+        """获取（或创建）某渠道某账号的令牌桶"""
+        key = (channel, account)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                per_minute, burst = self.rate_limits.get(channel, FALLBACK_RATE_LIMIT)
+                bucket = TokenBucket(
+                    per_minute / 60.0,
+                    burst,
+                    min_interval=self.min_interval,
+                    clock=self._clock,
+                    sleep=self._sleep,
+                )
+                self._buckets[key] = bucket
+            return bucket
+
+    def _backoff(self, attempt: int) -> float:
+        """带抖动的指数退避：上限的一半固定，另一半随机"""
+        ceiling = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def _record(self, channel: str, **changes) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(channel, ChannelMetrics())
+            for name, value in changes.items():
+                if name == "start":
+                    if metrics.first_start is None or value < metrics.first_start:
+                        metrics.first_start = value
+                elif name == "end":
+                    metrics.last_end = max(metrics.last_end, value)
+                else:
+                    setattr(metrics, name, getattr(metrics, name) + value)
+
+    def deliver(
+        self,
+        channel: str,
+        account: str,
+        send_func: Callable[[], requests.Response],
+        is_throttled: Optional[Callable[[requests.Response], bool]] = None,
+    ) -> requests.Response:
+        """
+        在配额允许时发送一个批次，必要时重试
+
+        Args:
+            channel: 渠道名（决定速率限制，并作为统计维度）
+            account: 账号标识（如 Webhook URL，同一账号共享配额）
+            send_func: 执行一次请求的函数
+            is_throttled: 判断 200 响应是否为渠道自定义的限流错误（可选）
+
+        Returns:
+            最后一次请求的响应（成功、不可重试的失败、重试耗尽，或 Retry-After 超过 BACKOFF_MAX）
+
+        Raises:
+            requests.exceptions.RequestException: 连接错误重试耗尽，或其他请求异常
+        """
+        bucket = self.bucket(channel, account)
+        attempt = 0
+        while True:
+            waited = bucket.acquire()
+            start = self._clock()
+            self._record(channel, requests=1, wait_seconds=waited, start=start)
+            try:
+                response = send_func()
+            except requests.exceptions.ConnectionError:
+                # 连接失败（请求未送达），可以安全重试
+                self._record(channel, send_seconds=self._clock() - start, end=self._clock())
+                if attempt >= self.max_retries:
+                    self._record(channel, failed=1)
+                    raise
+                bucket.penalize(self._backoff(attempt))
+                self._record(channel, retries=1)
+                attempt += 1
+                continue
+            end = self._clock()
+            self._record(channel, send_seconds=end - start, end=end)
+
+            throttled = response.status_code == 429
+            if not throttled and is_throttled is not None and response.status_code == 200:
+                try:
+                    throttled = bool(is_throttled(response))
+                except ValueError:
+                    throttled = False
+            if not throttled and response.status_code < 500:
+                self._record(channel, delivered=1)
+                return response
+
+            if throttled:
+                self._record(channel, throttled=1)
+            if attempt >= self.max_retries:
+                self._record(channel, failed=1)
+                return response
+
+            delay = parse_retry_after(response) if throttled else None
+            if delay is None:
+                delay = self._backoff(attempt)
+            elif delay > BACKOFF_MAX:
+                # 服务端要求的等待超过上限：不阻塞推送线程，本批次按失败处理，由 outbox 在后续运行中重放
+                print(
+                    f"[推送调度] {channel} 要求等待 {delay:.0f}s，超过上限 {BACKOFF_MAX:.0f}s，"
+                    f"本批次稍后重试"
+                )
+                bucket.penalize(BACKOFF_MAX)
+                self._record(channel, failed=1)
+                return response
+            bucket.penalize(delay)
+            self._record(channel, retries=1)
+            attempt += 1
+
+    def metrics(self) -> Dict[str, ChannelMetrics]:
+        """各渠道的统计快照"""
+        with self._lock:
+            return {channel: ChannelMetrics(**vars(m)) for channel, m in self._metrics.items()}
+
+    def format_metrics(self) -> str:
+        """格式化统计结果（每个渠道一行）"""
+        lines = []
+        for channel, m in self.metrics().items():
+            lines.append(
+                f"[推送调度] {channel}: 请求 {m.requests}，送达 {m.delivered}，限流 {m.throttled}，"
+                f"重试 {m.retries}，失败 {m.failed}，等待配额 {m.wait_seconds:.1f}s，"
+                f"吞吐 {m.throughput:.2f} 批/秒"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,240 @@
+# coding=utf-8
+"""
+增量推送（只推送与上次送达报告相比的变化）
+
+current / daily 模式每次运行都会重新推送完整的统计结果，其中大部分内容与上次推送相同。
+本模块为每个渠道、每种报告类型在存储中保存最近一次送达报告的指纹，下次推送时只发送变化：
+- 新上榜：词组中上次没有的标题（标记为新增）
+- 排名变化：最高排名变化达到阈值的标题（标题前标注 ↑n / ↓n）
+- 已下榜：上次推送过、本次不再出现的标题（汇总为"已下榜"分组，随其他变化一起发送）
+- 新增热点区域只保留上次没有推送过的标题
+
+当天首次推送、以及距离上次完整推送超过 full_refresh_minutes 时发送完整报告。
+变化部分沿用 prepare_report_data 的数据结构，分批、渲染和发送流程不变。
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from trendradar.utils.text import fold_title
+
+DEFAULT_FULL_REFRESH_MINUTES = 360
+DEFAULT_MIN_RANK_CHANGE = 3
+
+# "已下榜"分组的名称和最多列出的标题数
+DROPPED_GROUP_WORD = "已下榜"
+MAX_DROPPED_TITLES = 10
+
+# 支持增量推送的报告模式（incremental 模式本身只推送新增内容）
+DELTA_MODES = ("daily", "current")
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _title_key(title: Dict) -> str:
+    return f"{title['source_name']}|{fold_title(title['title'])}"
+
+
+def _best_rank(title: Dict) -> Optional[int]:
+    ranks = title.get("ranks") or []
+    return min(ranks) if ranks else None
+
+
+def report_fingerprint(report_data: Dict) -> Dict:
+    """
+    报告的结构指纹
+
+    Returns:
+        {"stats": {词组: {标题键: [标题, 来源, 最高排名]}}, "new": [新增热点标题键]}
+    """
+    stats = {}
+    for stat in report_data.get("stats", []):
+        stats[stat["word"]] = {
+            _title_key(title): [title["title"], title["source_name"], _best_rank(title)]
+            for title in stat["titles"]
+        }
+    new_keys = sorted(
+        _title_key(title)
+        for source in report_data.get("new_titles", [])
+        for title in source["titles"]
+    )
+    return {"stats": stats, "new": new_keys}
+
+
+def _dropped_title(title: str, source_name: str, rank_threshold: int) -> Dict:
+    return {
+        "title": title,
+        "source_name": source_name,
+        "time_display": "",
+        "count": 1,
+        "ranks": [],
+        "rank_threshold": rank_threshold,
+        "url": "",
+        "mobile_url": "",
+        "is_new": False,
+    }
+
+
+def compute_report_delta(
+    report_data: Dict,
+    previous: Dict,
+    min_rank_change: int = DEFAULT_MIN_RANK_CHANGE,
+) -> Tuple[Dict, int]:
+    """
+    计算报告相对上次指纹的变化
+
+    Args:
+        report_data: 本次完整报告数据（prepare_report_data 的返回值）
+        previous: 上次送达报告的指纹（report_fingerprint 的返回值）
+        min_rank_change: 最高排名变化达到该值才视为排名变化
+
+    Returns:
+        (只包含变化的报告数据, 新上榜、排名变化、已下榜和新增热点的标题数)
+    """
+    previous_stats = previous.get("stats", {})
+    rank_threshold = 5
+    changed_count = 0
+    current_keys = set()
+    stats = []
+
+    for stat in report_data.get("stats", []):
+        previous_titles = previous_stats.get(stat["word"], {})
+        changed_titles = []
+        for title in stat["titles"]:
+            key = _title_key(title)
+            current_keys.add(key)
+            rank_threshold = title.get("rank_threshold", rank_threshold)
+            old = previous_titles.get(key)
+            if old is None:
+                changed_titles.append({**title, "is_new": True})
+                continue
+            old_rank, new_rank = old[2], _best_rank(title)
+            if old_rank is None or new_rank is None or abs(old_rank - new_rank) < min_rank_change:
+                continue
+            arrow = f"↑{old_rank - new_rank}" if new_rank < old_rank else f"↓{new_rank - old_rank}"
+            changed_titles.append({**title, "title": f"{arrow} {title['title']}"})
+
+        if changed_titles:
+            changed_count += len(changed_titles)
+            stats.append({**stat, "titles": changed_titles})
+
+    # 已下榜：上次推送过、本次所有词组中都不再出现的标题
+    dropped = {}
+    for previous_titles in previous_stats.values():
+        for key, (title, source_name, _) in previous_titles.items():
+            if key not in current_keys and key not in dropped:
+                dropped[key] = _dropped_title(title, source_name, rank_threshold)
+    if dropped:
+        changed_count += len(dropped)
+        stats.append({
+            "word": DROPPED_GROUP_WORD,
+            "count": len(dropped),
+            "percentage": 0,
+            "titles": list(dropped.values())[:MAX_DROPPED_TITLES],
+        })
+
+    previous_new = set(previous.get("new", []))
+    new_titles = []
+    for source in report_data.get("new_titles", []):
+        titles = [title for title in source["titles"] if _title_key(title) not in previous_new]
+        if titles:
+            new_titles.append({**source, "titles": titles})
+    total_new_count = sum(len(source["titles"]) for source in new_titles)
+    changed_count += total_new_count
+
+    delta = {
+        "stats": stats,
+        "new_titles": new_titles,
+        "failed_ids": report_data.get("failed_ids", []),
+        "total_new_count": total_new_count,
+    }
+    return delta, changed_count
+
+
+class DeltaNotifier:
+    """
+    按渠道维护报告指纹，决定本次推送完整报告、变化部分还是跳过
+
+    指纹保存在当天数据库中（storage_backend 需要实现
+    get_notification_fingerprint / save_notification_fingerprint），
+    只有渠道发送成功后才更新，发送失败的渠道下次仍与之前送达的报告比较。
+    """
+
+    def __init__(
+        self,
+        storage_backend,
+        get_time_func: Callable[[], datetime],
+        full_refresh_minutes: int = DEFAULT_FULL_REFRESH_MINUTES,
+        min_rank_change: int = DEFAULT_MIN_RANK_CHANGE,
+    ):
+        """
+        Args:
+            storage_backend: 存储后端（StorageManager）
+            get_time_func: 获取当前时间的函数（应使用配置的时区）
+            full_refresh_minutes: 完整推送的最长间隔（分钟，0 表示每次都推送完整报告）
+            min_rank_change: 最高排名变化达到该值才推送
+        """
+        self.storage_backend = storage_backend
+        self.get_time = get_time_func
+        self.full_refresh_minutes = full_refresh_minutes
+        self.min_rank_change = max(1, min_rank_change)
+
+    def _refresh_due(self, record: Dict) -> bool:
+        if self.full_refresh_minutes <= 0 or not record.get("full_sent_at"):
+            return True
+        try:
+            full_sent_at = datetime.strptime(record["full_sent_at"], _TIME_FORMAT)
+        except ValueError:
+            return True
+        now = self.get_time().replace(tzinfo=None)
+        return now - full_sent_at >= timedelta(minutes=self.full_refresh_minutes)
+
+    def prepare(
+        self, channel: str, report_type: str, report_data: Dict
+    ) -> Tuple[Optional[Dict], bool]:
+        """
+        确定某渠道本次要推送的内容
+
+        Returns:
+            (报告数据, 是否为完整报告)；与上次相比没有变化时报告数据为 None
+        """
+        record = self.storage_backend.get_notification_fingerprint(channel, report_type)
+        if record is None or self._refresh_due(record):
+            return report_data, True
+
+        try:
+            previous = json.loads(record["fingerprint"])
+        except (TypeError, ValueError):
+            return report_data, True
+
+        delta, changed_count = compute_report_delta(report_data, previous, self.min_rank_change)
+        if changed_count == 0:
+            return None, False
+        return delta, False
+
+    def commit(self, channel: str, report_type: str, fingerprint: str, is_full: bool) -> None:
+        """渠道发送成功后保存本次完整报告的指纹"""
+        full_sent_at = self.get_time().strftime(_TIME_FORMAT) if is_full else None
+        self.storage_backend.save_notification_fingerprint(
+            channel, report_type, fingerprint, full_sent_at
+        )
+
+    @staticmethod
+    def serialize(report_data: Dict) -> str:
+        """计算并序列化报告指纹（每次推送只计算一次，所有渠道共用）"""
+        return json.dumps(report_fingerprint(report_data), ensure_ascii=False)
+
+
+def summarize_channels(plans: Dict[str, Tuple[Optional[Dict], bool]]) -> List[str]:
+    """生成各渠道推送内容的日志行"""
+    lines = []
+    for channel, (data, is_full) in plans.items():
+        if data is None:
+            lines.append(f"[增量推送] {channel}: 与上次推送相比没有变化，跳过")
+        elif is_full:
+            lines.append(f"[增量推送] {channel}: 推送完整报告")
+        else:
+            changed = sum(len(stat["titles"]) for stat in data["stats"]) + data["total_new_count"]
+            lines.append(f"[增量推送] {channel}: 只推送变化（{changed} 条）")
+    return lines
@@ -5,12 +5,19 @@
 提供统一的通知分发接口。
 支持所有通知渠道的多账号配置，使用 `;` 分隔多个账号。
 
+每个渠道的每个账号是一个独立的发送任务，由有界线程池并发执行：
+总推送耗时约等于最慢的单个账号，而不是所有渠道、账号、批次之和。
+同一账号内的多个批次仍在同一个任务中按顺序发送（保持消息顺序和批次间隔）。
+
 使用示例:
     dispatcher = NotificationDispatcher(config, get_time_func, split_content_func)
     results = dispatcher.dispatch_all(report_data, report_type, ...)
+    dispatcher.drain_outbox(proxy_url)  # 每次运行补发推送队列中发送失败的批次
 """
 
-from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from trendradar.core.config import (
     get_account_at_index,
@@ -19,6 +26,12 @@ from trendradar.core.config import (
     validate_paired_configs,
 )
 
+from .delivery import DeliveryScheduler
+from .delta import DELTA_MODES, DeltaNotifier, summarize_channels
+from .mailer import EmailDelivery
+from .outbox import NotificationOutbox
+from .sessions import SessionRegistry
+from .splitter import SplitContentCache
 from .senders import (
     send_to_bark,
     send_to_dingtalk,
@@ -44,6 +57,8 @@ class NotificationDispatcher:
         config: Dict[str, Any],
         get_time_func: Callable,
         split_content_func: Callable,
+        outbox: Optional[NotificationOutbox] = None,
+        delta: Optional[DeltaNotifier] = None,
     ):
         """
         初始化通知调度器
@@ -52,11 +67,29 @@ class NotificationDispatcher:
             config: 完整的配置字典，包含所有通知渠道的配置
             get_time_func: 获取当前时间的函数
             split_content_func: 内容分批函数
+            outbox: 推送队列（可选，Webhook 渠道的批次持久化后发送，未送达的下次运行补发）
+            delta: 增量推送（可选，daily/current 模式下各 Webhook 渠道只推送变化）
         """
         self.config = config
         self.get_time_func = get_time_func
         self.split_content_func = split_content_func
+        self.outbox = outbox
+        self.delta = delta
         self.max_accounts = config.get("MAX_ACCOUNTS_PER_CHANNEL", 3)
+        self.max_workers = config.get("DISPATCH_WORKERS", 8)
+        # 各渠道、各账号的发送配额在调度器生命周期内共享
+        self.scheduler = DeliveryScheduler(
+            rate_limits=config.get("RATE_LIMITS"),
+            min_interval=config.get("BATCH_SEND_INTERVAL", 0),
+            max_retries=config.get("DELIVERY_MAX_RETRIES", 3),
+        )
+        # 推送 HTTP 连接在各渠道、各账号、各次推送之间复用（每个主机的连接数与并发线程数一致）
+        self.sessions = SessionRegistry(pool_maxsize=self.max_workers)
+        # 邮件只构建一次，收件人分组在复用的 SMTP 连接上并行投递
+        self.email_delivery = EmailDelivery(
+            max_connections=config.get("EMAIL_MAX_CONNECTIONS", 2),
+            recipients_per_message=config.get("EMAIL_RECIPIENTS_PER_MESSAGE", 50),
+        )
 
     def dispatch_all(
         self,
@@ -81,48 +114,39 @@ class NotificationDispatcher:
         Returns:
             Dict[str, bool]: 每个渠道的发送结果，key 为渠道名，value 为是否成功
         """
-        results = {}
-
-        # 飞书
-        if self.config.get("FEISHU_WEBHOOK_URL"):
-            results["feishu"] = self._send_feishu(
-                report_data, report_type, update_info, proxy_url, mode
-            )
-
-        # 钉钉
-        if self.config.get("DINGTALK_WEBHOOK_URL"):
-            results["dingtalk"] = self._send_dingtalk(
-                report_data, report_type, update_info, proxy_url, mode
-            )
-
-        # 企业微信
-        if self.config.get("WEWORK_WEBHOOK_URL"):
-            results["wework"] = self._send_wework(
-                report_data, report_type, update_info, proxy_url, mode
-            )
-
-        # Telegram（需要配对验证）
-        if self.config.get("TELEGRAM_BOT_TOKEN") and self.config.get("TELEGRAM_CHAT_ID"):
-            results["telegram"] = self._send_telegram(
-                report_data, report_type, update_info, proxy_url, mode
-            )
-
-        # ntfy（需要配对验证）
-        if self.config.get("NTFY_SERVER_URL") and self.config.get("NTFY_TOPIC"):
-            results["ntfy"] = self._send_ntfy(
-                report_data, report_type, update_info, proxy_url, mode
-            )
-
-        # Bark
-        if self.config.get("BARK_URL"):
-            results["bark"] = self._send_bark(
-                report_data, report_type, update_info, proxy_url, mode
-            )
-
-        # Slack
-        if self.config.get("SLACK_WEBHOOK_URL"):
-            results["slack"] = self._send_slack(
-                report_data, report_type, update_info, proxy_url, mode
+        # 本次推送的批次属于同一报告实例（推送队列只在报告实例内去重）
+        if self.outbox is not None:
+            self.outbox.start_report()
+
+        # 同一次推送内，相同版式（格式、字节上限、模式）的分批结果只计算一次，所有账号共享
+        split_content_func = SplitContentCache(
+            self.split_content_func,
+            reverse_content_order=self.config.get("REVERSE_CONTENT_ORDER", False),
+        )
+        jobs: Dict[str, List[Callable[[], bool]]] = {}
+
+        webhook_channels = self._webhook_channels()
+        enabled = [channel for channel, (configured, _) in webhook_channels.items() if configured]
+
+        # 增量推送：各渠道只推送与上次送达报告相比的变化，没有变化的渠道跳过
+        plans: Dict[str, Tuple[Optional[Dict], bool]] = {}
+        if self.delta is not None and mode in DELTA_MODES:
+            plans = {
+                channel: self.delta.prepare(channel, report_type, report_data)
+                for channel in enabled
+            }
+            for line in summarize_channels(plans):
+                print(line)
+
+        skipped: Dict[str, bool] = {}
+        for channel in enabled:
+            channel_report, _ = plans.get(channel, (report_data, True))
+            if channel_report is None:
+                skipped[channel] = True
+                continue
+            build_jobs = webhook_channels[channel][1]
+            jobs[channel] = build_jobs(
+                channel_report, report_type, update_info, proxy_url, mode, split_content_func
             )
 
         # 邮件（保持原有逻辑，已支持多收件人）
@@ -131,19 +155,119 @@ class NotificationDispatcher:
             and self.config.get("EMAIL_PASSWORD")
             and self.config.get("EMAIL_TO")
         ):
-            results["email"] = self._send_email(report_type, html_file_path)
+            jobs["email"] = self._email_jobs(report_type, html_file_path)
+
+        account_results = self._run_jobs(jobs)
+        results = {channel: any(ok) for channel, ok in account_results.items()}
+        results.update(skipped)
+        if self.outbox is not None:
+            self.outbox.flush()
+
+        # 所有账号都发送成功的渠道才保存本次完整报告的指纹
+        # （指纹按渠道保存，有账号失败时下次仍与之前送达的报告比较，避免该账号漏掉变化）
+        if plans:
+            fingerprint = self.delta.serialize(report_data)
+            for channel, (channel_report, is_full) in plans.items():
+                channel_results = account_results.get(channel)
+                if channel_report is not None and channel_results and all(channel_results):
+                    self.delta.commit(channel, report_type, fingerprint, is_full)
+
+        metrics_text = self.scheduler.format_metrics()
+        if metrics_text:
+            print(metrics_text)
+        return results
+
+    def drain_outbox(self, proxy_url: Optional[str] = None) -> None:
+        """
+        补发推送队列中已到重试时间的失败批次（不生成新报告）
+
+        每次运行都应调用：不在推送窗口内、没有新增内容等不推送报告的运行中，
+        积压的批次也会补发，而不必等到同一账号下一次推送报告。
+
+        Args:
+            proxy_url: 代理 URL（可选）
+        """
+        if self.outbox is None:
+            return
+
+        jobs = {
+            channel: build_jobs(None, "", None, proxy_url, "daily", self.split_content_func)
+            for channel, (configured, build_jobs) in self._webhook_channels().items()
+            if configured
+        }
+        self._run_jobs(jobs)
+        self.outbox.flush()
+
+    def _webhook_channels(self) -> Dict[str, Tuple[Any, Callable[..., List[Callable[[], bool]]]]]:
+        """Webhook 渠道：渠道名 -> (是否已配置, 任务构建函数)，Telegram、ntfy 需要配对验证"""
+        return {
+            "feishu": (self.config.get("FEISHU_WEBHOOK_URL"), self._feishu_jobs),
+            "dingtalk": (self.config.get("DINGTALK_WEBHOOK_URL"), self._dingtalk_jobs),
+            "wework": (self.config.get("WEWORK_WEBHOOK_URL"), self._wework_jobs),
+            "telegram": (
+                self.config.get("TELEGRAM_BOT_TOKEN") and self.config.get("TELEGRAM_CHAT_ID"),
+                self._telegram_jobs,
+            ),
+            "ntfy": (
+                self.config.get("NTFY_SERVER_URL") and self.config.get("NTFY_TOPIC"),
+                self._ntfy_jobs,
+            ),
+            "bark": (self.config.get("BARK_URL"), self._bark_jobs),
+            "slack": (self.config.get("SLACK_WEBHOOK_URL"), self._slack_jobs),
+        }
+
+    def close(self) -> None:
+        """关闭复用的 HTTP 和 SMTP 连接"""
+        self.sessions.close()
+        self.email_delivery.close()
+
+    def _run_jobs(self, jobs: Dict[str, List[Callable[[], bool]]]) -> Dict[str, List[bool]]:
+        """
+        并发执行所有渠道的账号发送任务
+
+        Args:
+            jobs: 渠道名 -> 该渠道各账号的发送任务列表
+
+        Returns:
+            Dict[str, List[bool]]: 每个渠道各账号的发送结果（与任务列表顺序一致）
+        """
+        total = sum(len(channel_jobs) for channel_jobs in jobs.values())
+        workers = min(self.max_workers, total) if self.max_workers > 0 else total
 
+        if workers <= 1:
+            return {
+                channel: [self._run_job(channel, job) for job in channel_jobs]
+                for channel, channel_jobs in jobs.items()
+            }
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trendradar-push") as executor:
+            futures = {
+                channel: [executor.submit(self._run_job, channel, job) for job in channel_jobs]
+                for channel, channel_jobs in jobs.items()
+            }
+            for channel, channel_futures in futures.items():
+                results[channel] = [future.result() for future in channel_futures]
         return results
 
-    def _send_to_multi_accounts(
+    @staticmethod
+    def _run_job(channel: str, job: Callable[[], bool]) -> bool:
+        """执行单个发送任务，异常视为发送失败，不影响其他任务"""
+        try:
+            return bool(job())
+        except Exception as e:
+            print(f"{channel} 发送任务异常：{e}")
+            return False
+
+    def _account_jobs(
         self,
         channel_name: str,
         config_value: str,
         send_func: Callable[..., bool],
         **kwargs,
-    ) -> bool:
+    ) -> List[Callable[[], bool]]:
         """
-        通用多账号发送逻辑
+        通用多账号任务构建逻辑
 
         Args:
             channel_name: 渠道名称（用于日志和账号数量限制提示）
@@ -152,33 +276,33 @@ class NotificationDispatcher:
             **kwargs: 传递给发送函数的其他参数
 
         Returns:
-            bool: 任一账号发送成功则返回 True
+            List[Callable[[], bool]]: 每个账号一个发送任务
         """
         accounts = parse_multi_account_config(config_value)
         if not accounts:
-            return False
+            return []
 
         accounts = limit_accounts(accounts, self.max_accounts, channel_name)
-        results = []
+        jobs = []
 
         for i, account in enumerate(accounts):
             if account:
                 account_label = f"账号{i+1}" if len(accounts) > 1 else ""
-                result = send_func(account, account_label=account_label, **kwargs)
-                results.append(result)
+                jobs.append(partial(send_func, account, account_label=account_label, **kwargs))
 
-        return any(results) if results else False
+        return jobs
 
-    def _send_feishu(
+    def _feishu_jobs(
         self,
-        report_data: Dict,
+        report_data: Optional[Dict],
         report_type: str,
         update_info: Optional[Dict],
         proxy_url: Optional[str],
         mode: str,
-    ) -> bool:
+        split_content_func: Callable,
+    ) -> List[Callable[[], bool]]:
         """发送到飞书（多账号）"""
-        return self._send_to_multi_accounts(
+        return self._account_jobs(
             channel_name="飞书",
             config_value=self.config["FEISHU_WEBHOOK_URL"],
             send_func=lambda url, account_label: send_to_feishu(
@@ -191,21 +315,25 @@ class NotificationDispatcher:
                 account_label=account_label,
                 batch_size=self.config.get("FEISHU_BATCH_SIZE", 29000),
                 batch_interval=self.config.get("BATCH_SEND_INTERVAL", 1.0),
-                split_content_func=self.split_content_func,
+                split_content_func=split_content_func,
+                scheduler=self.scheduler,
+                sessions=self.sessions,
+                outbox=self.outbox,
                 get_time_func=self.get_time_func,
             ),
         )
 
-    def _send_dingtalk(
+    def _dingtalk_jobs(
         self,
-        report_data: Dict,
+        report_data: Optional[Dict],
         report_type: str,
         update_info: Optional[Dict],
         proxy_url: Optional[str],
         mode: str,
-    ) -> bool:
+        split_content_func: Callable,
+    ) -> List[Callable[[], bool]]:
         """发送到钉钉（多账号）"""
-        return self._send_to_multi_accounts(
+        return self._account_jobs(
             channel_name="钉钉",
             config_value=self.config["DINGTALK_WEBHOOK_URL"],
             send_func=lambda url, account_label: send_to_dingtalk(
@@ -218,20 +346,24 @@ class NotificationDispatcher:
                 account_label=account_label,
                 batch_size=self.config.get("DINGTALK_BATCH_SIZE", 20000),
                 batch_interval=self.config.get("BATCH_SEND_INTERVAL", 1.0),
-                split_content_func=self.split_content_func,
+                split_content_func=split_content_func,
+                scheduler=self.scheduler,
+                sessions=self.sessions,
+                outbox=self.outbox,
             ),
         )
 
-    def _send_wework(
+    def _wework_jobs(
         self,
-        report_data: Dict,
+        report_data: Optional[Dict],
         report_type: str,
         update_info: Optional[Dict],
         proxy_url: Optional[str],
         mode: str,
-    ) -> bool:
+        split_content_func: Callable,
+    ) -> List[Callable[[], bool]]:
         """发送到企业微信（多账号）"""
-        return self._send_to_multi_accounts(
+        return self._account_jobs(
             channel_name="企业微信",
             config_value=self.config["WEWORK_WEBHOOK_URL"],
             send_func=lambda url, account_label: send_to_wework(
@@ -245,24 +377,28 @@ class NotificationDispatcher:
                 batch_size=self.config.get("MESSAGE_BATCH_SIZE", 4000),
                 batch_interval=self.config.get("BATCH_SEND_INTERVAL", 1.0),
                 msg_type=self.config.get("WEWORK_MSG_TYPE", "markdown"),
-                split_content_func=self.split_content_func,
+                split_content_func=split_content_func,
+                scheduler=self.scheduler,
+                sessions=self.sessions,
+                outbox=self.outbox,
             ),
         )
 
-    def _send_telegram(
+    def _telegram_jobs(
         self,
-        report_data: Dict,
+        report_data: Optional[Dict],
         report_type: str,
         update_info: Optional[Dict],
         proxy_url: Optional[str],
         mode: str,
-    ) -> bool:
+        split_content_func: Callable,
+    ) -> List[Callable[[], bool]]:
         """发送到 Telegram（多账号，需验证 token 和 chat_id 配对）"""
         telegram_tokens = parse_multi_account_config(self.config["TELEGRAM_BOT_TOKEN"])
         telegram_chat_ids = parse_multi_account_config(self.config["TELEGRAM_CHAT_ID"])
 
         if not telegram_tokens or not telegram_chat_ids:
-            return False
+            return []
 
         # 验证配对
         valid, count = validate_paired_configs(
@@ -271,19 +407,20 @@ class NotificationDispatcher:
             required_keys=["bot_token", "chat_id"],
         )
         if not valid or count == 0:
-            return False
+            return []
 
         # 限制账号数量
         telegram_tokens = limit_accounts(telegram_tokens, self.max_accounts, "Telegram")
         telegram_chat_ids = telegram_chat_ids[: len(telegram_tokens)]
 
-        results = []
+        jobs = []
         for i in range(len(telegram_tokens)):
             token = telegram_tokens[i]
             chat_id = telegram_chat_ids[i]
             if token and chat_id:
                 account_label = f"账号{i+1}" if len(telegram_tokens) > 1 else ""
-                result = send_to_telegram(
+                jobs.append(partial(
+                    send_to_telegram,
                     bot_token=token,
                     chat_id=chat_id,
                     report_data=report_data,
@@ -294,46 +431,50 @@ class NotificationDispatcher:
                     account_label=account_label,
                     batch_size=self.config.get("MESSAGE_BATCH_SIZE", 4000),
                     batch_interval=self.config.get("BATCH_SEND_INTERVAL", 1.0),
-                    split_content_func=self.split_content_func,
-                )
-                results.append(result)
+                    split_content_func=split_content_func,
+                    scheduler=self.scheduler,
+                    sessions=self.sessions,
+                    outbox=self.outbox,
+                ))
 
-        return any(results) if results else False
+        return jobs
 
-    def _send_ntfy(
+    def _ntfy_jobs(
         self,
-        report_data: Dict,
+        report_data: Optional[Dict],
         report_type: str,
         update_info: Optional[Dict],
         proxy_url: Optional[str],
         mode: str,
-    ) -> bool:
+        split_content_func: Callable,
+    ) -> List[Callable[[], bool]]:
         """发送到 ntfy（多账号，需验证 topic 和 token 配对）"""
         ntfy_server_url = self.config["NTFY_SERVER_URL"]
         ntfy_topics = parse_multi_account_config(self.config["NTFY_TOPIC"])
         ntfy_tokens = parse_multi_account_config(self.config.get("NTFY_TOKEN", ""))
 
         if not ntfy_server_url or not ntfy_topics:
-            return False
+            return []
 
         # 验证 token 和 topic 数量一致（如果配置了 token）
         if ntfy_tokens and len(ntfy_tokens) != len(ntfy_topics):
             print(
                 f"❌ ntfy 配置错误：topic 数量({len(ntfy_topics)})与 token 数量({len(ntfy_tokens)})不一致，跳过 ntfy 推送"
             )
-            return False
+            return []
 
         # 限制账号数量
         ntfy_topics = limit_accounts(ntfy_topics, self.max_accounts, "ntfy")
         if ntfy_tokens:
             ntfy_tokens = ntfy_tokens[: len(ntfy_topics)]
 
-        results = []
+        jobs = []
         for i, topic in enumerate(ntfy_topics):
             if topic:
                 token = get_account_at_index(ntfy_tokens, i, "") if ntfy_tokens else ""
                 account_label = f"账号{i+1}" if len(ntfy_topics) > 1 else ""
-                result = send_to_ntfy(
+                jobs.append(partial(
+                    send_to_ntfy,
                     server_url=ntfy_server_url,
                     topic=topic,
                     token=token,
@@ -344,22 +485,25 @@ class NotificationDispatcher:
                     mode=mode,
                     account_label=account_label,
                     batch_size=3800,
-                    split_content_func=self.split_content_func,
-                )
-                results.append(result)
+                    split_content_func=split_content_func,
+                    scheduler=self.scheduler,
+                    sessions=self.sessions,
+                    outbox=self.outbox,
+                ))
 
-        return any(results) if results else False
+        return jobs
 
-    def _send_bark(
+    def _bark_jobs(
         self,
-        report_data: Dict,
+        report_data: Optional[Dict],
         report_type: str,
         update_info: Optional[Dict],
         proxy_url: Optional[str],
         mode: str,
-    ) -> bool:
+        split_content_func: Callable,
+    ) -> List[Callable[[], bool]]:
         """发送到 Bark（多账号）"""
-        return self._send_to_multi_accounts(
+        return self._account_jobs(
             channel_name="Bark",
             config_value=self.config["BARK_URL"],
             send_func=lambda url, account_label: send_to_bark(
@@ -372,20 +516,24 @@ class NotificationDispatcher:
                 account_label=account_label,
                 batch_size=self.config.get("BARK_BATCH_SIZE", 3600),
                 batch_interval=self.config.get("BATCH_SEND_INTERVAL", 1.0),
-                split_content_func=self.split_content_func,
+                split_content_func=split_content_func,
+                scheduler=self.scheduler,
+                sessions=self.sessions,
+                outbox=self.outbox,
             ),
         )
 
-    def _send_slack(
+    def _slack_jobs(
         self,
-        report_data: Dict,
+        report_data: Optional[Dict],
         report_type: str,
         update_info: Optional[Dict],
         proxy_url: Optional[str],
         mode: str,
-    ) -> bool:
+        split_content_func: Callable,
+    ) -> List[Callable[[], bool]]:
         """发送到 Slack（多账号）"""
-        return self._send_to_multi_accounts(
+        return self._account_jobs(
             channel_name="Slack",
             config_value=self.config["SLACK_WEBHOOK_URL"],
             send_func=lambda url, account_label: send_to_slack(
@@ -398,17 +546,21 @@ class NotificationDispatcher:
                 account_label=account_label,
                 batch_size=self.config.get("SLACK_BATCH_SIZE", 4000),
                 batch_interval=self.config.get("BATCH_SEND_INTERVAL", 1.0),
-                split_content_func=self.split_content_func,
+                split_content_func=split_content_func,
+                scheduler=self.scheduler,
+                sessions=self.sessions,
+                outbox=self.outbox,
             ),
         )
 
-    def _send_email(
+    def _email_jobs(
         self,
         report_type: str,
         html_file_path: Optional[str],
-    ) -> bool:
-        """发送邮件（保持原有逻辑，已支持多收件人）"""
-        return send_to_email(
+    ) -> List[Callable[[], bool]]:
+        """发送邮件（保持原有逻辑，已支持多收件人，作为单个任务）"""
+        return [partial(
+            send_to_email,
             from_email=self.config["EMAIL_FROM"],
             password=self.config["EMAIL_PASSWORD"],
             to_email=self.config["EMAIL_TO"],
@@ -417,4 +569,5 @@ class NotificationDispatcher:
             custom_smtp_server=self.config.get("EMAIL_SMTP_SERVER", ""),
             custom_smtp_port=self.config.get("EMAIL_SMTP_PORT", ""),
             get_time_func=self.get_time_func,
-        )
+            delivery=self.email_delivery,
+        )]
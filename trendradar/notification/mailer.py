@@ -0,0 +1,376 @@
+# coding=utf-8
+"""
+邮件投递模块
+
+- resolve_smtp_settings: 按发件人域名或自定义配置确定 SMTP 服务器、端口和加密方式
+- compact_html: 压缩 HTML 报告（去除脚本、注释，合并连续空白；邮件客户端不执行脚本）
+- build_report_message: 构建一次 MIME 邮件并序列化，所有收件人分组共用同一份字节
+- SmtpConnectionPool: 复用已登录的 SMTP 连接（空闲连接在复用前用 NOOP 探活）
+- EmailDelivery: 按发件账号管理连接池，收件人分组并行投递；
+  同一进程内多次推送（如多种报告类型）复用连接和已压缩的 HTML
+
+可以用本地 SMTP 接收器（如 aiosmtpd）测试：
+    delivery = EmailDelivery()
+    settings = SmtpSettings("127.0.0.1", 8025, use_tls=False, use_ssl=False)
+"""
+
+import re
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from email.header import Header
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr, formatdate, make_msgid
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# === SMTP 邮件配置 ===
+SMTP_CONFIGS = {
+    # Gmail（使用 STARTTLS）
+    "gmail.com": {"server": "smtp.gmail.com", "port": 587, "encryption": "TLS"},
+    # QQ邮箱（使用 SSL，更稳定）
+    "qq.com": {"server": "smtp.qq.com", "port": 465, "encryption": "SSL"},
+    # Outlook（使用 STARTTLS）
+    "outlook.com": {"server": "smtp-mail.outlook.com", "port": 587, "encryption": "TLS"},
+    "hotmail.com": {"server": "smtp-mail.outlook.com", "port": 587, "encryption": "TLS"},
+    "live.com": {"server": "smtp-mail.outlook.com", "port": 587, "encryption": "TLS"},
+    # 网易邮箱（使用 SSL，更稳定）
+    "163.com": {"server": "smtp.163.com", "port": 465, "encryption": "SSL"},
+    "126.com": {"server": "smtp.126.com", "port": 465, "encryption": "SSL"},
+    # 新浪邮箱（使用 SSL）
+    "sina.com": {"server": "smtp.sina.com", "port": 465, "encryption": "SSL"},
+    # 搜狐邮箱（使用 SSL）
+    "sohu.com": {"server": "smtp.sohu.com", "port": 465, "encryption": "SSL"},
+    # 天翼邮箱（使用 SSL）
+    "189.cn": {"server": "smtp.189.cn", "port": 465, "encryption": "SSL"},
+    # 阿里云邮箱（使用 TLS）
+    "aliyun.com": {"server": "smtp.aliyun.com", "port": 465, "encryption": "TLS"},
+    # Yandex邮箱（使用 TLS）
+    "yandex.com": {"server": "smtp.yandex.com", "port": 465, "encryption": "TLS"},
+}
+
+DEFAULT_MAX_CONNECTIONS = 2
+DEFAULT_RECIPIENTS_PER_MESSAGE = 50
+SMTP_TIMEOUT = 30
+
+
+@dataclass(frozen=True)
+class SmtpSettings:
+    """SMTP 服务器设置"""
+
+    server: str
+    port: int
+    use_tls: bool           # True: SMTP + STARTTLS
+    use_ssl: bool = True    # use_tls 为 False 时：True 使用 SMTP_SSL，False 为明文（仅用于本地测试）
+
+
+def resolve_smtp_settings(
+    from_email: str,
+    custom_smtp_server: Optional[str] = None,
+    custom_smtp_port: Optional[int] = None,
+) -> SmtpSettings:
+    """
+    确定 SMTP 服务器设置
+
+    Args:
+        from_email: 发件人邮箱
+        custom_smtp_server: 自定义 SMTP 服务器（可选）
+        custom_smtp_port: 自定义 SMTP 端口（可选）
+
+    Returns:
+        SmtpSettings
+    """
+    domain = from_email.split("@")[-1].lower()
+
+    if custom_smtp_server and custom_smtp_port:
+        # 使用自定义 SMTP 配置
+        smtp_port = int(custom_smtp_port)
+        # 根据端口判断加密方式：465=SSL, 587=TLS，其他端口优先尝试 TLS（更安全，更广泛支持）
+        return SmtpSettings(custom_smtp_server, smtp_port, use_tls=smtp_port != 465)
+    if domain in SMTP_CONFIGS:
+        # 使用预设配置
+        config = SMTP_CONFIGS[domain]
+        return SmtpSettings(config["server"], config["port"], use_tls=config["encryption"] == "TLS")
+
+    print(f"未识别的邮箱服务商: {domain}，使用通用 SMTP 配置")
+    return SmtpSettings(f"smtp.{domain}", 587, use_tls=True)
+
+
+_SCRIPT_PATTERN = re.compile(r"<script\b.*?</script>", re.IGNORECASE | re.DOTALL)
+_COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_PRESERVE_PATTERN = re.compile(r"(<(pre|textarea)\b.*?</\2>)", re.IGNORECASE | re.DOTALL)
+_LINE_BREAK_PATTERN = re.compile(r"\s*\n\s*")
+_SPACE_RUN_PATTERN = re.compile(r"[ \t]{2,}")
+
+
+def compact_html(html: str) -> str:
+    """
+    压缩 HTML 报告用于邮件正文
+
+    去除 <script>（邮件客户端不执行脚本，报告中的"保存为图片"脚本体积较大）和
+    HTML 注释（保留条件注释），连续空白合并为一个（与浏览器渲染结果相同）；
+    <pre>、<textarea> 内容保持原样。
+    """
+    html = _SCRIPT_PATTERN.sub("", html)
+    html = _COMMENT_PATTERN.sub("", html)
+
+    parts = _PRESERVE_PATTERN.split(html)
+    compacted = []
+    # split 结果：普通文本、保留块、标签名 交替出现
+    for i in range(0, len(parts), 3):
+        text = _LINE_BREAK_PATTERN.sub("\n", parts[i])
+        compacted.append(_SPACE_RUN_PATTERN.sub(" ", text))
+        if i + 1 < len(parts):
+            compacted.append(parts[i + 1])
+    return "".join(compacted).strip()
+
+
+def build_report_message(
+    from_email: str,
+    recipients: List[str],
+    report_type: str,
+    html_content: str,
+    now: datetime,
+) -> bytes:
+    """
+    构建报告邮件（只构建一次，所有收件人分组共用）
+
+    Args:
+        from_email: 发件人邮箱
+        recipients: 收件人列表（写入 To 头）
+        report_type: 报告类型
+        html_content: HTML 正文
+        now: 生成时间
+
+    Returns:
+        序列化后的邮件字节
+    """
+    msg = MIMEMultipart("alternative")
+
+    # 严格按照 RFC 标准设置 From header
+    msg["From"] = formataddr(("TrendRadar", from_email))
+    msg["To"] = ", ".join(recipients)
+
+    subject = f"TrendRadar 热点分析报告 - {report_type} - {now.strftime('%m月%d日 %H:%M')}"
+    msg["Subject"] = Header(subject, "utf-8")
+
+    # 设置其他标准 header
+    msg["MIME-Version"] = "1.0"
+    msg["Date"] = formatdate(localtime=True)
+    msg["Message-ID"] = make_msgid()
+
+    # 添加纯文本部分（作为备选）
+    text_content = f"""
+TrendRadar 热点分析报告
+========================
+报告类型：{report_type}
+生成时间：{now.strftime('%Y-%m-%d %H:%M:%S')}
+
+请使用支持HTML的邮件客户端查看完整报告内容。
+        """
+    msg.attach(MIMEText(text_content, "plain", "utf-8"))
+    msg.attach(MIMEText(html_content, "html", "utf-8"))
+    return msg.as_bytes()
+
+
+class SmtpConnectionPool:
+    """
+    已登录 SMTP 连接池（单个发件账号）
+
+    连接用完后放回空闲列表，下次复用前用 NOOP 探活，服务器已断开时重新连接登录。
+    """
+
+    def __init__(
+        self,
+        settings: SmtpSettings,
+        username: str,
+        password: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = SMTP_TIMEOUT,
+    ):
+        self.settings = settings
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._idle: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, max_connections))
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        settings = self.settings
+        if settings.use_tls:
+            # TLS 模式
+            server = smtplib.SMTP(settings.server, settings.port, timeout=self.timeout)
+            server.ehlo()
+            server.starttls()
+            server.ehlo()
+        elif settings.use_ssl:
+            # SSL 模式
+            server = smtplib.SMTP_SSL(settings.server, settings.port, timeout=self.timeout)
+            server.ehlo()
+        else:
+            server = smtplib.SMTP(settings.server, settings.port, timeout=self.timeout)
+            server.ehlo()
+
+        # 登录（本地测试服务器可不提供认证）
+        if self.password:
+            server.login(self.username, self.password)
+        with self._lock:
+            self.connects += 1
+        return server
+
+    @staticmethod
+    def _is_alive(server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """获取一个已登录的连接（用完自动放回，出错时丢弃）"""
+        with self._slots:
+            server = None
+            while server is None:
+                with self._lock:
+                    candidate = self._idle.pop() if self._idle else None
+                if candidate is None:
+                    server = self._connect()
+                elif self._is_alive(candidate):
+                    server = candidate
+                else:
+                    self._close(candidate)
+            try:
+                yield server
+            except BaseException:
+                self._close(server)
+                raise
+            with self._lock:
+                self._idle.append(server)
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        """关闭所有空闲连接"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            self._close(server)
+
+
+class EmailDelivery:
+    """
+    邮件投递器
+
+    按 (SMTP 设置, 发件账号) 缓存连接池；收件人按 recipients_per_message 分组，
+    各组在最多 max_connections 个连接上并行投递同一份邮件字节。
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        recipients_per_message: int = DEFAULT_RECIPIENTS_PER_MESSAGE,
+        timeout: float = SMTP_TIMEOUT,
+    ):
+        """
+        Args:
+            max_connections: 每个发件账号的最大并发连接数
+            recipients_per_message: 每封邮件（一次 SMTP 事务）的最大收件人数
+            timeout: SMTP 超时（秒）
+        """
+        self.max_connections = max(1, max_connections)
+        self.recipients_per_message = max(1, recipients_per_message)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pools: Dict[Tuple[SmtpSettings, str], SmtpConnectionPool] = {}
+        self._html_cache: Dict[str, Tuple[Tuple[float, int], str]] = {}
+
+    def pool(self, settings: SmtpSettings, from_email: str, password: str) -> SmtpConnectionPool:
+        """获取（或创建）某发件账号的连接池"""
+        key = (settings, from_email)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None or pool.password != password:
+                pool = SmtpConnectionPool(
+                    settings, from_email, password,
+                    max_connections=self.max_connections, timeout=self.timeout,
+                )
+                self._pools[key] = pool
+            return pool
+
+    def load_html(self, html_file_path: str) -> str:
+        """读取并压缩 HTML 报告（文件未变化时复用上次结果）"""
+        stat = Path(html_file_path).stat()
+        signature = (stat.st_mtime, stat.st_size)
+        with self._lock:
+            cached = self._html_cache.get(html_file_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        with open(html_file_path, "r", encoding="utf-8") as f:
+            html_content = compact_html(f.read())
+        with self._lock:
+            self._html_cache[html_file_path] = (signature, html_content)
+        return html_content
+
+    def send(
+        self,
+        settings: SmtpSettings,
+        from_email: str,
+        password: str,
+        recipients: List[str],
+        message: bytes,
+    ) -> List[Tuple[List[str], Exception]]:
+        """
+        投递邮件到所有收件人
+
+        Args:
+            settings: SMTP 设置
+            from_email: 发件人邮箱（同时作为登录用户名）
+            password: 邮箱密码/授权码
+            recipients: 收件人列表
+            message: build_report_message 生成的邮件字节
+
+        Returns:
+            失败的分组列表 [(收件人分组, 异常), ...]，全部成功时为空列表
+        """
+        pool = self.pool(settings, from_email, password)
+        size = self.recipients_per_message
+        groups = [recipients[i:i + size] for i in range(0, len(recipients), size)]
+
+        def send_group(group: List[str]) -> Optional[Exception]:
+            try:
+                with pool.connection() as server:
+                    server.sendmail(from_email, group, message)
+                return None
+            except Exception as e:
+                return e
+
+        if len(groups) == 1 or self.max_connections == 1:
+            results = [send_group(group) for group in groups]
+        else:
+            workers = min(self.max_connections, len(groups))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trendradar-smtp") as executor:
+                results = list(executor.map(send_group, groups))
+        return [(group, error) for group, error in zip(groups, results) if error is not None]
+
+    def close(self) -> None:
+        """关闭所有连接"""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
@@ -0,0 +1,309 @@
+# coding=utf-8
+"""
+本地模拟 Webhook 服务
+
+在本机启动一个 HTTP 服务，按各渠道的接口约定返回成功响应，用于在没有真实
+飞书 / 钉钉 / ntfy 等地址时测量推送延迟和批次数：
+- 可模拟网络延迟（固定延迟 + 随机抖动）
+- 按比例返回 429（可带 Retry-After 头）
+- 请求体超过上限时返回 413
+- 记录每个请求的渠道、路径、字节数和状态码
+
+路由（按路径第一段区分渠道）：
+    /feishu/...   /dingtalk/...   /wework/...   /slack/...   /ntfy/<topic>
+    /push（Bark 的推送端点）   /bot<token>/sendMessage（Telegram）
+
+Telegram 发送器固定使用 api.telegram.org，无法指向本服务，基准测试中不包含。
+
+用法:
+    python -m trendradar.notification.mock_server --port 9000 --latency-ms 80 --throttle-rate 0.1
+
+    with MockWebhookServer(MockWebhookBehavior(latency_ms=50)) as server:
+        config.update(server.channel_config(["feishu", "ntfy"]))
+        ...
+        print(server.summary())
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 可通过本服务模拟的渠道
+MOCK_CHANNELS = ("feishu", "dingtalk", "wework", "ntfy", "bark", "slack")
+
+# 各渠道成功响应：(Content-Type, 响应体)
+_SUCCESS_RESPONSES: Dict[str, Tuple[str, bytes]] = {
+    "feishu": ("application/json", b'{"code":0,"msg":"success","StatusCode":0}'),
+    "dingtalk": ("application/json", b'{"errcode":0,"errmsg":"ok"}'),
+    "wework": ("application/json", b'{"errcode":0,"errmsg":"ok"}'),
+    "telegram": ("application/json", b'{"ok":true,"result":{}}'),
+    "ntfy": ("application/json", b'{"id":"mock","event":"message"}'),
+    "bark": ("application/json", b'{"code":200,"message":"success"}'),
+    "slack": ("text/plain", b"ok"),
+}
+
+
+@dataclass
+class MockWebhookBehavior:
+    """模拟服务的响应行为"""
+
+    latency_ms: float = 0.0                 # 每个请求的固定延迟
+    jitter_ms: float = 0.0                  # 额外随机延迟（0 ~ jitter_ms）
+    throttle_rate: float = 0.0              # 返回 429 的比例（0 ~ 1）
+    retry_after: Optional[float] = 1.0      # 429 响应的 Retry-After 秒数（None 表示不带该头）
+    max_body_bytes: int = 0                 # 请求体上限，超过返回 413（0 表示不限制）
+    seed: int = 42
+
+
+@dataclass
+class MockRequest:
+    """一次收到的请求"""
+
+    channel: str
+    path: str
+    size: int
+    status: int
+    received_at: float
+
+
+@dataclass
+class MockChannelSummary:
+    """某渠道收到的请求汇总"""
+
+    requests: int = 0
+    delivered: int = 0
+    throttled: int = 0
+    too_large: int = 0
+    total_bytes: int = 0
+    max_bytes: int = 0
+    batch_sizes: List[int] = field(default_factory=list)
+
+
+def _route(path: str) -> Optional[str]:
+    segment = path.lstrip("/").split("/", 1)[0].split("?", 1)[0]
+    if segment in ("feishu", "dingtalk", "wework", "slack", "ntfy"):
+        return segment
+    if segment == "push":
+        return "bark"
+    if segment.startswith("bot"):
+        return "telegram"
+    return None
+
+
+class MockWebhookServer:
+    """
+    模拟 Webhook 服务（后台线程运行，每个请求一个线程）
+
+    behavior 对所有渠道生效，overrides 可按渠道覆盖（如只让 ntfy 返回 413）。
+    """
+
+    def __init__(
+        self,
+        behavior: Optional[MockWebhookBehavior] = None,
+        overrides: Optional[Dict[str, MockWebhookBehavior]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Args:
+            behavior: 默认响应行为
+            overrides: 渠道 -> 响应行为
+            host: 监听地址
+            port: 监听端口（0 表示随机端口）
+        """
+        self.behavior = behavior or MockWebhookBehavior()
+        self.overrides = overrides or {}
+        self._rng = random.Random(self.behavior.seed)
+        self._lock = threading.Lock()
+        self._records: List[MockRequest] = []
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头和响应体合并为一次写入并关闭 Nagle，避免 keep-alive 连接上的延迟确认等待
+            wbufsize = 64 * 1024
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                channel = _route(self.path)
+                status, headers, payload = server._respond(channel, len(body))
+                server._record(MockRequest(
+                    channel=channel or "unknown",
+                    path=self.path,
+                    size=len(body),
+                    status=status,
+                    received_at=time.perf_counter(),
+                ))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def _respond(self, channel: Optional[str], size: int) -> Tuple[int, Dict[str, str], bytes]:
+        if channel is None:
+            return 404, {"Content-Type": "text/plain"}, b"not found"
+
+        behavior = self.overrides.get(channel, self.behavior)
+        with self._lock:
+            jitter = self._rng.uniform(0, behavior.jitter_ms) if behavior.jitter_ms > 0 else 0.0
+            throttled = behavior.throttle_rate > 0 and self._rng.random() < behavior.throttle_rate
+        delay = (behavior.latency_ms + jitter) / 1000
+        if delay > 0:
+            time.sleep(delay)
+
+        if behavior.max_body_bytes and size > behavior.max_body_bytes:
+            payload = json.dumps({"code": 413, "error": "request entity too large"}).encode("utf-8")
+            return 413, {"Content-Type": "application/json"}, payload
+        if throttled:
+            headers = {"Content-Type": "application/json"}
+            if behavior.retry_after is not None:
+                headers["Retry-After"] = f"{behavior.retry_after:g}"
+            payload = json.dumps({"code": 429, "error": "too many requests"}).encode("utf-8")
+            return 429, headers, payload
+
+        content_type, payload = _SUCCESS_RESPONSES[channel]
+        return 200, {"Content-Type": content_type}, payload
+
+    def _record(self, request: MockRequest) -> None:
+        with self._lock:
+            self._records.append(request)
+
+    def start(self) -> "MockWebhookServer":
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-webhook", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "MockWebhookServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        """清空已记录的请求"""
+        with self._lock:
+            self._records.clear()
+
+    @property
+    def records(self) -> List[MockRequest]:
+        with self._lock:
+            return list(self._records)
+
+    def channel_config(self, channels: Iterable[str] = MOCK_CHANNELS, accounts: int = 1) -> Dict[str, str]:
+        """
+        指向本服务的渠道配置（与 load_config 的键一致，可直接合并到调度器配置）
+
+        Args:
+            channels: 要启用的渠道
+            accounts: 每个渠道的账号数（多个账号用 ; 分隔，路径不同）
+        """
+        accounts = max(1, accounts)
+        base = self.url
+        config = {}
+        for channel in channels:
+            if channel == "feishu":
+                config["FEISHU_WEBHOOK_URL"] = ";".join(f"{base}/feishu/hook{i}" for i in range(accounts))
+            elif channel == "dingtalk":
+                config["DINGTALK_WEBHOOK_URL"] = ";".join(f"{base}/dingtalk/robot{i}" for i in range(accounts))
+            elif channel == "wework":
+                config["WEWORK_WEBHOOK_URL"] = ";".join(f"{base}/wework/key{i}" for i in range(accounts))
+            elif channel == "slack":
+                config["SLACK_WEBHOOK_URL"] = ";".join(f"{base}/slack/hook{i}" for i in range(accounts))
+            elif channel == "bark":
+                config["BARK_URL"] = ";".join(f"{base}/device{i}" for i in range(accounts))
+            elif channel == "ntfy":
+                config["NTFY_SERVER_URL"] = f"{base}/ntfy"
+                config["NTFY_TOPIC"] = ";".join(f"topic{i}" for i in range(accounts))
+        return config
+
+    def summary(self) -> Dict[str, MockChannelSummary]:
+        """按渠道汇总已记录的请求（批次大小只统计成功送达的请求）"""
+        result: Dict[str, MockChannelSummary] = {}
+        for request in self.records:
+            stats = result.setdefault(request.channel, MockChannelSummary())
+            stats.requests += 1
+            if request.status == 429:
+                stats.throttled += 1
+            elif request.status == 413:
+                stats.too_large += 1
+            elif request.status == 200:
+                stats.delivered += 1
+                stats.total_bytes += request.size
+                stats.max_bytes = max(stats.max_bytes, request.size)
+                stats.batch_sizes.append(request.size)
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TrendRadar 本地模拟 Webhook 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="返回 429 的比例")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 响应的 Retry-After 秒数（负数表示不带该头）")
+    parser.add_argument("--max-body-bytes", type=int, default=0, help="请求体上限，超过返回 413")
+    args = parser.parse_args()
+
+    behavior = MockWebhookBehavior(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+        max_body_bytes=args.max_body_bytes,
+    )
+    server = MockWebhookServer(behavior, host=args.host, port=args.port)
+    print(f"模拟 Webhook 服务已启动: {server.url}")
+    print("可使用以下环境变量指向本服务:")
+    for key, value in server.channel_config().items():
+        print(f"  {key}={value}")
+
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        for channel, stats in server.summary().items():
+            print(
+                f"{channel}: 请求 {stats.requests}，送达 {stats.delivered}，"
+                f"429 {stats.throttled}，413 {stats.too_large}，字节 {stats.total_bytes}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# coding=utf-8
+"""
+持久化推送队列
+
+每个批次在发送前写入当天数据库的 notification_outbox 表（与 push_records 同库），
+发送成功后标记为已送达，失败时按带抖动的退避时间安排下次重试：
+- 幂等键 = 渠道 + 账号 + 报告实例 ID + 批次编号，只在同一次生成的报告内去重，
+  新生成的报告即使内容与之前相同也会完整推送
+- 只补发发送失败的批次（某批次失败后未发送的后续批次一并记为失败），
+  推送语义为至少一次（at-least-once）
+- 超过最大尝试次数的批次标记为 dead，不再重试
+
+队列只保存请求体和非敏感请求头；Webhook URL、Token、Authorization 头不落盘，
+补发时按账号哈希重新绑定当前配置的地址。
+"""
+
+import hashlib
+import json
+import random
+import secrets
+import threading
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from trendradar.notification.delivery import OutboundRequest
+
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_LOOKBACK_DAYS = 1
+
+# 重试退避（分钟）：2, 4, 8 ... 最多 60，实际等待为其 50%~100%
+RETRY_BACKOFF_MAX_MINUTES = 60
+
+# 不写入队列的请求头
+_SENSITIVE_HEADERS = {"authorization"}
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class NotificationOutbox:
+    """
+    推送队列
+
+    storage_backend 需要实现 outbox_enqueue / outbox_pending / outbox_update / sync_outbox
+    （StorageManager 及各存储后端）。后端不支持时 enqueue 返回 None，发送器直接发送。
+    可被多个推送线程共享，所有存储访问串行执行；推送结束后调用 flush 同步到远程存储。
+    """
+
+    def __init__(
+        self,
+        storage_backend,
+        get_time_func: Callable,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    ):
+        """
+        Args:
+            storage_backend: 存储后端（StorageManager）
+            get_time_func: 获取当前时间的函数（应使用配置的时区）
+            max_attempts: 单个批次的最大尝试次数
+            lookback_days: 补发时向前查找的天数（0 表示只补发当天的批次）
+        """
+        self.storage_backend = storage_backend
+        self.get_time = get_time_func
+        self.max_attempts = max(1, max_attempts)
+        self.lookback_days = max(0, lookback_days)
+        self.report_id = ""
+        self._lock = threading.Lock()
+
+    def start_report(self) -> str:
+        """开始一次新报告的推送（之后入队的批次属于同一报告实例），返回报告实例 ID"""
+        self.report_id = f"{self.get_time().strftime('%Y%m%d%H%M%S')}-{secrets.token_hex(4)}"
+        return self.report_id
+
+    @staticmethod
+    def account_key(channel: str, account: str) -> str:
+        """账号哈希（队列中不保存 Webhook URL 等敏感信息）"""
+        return hashlib.sha256(f"{channel}|{account}".encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def idempotency_key(channel: str, account_key: str, report_id: str, batch_num: int) -> str:
+        """批次幂等键（报告实例内唯一，不同报告实例的批次互不影响）"""
+        raw = f"{channel}|{account_key}|{report_id}|{batch_num}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _today(self) -> str:
+        return self.get_time().strftime("%Y-%m-%d")
+
+    def _now_str(self) -> str:
+        return self.get_time().strftime(_TIME_FORMAT)
+
+    def enqueue(
+        self,
+        channel: str,
+        account: str,
+        report_type: str,
+        batch_requests: List[OutboundRequest],
+    ) -> Optional[Dict[int, Dict]]:
+        """
+        批次入队
+
+        Args:
+            channel: 渠道名
+            account: 账号标识（与 DeliveryScheduler 使用的一致）
+            report_type: 报告类型
+            batch_requests: 待发送的批次
+
+        Returns:
+            批次编号 -> 队列中的行（同一报告实例重复入队时含已写入的状态），后端不支持时返回 None
+        """
+        account_key = self.account_key(channel, account)
+        # 未调用 start_report 时（直接调用发送函数）每次入队视为一个新的报告实例
+        report_id = self.report_id or self.start_report()
+        now_str = self._now_str()
+        rows = []
+        for request in batch_requests:
+            if request.json is not None:
+                body = json.dumps(request.json, ensure_ascii=False).encode("utf-8")
+            else:
+                body = request.data or b""
+            headers = {
+                name: value for name, value in request.headers.items()
+                if name.lower() not in _SENSITIVE_HEADERS
+            }
+            rows.append({
+                "idempotency_key": self.idempotency_key(
+                    channel, account_key, report_id, request.batch_num
+                ),
+                "channel": channel,
+                "account_key": account_key,
+                "report_type": report_type,
+                "batch_num": request.batch_num,
+                "batch_total": request.total,
+                "body": body,
+                "is_json": 1 if request.json is not None else 0,
+                "headers": json.dumps(headers, ensure_ascii=False),
+                "created_at": now_str,
+            })
+
+        date = self._today()
+        with self._lock:
+            stored = self.storage_backend.outbox_enqueue(rows, date)
+        if stored is None:
+            return None
+
+        entries = {}
+        for request, row in zip(batch_requests, rows):
+            entry = stored.get(row["idempotency_key"])
+            if entry is not None:
+                entry["date"] = date
+                entries[request.batch_num] = entry
+        return entries
+
+    def backlog(self, channel: str, account: str) -> List[Tuple[Dict, OutboundRequest]]:
+        """
+        某账号已到重试时间的失败批次（按日期、入队顺序）
+
+        Returns:
+            [(队列中的行, 重建的请求), ...]
+        """
+        account_key = self.account_key(channel, account)
+        now = self.get_time()
+        now_str = now.strftime(_TIME_FORMAT)
+        pending = []
+        for days_ago in range(self.lookback_days, -1, -1):
+            date = (now - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+            with self._lock:
+                rows = self.storage_backend.outbox_pending(account_key, now_str, date)
+            for row in rows:
+                row["date"] = date
+                pending.append((row, self._request_from_row(row)))
+        return pending
+
+    @staticmethod
+    def _request_from_row(row: Dict) -> OutboundRequest:
+        body = row["body"] or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        payload = json.loads(body.decode("utf-8")) if row["is_json"] else None
+        return OutboundRequest(
+            batch_num=row["batch_num"],
+            total=row["batch_total"],
+            content=body.decode("utf-8", errors="replace"),
+            json=payload,
+            data=None if row["is_json"] else body,
+            headers=json.loads(row["headers"] or "{}"),
+        )
+
+    def mark_delivered(self, row: Dict) -> None:
+        """标记批次已送达"""
+        changes = {
+            "status": "delivered",
+            "attempts": (row.get("attempts") or 0) + 1,
+            "delivered_at": self._now_str(),
+            "last_error": None,
+        }
+        with self._lock:
+            self.storage_backend.outbox_update(row["idempotency_key"], changes, row.get("date"))
+        row.update(changes)
+
+    def mark_failed(self, row: Dict, error: str) -> None:
+        """记录发送失败，安排下次重试（超过最大尝试次数时标记为 dead）"""
+        attempts = (row.get("attempts") or 0) + 1
+        changes = {"attempts": attempts, "last_error": error[:500]}
+        if attempts >= self.max_attempts:
+            changes["status"] = "dead"
+        else:
+            ceiling = min(RETRY_BACKOFF_MAX_MINUTES, 2 ** attempts)
+            delay = timedelta(minutes=random.uniform(ceiling / 2, ceiling))
+            changes["next_attempt_at"] = (self.get_time() + delay).strftime(_TIME_FORMAT)
+        with self._lock:
+            self.storage_backend.outbox_update(row["idempotency_key"], changes, row.get("date"))
+        row.update(changes)
+
+    def flush(self) -> None:
+        """将本次推送的队列变更同步到远程存储（远程后端只在此时上传数据库）"""
+        self.storage_backend.sync_outbox()
@@ -6,12 +6,71 @@
 通过 storage_backend 统一存储，支持本地 SQLite 和远程云存储
 """
 
+import json
+import os
 from datetime import datetime
+from pathlib import Path
 from typing import Callable, Optional, Any
 
 import pytz
 
 
+class FilePushRecordStore:
+    """
+    基于 JSON 文件的推送记录
+
+    多租户模式下各租户共用同一个数据库，而数据库中的推送记录按日期唯一，
+    因此每个租户在自己的报告目录下单独记录 once_per_day 状态。
+    接口与存储后端的 has_pushed_today / record_push 相同，可直接传给 PushRecordManager。
+    """
+
+    backend_name = "file"
+
+    def __init__(self, record_dir: str, get_time_func: Callable[[], datetime]):
+        """
+        Args:
+            record_dir: 记录文件所在目录
+            get_time_func: 获取当前时间的函数（应使用配置的时区）
+        """
+        self.path = Path(record_dir) / "push_records.json"
+        self.get_time = get_time_func
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"[推送记录] 读取 {self.path} 失败: {e}")
+            return {}
+
+    def has_pushed_today(self, date: Optional[str] = None) -> bool:
+        date = date or self.get_time().strftime("%Y-%m-%d")
+        return bool(self._load().get(date, {}).get("pushed"))
+
+    def record_push(self, report_type: str, date: Optional[str] = None) -> bool:
+        now = self.get_time()
+        date = date or now.strftime("%Y-%m-%d")
+        records = self._load()
+        records[date] = {
+            "pushed": True,
+            "push_time": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "report_type": report_type,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            print(f"[推送记录] 推送记录已保存: {report_type} at {records[date]['push_time']}")
+            return True
+        except OSError as e:
+            print(f"[推送记录] 保存推送记录失败: {e}")
+            return False
+
+
 class PushRecordManager:
     """
     推送记录管理器
@@ -3,14 +3,35 @@
 通知内容渲染模块
 
 提供多平台通知内容渲染功能，生成格式化的推送消息
+
+消息按片段收集后一次 str.join 拼接；标题行使用 formatter 的预编译模板，
+渲染结果与分批拆分（splitter）共享缓存。
 """
 
 from datetime import datetime
-from typing import Dict, Optional, Callable
+from typing import Dict, List, Optional, Callable
 
 from trendradar.report.formatter import format_title_for_platform
 
 
+def _empty_mode_text(mode: str) -> str:
+    if mode == "incremental":
+        return "增量模式下暂无新增匹配的热点词汇"
+    elif mode == "current":
+        return "当前榜单模式下暂无匹配的热点词汇"
+    return "暂无匹配的热点词汇"
+
+
+def _join_sections(first: str, second: str, divider: str, reverse: bool) -> List[str]:
+    """按内容顺序拼接热点词汇统计和新增热点两部分（reverse 时新增在前）"""
+    if reverse:
+        first, second = second, first
+    sections = [section for section in (first, second) if section]
+    if len(sections) == 2:
+        return [sections[0], divider, sections[1]]
+    return sections
+
+
 def render_feishu_content(
     report_data: Dict,
     update_info: Optional[Dict] = None,
@@ -33,9 +54,9 @@ def render_feishu_content(
         格式化的飞书消息内容
     """
     # 生成热点词汇统计部分
-    stats_content = ""
+    stats_parts = []
     if report_data["stats"]:
-        stats_content += "📊 **热点词汇统计**\n\n"
+        stats_parts.append("📊 **热点词汇统计**\n\n")
 
         total_count = len(report_data["stats"])
 
@@ -46,92 +67,70 @@ def render_feishu_content(
             sequence_display = f"<font color='grey'>[{i + 1}/{total_count}]</font>"
 
             if count >= 10:
-                stats_content += f"🔥 {sequence_display} **{word}** : <font color='red'>{count}</font> 条\n\n"
+                stats_parts.append(f"🔥 {sequence_display} **{word}** : <font color='red'>{count}</font> 条\n\n")
             elif count >= 5:
-                stats_content += f"📈 {sequence_display} **{word}** : <font color='orange'>{count}</font> 条\n\n"
+                stats_parts.append(f"📈 {sequence_display} **{word}** : <font color='orange'>{count}</font> 条\n\n")
             else:
-                stats_content += f"📌 {sequence_display} **{word}** : {count} 条\n\n"
-
-            for j, title_data in enumerate(stat["titles"], 1):
-                formatted_title = format_title_for_platform(
-                    "feishu", title_data, show_source=True
-                )
-                stats_content += f"  {j}. {formatted_title}\n"
+                stats_parts.append(f"📌 {sequence_display} **{word}** : {count} 条\n\n")
 
-                if j < len(stat["titles"]):
-                    stats_content += "\n"
+            stats_parts.append("\n".join(
+                f"  {j}. {format_title_for_platform('feishu', title_data, show_source=True)}\n"
+                for j, title_data in enumerate(stat["titles"], 1)
+            ))
 
             if i < len(report_data["stats"]) - 1:
-                stats_content += f"\n{separator}\n\n"
+                stats_parts.append(f"\n{separator}\n\n")
 
     # 生成新增新闻部分
-    new_titles_content = ""
+    new_titles_parts = []
     if report_data["new_titles"]:
-        new_titles_content += (
+        new_titles_parts.append(
             f"🆕 **本次新增热点新闻** (共 {report_data['total_new_count']} 条)\n\n"
         )
 
         for source_data in report_data["new_titles"]:
-            new_titles_content += (
+            new_titles_parts.append(
                 f"**{source_data['source_name']}** ({len(source_data['titles'])} 条):\n"
             )
+            new_titles_parts.extend(
+                f"  {j}. {format_title_for_platform('feishu', title_data, show_source=False, mark_new=False)}\n"
+                for j, title_data in enumerate(source_data["titles"], 1)
+            )
+            new_titles_parts.append("\n")
+
+    # 根据配置决定内容顺序（默认热点词汇统计在前，新增热点在后）
+    parts = _join_sections(
+        "".join(stats_parts),
+        "".join(new_titles_parts),
+        f"\n{separator}\n\n",
+        reverse_content_order,
+    )
 
-            for j, title_data in enumerate(source_data["titles"], 1):
-                title_data_copy = title_data.copy()
-                title_data_copy["is_new"] = False
-                formatted_title = format_title_for_platform(
-                    "feishu", title_data_copy, show_source=False
-                )
-                new_titles_content += f"  {j}. {formatted_title}\n"
-
-            new_titles_content += "\n"
-
-    # 根据配置决定内容顺序
-    text_content = ""
-    if reverse_content_order:
-        # 新增热点在前，热点词汇统计在后
-        if new_titles_content:
-            text_content += new_titles_content
-            if stats_content:
-                text_content += f"\n{separator}\n\n"
-        if stats_content:
-            text_content += stats_content
-    else:
-        # 默认：热点词汇统计在前，新增热点在后
-        if stats_content:
-            text_content += stats_content
-            if new_titles_content:
-                text_content += f"\n{separator}\n\n"
-        if new_titles_content:
-            text_content += new_titles_content
-
-    if not text_content:
-        if mode == "incremental":
-            mode_text = "增量模式下暂无新增匹配的热点词汇"
-        elif mode == "current":
-            mode_text = "当前榜单模式下暂无匹配的热点词汇"
-        else:
-            mode_text = "暂无匹配的热点词汇"
-        text_content = f"📭 {mode_text}\n\n"
+    if not parts:
+        parts.append(f"📭 {_empty_mode_text(mode)}\n\n")
 
     if report_data["failed_ids"]:
-        if text_content and "暂无匹配" not in text_content:
-            text_content += f"\n{separator}\n\n"
+        # 正文含“暂无匹配”时不加分隔线（增量模式的空报告提示不含该词，仍会加）
+        text_content = "".join(parts)
+        if "暂无匹配" not in text_content:
+            parts = [text_content, f"\n{separator}\n\n"]
 
-        text_content += "⚠️ **数据获取失败的平台：**\n\n"
-        for i, id_value in enumerate(report_data["failed_ids"], 1):
-            text_content += f"  • <font color='red'>{id_value}</font>\n"
+        parts.append("⚠️ **数据获取失败的平台：**\n\n")
+        parts.extend(
+            f"  • <font color='red'>{id_value}</font>\n"
+            for id_value in report_data["failed_ids"]
+        )
 
     # 获取当前时间
     now = get_time_func() if get_time_func else datetime.now()
-    text_content += (
+    parts.append(
         f"\n\n<font color='grey'>更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}</font>"
     )
 
     if update_info:
-        text_content += f"\n<font color='grey'>TrendRadar 发现新版本 {update_info['remote_version']}，当前 {update_info['current_version']}</font>"
+        parts.append(f"\n<font color='grey'>TrendRadar 发现新版本 {update_info['remote_version']}，当前 {update_info['current_version']}</font>")
 
-    return text_content
+    return "".join(parts)
 
 
 def render_dingtalk_content(
@@ -159,15 +158,17 @@ def render_dingtalk_content(
     now = get_time_func() if get_time_func else datetime.now()
 
     # 头部信息
-    header_content = f"**总新闻数：** {total_titles}\n\n"
-    header_content += f"**时间：** {now.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-    header_content += "**类型：** 热点分析报告\n\n"
-    header_content += "---\n\n"
+    parts = [
+        f"**总新闻数：** {total_titles}\n\n",
+        f"**时间：** {now.strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+        "**类型：** 热点分析报告\n\n",
+        "---\n\n",
+    ]
 
     # 生成热点词汇统计部分
-    stats_content = ""
+    stats_parts = []
     if report_data["stats"]:
-        stats_content += "📊 **热点词汇统计**\n\n"
+        stats_parts.append("📊 **热点词汇统计**\n\n")
 
         total_count = len(report_data["stats"])
 
@@ -178,83 +179,56 @@ def render_dingtalk_content(
             sequence_display = f"[{i + 1}/{total_count}]"
 
             if count >= 10:
-                stats_content += f"🔥 {sequence_display} **{word}** : **{count}** 条\n\n"
+                stats_parts.append(f"🔥 {sequence_display} **{word}** : **{count}** 条\n\n")
             elif count >= 5:
-                stats_content += f"📈 {sequence_display} **{word}** : **{count}** 条\n\n"
+                stats_parts.append(f"📈 {sequence_display} **{word}** : **{count}** 条\n\n")
             else:
-                stats_content += f"📌 {sequence_display} **{word}** : {count} 条\n\n"
+                stats_parts.append(f"📌 {sequence_display} **{word}** : {count} 条\n\n")
 
-            for j, title_data in enumerate(stat["titles"], 1):
-                formatted_title = format_title_for_platform(
-                    "dingtalk", title_data, show_source=True
-                )
-                stats_content += f"  {j}. {formatted_title}\n"
-
-                if j < len(stat["titles"]):
-                    stats_content += "\n"
+            stats_parts.append("\n".join(
+                f"  {j}. {format_title_for_platform('dingtalk', title_data, show_source=True)}\n"
+                for j, title_data in enumerate(stat["titles"], 1)
+            ))
 
             if i < len(report_data["stats"]) - 1:
-                stats_content += "\n---\n\n"
+                stats_parts.append("\n---\n\n")
 
     # 生成新增新闻部分
-    new_titles_content = ""
+    new_titles_parts = []
     if report_data["new_titles"]:
-        new_titles_content += (
+        new_titles_parts.append(
             f"🆕 **本次新增热点新闻** (共 {report_data['total_new_count']} 条)\n\n"
         )
 
         for source_data in report_data["new_titles"]:
-            new_titles_content += f"**{source_data['source_name']}** ({len(source_data['titles'])} 条):\n\n"
-
-            for j, title_data in enumerate(source_data["titles"], 1):
-                title_data_copy = title_data.copy()
-                title_data_copy["is_new"] = False
-                formatted_title = format_title_for_platform(
-                    "dingtalk", title_data_copy, show_source=False
-                )
-                new_titles_content += f"  {j}. {formatted_title}\n"
-
-            new_titles_content += "\n"
-
-    # 根据配置决定内容顺序
-    text_content = header_content
-    if reverse_content_order:
-        # 新增热点在前，热点词汇统计在后
-        if new_titles_content:
-            text_content += new_titles_content
-            if stats_content:
-                text_content += "\n---\n\n"
-        if stats_content:
-            text_content += stats_content
-    else:
-        # 默认：热点词汇统计在前，新增热点在后
-        if stats_content:
-            text_content += stats_content
-            if new_titles_content:
-                text_content += "\n---\n\n"
-        if new_titles_content:
-            text_content += new_titles_content
-
-    if not stats_content and not new_titles_content:
-        if mode == "incremental":
-            mode_text = "增量模式下暂无新增匹配的热点词汇"
-        elif mode == "current":
-            mode_text = "当前榜单模式下暂无匹配的热点词汇"
-        else:
-            mode_text = "暂无匹配的热点词汇"
-        text_content += f"📭 {mode_text}\n\n"
+            new_titles_parts.append(f"**{source_data['source_name']}** ({len(source_data['titles'])} 条):\n\n")
+            new_titles_parts.extend(
+                f"  {j}. {format_title_for_platform('dingtalk', title_data, show_source=False, mark_new=False)}\n"
+                for j, title_data in enumerate(source_data["titles"], 1)
+            )
+            new_titles_parts.append("\n")
+
+    # 根据配置决定内容顺序（默认热点词汇统计在前，新增热点在后）
+    sections = _join_sections(
+        "".join(stats_parts), "".join(new_titles_parts), "\n---\n\n", reverse_content_order
+    )
+    parts.extend(sections)
+
+    if not sections:
+        parts.append(f"📭 {_empty_mode_text(mode)}\n\n")
 
     if report_data["failed_ids"]:
+        # 正文含“暂无匹配”时不加分隔线（增量模式的空报告提示不含该词，仍会加）
+        text_content = "".join(parts)
         if "暂无匹配" not in text_content:
-            text_content += "\n---\n\n"
+            parts = [text_content, "\n---\n\n"]
 
-        text_content += "⚠️ **数据获取失败的平台：**\n\n"
-        for i, id_value in enumerate(report_data["failed_ids"], 1):
-            text_content += f"  • **{id_value}**\n"
+        parts.append("⚠️ **数据获取失败的平台：**\n\n")
+        parts.extend(f"  • **{id_value}**\n" for id_value in report_data["failed_ids"])
 
-    text_content += f"\n\n> 更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"
+    parts.append(f"\n\n> 更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}")
 
     if update_info:
-        text_content += f"\n> TrendRadar 发现新版本 **{update_info['remote_version']}**，当前 **{update_info['current_version']}**"
+        parts.append(f"\n> TrendRadar 发现新版本 **{update_info['remote_version']}**，当前 **{update_info['current_version']}**")
 
-    return text_content
+    return "".join(parts)
@@ -13,15 +13,14 @@
 - Slack
 
 每个发送函数都支持分批发送，并通过参数化配置实现与 CONFIG 的解耦。
+Webhook 请求经 DeliveryScheduler 按渠道速率限制发送（限流时按 Retry-After 重试）；
+传入 NotificationOutbox 时批次先写入推送队列，发送失败的批次在之后的运行中补发
+（report_data 为 None 时只补发，不生成新报告）；
+请求经 SessionRegistry 共享的 Session 发送，同一主机的连接在批次、账号之间复用。
 """
 
 import smtplib
-import time
 from datetime import datetime
-from email.header import Header
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.utils import formataddr, formatdate, make_msgid
 from pathlib import Path
 from typing import Callable, Dict, List, Optional
 from urllib.parse import urlparse
@@ -29,38 +28,238 @@ from urllib.parse import urlparse
 import requests
 
 from .batch import add_batch_headers, get_max_batch_header_size
+from .delivery import DeliveryScheduler, OutboundRequest
 from .formatters import convert_markdown_to_mrkdwn, strip_markdown
+from .mailer import (
+    SMTP_CONFIGS,  # noqa: F401  兼容旧代码从 senders 导入（已移至 mailer）
+    EmailDelivery,
+    SmtpSettings,
+    build_report_message,
+    resolve_smtp_settings,
+)
+from .outbox import NotificationOutbox
+from .sessions import SessionRegistry
 
 
-# === SMTP 邮件配置 ===
-SMTP_CONFIGS = {
-    # Gmail（使用 STARTTLS）
-    "gmail.com": {"server": "smtp.gmail.com", "port": 587, "encryption": "TLS"},
-    # QQ邮箱（使用 SSL，更稳定）
-    "qq.com": {"server": "smtp.qq.com", "port": 465, "encryption": "SSL"},
-    # Outlook（使用 STARTTLS）
-    "outlook.com": {"server": "smtp-mail.outlook.com", "port": 587, "encryption": "TLS"},
-    "hotmail.com": {"server": "smtp-mail.outlook.com", "port": 587, "encryption": "TLS"},
-    "live.com": {"server": "smtp-mail.outlook.com", "port": 587, "encryption": "TLS"},
-    # 网易邮箱（使用 SSL，更稳定）
-    "163.com": {"server": "smtp.163.com", "port": 465, "encryption": "SSL"},
-    "126.com": {"server": "smtp.126.com", "port": 465, "encryption": "SSL"},
-    # 新浪邮箱（使用 SSL）
-    "sina.com": {"server": "smtp.sina.com", "port": 465, "encryption": "SSL"},
-    # 搜狐邮箱（使用 SSL）
-    "sohu.com": {"server": "smtp.sohu.com", "port": 465, "encryption": "SSL"},
-    # 天翼邮箱（使用 SSL）
-    "189.cn": {"server": "smtp.189.cn", "port": 465, "encryption": "SSL"},
-    # 阿里云邮箱（使用 TLS）
-    "aliyun.com": {"server": "smtp.aliyun.com", "port": 465, "encryption": "TLS"},
-    # Yandex邮箱（使用 TLS）
-    "yandex.com": {"server": "smtp.yandex.com", "port": 465, "encryption": "TLS"},
-}
+# === 渠道在 200 响应体中返回的限流错误码 ===
+FEISHU_THROTTLE_CODES = {11232}       # frequency limited
+DINGTALK_THROTTLE_CODES = {130101}    # send too fast
+WEWORK_THROTTLE_CODES = {45009}       # api freq out of limit
+
+
+def _feishu_throttled(response: requests.Response) -> bool:
+    return response.json().get("code") in FEISHU_THROTTLE_CODES
+
+
+def _dingtalk_throttled(response: requests.Response) -> bool:
+    return response.json().get("errcode") in DINGTALK_THROTTLE_CODES
+
+
+def _wework_throttled(response: requests.Response) -> bool:
+    return response.json().get("errcode") in WEWORK_THROTTLE_CODES
+
+
+# === 各渠道的响应检查（成功返回 None，失败返回错误描述） ===
+
+
+def _feishu_error(response: requests.Response) -> Optional[str]:
+    if response.status_code != 200:
+        return f"状态码：{response.status_code}"
+    result = response.json()
+    # 检查飞书的响应状态
+    if result.get("StatusCode") == 0 or result.get("code") == 0:
+        return None
+    return f"错误：{result.get('msg') or result.get('StatusMessage', '未知错误')}"
+
+
+def _errcode_error(response: requests.Response) -> Optional[str]:
+    # 钉钉、企业微信
+    if response.status_code != 200:
+        return f"状态码：{response.status_code}"
+    result = response.json()
+    if result.get("errcode") == 0:
+        return None
+    return f"错误：{result.get('errmsg')}"
+
+
+def _telegram_error(response: requests.Response) -> Optional[str]:
+    if response.status_code != 200:
+        return f"状态码：{response.status_code}"
+    result = response.json()
+    if result.get("ok"):
+        return None
+    return f"错误：{result.get('description')}"
+
+
+def _ntfy_error(response: requests.Response) -> Optional[str]:
+    if response.status_code == 200:
+        return None
+    if response.status_code == 429:
+        return "速率限制，重试后仍失败"
+    if response.status_code == 413:
+        return "消息过大被拒绝"
+    return f"状态码：{response.status_code}，错误详情：{response.text}"
+
+
+def _bark_error(response: requests.Response) -> Optional[str]:
+    if response.status_code != 200:
+        return f"状态码：{response.status_code}，错误详情：{response.text}"
+    result = response.json()
+    if result.get("code") == 200:
+        return None
+    return f"错误：{result.get('message', '未知错误')}"
+
+
+def _slack_error(response: requests.Response) -> Optional[str]:
+    # Slack Incoming Webhooks 成功时返回 "ok" 文本
+    if response.status_code == 200 and response.text == "ok":
+        return None
+    return f"错误：{response.text if response.text else f'状态码：{response.status_code}'}"
+
+
+def _deliver_batches(
+    channel: str,
+    account: str,
+    url: str,
+    batch_requests: List[OutboundRequest],
+    check_response: Callable[[requests.Response], Optional[str]],
+    *,
+    log_prefix: str,
+    report_type: str,
+    proxies: Optional[Dict],
+    scheduler: DeliveryScheduler,
+    sessions: Optional[SessionRegistry] = None,
+    outbox: Optional[NotificationOutbox] = None,
+    auth_headers: Optional[Dict[str, str]] = None,
+    auth_fields: Optional[Dict] = None,
+    is_throttled: Optional[Callable[[requests.Response], bool]] = None,
+    stop_on_failure: bool = True,
+) -> int:
+    """
+    按顺序发送批次（Webhook 渠道共用）
+
+    有推送队列时先补发该账号之前发送失败的批次，再将本次批次入队（batch_requests 为空时只补发）：
+    同一报告实例中已送达的批次直接跳过，发送失败（及因此未发送）的批次留在队列中等待补发。
+
+    Args:
+        channel: 渠道名
+        account: 账号标识（同一账号共享发送配额和推送队列）
+        url: 请求地址
+        batch_requests: 按推送顺序排列的批次
+        check_response: 检查响应，成功返回 None，失败返回错误描述
+        log_prefix: 日志前缀
+        report_type: 报告类型
+        proxies: 代理配置
+        scheduler: 推送节奏调度器
+        sessions: HTTP 会话池（可选，未传入时本次发送内临时复用一个 Session）
+        outbox: 推送队列（可选）
+        auth_headers: 鉴权请求头（发送时附加，不写入推送队列）
+        auth_fields: 鉴权字段（发送时合并到 JSON 请求体，不写入推送队列）
+        is_throttled: 判断 200 响应是否为限流错误（可选）
+        stop_on_failure: 某批次失败后是否停止发送后续批次
+
+    Returns:
+        送达（含之前已送达）的批次数
+    """
+
+    def post(request: OutboundRequest) -> Optional[str]:
+        headers = {**request.headers, **(auth_headers or {})}
+        payload = request.json
+        if payload is not None and auth_fields:
+            payload = {**payload, **auth_fields}
+        try:
+            response = scheduler.deliver(
+                channel,
+                account,
+                lambda: sessions.post(
+                    url,
+                    headers=headers or None,
+                    json=payload,
+                    data=request.data,
+                    proxies=proxies,
+                    timeout=30,
+                ),
+                is_throttled=is_throttled,
+            )
+        except Exception as e:
+            return f"出错：{e}"
+        return check_response(response)
+
+    owns_sessions = sessions is None
+    if owns_sessions:
+        sessions = SessionRegistry(pool_maxsize=1)
+    try:
+        return _deliver_with_outbox(
+            channel, account, batch_requests, post,
+            log_prefix=log_prefix, report_type=report_type,
+            outbox=outbox, stop_on_failure=stop_on_failure,
+        )
+    finally:
+        if owns_sessions:
+            sessions.close()
+
+
+def _deliver_with_outbox(
+    channel: str,
+    account: str,
+    batch_requests: List[OutboundRequest],
+    post: Callable[[OutboundRequest], Optional[str]],
+    *,
+    log_prefix: str,
+    report_type: str,
+    outbox: Optional[NotificationOutbox],
+    stop_on_failure: bool,
+) -> int:
+    """补发积压批次、入队并逐批发送（post 成功返回 None，失败返回错误描述）"""
+    entries = None
+    if outbox is not None:
+        for row, request in outbox.backlog(channel, account):
+            label = f"{log_prefix}补发第 {request.batch_num}/{request.total} 批次 [{row['report_type']}]"
+            error = post(request)
+            if error is None:
+                outbox.mark_delivered(row)
+                print(f"{label}成功")
+            else:
+                outbox.mark_failed(row, error)
+                print(f"{label}失败，{error}")
+                break
+        if batch_requests:
+            entries = outbox.enqueue(channel, account, report_type, batch_requests)
+
+    success_count = 0
+    for index, request in enumerate(batch_requests):
+        progress = f"第 {request.batch_num}/{request.total} 批次"
+        row = entries.get(request.batch_num) if entries else None
+        if row is not None and row["status"] == "delivered":
+            print(f"{log_prefix}{progress}已送达，跳过 [{report_type}]")
+            success_count += 1
+            continue
+
+        print(f"发送{log_prefix}{progress}，大小：{request.size} 字节 [{report_type}]")
+        error = post(request)
+        if error is None:
+            if row is not None:
+                outbox.mark_delivered(row)
+            print(f"{log_prefix}{progress}发送成功 [{report_type}]")
+            success_count += 1
+            continue
+
+        if row is not None:
+            outbox.mark_failed(row, error)
+        print(f"{log_prefix}{progress}发送失败 [{report_type}]，{error}")
+        if stop_on_failure:
+            # 后续批次不再发送，一并记为失败，补发时按入队顺序发送
+            for pending in batch_requests[index + 1:]:
+                pending_row = entries.get(pending.batch_num) if entries else None
+                if pending_row is not None:
+                    outbox.mark_failed(pending_row, "前序批次发送失败，未发送")
+            break
+    return success_count
 
 
 def send_to_feishu(
     webhook_url: str,
-    report_data: Dict,
+    report_data: Optional[Dict],
     report_type: str,
     update_info: Optional[Dict] = None,
     proxy_url: Optional[str] = None,
@@ -70,6 +269,9 @@ def send_to_feishu(
     batch_size: int = 29000,
     batch_interval: float = 1.0,
     split_content_func: Callable = None,
+    scheduler: Optional[DeliveryScheduler] = None,
+    sessions: Optional[SessionRegistry] = None,
+    outbox: Optional[NotificationOutbox] = None,
     get_time_func: Callable = None,
 ) -> bool:
     """
@@ -77,20 +279,26 @@ def send_to_feishu(
 
     Args:
         webhook_url: 飞书 Webhook URL
-        report_data: 报告数据
+        report_data: 报告数据（为 None 时只补发推送队列中发送失败的批次）
         report_type: 报告类型
         update_info: 更新信息（可选）
         proxy_url: 代理 URL（可选）
         mode: 报告模式 (daily/current)
         account_label: 账号标签（多账号时显示）
         batch_size: 批次大小（字节）
-        batch_interval: 批次发送间隔（秒）
+        batch_interval: 同一账号相邻批次的最小间隔（秒，仅在未传入 scheduler 时使用）
         split_content_func: 内容分批函数
+        scheduler: 推送节奏调度器（可选，未传入时按渠道默认速率限制新建）
+        sessions: HTTP 会话池（可选，多账号、多次推送共享连接）
+        outbox: 推送队列（可选，传入时批次持久化并在下次运行时补发未送达的批次）
         get_time_func: 获取当前时间的函数
 
     Returns:
         bool: 发送是否成功
     """
+    if scheduler is None:
+        scheduler = DeliveryScheduler(min_interval=batch_interval)
+
     headers = {"Content-Type": "application/json"}
     proxies = None
     if proxy_url:
@@ -99,6 +307,16 @@ def send_to_feishu(
     # 日志前缀
     log_prefix = f"飞书{account_label}" if account_label else "飞书"
 
+    # 只补发推送队列中发送失败的批次（不生成新报告）
+    if report_data is None:
+        _deliver_batches(
+            "feishu", webhook_url, webhook_url, [], _feishu_error,
+            log_prefix=log_prefix, report_type=report_type, proxies=proxies,
+            scheduler=scheduler, sessions=sessions, outbox=outbox,
+            is_throttled=_feishu_throttled,
+        )
+        return True
+
     # 预留批次头部空间，避免添加头部后超限
     header_reserve = get_max_batch_header_size("feishu")
     batches = split_content_func(
@@ -114,62 +332,53 @@ def send_to_feishu(
 
     print(f"{log_prefix}消息分为 {len(batches)} 批次发送 [{report_type}]")
 
-    # 逐批发送
-    for i, batch_content in enumerate(batches, 1):
-        content_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送{log_prefix}第 {i}/{len(batches)} 批次，大小：{content_size} 字节 [{report_type}]"
-        )
-
-        total_titles = sum(
-            len(stat["titles"]) for stat in report_data["stats"] if stat["count"] > 0
-        )
-        now = get_time_func() if get_time_func else datetime.now()
+    total_titles = sum(
+        len(stat["titles"]) for stat in report_data["stats"] if stat["count"] > 0
+    )
 
-        payload = {
-            "msg_type": "text",
-            "content": {
-                "total_titles": total_titles,
-                "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
-                "report_type": report_type,
-                "text": batch_content,
+    now = get_time_func() if get_time_func else datetime.now()
+    timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+    batch_requests = [
+        OutboundRequest(
+            batch_num=i,
+            total=len(batches),
+            content=batch_content,
+            json={
+                "msg_type": "text",
+                "content": {
+                    "total_titles": total_titles,
+                    "timestamp": timestamp,
+                    "report_type": report_type,
+                    "text": batch_content,
+                },
             },
-        }
-
-        try:
-            response = requests.post(
-                webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
-            )
-            if response.status_code == 200:
-                result = response.json()
-                # 检查飞书的响应状态
-                if result.get("StatusCode") == 0 or result.get("code") == 0:
-                    print(f"{log_prefix}第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                    # 批次间间隔
-                    if i < len(batches):
-                        time.sleep(batch_interval)
-                else:
-                    error_msg = result.get("msg") or result.get("StatusMessage", "未知错误")
-                    print(
-                        f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{error_msg}"
-                    )
-                    return False
-            else:
-                print(
-                    f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-        except Exception as e:
-            print(f"{log_prefix}第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
-            return False
+            headers=headers,
+        )
+        for i, batch_content in enumerate(batches, 1)
+    ]
 
-    print(f"{log_prefix}所有 {len(batches)} 批次发送完成 [{report_type}]")
+    success_count = _deliver_batches(
+        "feishu",
+        webhook_url,
+        webhook_url,
+        batch_requests,
+        _feishu_error,
+        log_prefix=log_prefix,
+        report_type=report_type,
+        proxies=proxies,
+        scheduler=scheduler,
+        sessions=sessions,
+        outbox=outbox,
+        is_throttled=_feishu_throttled,
+    )
+    if success_count < len(batch_requests):
+        return False
+    print(f"{log_prefix}所有 {len(batch_requests)} 批次发送完成 [{report_type}]")
     return True
 
-
 def send_to_dingtalk(
     webhook_url: str,
-    report_data: Dict,
+    report_data: Optional[Dict],
     report_type: str,
     update_info: Optional[Dict] = None,
     proxy_url: Optional[str] = None,
@@ -179,25 +388,34 @@ def send_to_dingtalk(
     batch_size: int = 20000,
     batch_interval: float = 1.0,
     split_content_func: Callable = None,
+    scheduler: Optional[DeliveryScheduler] = None,
+    sessions: Optional[SessionRegistry] = None,
+    outbox: Optional[NotificationOutbox] = None,
 ) -> bool:
     """
     发送到钉钉（支持分批发送）
 
     Args:
         webhook_url: 钉钉 Webhook URL
-        report_data: 报告数据
+        report_data: 报告数据（为 None 时只补发推送队列中发送失败的批次）
         report_type: 报告类型
         update_info: 更新信息（可选）
         proxy_url: 代理 URL（可选）
         mode: 报告模式 (daily/current)
         account_label: 账号标签（多账号时显示）
         batch_size: 批次大小（字节）
-        batch_interval: 批次发送间隔（秒）
+        batch_interval: 同一账号相邻批次的最小间隔（秒，仅在未传入 scheduler 时使用）
         split_content_func: 内容分批函数
+        scheduler: 推送节奏调度器（可选，未传入时按渠道默认速率限制新建）
+        sessions: HTTP 会话池（可选，多账号、多次推送共享连接）
+        outbox: 推送队列（可选，传入时批次持久化并在下次运行时补发未送达的批次）
 
     Returns:
         bool: 发送是否成功
     """
+    if scheduler is None:
+        scheduler = DeliveryScheduler(min_interval=batch_interval)
+
     headers = {"Content-Type": "application/json"}
     proxies = None
     if proxy_url:
@@ -206,6 +424,16 @@ def send_to_dingtalk(
     # 日志前缀
     log_prefix = f"钉钉{account_label}" if account_label else "钉钉"
 
+    # 只补发推送队列中发送失败的批次（不生成新报告）
+    if report_data is None:
+        _deliver_batches(
+            "dingtalk", webhook_url, webhook_url, [], _errcode_error,
+            log_prefix=log_prefix, report_type=report_type, proxies=proxies,
+            scheduler=scheduler, sessions=sessions, outbox=outbox,
+            is_throttled=_dingtalk_throttled,
+        )
+        return True
+
     # 预留批次头部空间，避免添加头部后超限
     header_reserve = get_max_batch_header_size("dingtalk")
     batches = split_content_func(
@@ -221,53 +449,45 @@ def send_to_dingtalk(
 
     print(f"{log_prefix}消息分为 {len(batches)} 批次发送 [{report_type}]")
 
-    # 逐批发送
-    for i, batch_content in enumerate(batches, 1):
-        content_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送{log_prefix}第 {i}/{len(batches)} 批次，大小：{content_size} 字节 [{report_type}]"
-        )
-
-        payload = {
-            "msgtype": "markdown",
-            "markdown": {
-                "title": f"TrendRadar 热点分析报告 - {report_type}",
-                "text": batch_content,
+    batch_requests = [
+        OutboundRequest(
+            batch_num=i,
+            total=len(batches),
+            content=batch_content,
+            json={
+                "msgtype": "markdown",
+                "markdown": {
+                    "title": f"TrendRadar 热点分析报告 - {report_type}",
+                    "text": batch_content,
+                },
             },
-        }
-
-        try:
-            response = requests.post(
-                webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
-            )
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("errcode") == 0:
-                    print(f"{log_prefix}第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                    # 批次间间隔
-                    if i < len(batches):
-                        time.sleep(batch_interval)
-                else:
-                    print(
-                        f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('errmsg')}"
-                    )
-                    return False
-            else:
-                print(
-                    f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-        except Exception as e:
-            print(f"{log_prefix}第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
-            return False
+            headers=headers,
+        )
+        for i, batch_content in enumerate(batches, 1)
+    ]
 
-    print(f"{log_prefix}所有 {len(batches)} 批次发送完成 [{report_type}]")
+    success_count = _deliver_batches(
+        "dingtalk",
+        webhook_url,
+        webhook_url,
+        batch_requests,
+        _errcode_error,
+        log_prefix=log_prefix,
+        report_type=report_type,
+        proxies=proxies,
+        scheduler=scheduler,
+        sessions=sessions,
+        outbox=outbox,
+        is_throttled=_dingtalk_throttled,
+    )
+    if success_count < len(batch_requests):
+        return False
+    print(f"{log_prefix}所有 {len(batch_requests)} 批次发送完成 [{report_type}]")
     return True
 
-
 def send_to_wework(
     webhook_url: str,
-    report_data: Dict,
+    report_data: Optional[Dict],
     report_type: str,
     update_info: Optional[Dict] = None,
     proxy_url: Optional[str] = None,
@@ -278,26 +498,35 @@ def send_to_wework(
     batch_interval: float = 1.0,
     msg_type: str = "markdown",
     split_content_func: Callable = None,
+    scheduler: Optional[DeliveryScheduler] = None,
+    sessions: Optional[SessionRegistry] = None,
+    outbox: Optional[NotificationOutbox] = None,
 ) -> bool:
     """
     发送到企业微信（支持分批发送，支持 markdown 和 text 两种格式）
 
     Args:
         webhook_url: 企业微信 Webhook URL
-        report_data: 报告数据
+        report_data: 报告数据（为 None 时只补发推送队列中发送失败的批次）
         report_type: 报告类型
         update_info: 更新信息（可选）
         proxy_url: 代理 URL（可选）
         mode: 报告模式 (daily/current)
         account_label: 账号标签（多账号时显示）
         batch_size: 批次大小（字节）
-        batch_interval: 批次发送间隔（秒）
+        batch_interval: 同一账号相邻批次的最小间隔（秒，仅在未传入 scheduler 时使用）
         msg_type: 消息类型 (markdown/text)
         split_content_func: 内容分批函数
+        scheduler: 推送节奏调度器（可选，未传入时按渠道默认速率限制新建）
+        sessions: HTTP 会话池（可选，多账号、多次推送共享连接）
+        outbox: 推送队列（可选，传入时批次持久化并在下次运行时补发未送达的批次）
 
     Returns:
         bool: 发送是否成功
     """
+    if scheduler is None:
+        scheduler = DeliveryScheduler(min_interval=batch_interval)
+
     headers = {"Content-Type": "application/json"}
     proxies = None
     if proxy_url:
@@ -306,6 +535,16 @@ def send_to_wework(
     # 日志前缀
     log_prefix = f"企业微信{account_label}" if account_label else "企业微信"
 
+    # 只补发推送队列中发送失败的批次（不生成新报告）
+    if report_data is None:
+        _deliver_batches(
+            "wework", webhook_url, webhook_url, [], _errcode_error,
+            log_prefix=log_prefix, report_type=report_type, proxies=proxies,
+            scheduler=scheduler, sessions=sessions, outbox=outbox,
+            is_throttled=_wework_throttled,
+        )
+        return True
+
     # 获取消息类型配置（markdown 或 text）
     is_text_mode = msg_type.lower() == "text"
 
@@ -328,56 +567,46 @@ def send_to_wework(
 
     print(f"{log_prefix}消息分为 {len(batches)} 批次发送 [{report_type}]")
 
-    # 逐批发送
+    # 根据消息类型构建请求
+    batch_requests = []
     for i, batch_content in enumerate(batches, 1):
-        # 根据消息类型构建 payload
         if is_text_mode:
             # text 格式：去除 markdown 语法
-            plain_content = strip_markdown(batch_content)
-            payload = {"msgtype": "text", "text": {"content": plain_content}}
-            content_size = len(plain_content.encode("utf-8"))
+            content = strip_markdown(batch_content)
+            payload = {"msgtype": "text", "text": {"content": content}}
         else:
             # markdown 格式：保持原样
-            payload = {"msgtype": "markdown", "markdown": {"content": batch_content}}
-            content_size = len(batch_content.encode("utf-8"))
-
-        print(
-            f"发送{log_prefix}第 {i}/{len(batches)} 批次，大小：{content_size} 字节 [{report_type}]"
-        )
-
-        try:
-            response = requests.post(
-                webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
+            content = batch_content
+            payload = {"msgtype": "markdown", "markdown": {"content": content}}
+        batch_requests.append(
+            OutboundRequest(
+                batch_num=i, total=len(batches), content=content, json=payload, headers=headers
             )
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("errcode") == 0:
-                    print(f"{log_prefix}第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                    # 批次间间隔
-                    if i < len(batches):
-                        time.sleep(batch_interval)
-                else:
-                    print(
-                        f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('errmsg')}"
-                    )
-                    return False
-            else:
-                print(
-                    f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-        except Exception as e:
-            print(f"{log_prefix}第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
-            return False
+        )
 
-    print(f"{log_prefix}所有 {len(batches)} 批次发送完成 [{report_type}]")
+    success_count = _deliver_batches(
+        "wework",
+        webhook_url,
+        webhook_url,
+        batch_requests,
+        _errcode_error,
+        log_prefix=log_prefix,
+        report_type=report_type,
+        proxies=proxies,
+        scheduler=scheduler,
+        sessions=sessions,
+        outbox=outbox,
+        is_throttled=_wework_throttled,
+    )
+    if success_count < len(batch_requests):
+        return False
+    print(f"{log_prefix}所有 {len(batch_requests)} 批次发送完成 [{report_type}]")
     return True
 
-
 def send_to_telegram(
     bot_token: str,
     chat_id: str,
-    report_data: Dict,
+    report_data: Optional[Dict],
     report_type: str,
     update_info: Optional[Dict] = None,
     proxy_url: Optional[str] = None,
@@ -387,6 +616,9 @@ def send_to_telegram(
     batch_size: int = 4000,
     batch_interval: float = 1.0,
     split_content_func: Callable = None,
+    scheduler: Optional[DeliveryScheduler] = None,
+    sessions: Optional[SessionRegistry] = None,
+    outbox: Optional[NotificationOutbox] = None,
 ) -> bool:
     """
     发送到 Telegram（支持分批发送）
@@ -394,19 +626,25 @@ def send_to_telegram(
     Args:
         bot_token: Telegram Bot Token
         chat_id: Telegram Chat ID
-        report_data: 报告数据
+        report_data: 报告数据（为 None 时只补发推送队列中发送失败的批次）
         report_type: 报告类型
         update_info: 更新信息（可选）
         proxy_url: 代理 URL（可选）
         mode: 报告模式 (daily/current)
         account_label: 账号标签（多账号时显示）
         batch_size: 批次大小（字节）
-        batch_interval: 批次发送间隔（秒）
+        batch_interval: 同一账号相邻批次的最小间隔（秒，仅在未传入 scheduler 时使用）
         split_content_func: 内容分批函数
+        scheduler: 推送节奏调度器（可选，未传入时按渠道默认速率限制新建）
+        sessions: HTTP 会话池（可选，多账号、多次推送共享连接）
+        outbox: 推送队列（可选，传入时批次持久化并在下次运行时补发未送达的批次）
 
     Returns:
         bool: 发送是否成功
     """
+    if scheduler is None:
+        scheduler = DeliveryScheduler(min_interval=batch_interval)
+
     headers = {"Content-Type": "application/json"}
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
 
@@ -417,6 +655,15 @@ def send_to_telegram(
     # 日志前缀
     log_prefix = f"Telegram{account_label}" if account_label else "Telegram"
 
+    # 只补发推送队列中发送失败的批次（不生成新报告）
+    if report_data is None:
+        _deliver_batches(
+            "telegram", f"{bot_token}:{chat_id}", url, [], _telegram_error,
+            log_prefix=log_prefix, report_type=report_type, proxies=proxies,
+            scheduler=scheduler, sessions=sessions, outbox=outbox,
+        )
+        return True
+
     # 获取分批内容，预留批次头部空间
     header_reserve = get_max_batch_header_size("telegram")
     batches = split_content_func(
@@ -428,49 +675,40 @@ def send_to_telegram(
 
     print(f"{log_prefix}消息分为 {len(batches)} 批次发送 [{report_type}]")
 
-    # 逐批发送
-    for i, batch_content in enumerate(batches, 1):
-        content_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送{log_prefix}第 {i}/{len(batches)} 批次，大小：{content_size} 字节 [{report_type}]"
+    batch_requests = [
+        OutboundRequest(
+            batch_num=i,
+            total=len(batches),
+            content=batch_content,
+            json={
+                "chat_id": chat_id,
+                "text": batch_content,
+                "parse_mode": "HTML",
+                "disable_web_page_preview": True,
+            },
+            headers=headers,
         )
-
-        payload = {
-            "chat_id": chat_id,
-            "text": batch_content,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": True,
-        }
-
-        try:
-            response = requests.post(
-                url, headers=headers, json=payload, proxies=proxies, timeout=30
-            )
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("ok"):
-                    print(f"{log_prefix}第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                    # 批次间间隔
-                    if i < len(batches):
-                        time.sleep(batch_interval)
-                else:
-                    print(
-                        f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('description')}"
-                    )
-                    return False
-            else:
-                print(
-                    f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-        except Exception as e:
-            print(f"{log_prefix}第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
-            return False
-
-    print(f"{log_prefix}所有 {len(batches)} 批次发送完成 [{report_type}]")
+        for i, batch_content in enumerate(batches, 1)
+    ]
+
+    success_count = _deliver_batches(
+        "telegram",
+        f"{bot_token}:{chat_id}",
+        url,
+        batch_requests,
+        _telegram_error,
+        log_prefix=log_prefix,
+        report_type=report_type,
+        proxies=proxies,
+        scheduler=scheduler,
+        sessions=sessions,
+        outbox=outbox,
+    )
+    if success_count < len(batch_requests):
+        return False
+    print(f"{log_prefix}所有 {len(batch_requests)} 批次发送完成 [{report_type}]")
     return True
 
-
 def send_to_email(
     from_email: str,
     password: str,
@@ -481,10 +719,13 @@ def send_to_email(
     custom_smtp_port: Optional[int] = None,
     *,
     get_time_func: Callable = None,
+    delivery: Optional[EmailDelivery] = None,
 ) -> bool:
     """
     发送邮件通知
 
+    邮件只构建一次（HTML 正文压缩后写入），收件人按分组在复用的 SMTP 连接上并行投递。
+
     Args:
         from_email: 发件人邮箱
         password: 邮箱密码/授权码
@@ -494,144 +735,80 @@ def send_to_email(
         custom_smtp_server: 自定义 SMTP 服务器（可选）
         custom_smtp_port: 自定义 SMTP 端口（可选）
         get_time_func: 获取当前时间的函数
+        delivery: 邮件投递器（可选，多次推送共享 SMTP 连接；未传入时发送完即关闭连接）
 
     Returns:
         bool: 发送是否成功
     """
-    try:
-        if not html_file_path or not Path(html_file_path).exists():
-            print(f"错误：HTML文件不存在或未提供: {html_file_path}")
-            return False
-
-        print(f"使用HTML文件: {html_file_path}")
-        with open(html_file_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-
-        domain = from_email.split("@")[-1].lower()
-
-        if custom_smtp_server and custom_smtp_port:
-            # 使用自定义 SMTP 配置
-            smtp_server = custom_smtp_server
-            smtp_port = int(custom_smtp_port)
-            # 根据端口判断加密方式：465=SSL, 587=TLS
-            if smtp_port == 465:
-                use_tls = False  # SSL 模式（SMTP_SSL）
-            elif smtp_port == 587:
-                use_tls = True  # TLS 模式（STARTTLS）
-            else:
-                # 其他端口优先尝试 TLS（更安全，更广泛支持）
-                use_tls = True
-        elif domain in SMTP_CONFIGS:
-            # 使用预设配置
-            config = SMTP_CONFIGS[domain]
-            smtp_server = config["server"]
-            smtp_port = config["port"]
-            use_tls = config["encryption"] == "TLS"
-        else:
-            print(f"未识别的邮箱服务商: {domain}，使用通用 SMTP 配置")
-            smtp_server = f"smtp.{domain}"
-            smtp_port = 587
-            use_tls = True
-
-        msg = MIMEMultipart("alternative")
+    if not html_file_path or not Path(html_file_path).exists():
+        print(f"错误：HTML文件不存在或未提供: {html_file_path}")
+        return False
 
-        # 严格按照 RFC 标准设置 From header
-        sender_name = "TrendRadar"
-        msg["From"] = formataddr((sender_name, from_email))
+    owns_delivery = delivery is None
+    if owns_delivery:
+        delivery = EmailDelivery()
 
-        # 设置收件人
-        recipients = [addr.strip() for addr in to_email.split(",")]
-        if len(recipients) == 1:
-            msg["To"] = recipients[0]
-        else:
-            msg["To"] = ", ".join(recipients)
+    settings = None
+    try:
+        print(f"使用HTML文件: {html_file_path}")
+        html_content = delivery.load_html(html_file_path)
+        settings = resolve_smtp_settings(from_email, custom_smtp_server, custom_smtp_port)
 
-        # 设置邮件主题
+        recipients = [addr.strip() for addr in to_email.split(",") if addr.strip()]
         now = get_time_func() if get_time_func else datetime.now()
-        subject = f"TrendRadar 热点分析报告 - {report_type} - {now.strftime('%m月%d日 %H:%M')}"
-        msg["Subject"] = Header(subject, "utf-8")
-
-        # 设置其他标准 header
-        msg["MIME-Version"] = "1.0"
-        msg["Date"] = formatdate(localtime=True)
-        msg["Message-ID"] = make_msgid()
-
-        # 添加纯文本部分（作为备选）
-        text_content = f"""
-TrendRadar 热点分析报告
-========================
-报告类型：{report_type}
-生成时间：{now.strftime('%Y-%m-%d %H:%M:%S')}
-
-请使用支持HTML的邮件客户端查看完整报告内容。
-        """
-        text_part = MIMEText(text_content, "plain", "utf-8")
-        msg.attach(text_part)
-
-        html_part = MIMEText(html_content, "html", "utf-8")
-        msg.attach(html_part)
+        message = build_report_message(from_email, recipients, report_type, html_content, now)
 
         print(f"正在发送邮件到 {to_email}...")
-        print(f"SMTP 服务器: {smtp_server}:{smtp_port}")
+        print(f"SMTP 服务器: {settings.server}:{settings.port}")
         print(f"发件人: {from_email}")
 
-        try:
-            if use_tls:
-                # TLS 模式
-                server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
-                server.set_debuglevel(0)  # 设为1可以查看详细调试信息
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
-            else:
-                # SSL 模式
-                server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=30)
-                server.set_debuglevel(0)
-                server.ehlo()
-
-            # 登录
-            server.login(from_email, password)
-
-            # 发送邮件
-            server.send_message(msg)
-            server.quit()
-
-            print(f"邮件发送成功 [{report_type}] -> {to_email}")
-            return True
-
-        except smtplib.SMTPServerDisconnected:
-            print("邮件发送失败：服务器意外断开连接，请检查网络或稍后重试")
+        failures = delivery.send(settings, from_email, password, recipients, message)
+        for group, error in failures:
+            _print_smtp_error(error, settings, report_type, group)
+        if failures:
             return False
 
-    except smtplib.SMTPAuthenticationError as e:
-        print("邮件发送失败：认证错误，请检查邮箱和密码/授权码")
-        print(f"详细错误: {str(e)}")
-        return False
-    except smtplib.SMTPRecipientsRefused as e:
-        print(f"邮件发送失败：收件人地址被拒绝 {e}")
-        return False
-    except smtplib.SMTPSenderRefused as e:
-        print(f"邮件发送失败：发件人地址被拒绝 {e}")
-        return False
-    except smtplib.SMTPDataError as e:
-        print(f"邮件发送失败：邮件数据错误 {e}")
-        return False
-    except smtplib.SMTPConnectError as e:
-        print(f"邮件发送失败：无法连接到 SMTP 服务器 {smtp_server}:{smtp_port}")
-        print(f"详细错误: {str(e)}")
-        return False
+        print(f"邮件发送成功 [{report_type}] -> {to_email}")
+        return True
     except Exception as e:
-        print(f"邮件发送失败 [{report_type}]：{e}")
-        import traceback
-        traceback.print_exc()
+        _print_smtp_error(e, settings, report_type)
         return False
+    finally:
+        if owns_delivery:
+            delivery.close()
+
+
+def _print_smtp_error(
+    error: Exception,
+    settings: Optional[SmtpSettings],
+    report_type: str,
+    group: Optional[List[str]] = None,
+) -> None:
+    """输出邮件发送失败原因"""
+    target = f"（收件人：{', '.join(group)}）" if group else ""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        print(f"邮件发送失败{target}：服务器意外断开连接，请检查网络或稍后重试")
+    elif isinstance(error, smtplib.SMTPAuthenticationError):
+        print("邮件发送失败：认证错误，请检查邮箱和密码/授权码")
+        print(f"详细错误: {str(error)}")
+    elif isinstance(error, smtplib.SMTPRecipientsRefused):
+        print(f"邮件发送失败{target}：收件人地址被拒绝 {error}")
+    elif isinstance(error, smtplib.SMTPSenderRefused):
+        print(f"邮件发送失败：发件人地址被拒绝 {error}")
+    elif isinstance(error, smtplib.SMTPDataError):
+        print(f"邮件发送失败{target}：邮件数据错误 {error}")
+    elif isinstance(error, smtplib.SMTPConnectError) and settings is not None:
+        print(f"邮件发送失败：无法连接到 SMTP 服务器 {settings.server}:{settings.port}")
+        print(f"详细错误: {str(error)}")
+    else:
+        print(f"邮件发送失败 [{report_type}]{target}：{error}")
 
 
 def send_to_ntfy(
     server_url: str,
     topic: str,
     token: Optional[str],
-    report_data: Dict,
+    report_data: Optional[Dict],
     report_type: str,
     update_info: Optional[Dict] = None,
     proxy_url: Optional[str] = None,
@@ -640,6 +817,9 @@ def send_to_ntfy(
     *,
     batch_size: int = 3800,
     split_content_func: Callable = None,
+    scheduler: Optional[DeliveryScheduler] = None,
+    sessions: Optional[SessionRegistry] = None,
+    outbox: Optional[NotificationOutbox] = None,
 ) -> bool:
     """
     发送到 ntfy（支持分批发送，严格遵守4KB限制）
@@ -648,7 +828,7 @@ def send_to_ntfy(
         server_url: ntfy 服务器 URL
         topic: ntfy 主题
         token: ntfy 访问令牌（可选）
-        report_data: 报告数据
+        report_data: 报告数据（为 None 时只补发推送队列中发送失败的批次）
         report_type: 报告类型
         update_info: 更新信息（可选）
         proxy_url: 代理 URL（可选）
@@ -656,10 +836,16 @@ def send_to_ntfy(
         account_label: 账号标签（多账号时显示）
         batch_size: 批次大小（字节）
         split_content_func: 内容分批函数
+        scheduler: 推送节奏调度器（可选，未传入时按渠道默认速率限制新建）
+        sessions: HTTP 会话池（可选，多账号、多次推送共享连接）
+        outbox: 推送队列（可选，传入时批次持久化并在下次运行时补发未送达的批次）
 
     Returns:
         bool: 发送是否成功
     """
+    if scheduler is None:
+        scheduler = DeliveryScheduler()
+
     # 日志前缀
     log_prefix = f"ntfy{account_label}" if account_label else "ntfy"
 
@@ -681,8 +867,8 @@ def send_to_ntfy(
         "Tags": "news",
     }
 
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
+    # 鉴权头在发送时附加，不随批次写入推送队列
+    auth_headers = {"Authorization": f"Bearer {token}"} if token else None
 
     # 构建完整URL，确保格式正确
     base_url = server_url.rstrip("/")
@@ -694,6 +880,16 @@ def send_to_ntfy(
     if proxy_url:
         proxies = {"http": proxy_url, "https": proxy_url}
 
+    # 只补发推送队列中发送失败的批次（不生成新报告）
+    if report_data is None:
+        _deliver_batches(
+            "ntfy", url, url, [], _ntfy_error,
+            log_prefix=log_prefix, report_type=report_type, proxies=proxies,
+            scheduler=scheduler, sessions=sessions, outbox=outbox,
+            auth_headers=auth_headers,
+        )
+        return True
+
     # 获取分批内容，预留批次头部空间
     header_reserve = get_max_batch_header_size("ntfy")
     batches = split_content_func(
@@ -712,83 +908,47 @@ def send_to_ntfy(
 
     print(f"{log_prefix}将按反向顺序推送（最后批次先推送），确保客户端显示顺序正确")
 
-    # 逐批发送（反向顺序）
-    success_count = 0
+    batch_requests = []
     for idx, batch_content in enumerate(reversed_batches, 1):
         # 计算正确的批次编号（用户视角的编号）
         actual_batch_num = total_batches - idx + 1
-
-        content_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送{log_prefix}第 {actual_batch_num}/{total_batches} 批次（推送顺序: {idx}/{total_batches}），大小：{content_size} 字节 [{report_type}]"
-        )
+        content = batch_content.encode("utf-8")
 
         # 检查消息大小，确保不超过4KB
-        if content_size > 4096:
-            print(f"警告：{log_prefix}第 {actual_batch_num} 批次消息过大（{content_size} 字节），可能被拒绝")
+        if len(content) > 4096:
+            print(f"警告：{log_prefix}第 {actual_batch_num} 批次消息过大（{len(content)} 字节），可能被拒绝")
 
         # 更新 headers 的批次标识
         current_headers = headers.copy()
         if total_batches > 1:
             current_headers["Title"] = f"{report_type_en} ({actual_batch_num}/{total_batches})"
 
-        try:
-            response = requests.post(
-                url,
+        batch_requests.append(
+            OutboundRequest(
+                batch_num=actual_batch_num,
+                total=total_batches,
+                content=batch_content,
+                data=content,
                 headers=current_headers,
-                data=batch_content.encode("utf-8"),
-                proxies=proxies,
-                timeout=30,
             )
+        )
 
-            if response.status_code == 200:
-                print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次发送成功 [{report_type}]")
-                success_count += 1
-                if idx < total_batches:
-                    # 公共服务器建议 2-3 秒，自托管可以更短
-                    interval = 2 if "ntfy.sh" in server_url else 1
-                    time.sleep(interval)
-            elif response.status_code == 429:
-                print(
-                    f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次速率限制 [{report_type}]，等待后重试"
-                )
-                time.sleep(10)  # 等待10秒后重试
-                # 重试一次
-                retry_response = requests.post(
-                    url,
-                    headers=current_headers,
-                    data=batch_content.encode("utf-8"),
-                    proxies=proxies,
-                    timeout=30,
-                )
-                if retry_response.status_code == 200:
-                    print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次重试成功 [{report_type}]")
-                    success_count += 1
-                else:
-                    print(
-                        f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次重试失败，状态码：{retry_response.status_code}"
-                    )
-            elif response.status_code == 413:
-                print(
-                    f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次消息过大被拒绝 [{report_type}]，消息大小：{content_size} 字节"
-                )
-            else:
-                print(
-                    f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                try:
-                    print(f"错误详情：{response.text}")
-                except:
-                    pass
-
-        except requests.exceptions.ConnectTimeout:
-            print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次连接超时 [{report_type}]")
-        except requests.exceptions.ReadTimeout:
-            print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次读取超时 [{report_type}]")
-        except requests.exceptions.ConnectionError as e:
-            print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次连接错误 [{report_type}]：{e}")
-        except Exception as e:
-            print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次发送异常 [{report_type}]：{e}")
+    # 逐批发送（反向顺序，某批次失败不影响其余批次）
+    success_count = _deliver_batches(
+        "ntfy",
+        url,
+        url,
+        batch_requests,
+        _ntfy_error,
+        log_prefix=log_prefix,
+        report_type=report_type,
+        proxies=proxies,
+        scheduler=scheduler,
+        sessions=sessions,
+        outbox=outbox,
+        auth_headers=auth_headers,
+        stop_on_failure=False,
+    )
 
     # 判断整体发送是否成功
     if success_count == total_batches:
@@ -801,10 +961,9 @@ def send_to_ntfy(
         print(f"{log_prefix}发送完全失败 [{report_type}]")
         return False
 
-
 def send_to_bark(
     bark_url: str,
-    report_data: Dict,
+    report_data: Optional[Dict],
     report_type: str,
     update_info: Optional[Dict] = None,
     proxy_url: Optional[str] = None,
@@ -814,25 +973,34 @@ def send_to_bark(
     batch_size: int = 3600,
     batch_interval: float = 1.0,
     split_content_func: Callable = None,
+    scheduler: Optional[DeliveryScheduler] = None,
+    sessions: Optional[SessionRegistry] = None,
+    outbox: Optional[NotificationOutbox] = None,
 ) -> bool:
     """
     发送到 Bark（支持分批发送，使用 markdown 格式）
 
     Args:
         bark_url: Bark URL（包含 device_key）
-        report_data: 报告数据
+        report_data: 报告数据（为 None 时只补发推送队列中发送失败的批次）
         report_type: 报告类型
         update_info: 更新信息（可选）
         proxy_url: 代理 URL（可选）
         mode: 报告模式 (daily/current)
         account_label: 账号标签（多账号时显示）
         batch_size: 批次大小（字节）
-        batch_interval: 批次发送间隔（秒）
+        batch_interval: 同一账号相邻批次的最小间隔（秒，仅在未传入 scheduler 时使用）
         split_content_func: 内容分批函数
+        scheduler: 推送节奏调度器（可选，未传入时按渠道默认速率限制新建）
+        sessions: HTTP 会话池（可选，多账号、多次推送共享连接）
+        outbox: 推送队列（可选，传入时批次持久化并在下次运行时补发未送达的批次）
 
     Returns:
         bool: 发送是否成功
     """
+    if scheduler is None:
+        scheduler = DeliveryScheduler(min_interval=batch_interval)
+
     # 日志前缀
     log_prefix = f"Bark{account_label}" if account_label else "Bark"
 
@@ -852,6 +1020,16 @@ def send_to_bark(
     # 构建正确的 API 端点
     api_endpoint = f"{parsed_url.scheme}://{parsed_url.netloc}/push"
 
+    # 只补发推送队列中发送失败的批次（不生成新报告）
+    if report_data is None:
+        _deliver_batches(
+            "bark", bark_url, api_endpoint, [], _bark_error,
+            log_prefix=log_prefix, report_type=report_type, proxies=proxies,
+            scheduler=scheduler, sessions=sessions, outbox=outbox,
+            auth_fields={"device_key": device_key},
+        )
+        return True
+
     # 获取分批内容，预留批次头部空间
     header_reserve = get_max_batch_header_size("bark")
     batches = split_content_func(
@@ -870,70 +1048,49 @@ def send_to_bark(
 
     print(f"{log_prefix}将按反向顺序推送（最后批次先推送），确保客户端显示顺序正确")
 
-    # 逐批发送（反向顺序）
-    success_count = 0
+    batch_requests = []
     for idx, batch_content in enumerate(reversed_batches, 1):
         # 计算正确的批次编号（用户视角的编号）
         actual_batch_num = total_batches - idx + 1
 
-        content_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送{log_prefix}第 {actual_batch_num}/{total_batches} 批次（推送顺序: {idx}/{total_batches}），大小：{content_size} 字节 [{report_type}]"
-        )
-
         # 检查消息大小（Bark使用APNs，限制4KB）
+        content_size = len(batch_content.encode("utf-8"))
         if content_size > 4096:
             print(
                 f"警告：{log_prefix}第 {actual_batch_num}/{total_batches} 批次消息过大（{content_size} 字节），可能被拒绝"
             )
 
-        # 构建JSON payload
-        payload = {
-            "title": report_type,
-            "markdown": batch_content,
-            "device_key": device_key,
-            "sound": "default",
-            "group": "TrendRadar",
-            "action": "none",  # 点击推送跳到 APP 不弹出弹框,方便阅读
-        }
-
-        try:
-            response = requests.post(
-                api_endpoint,
-                json=payload,
-                proxies=proxies,
-                timeout=30,
+        batch_requests.append(
+            OutboundRequest(
+                batch_num=actual_batch_num,
+                total=total_batches,
+                content=batch_content,
+                json={
+                    "title": report_type,
+                    "markdown": batch_content,
+                    "sound": "default",
+                    "group": "TrendRadar",
+                    "action": "none",  # 点击推送跳到 APP 不弹出弹框,方便阅读
+                },
             )
+        )
 
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("code") == 200:
-                    print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次发送成功 [{report_type}]")
-                    success_count += 1
-                    # 批次间间隔
-                    if idx < total_batches:
-                        time.sleep(batch_interval)
-                else:
-                    print(
-                        f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次发送失败 [{report_type}]，错误：{result.get('message', '未知错误')}"
-                    )
-            else:
-                print(
-                    f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                try:
-                    print(f"错误详情：{response.text}")
-                except:
-                    pass
-
-        except requests.exceptions.ConnectTimeout:
-            print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次连接超时 [{report_type}]")
-        except requests.exceptions.ReadTimeout:
-            print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次读取超时 [{report_type}]")
-        except requests.exceptions.ConnectionError as e:
-            print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次连接错误 [{report_type}]：{e}")
-        except Exception as e:
-            print(f"{log_prefix}第 {actual_batch_num}/{total_batches} 批次发送异常 [{report_type}]：{e}")
+    # 逐批发送（反向顺序，某批次失败不影响其余批次）
+    success_count = _deliver_batches(
+        "bark",
+        bark_url,
+        api_endpoint,
+        batch_requests,
+        _bark_error,
+        log_prefix=log_prefix,
+        report_type=report_type,
+        proxies=proxies,
+        scheduler=scheduler,
+        sessions=sessions,
+        outbox=outbox,
+        auth_fields={"device_key": device_key},
+        stop_on_failure=False,
+    )
 
     # 判断整体发送是否成功
     if success_count == total_batches:
@@ -946,10 +1103,9 @@ def send_to_bark(
         print(f"{log_prefix}发送完全失败 [{report_type}]")
         return False
 
-
 def send_to_slack(
     webhook_url: str,
-    report_data: Dict,
+    report_data: Optional[Dict],
     report_type: str,
     update_info: Optional[Dict] = None,
     proxy_url: Optional[str] = None,
@@ -959,25 +1115,34 @@ def send_to_slack(
     batch_size: int = 4000,
     batch_interval: float = 1.0,
     split_content_func: Callable = None,
+    scheduler: Optional[DeliveryScheduler] = None,
+    sessions: Optional[SessionRegistry] = None,
+    outbox: Optional[NotificationOutbox] = None,
 ) -> bool:
     """
     发送到 Slack（支持分批发送，使用 mrkdwn 格式）
 
     Args:
         webhook_url: Slack Webhook URL
-        report_data: 报告数据
+        report_data: 报告数据（为 None 时只补发推送队列中发送失败的批次）
         report_type: 报告类型
         update_info: 更新信息（可选）
         proxy_url: 代理 URL（可选）
         mode: 报告模式 (daily/current)
         account_label: 账号标签（多账号时显示）
         batch_size: 批次大小（字节）
-        batch_interval: 批次发送间隔（秒）
+        batch_interval: 同一账号相邻批次的最小间隔（秒，仅在未传入 scheduler 时使用）
         split_content_func: 内容分批函数
+        scheduler: 推送节奏调度器（可选，未传入时按渠道默认速率限制新建）
+        sessions: HTTP 会话池（可选，多账号、多次推送共享连接）
+        outbox: 推送队列（可选，传入时批次持久化并在下次运行时补发未送达的批次）
 
     Returns:
         bool: 发送是否成功
     """
+    if scheduler is None:
+        scheduler = DeliveryScheduler(min_interval=batch_interval)
+
     headers = {"Content-Type": "application/json"}
     proxies = None
     if proxy_url:
@@ -986,6 +1151,15 @@ def send_to_slack(
     # 日志前缀
     log_prefix = f"Slack{account_label}" if account_label else "Slack"
 
+    # 只补发推送队列中发送失败的批次（不生成新报告）
+    if report_data is None:
+        _deliver_batches(
+            "slack", webhook_url, webhook_url, [], _slack_error,
+            log_prefix=log_prefix, report_type=report_type, proxies=proxies,
+            scheduler=scheduler, sessions=sessions, outbox=outbox,
+        )
+        return True
+
     # 获取分批内容，预留批次头部空间
     header_reserve = get_max_batch_header_size("slack")
     batches = split_content_func(
@@ -997,39 +1171,35 @@ def send_to_slack(
 
     print(f"{log_prefix}消息分为 {len(batches)} 批次发送 [{report_type}]")
 
-    # 逐批发送
+    batch_requests = []
     for i, batch_content in enumerate(batches, 1):
         # 转换 Markdown 到 mrkdwn 格式
         mrkdwn_content = convert_markdown_to_mrkdwn(batch_content)
-
-        content_size = len(mrkdwn_content.encode("utf-8"))
-        print(
-            f"发送{log_prefix}第 {i}/{len(batches)} 批次，大小：{content_size} 字节 [{report_type}]"
-        )
-
         # 构建 Slack payload（使用简单的 text 字段，支持 mrkdwn）
-        payload = {"text": mrkdwn_content}
-
-        try:
-            response = requests.post(
-                webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
+        batch_requests.append(
+            OutboundRequest(
+                batch_num=i,
+                total=len(batches),
+                content=mrkdwn_content,
+                json={"text": mrkdwn_content},
+                headers=headers,
             )
+        )
 
-            # Slack Incoming Webhooks 成功时返回 "ok" 文本
-            if response.status_code == 200 and response.text == "ok":
-                print(f"{log_prefix}第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                # 批次间间隔
-                if i < len(batches):
-                    time.sleep(batch_interval)
-            else:
-                error_msg = response.text if response.text else f"状态码：{response.status_code}"
-                print(
-                    f"{log_prefix}第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{error_msg}"
-                )
-                return False
-        except Exception as e:
-            print(f"{log_prefix}第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
-            return False
-
-    print(f"{log_prefix}所有 {len(batches)} 批次发送完成 [{report_type}]")
+    success_count = _deliver_batches(
+        "slack",
+        webhook_url,
+        webhook_url,
+        batch_requests,
+        _slack_error,
+        log_prefix=log_prefix,
+        report_type=report_type,
+        proxies=proxies,
+        scheduler=scheduler,
+        sessions=sessions,
+        outbox=outbox,
+    )
+    if success_count < len(batch_requests):
+        return False
+    print(f"{log_prefix}所有 {len(batch_requests)} 批次发送完成 [{report_type}]")
     return True
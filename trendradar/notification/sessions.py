@@ -0,0 +1,80 @@
+# coding=utf-8
+"""
+推送 HTTP 会话池
+
+各渠道的 Webhook 请求通过共享的 requests.Session 发送：
+- 同一代理配置共用一个 Session，其连接池按主机划分（keep-alive 复用 TCP/TLS 连接）
+- 同一账号的多个批次、同一主机的多个账号（如多个飞书机器人）不再重复握手
+- 连接池大小与并发推送线程数一致，并发发送时不会丢弃空闲连接
+
+使用示例:
+    sessions = SessionRegistry(pool_maxsize=8)
+    response = sessions.post(webhook_url, json=payload, proxies=proxies, timeout=30)
+    sessions.close()
+"""
+
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 每个 Session 缓存的主机连接池数量
+DEFAULT_POOL_CONNECTIONS = 16
+# 每个主机保留的连接数
+DEFAULT_POOL_MAXSIZE = 8
+
+
+class SessionRegistry:
+    """
+    线程安全的 Session 注册表（按代理配置区分）
+
+    requests.Session 的连接池本身是线程安全的，多个推送线程可共用同一个 Session。
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    ):
+        """
+        Args:
+            pool_connections: 每个 Session 缓存的主机连接池数量
+            pool_maxsize: 每个主机保留的连接数（建议与并发推送线程数一致）
+        """
+        self.pool_connections = max(1, pool_connections)
+        self.pool_maxsize = max(1, pool_maxsize)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+
+    def get(self, proxies: Optional[Dict[str, str]] = None) -> requests.Session:
+        """获取（或创建）某代理配置对应的 Session"""
+        key = (proxies or {}).get("https") or (proxies or {}).get("http") or ""
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                if proxies:
+                    session.proxies.update(proxies)
+                self._sessions[key] = session
+            return session
+
+    def post(
+        self, url: str, proxies: Optional[Dict[str, str]] = None, **kwargs
+    ) -> requests.Response:
+        """通过共享 Session 发送 POST 请求（参数同 requests.post）"""
+        return self.get(proxies).post(url, proxies=proxies, **kwargs)
+
+    def close(self) -> None:
+        """关闭所有 Session 及其连接"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
@@ -3,10 +3,14 @@
 消息分批处理模块
 
 提供消息内容分批拆分功能，确保消息大小不超过各平台限制
+
+批次内容按片段累积并维护累计字节数：每个片段（标题行、词组标题等）只编码一次，
+批次完成时再拼接，整体为线性时间（不再在每次追加后重新编码整个批次）。
 """
 
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 
 from trendradar.report.formatter import format_title_for_platform
 
@@ -20,6 +24,52 @@ DEFAULT_BATCH_SIZES = {
 }
 
 
+def _utf8_len(text: str) -> int:
+    """文本的 UTF-8 字节数"""
+    return len(text.encode("utf-8"))
+
+
+# 按平台格式渲染标题的格式（热点词汇统计 / 新增热点区域），其它格式使用原始标题
+_STAT_TITLE_FORMATS = ("wework", "bark", "telegram", "ntfy", "feishu", "dingtalk", "slack")
+_NEW_TITLE_FORMATS = ("wework", "telegram", "feishu", "dingtalk", "slack")
+
+
+def _format_stat_title(format_type: str, title_data: Dict) -> str:
+    """热点词汇统计区域的标题"""
+    if format_type in _STAT_TITLE_FORMATS:
+        return format_title_for_platform(format_type, title_data, show_source=True)
+    return title_data["title"]
+
+
+def _format_new_title(format_type: str, title_data: Dict, first: bool = False) -> str:
+    """新增热点区域的标题（Bark 每个来源的第一条使用企业微信格式，其余使用原始标题）"""
+    if first and format_type == "bark":
+        format_type = "wework"
+    if format_type in _NEW_TITLE_FORMATS:
+        return format_title_for_platform(format_type, title_data, show_source=False, mark_new=False)
+    return title_data["title"]
+
+
+class _BatchBuffer:
+    """按片段累积的批次内容，size 为已累积内容的 UTF-8 字节数"""
+
+    __slots__ = ("parts", "size")
+
+    def __init__(self, *fragments: str):
+        self.parts: List[str] = []
+        self.size = 0
+        for fragment in fragments:
+            self.append(fragment)
+
+    def append(self, fragment: str, fragment_size: Optional[int] = None) -> None:
+        """追加片段（已知字节数时直接传入，避免重复编码）"""
+        self.parts.append(fragment)
+        self.size += _utf8_len(fragment) if fragment_size is None else fragment_size
+
+    def value(self) -> str:
+        return "".join(self.parts)
+
+
 def split_content_into_batches(
     report_data: Dict,
     format_type: str,
@@ -125,7 +175,8 @@ def split_content_into_batches(
         elif format_type == "slack":
             stats_header = f"📊 *热点词汇统计*\n\n"
 
-    current_batch = base_header
+    footer_size = _utf8_len(base_footer)
+    current_batch = _BatchBuffer(base_header)
     current_batch_has_content = False
 
     if (
@@ -153,17 +204,14 @@ def split_content_into_batches(
         total_count = len(report_data["stats"])
 
         # 添加统计标题
-        test_content = current_batch + stats_header
-        if (
-            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-            < max_bytes
-        ):
-            current_batch = test_content
+        fragment_size = _utf8_len(stats_header)
+        if current_batch.size + fragment_size + footer_size < max_bytes:
+            current_batch.append(stats_header, fragment_size)
             current_batch_has_content = True
         else:
             if current_batch_has_content:
-                batches.append(current_batch + base_footer)
-            current_batch = base_header + stats_header
+                batches.append(current_batch.value() + base_footer)
+            current_batch = _BatchBuffer(base_header, stats_header)
             current_batch_has_content = True
 
         # 逐个处理词组（确保词组标题+第一条新闻的原子性）
@@ -236,33 +284,7 @@ def split_content_into_batches(
             # 构建第一条新闻
             first_news_line = ""
             if stat["titles"]:
-                first_title_data = stat["titles"][0]
-                if format_type in ("wework", "bark"):
-                    formatted_title = format_title_for_platform(
-                        "wework", first_title_data, show_source=True
-                    )
-                elif format_type == "telegram":
-                    formatted_title = format_title_for_platform(
-                        "telegram", first_title_data, show_source=True
-                    )
-                elif format_type == "ntfy":
-                    formatted_title = format_title_for_platform(
-                        "ntfy", first_title_data, show_source=True
-                    )
-                elif format_type == "feishu":
-                    formatted_title = format_title_for_platform(
-                        "feishu", first_title_data, show_source=True
-                    )
-                elif format_type == "dingtalk":
-                    formatted_title = format_title_for_platform(
-                        "dingtalk", first_title_data, show_source=True
-                    )
-                elif format_type == "slack":
-                    formatted_title = format_title_for_platform(
-                        "slack", first_title_data, show_source=True
-                    )
-                else:
-                    formatted_title = f"{first_title_data['title']}"
+                formatted_title = _format_stat_title(format_type, stat["titles"][0])
 
                 first_news_line = f"  1. {formatted_title}\n"
                 if len(stat["titles"]) > 1:
@@ -270,68 +292,36 @@ def split_content_into_batches(
 
             # 原子性检查：词组标题+第一条新闻必须一起处理
             word_with_first_news = word_header + first_news_line
-            test_content = current_batch + word_with_first_news
+            fragment_size = _utf8_len(word_with_first_news)
 
-            if (
-                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                >= max_bytes
-            ):
+            if current_batch.size + fragment_size + footer_size >= max_bytes:
                 # 当前批次容纳不下，开启新批次
                 if current_batch_has_content:
-                    batches.append(current_batch + base_footer)
-                current_batch = base_header + stats_header + word_with_first_news
+                    batches.append(current_batch.value() + base_footer)
+                current_batch = _BatchBuffer(base_header, stats_header, word_with_first_news)
                 current_batch_has_content = True
                 start_index = 1
             else:
-                current_batch = test_content
+                current_batch.append(word_with_first_news, fragment_size)
                 current_batch_has_content = True
                 start_index = 1
 
             # 处理剩余新闻条目
             for j in range(start_index, len(stat["titles"])):
-                title_data = stat["titles"][j]
-                if format_type in ("wework", "bark"):
-                    formatted_title = format_title_for_platform(
-                        "wework", title_data, show_source=True
-                    )
-                elif format_type == "telegram":
-                    formatted_title = format_title_for_platform(
-                        "telegram", title_data, show_source=True
-                    )
-                elif format_type == "ntfy":
-                    formatted_title = format_title_for_platform(
-                        "ntfy", title_data, show_source=True
-                    )
-                elif format_type == "feishu":
-                    formatted_title = format_title_for_platform(
-                        "feishu", title_data, show_source=True
-                    )
-                elif format_type == "dingtalk":
-                    formatted_title = format_title_for_platform(
-                        "dingtalk", title_data, show_source=True
-                    )
-                elif format_type == "slack":
-                    formatted_title = format_title_for_platform(
-                        "slack", title_data, show_source=True
-                    )
-                else:
-                    formatted_title = f"{title_data['title']}"
+                formatted_title = _format_stat_title(format_type, stat["titles"][j])
 
                 news_line = f"  {j + 1}. {formatted_title}\n"
                 if j < len(stat["titles"]) - 1:
                     news_line += "\n"
 
-                test_content = current_batch + news_line
-                if (
-                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                    >= max_bytes
-                ):
+                fragment_size = _utf8_len(news_line)
+                if current_batch.size + fragment_size + footer_size >= max_bytes:
                     if current_batch_has_content:
-                        batches.append(current_batch + base_footer)
-                    current_batch = base_header + stats_header + word_header + news_line
+                        batches.append(current_batch.value() + base_footer)
+                    current_batch = _BatchBuffer(base_header, stats_header, word_header, news_line)
                     current_batch_has_content = True
                 else:
-                    current_batch = test_content
+                    current_batch.append(news_line, fragment_size)
                     current_batch_has_content = True
 
             # 词组间分隔符
@@ -350,12 +340,9 @@ def split_content_into_batches(
                 elif format_type == "slack":
                     separator = f"\n\n"
 
-                test_content = current_batch + separator
-                if (
-                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                    < max_bytes
-                ):
-                    current_batch = test_content
+                fragment_size = _utf8_len(separator)
+                if current_batch.size + fragment_size + footer_size < max_bytes:
+                    current_batch.append(separator, fragment_size)
 
         return current_batch, current_batch_has_content, batches
 
@@ -381,17 +368,14 @@ def split_content_into_batches(
         elif format_type == "slack":
             new_header = f"\n\n🆕 *本次新增热点新闻* (共 {report_data['total_new_count']} 条)\n\n"
 
-        test_content = current_batch + new_header
-        if (
-            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-            >= max_bytes
-        ):
+        fragment_size = _utf8_len(new_header)
+        if current_batch.size + fragment_size + footer_size >= max_bytes:
             if current_batch_has_content:
-                batches.append(current_batch + base_footer)
-            current_batch = base_header + new_header
+                batches.append(current_batch.value() + base_footer)
+            current_batch = _BatchBuffer(base_header, new_header)
             current_batch_has_content = True
         else:
-            current_batch = test_content
+            current_batch.append(new_header, fragment_size)
             current_batch_has_content = True
 
         # 逐个处理新增新闻来源
@@ -413,98 +397,42 @@ def split_content_into_batches(
             # 构建第一条新增新闻
             first_news_line = ""
             if source_data["titles"]:
-                first_title_data = source_data["titles"][0]
-                title_data_copy = first_title_data.copy()
-                title_data_copy["is_new"] = False
-
-                if format_type in ("wework", "bark"):
-                    formatted_title = format_title_for_platform(
-                        "wework", title_data_copy, show_source=False
-                    )
-                elif format_type == "telegram":
-                    formatted_title = format_title_for_platform(
-                        "telegram", title_data_copy, show_source=False
-                    )
-                elif format_type == "feishu":
-                    formatted_title = format_title_for_platform(
-                        "feishu", title_data_copy, show_source=False
-                    )
-                elif format_type == "dingtalk":
-                    formatted_title = format_title_for_platform(
-                        "dingtalk", title_data_copy, show_source=False
-                    )
-                elif format_type == "slack":
-                    formatted_title = format_title_for_platform(
-                        "slack", title_data_copy, show_source=False
-                    )
-                else:
-                    formatted_title = f"{title_data_copy['title']}"
+                formatted_title = _format_new_title(format_type, source_data["titles"][0], first=True)
 
                 first_news_line = f"  1. {formatted_title}\n"
 
             # 原子性检查：来源标题+第一条新闻
             source_with_first_news = source_header + first_news_line
-            test_content = current_batch + source_with_first_news
+            fragment_size = _utf8_len(source_with_first_news)
 
-            if (
-                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                >= max_bytes
-            ):
+            if current_batch.size + fragment_size + footer_size >= max_bytes:
                 if current_batch_has_content:
-                    batches.append(current_batch + base_footer)
-                current_batch = base_header + new_header + source_with_first_news
+                    batches.append(current_batch.value() + base_footer)
+                current_batch = _BatchBuffer(base_header, new_header, source_with_first_news)
                 current_batch_has_content = True
                 start_index = 1
             else:
-                current_batch = test_content
+                current_batch.append(source_with_first_news, fragment_size)
                 current_batch_has_content = True
                 start_index = 1
 
             # 处理剩余新增新闻
             for j in range(start_index, len(source_data["titles"])):
-                title_data = source_data["titles"][j]
-                title_data_copy = title_data.copy()
-                title_data_copy["is_new"] = False
-
-                if format_type == "wework":
-                    formatted_title = format_title_for_platform(
-                        "wework", title_data_copy, show_source=False
-                    )
-                elif format_type == "telegram":
-                    formatted_title = format_title_for_platform(
-                        "telegram", title_data_copy, show_source=False
-                    )
-                elif format_type == "feishu":
-                    formatted_title = format_title_for_platform(
-                        "feishu", title_data_copy, show_source=False
-                    )
-                elif format_type == "dingtalk":
-                    formatted_title = format_title_for_platform(
-                        "dingtalk", title_data_copy, show_source=False
-                    )
-                elif format_type == "slack":
-                    formatted_title = format_title_for_platform(
-                        "slack", title_data_copy, show_source=False
-                    )
-                else:
-                    formatted_title = f"{title_data_copy['title']}"
+                formatted_title = _format_new_title(format_type, source_data["titles"][j])
 
                 news_line = f"  {j + 1}. {formatted_title}\n"
 
-                test_content = current_batch + news_line
-                if (
-                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                    >= max_bytes
-                ):
+                fragment_size = _utf8_len(news_line)
+                if current_batch.size + fragment_size + footer_size >= max_bytes:
                     if current_batch_has_content:
-                        batches.append(current_batch + base_footer)
-                    current_batch = base_header + new_header + source_header + news_line
+                        batches.append(current_batch.value() + base_footer)
+                    current_batch = _BatchBuffer(base_header, new_header, source_header, news_line)
                     current_batch_has_content = True
                 else:
-                    current_batch = test_content
+                    current_batch.append(news_line, fragment_size)
                     current_batch_has_content = True
 
-            current_batch += "\n"
+            current_batch.append("\n")
 
         return current_batch, current_batch_has_content, batches
 
@@ -539,17 +467,14 @@ def split_content_into_batches(
         elif format_type == "dingtalk":
             failed_header = f"\n---\n\n⚠️ **数据获取失败的平台：**\n\n"
 
-        test_content = current_batch + failed_header
-        if (
-            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-            >= max_bytes
-        ):
+        fragment_size = _utf8_len(failed_header)
+        if current_batch.size + fragment_size + footer_size >= max_bytes:
             if current_batch_has_content:
-                batches.append(current_batch + base_footer)
-            current_batch = base_header + failed_header
+                batches.append(current_batch.value() + base_footer)
+            current_batch = _BatchBuffer(base_header, failed_header)
             current_batch_has_content = True
         else:
-            current_batch = test_content
+            current_batch.append(failed_header, fragment_size)
             current_batch_has_content = True
 
         for i, id_value in enumerate(report_data["failed_ids"], 1):
@@ -560,21 +485,69 @@ def split_content_into_batches(
             else:
                 failed_line = f"  • {id_value}\n"
 
-            test_content = current_batch + failed_line
-            if (
-                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                >= max_bytes
-            ):
+            fragment_size = _utf8_len(failed_line)
+            if current_batch.size + fragment_size + footer_size >= max_bytes:
                 if current_batch_has_content:
-                    batches.append(current_batch + base_footer)
-                current_batch = base_header + failed_header + failed_line
+                    batches.append(current_batch.value() + base_footer)
+                current_batch = _BatchBuffer(base_header, failed_header, failed_line)
                 current_batch_has_content = True
             else:
-                current_batch = test_content
+                current_batch.append(failed_line, fragment_size)
                 current_batch_has_content = True
 
     # 完成最后批次
     if current_batch_has_content:
-        batches.append(current_batch + base_footer)
+        batches.append(current_batch.value() + base_footer)
 
     return batches
+
+
+class SplitContentCache:
+    """
+    分批结果缓存（一次推送内共享）
+
+    同一渠道的多个账号、以及分批参数相同的不同渠道，会对同一份 report_data
+    反复调用分批函数。本类包装分批函数，按 (报告, format_type, max_bytes, mode, 内容顺序)
+    缓存结果，每种版式只拆分一次。增量推送时各渠道的报告不同，按报告对象区分。
+
+    缓存只在一次推送（同一批 report_data 和 update_info）内有效，
+    由 NotificationDispatcher.dispatch_all 每次新建。并发调用时同一版式只计算一次。
+    """
+
+    def __init__(self, split_content_func: Callable, reverse_content_order: bool = False):
+        """
+        Args:
+            split_content_func: 原始分批函数，签名同 AppContext.split_content
+            reverse_content_order: 是否反转内容顺序（参与缓存键）
+        """
+        self._split_content_func = split_content_func
+        self._reverse_content_order = reverse_content_order
+        self._batches: Dict[Tuple, List[str]] = {}
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def __call__(
+        self,
+        report_data: Dict,
+        format_type: str,
+        update_info: Optional[Dict] = None,
+        max_bytes: Optional[int] = None,
+        mode: str = "daily",
+    ) -> List[str]:
+        key = (id(report_data), format_type, max_bytes, mode, self._reverse_content_order)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            batches = self._batches.get(key)
+            if batches is None:
+                batches = self._split_content_func(
+                    report_data, format_type, update_info, max_bytes=max_bytes, mode=mode
+                )
+                self._batches[key] = batches
+
+        # 返回副本，调用方修改列表不影响缓存
+        return list(batches)
+
+    def __len__(self) -> int:
+        return len(self._batches)
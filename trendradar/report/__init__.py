@@ -8,7 +8,7 @@
 
 模块结构：
 - helpers: 报告辅助函数（清理、转义、格式化）
-- formatter: 平台标题格式化
+- formatter: 平台标题格式化（预编译模板、片段缓存）
 - html: HTML 报告渲染
 - generator: 报告生成器
 """
@@ -18,7 +18,12 @@ from trendradar.report.helpers import (
     html_escape,
     format_rank_display,
 )
-from trendradar.report.formatter import format_title_for_platform
+from trendradar.report.formatter import (
+    format_title_for_platform,
+    clear_title_fragment_cache,
+    TitleTemplate,
+    TITLE_TEMPLATES,
+)
 from trendradar.report.html import render_html_content
 from trendradar.report.generator import (
     prepare_report_data,
@@ -32,6 +37,9 @@ __all__ = [
     "format_rank_display",
     # 格式化函数
     "format_title_for_platform",
+    "clear_title_fragment_cache",
+    "TitleTemplate",
+    "TITLE_TEMPLATES",
     # HTML 渲染
     "render_html_content",
     # 报告生成器
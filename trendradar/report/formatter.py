@@ -3,15 +3,166 @@
 平台标题格式化模块
 
 提供多平台标题格式化功能
+
+每个平台的标题格式是一个预编译模板（TitleTemplate）：链接、来源、时间、次数等片段的
+格式串在模块加载时绑定为 str.format，渲染时按顺序收集片段后 str.join 拼接，不再逐条按平台分支。
+渲染结果按 (平台, 标题数据, 显示选项) 缓存，分批拆分和完整消息渲染共用，
+同一条标题在一次推送的多种版式、多个渠道中只渲染一次。
 """
 
-from typing import Dict
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
 
 from trendradar.report.helpers import clean_title, html_escape, format_rank_display
 
+NEW_TITLE_MARK = "🆕 "
+
+# 片段缓存的最大条目数（超过后整体清空，避免长期运行时无限增长）
+MAX_CACHED_FRAGMENTS = 50000
+
+
+def _identity(text: str) -> str:
+    return text
+
+
+@dataclass(frozen=True)
+class TitleTemplate:
+    """
+    平台标题模板
+
+    片段依次为：[来源] [🆕] 标题/链接 [排名] [时间] [次数]。
+    HTML 模板的来源始终显示并写在链接片段中，新增标记改为包裹整行。
+    """
+
+    link: str                                # 有链接时的标题片段，可用 {title} {url} {source}
+    plain: str = "{title}"                   # 无链接时的标题片段
+    source: str = "[{source}] "              # 来源片段（show_source 时）
+    time: str = " - {time}"                  # 时间片段
+    count: str = " ({count}次)"              # 出现次数片段（次数大于 1 时）
+    rank_format: str = "wework"              # format_rank_display 使用的平台类型
+    escape_link_title: bool = False          # 链接中的标题是否 HTML 转义
+    escape_all: bool = False                 # 标题、来源、链接、时间是否全部 HTML 转义
+    new_wrapper: Optional[Tuple[str, str]] = None  # 新增标题包裹整行（否则在来源后加标记）
+    _compiled: Dict[str, Callable[..., str]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        for name in ("link", "plain", "source", "time", "count"):
+            self._compiled[name] = getattr(self, name).format
+
+    def render(self, title_data: Dict, show_source: bool, mark_new: bool) -> str:
+        escape = html_escape if self.escape_all else _identity
+        compiled = self._compiled
+        cleaned_title = clean_title(title_data["title"])
+        link_url = title_data["mobile_url"] or title_data["url"]
+        source_name = escape(title_data["source_name"])
+        is_new = mark_new and title_data.get("is_new")
+
+        parts = []
+        if self.new_wrapper is None:
+            if show_source:
+                parts.append(compiled["source"](source=source_name))
+            if is_new:
+                parts.append(NEW_TITLE_MARK)
+
+        if link_url:
+            link_title = html_escape(cleaned_title) if self.escape_link_title else escape(cleaned_title)
+            parts.append(compiled["link"](title=link_title, url=escape(link_url), source=source_name))
+        else:
+            parts.append(compiled["plain"](title=escape(cleaned_title), source=source_name))
+
+        rank_display = format_rank_display(
+            title_data["ranks"], title_data["rank_threshold"], self.rank_format
+        )
+        if rank_display:
+            parts.append(" ")
+            parts.append(rank_display)
+        if title_data["time_display"]:
+            parts.append(compiled["time"](time=escape(title_data["time_display"])))
+        if title_data["count"] > 1:
+            parts.append(compiled["count"](count=title_data["count"]))
+
+        if self.new_wrapper is not None and is_new:
+            parts.insert(0, self.new_wrapper[0])
+            parts.append(self.new_wrapper[1])
+        return "".join(parts)
+
+
+_MARKDOWN_TEMPLATE = TitleTemplate(link="[{title}]({url})")
+
+TITLE_TEMPLATES: Dict[str, TitleTemplate] = {
+    "feishu": TitleTemplate(
+        link="[{title}]({url})",
+        source="<font color='grey'>[{source}]</font> ",
+        time=" <font color='grey'>- {time}</font>",
+        count=" <font color='green'>({count}次)</font>",
+        rank_format="feishu",
+    ),
+    "dingtalk": TitleTemplate(link="[{title}]({url})", rank_format="dingtalk"),
+    # WeWork 和 Bark 使用 markdown 格式
+    "wework": _MARKDOWN_TEMPLATE,
+    "bark": TitleTemplate(link="[{title}]({url})", rank_format="bark"),
+    "telegram": TitleTemplate(
+        link='<a href="{url}">{title}</a>',
+        time=" <code>- {time}</code>",
+        count=" <code>({count}次)</code>",
+        rank_format="telegram",
+        escape_link_title=True,
+    ),
+    "ntfy": TitleTemplate(
+        link="[{title}]({url})",
+        time=" `- {time}`",
+        count=" `({count}次)`",
+        rank_format="ntfy",
+    ),
+    # Slack 使用 mrkdwn 格式，链接格式: <url|text>，排名使用 * 加粗
+    "slack": TitleTemplate(
+        link="<{url}|{title}>",
+        time=" `- {time}`",
+        count=" `({count}次)`",
+        rank_format="slack",
+    ),
+    "html": TitleTemplate(
+        link='[{source}] <a href="{url}" target="_blank" class="news-link">{title}</a>',
+        plain='[{source}] <span class="no-link">{title}</span>',
+        time=" <font color='grey'>- {time}</font>",
+        count=" <font color='green'>({count}次)</font>",
+        rank_format="html",
+        escape_all=True,
+        new_wrapper=("<div class='new-title'>🆕 ", "</div>"),
+    ),
+}
+
+_fragment_cache: Dict[Tuple, str] = {}
+_fragment_cache_lock = threading.Lock()
+
+
+def _fragment_key(platform: str, title_data: Dict, show_source: bool, mark_new: bool) -> Tuple:
+    return (
+        platform,
+        show_source,
+        bool(mark_new and title_data.get("is_new")),
+        title_data["title"],
+        title_data["source_name"],
+        title_data["time_display"],
+        title_data["count"],
+        tuple(title_data["ranks"]),
+        title_data["rank_threshold"],
+        title_data["mobile_url"],
+        title_data["url"],
+    )
+
+
+def clear_title_fragment_cache() -> None:
+    """清空标题片段缓存"""
+    with _fragment_cache_lock:
+        _fragment_cache.clear()
+
 
 def format_title_for_platform(
-    platform: str, title_data: Dict, show_source: bool = True
+    platform: str, title_data: Dict, show_source: bool = True, mark_new: bool = True
 ) -> str:
     """统一的标题格式化方法
 
@@ -38,186 +189,21 @@ def format_title_for_platform(
             - mobile_url: 移动端链接（优先使用）
             - is_new: 是否为新增标题（可选）
         show_source: 是否显示来源名称
+        mark_new: 是否显示新增标记（新增热点区域不重复标记）
 
     Returns:
         格式化后的标题字符串
     """
-    rank_display = format_rank_display(
-        title_data["ranks"], title_data["rank_threshold"], platform
-    )
-
-    link_url = title_data["mobile_url"] or title_data["url"]
-    cleaned_title = clean_title(title_data["title"])
-
-    if platform == "feishu":
-        if link_url:
-            formatted_title = f"[{cleaned_title}]({link_url})"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"<font color='grey'>[{title_data['source_name']}]</font> {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" <font color='grey'>- {title_data['time_display']}</font>"
-        if title_data["count"] > 1:
-            result += f" <font color='green'>({title_data['count']}次)</font>"
-
-        return result
-
-    elif platform == "dingtalk":
-        if link_url:
-            formatted_title = f"[{cleaned_title}]({link_url})"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" - {title_data['time_display']}"
-        if title_data["count"] > 1:
-            result += f" ({title_data['count']}次)"
-
-        return result
-
-    elif platform in ("wework", "bark"):
-        # WeWork 和 Bark 使用 markdown 格式
-        if link_url:
-            formatted_title = f"[{cleaned_title}]({link_url})"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" - {title_data['time_display']}"
-        if title_data["count"] > 1:
-            result += f" ({title_data['count']}次)"
-
-        return result
-
-    elif platform == "telegram":
-        if link_url:
-            formatted_title = f'<a href="{link_url}">{html_escape(cleaned_title)}</a>'
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" <code>- {title_data['time_display']}</code>"
-        if title_data["count"] > 1:
-            result += f" <code>({title_data['count']}次)</code>"
-
-        return result
-
-    elif platform == "ntfy":
-        if link_url:
-            formatted_title = f"[{cleaned_title}]({link_url})"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" `- {title_data['time_display']}`"
-        if title_data["count"] > 1:
-            result += f" `({title_data['count']}次)`"
-
-        return result
-
-    elif platform == "slack":
-        # Slack 使用 mrkdwn 格式
-        if link_url:
-            # Slack 链接格式: <url|text>
-            formatted_title = f"<{link_url}|{cleaned_title}>"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        # 排名（使用 * 加粗）
-        rank_display = format_rank_display(
-            title_data["ranks"], title_data["rank_threshold"], "slack"
-        )
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" `- {title_data['time_display']}`"
-        if title_data["count"] > 1:
-            result += f" `({title_data['count']}次)`"
-
-        return result
-
-    elif platform == "html":
-        rank_display = format_rank_display(
-            title_data["ranks"], title_data["rank_threshold"], "html"
-        )
-
-        link_url = title_data["mobile_url"] or title_data["url"]
-
-        escaped_title = html_escape(cleaned_title)
-        escaped_source_name = html_escape(title_data["source_name"])
-
-        if link_url:
-            escaped_url = html_escape(link_url)
-            formatted_title = f'[{escaped_source_name}] <a href="{escaped_url}" target="_blank" class="news-link">{escaped_title}</a>'
-        else:
-            formatted_title = (
-                f'[{escaped_source_name}] <span class="no-link">{escaped_title}</span>'
-            )
-
-        if rank_display:
-            formatted_title += f" {rank_display}"
-        if title_data["time_display"]:
-            escaped_time = html_escape(title_data["time_display"])
-            formatted_title += f" <font color='grey'>- {escaped_time}</font>"
-        if title_data["count"] > 1:
-            formatted_title += f" <font color='green'>({title_data['count']}次)</font>"
-
-        if title_data.get("is_new"):
-            formatted_title = f"<div class='new-title'>🆕 {formatted_title}</div>"
-
-        return formatted_title
-
-    else:
-        return cleaned_title
+    template = TITLE_TEMPLATES.get(platform)
+    if template is None:
+        return clean_title(title_data["title"])
+
+    key = _fragment_key(platform, title_data, show_source, mark_new)
+    fragment = _fragment_cache.get(key)
+    if fragment is None:
+        fragment = template.render(title_data, show_source, mark_new)
+        with _fragment_cache_lock:
+            if len(_fragment_cache) >= MAX_CACHED_FRAGMENTS:
+                _fragment_cache.clear()
+            _fragment_cache[key] = fragment
+    return fragment
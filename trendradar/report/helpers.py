@@ -5,9 +5,10 @@
 提供报告生成相关的通用辅助函数
 """
 
-import re
 from typing import List
 
+from trendradar.utils.text import clean_title_text
+
 
 def clean_title(title: str) -> str:
     """清理标题中的特殊字符
@@ -25,10 +26,8 @@ def clean_title(title: str) -> str:
     """
     if not isinstance(title, str):
         title = str(title)
-    cleaned_title = title.replace("\n", " ").replace("\r", " ")
-    cleaned_title = re.sub(r"\s+", " ", cleaned_title)
-    cleaned_title = cleaned_title.strip()
-    return cleaned_title
+    # 规范化结果在入库时已计算并驻留，这里直接查表
+    return clean_title_text(title)
 
 
 def html_escape(text: str) -> str:
@@ -5,6 +5,9 @@
 支持的存储后端:
 - local: 本地 SQLite + TXT/HTML 文件
 - remote: 远程云存储（S3 兼容协议：R2/OSS/COS/S3 等）
+- hybrid: 本地 SQLite 为主，异步复制到远程云存储
+- duckdb: 单文件 DuckDB，所有日期按 date 列分区存储
+- sharded: 本地 SQLite 按平台分组分片并行写入，读取时合并
 - auto: 根据环境自动选择（GitHub Actions 用 remote，其他用 local）
 """
 
@@ -17,6 +20,7 @@ from trendradar.storage.base import (
 )
 from trendradar.storage.local import LocalStorageBackend
 from trendradar.storage.manager import StorageManager, get_storage_manager
+from trendradar.storage.upload_queue import UploadQueue
 
 # 远程后端可选导入（需要 boto3）
 try:
@@ -26,6 +30,12 @@ except ImportError:
     RemoteStorageBackend = None
     HAS_REMOTE = False
 
+from trendradar.storage.hybrid import HybridStorageBackend
+from trendradar.storage.sharded import ShardedStorageBackend, connect_merged
+
+# DuckDB 后端可选导入（需要 duckdb）
+from trendradar.storage.duckdb_backend import DuckDBStorageBackend, HAS_DUCKDB
+
 __all__ = [
     # 基础类
     "StorageBackend",
@@ -37,8 +47,15 @@ __all__ = [
     # 后端实现
     "LocalStorageBackend",
     "RemoteStorageBackend",
+    "HybridStorageBackend",
+    "DuckDBStorageBackend",
+    "ShardedStorageBackend",
+    "connect_merged",
     "HAS_REMOTE",
+    "HAS_DUCKDB",
     # 管理器
     "StorageManager",
     "get_storage_manager",
+    # 异步上传
+    "UploadQueue",
 ]
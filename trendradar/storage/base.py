@@ -7,6 +7,7 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Dict, List, Optional, Any
 
 
@@ -354,6 +355,138 @@ class StorageBackend(ABC):
         pass
 
 
+    # === 增量分析相关方法（可选实现） ===
+
+    def get_news_rows_since(
+        self, since_crawl_time: str = "", date: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        增量读取 last_crawl_time >= since_crawl_time 的新闻行
+
+        默认不支持（返回 None），调用方回退为 get_today_all_data 全量读取。
+
+        Args:
+            since_crawl_time: 起始抓取时间（HH-MM），空串表示读取全部
+            date: 日期字符串，默认为今天
+
+        Returns:
+            {"total", "platforms", "rows"}，不支持时返回 None
+        """
+        return None
+
+    def get_analysis_state_path(self, date: Optional[str] = None) -> Optional[Path]:
+        """
+        增量分析状态文件路径
+
+        默认不支持（返回 None），此时不使用增量分析状态。
+        """
+        return None
+
+    # === 推送队列相关方法（可选实现） ===
+
+    def outbox_enqueue(self, rows: List[Dict], date: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+        """
+        推送批次入队（幂等键已存在时忽略）
+
+        默认不支持（返回 None），调用方直接发送、不做持久化重试。
+
+        Args:
+            rows: 待入队的行（见 storage/outbox.py 的 OUTBOX_INSERT_COLUMNS）
+            date: 日期字符串，默认为今天
+
+        Returns:
+            幂等键 -> 数据库中的行，不支持时返回 None
+        """
+        return None
+
+    def outbox_pending(
+        self, account_key: str, now_str: str, date: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        查询某账号已到重试时间的待发送批次
+
+        Args:
+            account_key: 账号哈希
+            now_str: 当前时间（YYYY-MM-DD HH:MM:SS）
+            date: 日期字符串，默认为今天（该日期没有数据库时返回空列表）
+
+        Returns:
+            待发送的行列表（按入队顺序）
+        """
+        return []
+
+    def outbox_update(
+        self, idempotency_key: str, changes: Dict, date: Optional[str] = None
+    ) -> bool:
+        """
+        更新推送批次的发送状态
+
+        Args:
+            idempotency_key: 幂等键
+            changes: 要更新的列（status / attempts / next_attempt_at / last_error / delivered_at）
+            date: 批次所在数据库的日期
+
+        Returns:
+            是否更新成功
+        """
+        return False
+
+    def sync_outbox(self) -> None:
+        """
+        将推送队列的变更同步到远程存储
+
+        远程后端的 outbox_enqueue / outbox_update 只写本地数据库，推送结束后调用一次统一上传；
+        其它后端写入即持久化，默认无操作。
+        """
+
+    # === 推送指纹相关方法（可选实现） ===
+
+    def get_notification_fingerprint(
+        self, channel: str, report_type: str, date: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        获取某渠道、某报告类型最近一次送达的报告指纹
+
+        默认不支持（返回 None），调用方按首次推送处理（发送完整报告）。
+
+        Args:
+            channel: 渠道名
+            report_type: 报告类型
+            date: 日期字符串，默认为今天
+
+        Returns:
+            {"fingerprint": JSON 字符串, "full_sent_at": 最近一次完整推送时间, "updated_at": 更新时间}
+        """
+        return None
+
+    def save_notification_fingerprint(
+        self,
+        channel: str,
+        report_type: str,
+        fingerprint: str,
+        full_sent_at: Optional[str] = None,
+        date: Optional[str] = None,
+    ) -> bool:
+        """
+        保存报告指纹
+
+        Args:
+            channel: 渠道名
+            report_type: 报告类型
+            fingerprint: 报告指纹（JSON 字符串）
+            full_sent_at: 完整推送时间（本次为增量推送时传 None，保留原值）
+            date: 日期字符串，默认为今天
+
+        Returns:
+            是否保存成功
+        """
+        return False
+
+
+# news_items 的规范化列（入库时计算，见 utils/text.py 和 utils/url.py）
+NORMALIZED_NEWS_COLUMNS = ("title_clean", "title_fold", "url_signature")
+
+
 def convert_crawl_results_to_news_data(
     results: Dict[str, Dict],
     id_to_name: Dict[str, str],
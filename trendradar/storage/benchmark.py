@@ -0,0 +1,495 @@
+# coding=utf-8
+"""
+存储后端基准测试
+
+用可复现的合成数据（固定随机种子）模拟多天、多平台、多批次的抓取，
+按真实流程依次调用 detect_new_titles → save_news_data → get_today_all_data，
+再等待异步上传完成（flush）、统计体积、执行 cleanup_old_data 并关闭后端，
+输出各操作的吞吐量、延迟分位数和数据库体积。
+
+结果可保存为 JSON（包含参数和 git 版本），并与之前的结果对比，
+便于在不同提交之间比较存储性能。
+
+用法:
+    python -m trendradar.storage.benchmark --backend local --days 3 --crawls-per-day 24
+    python -m trendradar.storage.benchmark --backend remote --moto
+    python -m trendradar.storage.benchmark --backend remote --endpoint-url http://127.0.0.1:9000 \\
+        --bucket trendradar-bench --access-key minioadmin --secret-key minioadmin
+    python -m trendradar.storage.benchmark --backend local --output bench.json --compare baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from trendradar.storage.base import NewsData, NewsItem
+from trendradar.utils.time import get_configured_time
+
+
+BENCH_OPERATIONS = [
+    "detect_new_titles",
+    "save_news_data",
+    "get_today_all_data",
+    "flush",
+    "cleanup_old_data",
+    "close",
+]
+
+
+# 合成标题用词
+_WORDS = [
+    "人工智能", "新能源", "芯片", "比亚迪", "华为", "苹果", "特斯拉", "股市", "A股", "美联储",
+    "降息", "世界杯", "国足", "演唱会", "电影", "票房", "高考", "地震", "台风", "航天",
+    "火箭", "卫星", "医保", "房价", "楼市", "汽车", "手机", "发布会", "科技", "教育",
+]
+
+
+@dataclass
+class BenchmarkConfig:
+    """基准测试参数（写入结果文件，用于判断两次结果是否可比）"""
+
+    backend: str = "local"
+    platforms: int = 12
+    items_per_crawl: int = 50
+    crawls_per_day: int = 24
+    days: int = 2
+    title_churn: float = 0.1        # 每批次被替换为新标题的比例
+    url_churn: float = 0.05         # 每批次标题不变但 URL 变化的比例
+    retention_days: int = 1         # cleanup_old_data 保留天数
+    seed: int = 42
+    timezone: str = "Asia/Shanghai"
+
+
+class SyntheticNewsGenerator:
+    """
+    合成新闻数据生成器
+
+    每个平台维护一个热榜：每批次按 title_churn 替换部分标题、
+    按 url_churn 更换部分 URL，其余条目排名小幅抖动。
+    日期以今天为最后一天向前排列，便于测试 cleanup_old_data。
+    """
+
+    def __init__(
+        self,
+        platforms: int = 12,
+        items_per_crawl: int = 50,
+        crawls_per_day: int = 24,
+        days: int = 2,
+        title_churn: float = 0.1,
+        url_churn: float = 0.05,
+        seed: int = 42,
+        timezone: str = "Asia/Shanghai",
+    ):
+        self.platform_ids = [f"bench{i:02d}" for i in range(platforms)]
+        self.items_per_crawl = items_per_crawl
+        self.crawls_per_day = max(1, crawls_per_day)
+        self.days = max(1, days)
+        self.title_churn = title_churn
+        self.url_churn = url_churn
+        self.timezone = timezone
+        self._rng = random.Random(seed)
+        self._serial = 0
+
+    def _new_entry(self, platform_id: str) -> Dict[str, str]:
+        self._serial += 1
+        words = [self._rng.choice(_WORDS) for _ in range(self._rng.randint(3, 6))]
+        title = f"{''.join(words)} #{self._serial}"
+        return {"title": title, "url": f"https://{platform_id}.example.com/n/{self._serial}"}
+
+    def _churn(self, platform_id: str, board: List[Dict[str, str]]) -> None:
+        for index in range(len(board)):
+            roll = self._rng.random()
+            if roll < self.title_churn:
+                board[index] = self._new_entry(platform_id)
+            elif roll < self.title_churn + self.url_churn:
+                self._serial += 1
+                board[index] = {
+                    "title": board[index]["title"],
+                    "url": f"https://{platform_id}.example.com/n/{self._serial}",
+                }
+
+        # 排名小幅抖动：相邻交换
+        for index in range(len(board) - 1):
+            if self._rng.random() < 0.2:
+                board[index], board[index + 1] = board[index + 1], board[index]
+
+    def dates(self) -> List[str]:
+        """生成的日期列表（最后一天为今天）"""
+        today = get_configured_time(self.timezone)
+        return [
+            (today - timedelta(days=offset)).strftime("%Y-%m-%d")
+            for offset in range(self.days - 1, -1, -1)
+        ]
+
+    def crawl_times(self) -> List[str]:
+        """一天内的抓取时间（HH-MM，均匀分布）"""
+        step = (24 * 60) // self.crawls_per_day
+        return [f"{(i * step) // 60:02d}-{(i * step) % 60:02d}" for i in range(self.crawls_per_day)]
+
+    def __iter__(self) -> Iterator[NewsData]:
+        boards = {
+            pid: [self._new_entry(pid) for _ in range(self.items_per_crawl)]
+            for pid in self.platform_ids
+        }
+        id_to_name = {pid: f"平台{pid[-2:]}" for pid in self.platform_ids}
+
+        for date in self.dates():
+            for crawl_time in self.crawl_times():
+                items = {}
+                for pid, board in boards.items():
+                    self._churn(pid, board)
+                    items[pid] = [
+                        NewsItem(
+                            title=entry["title"],
+                            source_id=pid,
+                            source_name=id_to_name[pid],
+                            rank=rank,
+                            url=entry["url"],
+                            crawl_time=crawl_time,
+                        )
+                        for rank, entry in enumerate(board, start=1)
+                    ]
+                yield NewsData(
+                    date=date,
+                    crawl_time=crawl_time,
+                    items=items,
+                    id_to_name=dict(id_to_name),
+                    failed_ids=[],
+                )
+
+
+@dataclass
+class OperationStats:
+    """单个操作的统计结果"""
+
+    calls: int = 0
+    items: int = 0
+    total_seconds: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    items_per_second: float = 0.0
+
+
+@dataclass
+class BenchmarkResult:
+    """基准测试结果"""
+
+    config: BenchmarkConfig
+    operations: Dict[str, OperationStats] = field(default_factory=dict)
+    db_size_bytes: int = 0
+    wal_size_bytes: int = 0         # 尚未检查点的 WAL 等日志文件
+    total_items: int = 0
+    wall_seconds: float = 0.0
+    environment: Dict[str, str] = field(default_factory=dict)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _summarize(latencies: List[float], items: int) -> OperationStats:
+    values = sorted(latencies)
+    total = sum(values)
+    return OperationStats(
+        calls=len(values),
+        items=items,
+        total_seconds=round(total, 6),
+        p50_ms=round(_percentile(values, 50) * 1000, 3),
+        p95_ms=round(_percentile(values, 95) * 1000, 3),
+        p99_ms=round(_percentile(values, 99) * 1000, 3),
+        max_ms=round((values[-1] if values else 0.0) * 1000, 3),
+        items_per_second=round(items / total, 1) if total > 0 and items else 0.0,
+    )
+
+
+def _environment() -> Dict[str, str]:
+    """记录运行环境，便于判断结果是否可比"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def _local_size(files: List[Path]) -> Tuple[int, int]:
+    """统计本地文件体积，返回 (数据库文件, WAL 等日志文件)"""
+    db_bytes, wal_bytes = 0, 0
+    for path in files:
+        if not path.is_file():
+            continue
+        if path.name.endswith(("-wal", "-shm", ".wal")):
+            wal_bytes += path.stat().st_size
+        else:
+            db_bytes += path.stat().st_size
+    return db_bytes, wal_bytes
+
+
+def _flush_pending(backend) -> None:
+    """等待后端的异步上传 / 复制队列清空（同步后端无操作）"""
+    upload_queue = getattr(backend, "_upload_queue", None)
+    if upload_queue is not None:
+        upload_queue.flush()
+    if hasattr(backend, "flush_replication"):
+        backend.flush_replication()
+
+
+def _remote_size(backend) -> int:
+    """统计远程存储桶中的对象总大小"""
+    s3_client = getattr(backend, "s3_client", None)
+    if s3_client is None:
+        remote_backend = getattr(backend, "remote_backend", None)
+        return _remote_size(remote_backend) if remote_backend else 0
+
+    total = 0
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=backend.bucket_name):
+        total += sum(obj["Size"] for obj in page.get("Contents", []))
+    return total
+
+
+def run_benchmark(
+    config: BenchmarkConfig,
+    work_dir: str,
+    remote_config: Optional[dict] = None,
+    quiet: bool = True,
+) -> BenchmarkResult:
+    """
+    执行一次基准测试
+
+    Args:
+        config: 测试参数
+        work_dir: 工作目录（作为后端的 data_dir）
+        remote_config: 远程存储配置（remote / hybrid 后端使用）
+        quiet: 是否屏蔽后端自身的日志输出
+
+    Returns:
+        测试结果
+    """
+    from trendradar.storage.manager import StorageManager
+
+    data_dir = Path(work_dir) / "output"
+    manager = StorageManager(
+        backend_type=config.backend,
+        data_dir=str(data_dir),
+        enable_txt=False,
+        enable_html=False,
+        remote_config=remote_config,
+        timezone=config.timezone,
+    )
+    backend = manager.get_backend()
+    if backend.backend_name != config.backend:
+        raise RuntimeError(f"后端 {config.backend} 初始化失败（实际为 {backend.backend_name}）")
+
+    generator = SyntheticNewsGenerator(
+        platforms=config.platforms,
+        items_per_crawl=config.items_per_crawl,
+        crawls_per_day=config.crawls_per_day,
+        days=config.days,
+        title_churn=config.title_churn,
+        url_churn=config.url_churn,
+        seed=config.seed,
+        timezone=config.timezone,
+    )
+
+    latencies: Dict[str, List[float]] = {op: [] for op in BENCH_OPERATIONS}
+    items: Dict[str, int] = {op: 0 for op in BENCH_OPERATIONS}
+    result = BenchmarkResult(config=config, environment=_environment())
+    silence = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+
+    def timed(op: str, func, *args):
+        start = time.perf_counter()
+        with silence:
+            value = func(*args)
+        latencies[op].append(time.perf_counter() - start)
+        return value
+
+    wall_start = time.perf_counter()
+    for data in generator:
+        count = data.get_total_count()
+        result.total_items += count
+
+        timed("detect_new_titles", backend.detect_new_titles, data)
+        items["detect_new_titles"] += count
+
+        if not timed("save_news_data", backend.save_news_data, data):
+            raise RuntimeError(f"save_news_data 失败: {data.date} {data.crawl_time}")
+        items["save_news_data"] += count
+
+        all_data = timed("get_today_all_data", backend.get_today_all_data, data.date)
+        items["get_today_all_data"] += all_data.get_total_count() if all_data else 0
+
+    # 等待异步上传 / 复制完成后再统计体积
+    timed("flush", _flush_pending, backend)
+    if config.backend in ("remote", "hybrid"):
+        result.db_size_bytes = _remote_size(backend)
+    elif config.backend == "duckdb":
+        duckdb_path = Path(manager.duckdb_path)
+        result.db_size_bytes, result.wal_size_bytes = _local_size(
+            list(duckdb_path.parent.glob(f"{duckdb_path.name}*"))
+        )
+    else:
+        result.db_size_bytes, result.wal_size_bytes = _local_size(list(data_dir.rglob("*.db*")))
+
+    timed("cleanup_old_data", backend.cleanup_old_data, config.retention_days)
+    timed("close", backend.cleanup)
+    result.wall_seconds = round(time.perf_counter() - wall_start, 3)
+
+    result.operations = {op: _summarize(latencies[op], items[op]) for op in BENCH_OPERATIONS}
+    return result
+
+
+def format_result(result: BenchmarkResult, baseline: Optional[dict] = None) -> str:
+    """格式化结果表格（可选与基线对比 p50 / 吞吐量）"""
+    config = result.config
+    lines = [
+        f"后端: {config.backend}  平台: {config.platforms}  每批条数: {config.items_per_crawl}  "
+        f"每天批次: {config.crawls_per_day}  天数: {config.days}  "
+        f"标题变化: {config.title_churn}  URL 变化: {config.url_churn}  种子: {config.seed}",
+        f"总条目: {result.total_items}  总耗时: {result.wall_seconds}s  "
+        f"数据库体积: {result.db_size_bytes / 1024 / 1024:.2f} MB "
+        f"(WAL {result.wal_size_bytes / 1024 / 1024:.2f} MB)  "
+        f"提交: {result.environment.get('git_commit') or '-'}",
+        "",
+        f"{'操作':<20}{'次数':>6}{'p50(ms)':>11}{'p95(ms)':>11}{'p99(ms)':>11}{'max(ms)':>11}{'条/秒':>12}",
+    ]
+
+    baseline_ops = (baseline or {}).get("operations", {})
+    for op, stats in result.operations.items():
+        line = (
+            f"{op:<20}{stats.calls:>6}{stats.p50_ms:>11.2f}{stats.p95_ms:>11.2f}"
+            f"{stats.p99_ms:>11.2f}{stats.max_ms:>11.2f}{stats.items_per_second:>12.0f}"
+        )
+        base = baseline_ops.get(op)
+        if base and base.get("p50_ms"):
+            change = (stats.p50_ms - base["p50_ms"]) / base["p50_ms"] * 100
+            line += f"   p50 {change:+.1f}% (基线 {base['p50_ms']:.2f})"
+        lines.append(line)
+
+    if baseline and baseline.get("config") != asdict(config):
+        lines.append("")
+        lines.append("⚠️ 基线参数与本次不同，对比结果仅供参考")
+    return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def _moto_bucket(bucket_name: str):
+    """使用 moto 模拟 S3（无需真实对象存储）"""
+    try:
+        import boto3
+        from moto import mock_aws
+    except ImportError:
+        raise ImportError("--moto 需要安装 moto: pip install 'moto[s3]'")
+
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=bucket_name)
+        yield {
+            "bucket_name": bucket_name,
+            "access_key_id": "testing",
+            "secret_access_key": "testing",
+            "endpoint_url": "https://s3.amazonaws.com",
+            "region": "us-east-1",
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TrendRadar 存储后端基准测试")
+    parser.add_argument("--backend", default="local",
+                        choices=["local", "remote", "hybrid", "duckdb", "sharded"])
+    parser.add_argument("--platforms", type=int, default=BenchmarkConfig.platforms)
+    parser.add_argument("--items-per-crawl", type=int, default=BenchmarkConfig.items_per_crawl)
+    parser.add_argument("--crawls-per-day", type=int, default=BenchmarkConfig.crawls_per_day)
+    parser.add_argument("--days", type=int, default=BenchmarkConfig.days)
+    parser.add_argument("--title-churn", type=float, default=BenchmarkConfig.title_churn)
+    parser.add_argument("--url-churn", type=float, default=BenchmarkConfig.url_churn)
+    parser.add_argument("--retention-days", type=int, default=BenchmarkConfig.retention_days)
+    parser.add_argument("--seed", type=int, default=BenchmarkConfig.seed)
+    parser.add_argument("--work-dir", help="工作目录（默认临时目录，结束后删除）")
+    parser.add_argument("--output", help="保存 JSON 结果")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比")
+    parser.add_argument("--verbose", action="store_true", help="显示后端日志")
+
+    remote_group = parser.add_argument_group("远程存储（remote / hybrid）")
+    remote_group.add_argument("--moto", action="store_true", help="使用 moto 模拟 S3")
+    remote_group.add_argument("--endpoint-url", default="", help="S3 兼容端点（如本地 MinIO）")
+    remote_group.add_argument("--bucket", default="trendradar-bench")
+    remote_group.add_argument("--access-key", default="")
+    remote_group.add_argument("--secret-key", default="")
+    remote_group.add_argument("--region", default="")
+    remote_group.add_argument("--sync-upload", action="store_true", help="remote 后端使用同步上传")
+    args = parser.parse_args()
+
+    config = BenchmarkConfig(
+        backend=args.backend,
+        platforms=args.platforms,
+        items_per_crawl=args.items_per_crawl,
+        crawls_per_day=args.crawls_per_day,
+        days=args.days,
+        title_churn=args.title_churn,
+        url_churn=args.url_churn,
+        retention_days=args.retention_days,
+        seed=args.seed,
+    )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="trendradar_bench_")
+    try:
+        with contextlib.ExitStack() as stack:
+            remote_config = None
+            if args.backend in ("remote", "hybrid"):
+                if args.moto:
+                    remote_config = stack.enter_context(_moto_bucket(args.bucket))
+                else:
+                    remote_config = {
+                        "bucket_name": args.bucket,
+                        "access_key_id": args.access_key,
+                        "secret_access_key": args.secret_key,
+                        "endpoint_url": args.endpoint_url,
+                        "region": args.region,
+                    }
+                remote_config["async_upload"] = not args.sync_upload
+
+            result = run_benchmark(config, work_dir, remote_config, quiet=not args.verbose)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(format_result(result, baseline))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(asdict(result), f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
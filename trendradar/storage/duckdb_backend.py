@@ -0,0 +1,1000 @@
+# coding=utf-8
+"""
+DuckDB 存储后端 - 单文件分析型存储
+
+所有日期的数据存放在同一个 DuckDB 文件中，按 date 列分区：
+- 跨日期查询无需逐个打开每日 SQLite
+- 清理过期数据为按分区键删除
+- TXT 快照 / HTML 报告仍写入本地日期目录（与 local 后端一致）
+
+需要安装 duckdb: pip install duckdb
+"""
+
+import json
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    duckdb = None
+    HAS_DUCKDB = False
+
+from trendradar.storage.base import (
+    StorageBackend, NewsItem, NewsData, NORMALIZED_NEWS_COLUMNS,
+)
+from trendradar.storage.local import LocalStorageBackend
+from trendradar.storage.outbox import (
+    OUTBOX_INSERT_COLUMNS,
+    OUTBOX_SELECT_COLUMNS,
+    OUTBOX_UPDATE_COLUMNS,
+)
+from trendradar.storage.sharded import connect_merged
+from trendradar.utils.time import (
+    get_configured_time,
+    format_date_folder,
+    format_time_filename,
+)
+from trendradar.utils.text import title_forms
+from trendradar.utils.url import url_forms
+
+
+# DuckDB 表结构（所有表都带 date 分区列）
+DUCKDB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS platforms (
+    id VARCHAR PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    updated_at VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS news_items (
+    id BIGINT PRIMARY KEY,
+    date DATE NOT NULL,
+    title VARCHAR NOT NULL,
+    platform_id VARCHAR NOT NULL,
+    rank INTEGER NOT NULL,
+    url VARCHAR DEFAULT '',
+    mobile_url VARCHAR DEFAULT '',
+    first_crawl_time VARCHAR NOT NULL,
+    last_crawl_time VARCHAR NOT NULL,
+    crawl_count INTEGER DEFAULT 1,
+    created_at VARCHAR,
+    updated_at VARCHAR,
+    title_clean VARCHAR DEFAULT '',
+    title_fold VARCHAR DEFAULT '',
+    url_signature VARCHAR DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS title_changes (
+    news_item_id BIGINT NOT NULL,
+    date DATE NOT NULL,
+    old_title VARCHAR NOT NULL,
+    new_title VARCHAR NOT NULL,
+    changed_at VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS rank_history (
+    news_item_id BIGINT NOT NULL,
+    date DATE NOT NULL,
+    rank INTEGER NOT NULL,
+    crawl_time VARCHAR NOT NULL,
+    created_at VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS crawl_records (
+    id BIGINT PRIMARY KEY,
+    date DATE NOT NULL,
+    crawl_time VARCHAR NOT NULL,
+    total_items INTEGER DEFAULT 0,
+    created_at VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS crawl_source_status (
+    crawl_record_id BIGINT NOT NULL,
+    date DATE NOT NULL,
+    platform_id VARCHAR NOT NULL,
+    status VARCHAR NOT NULL,
+    PRIMARY KEY (crawl_record_id, platform_id)
+);
+
+CREATE TABLE IF NOT EXISTS push_records (
+    date DATE PRIMARY KEY,
+    pushed INTEGER DEFAULT 0,
+    push_time VARCHAR,
+    report_type VARCHAR,
+    created_at VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id BIGINT NOT NULL,
+    date DATE NOT NULL,
+    idempotency_key VARCHAR NOT NULL,
+    channel VARCHAR NOT NULL,
+    account_key VARCHAR NOT NULL,
+    report_type VARCHAR,
+    batch_num INTEGER,
+    batch_total INTEGER,
+    body BLOB NOT NULL,
+    is_json INTEGER DEFAULT 1,
+    headers VARCHAR DEFAULT '{}',
+    status VARCHAR DEFAULT 'pending',
+    attempts INTEGER DEFAULT 0,
+    next_attempt_at VARCHAR,
+    last_error VARCHAR,
+    created_at VARCHAR,
+    delivered_at VARCHAR,
+    PRIMARY KEY (date, idempotency_key)
+);
+
+CREATE TABLE IF NOT EXISTS notification_fingerprints (
+    date DATE NOT NULL,
+    channel VARCHAR NOT NULL,
+    report_type VARCHAR NOT NULL,
+    fingerprint VARCHAR NOT NULL,
+    full_sent_at VARCHAR,
+    updated_at VARCHAR,
+    PRIMARY KEY (date, channel, report_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_news_date_platform ON news_items(date, platform_id);
+CREATE INDEX IF NOT EXISTS idx_rank_history_date ON rank_history(date, news_item_id);
+CREATE INDEX IF NOT EXISTS idx_crawl_records_date ON crawl_records(date, crawl_time);
+"""
+
+_NEWS_ITEM_COLUMNS = (
+    "id", "date", "title", "platform_id", "rank", "url", "mobile_url",
+    "first_crawl_time", "last_crawl_time", "crawl_count", "created_at", "updated_at",
+    "title_clean", "title_fold", "url_signature",
+)
+_RANK_HISTORY_COLUMNS = ("news_item_id", "date", "rank", "crawl_time", "created_at")
+_TITLE_CHANGE_COLUMNS = ("news_item_id", "date", "old_title", "new_title", "changed_at")
+_SOURCE_STATUS_COLUMNS = ("crawl_record_id", "date", "platform_id", "status")
+
+# 按日期删除时涉及的表
+_DATE_PARTITIONED_TABLES = (
+    "rank_history",
+    "title_changes",
+    "crawl_source_status",
+    "crawl_records",
+    "news_items",
+    "push_records",
+    "notification_outbox",
+    "notification_fingerprints",
+)
+
+
+# 批量写入的行来源：整批数据序列化为一个 JSON 参数，在 SQL 中展开
+# （DuckDB Python 绑定逐个转换参数，executemany / 多行占位符在大批量时很慢）
+_JSON_ROWS = "(SELECT unnest(CAST(? AS JSON)::VARCHAR[][]) AS r)"
+
+
+def _insert_rows(conn, table: str, columns: Sequence[str], rows: List[Sequence], tail: str = "") -> None:
+    """
+    批量插入（列值由 DuckDB 按目标列类型隐式转换）
+
+    Args:
+        conn: DuckDB 连接
+        table: 表名
+        columns: 列名
+        rows: 行数据，与 columns 顺序一致
+        tail: 追加的子句（如 ON CONFLICT）
+    """
+    if not rows:
+        return
+    select_list = ", ".join(f"r[{i}]" for i in range(1, len(columns) + 1))
+    conn.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) SELECT {select_list} FROM {_JSON_ROWS} {tail}",
+        [json.dumps(rows, ensure_ascii=False)],
+    )
+
+
+class DuckDBStorageBackend(StorageBackend):
+    """
+    DuckDB 存储后端
+
+    特点：
+    - 单个 DuckDB 文件保存所有日期，date 列作为分区键
+    - 写入按批次执行（一次查询已有记录，整批数据作为一个 JSON 参数插入/更新）
+    - 检测新增标题直接在 SQL 中过滤，不必加载整天数据
+    - 推送队列、推送指纹同样按 date 分区，与每日 SQLite 中的同名表语义一致
+    - 可通过 migrate 工具从现有 output/*/news.db 导入
+    """
+
+    def __init__(
+        self,
+        db_path: str = "output/trendradar.duckdb",
+        data_dir: str = "output",
+        enable_txt: bool = True,
+        enable_html: bool = True,
+        timezone: str = "Asia/Shanghai",
+    ):
+        """
+        初始化 DuckDB 存储后端
+
+        Args:
+            db_path: DuckDB 数据库文件路径
+            data_dir: TXT/HTML 文件目录
+            enable_txt: 是否启用 TXT 快照
+            enable_html: 是否启用 HTML 报告
+            timezone: 时区配置（默认 Asia/Shanghai）
+        """
+        if not HAS_DUCKDB:
+            raise ImportError("DuckDB 存储后端需要安装 duckdb: pip install duckdb")
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.data_dir = Path(data_dir)
+        self.enable_txt = enable_txt
+        self.enable_html = enable_html
+        self.timezone = timezone
+
+        # TXT / HTML 文件仍按日期目录保存，复用本地后端实现
+        self._file_backend = LocalStorageBackend(
+            data_dir=data_dir,
+            enable_txt=enable_txt,
+            enable_html=enable_html,
+            timezone=timezone,
+        )
+        self._conn = None
+
+    @property
+    def backend_name(self) -> str:
+        return "duckdb"
+
+    @property
+    def supports_txt(self) -> bool:
+        return self.enable_txt
+
+    def _get_configured_time(self):
+        """获取配置时区的当前时间"""
+        return get_configured_time(self.timezone)
+
+    def _format_date_folder(self, date: Optional[str] = None) -> str:
+        """格式化日期 (ISO 格式: YYYY-MM-DD)"""
+        return format_date_folder(date, self.timezone)
+
+    def _format_time_filename(self) -> str:
+        """格式化时间文件名 (格式: HH-MM)"""
+        return format_time_filename(self.timezone)
+
+    def _get_connection(self):
+        """获取 DuckDB 连接（单连接，首次使用时初始化表结构）"""
+        if self._conn is None:
+            self._conn = duckdb.connect(str(self.db_path))
+            self._conn.execute(DUCKDB_SCHEMA)
+            # 旧文件补充规范化列
+            for column in NORMALIZED_NEWS_COLUMNS:
+                self._conn.execute(
+                    f"ALTER TABLE news_items ADD COLUMN IF NOT EXISTS {column} VARCHAR DEFAULT ''"
+                )
+        return self._conn
+
+    @staticmethod
+    def _next_id(conn, table: str) -> int:
+        """获取表的下一个可用 ID（单写入者，直接取 MAX + 1）"""
+        row = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()
+        return row[0] + 1
+
+    def save_news_data(self, data: NewsData) -> bool:
+        """
+        保存新闻数据（以标准化 URL + platform_id 去重，支持标题更新检测）
+
+        Args:
+            data: 新闻数据
+
+        Returns:
+            是否保存成功
+        """
+        conn = self._get_connection()
+        date = self._format_date_folder(data.date)
+        now_str = self._get_configured_time().strftime("%Y-%m-%d %H:%M:%S")
+
+        try:
+            conn.execute("BEGIN TRANSACTION")
+
+            # 同步平台信息
+            if data.id_to_name:
+                _insert_rows(
+                    conn, "platforms", ("id", "name", "updated_at"),
+                    [(sid, name, now_str) for sid, name in data.id_to_name.items()],
+                    "ON CONFLICT (id) DO UPDATE SET name = excluded.name, updated_at = excluded.updated_at",
+                )
+
+            # 一次性读取当天已有的 URL 记录
+            existing: Dict[Tuple[str, str], Tuple[int, str]] = {}
+            for row in conn.execute("""
+                SELECT platform_id, url, id, title FROM news_items
+                WHERE date = CAST(? AS DATE) AND url != ''
+            """, [date]).fetchall():
+                existing[(row[0], row[1])] = (row[2], row[3])
+
+            next_id = self._next_id(conn, "news_items")
+            inserts, rank_rows, title_change_rows = [], [], []
+            updates: Dict[int, list] = {}
+            title_changed_count = 0
+
+            for source_id, news_list in data.items.items():
+                for item in news_list:
+                    normalized_url, url_signature = url_forms(item.url, source_id)
+                    title_clean, title_fold = title_forms(item.title)
+                    hit = existing.get((source_id, normalized_url)) if normalized_url else None
+
+                    if hit:
+                        existing_id, existing_title = hit
+                        if existing_title != item.title:
+                            title_change_rows.append(
+                                (existing_id, date, existing_title, item.title, now_str)
+                            )
+                            title_changed_count += 1
+                        # 同一批次内同一 URL 多次出现时合并为一次更新，累计出现次数
+                        previous = updates.get(existing_id)
+                        hits = previous[1] + 1 if previous else 1
+                        updates[existing_id] = [
+                            existing_id, hits, item.title, item.rank, item.mobile_url,
+                            data.crawl_time, now_str, title_clean, title_fold, url_signature,
+                        ]
+                        rank_rows.append((existing_id, date, item.rank, data.crawl_time, now_str))
+                        # 同一批次内重复 URL 也视为更新
+                        existing[(source_id, normalized_url)] = (existing_id, item.title)
+                    else:
+                        new_id = next_id
+                        next_id += 1
+                        inserts.append((
+                            new_id, date, item.title, source_id, item.rank,
+                            normalized_url, item.mobile_url,
+                            data.crawl_time, data.crawl_time, 1, now_str, now_str,
+                            title_clean, title_fold, url_signature,
+                        ))
+                        rank_rows.append((new_id, date, item.rank, data.crawl_time, now_str))
+                        if normalized_url:
+                            existing[(source_id, normalized_url)] = (new_id, item.title)
+
+            _insert_rows(conn, "news_items", _NEWS_ITEM_COLUMNS, inserts)
+            if updates:
+                conn.execute(f"""
+                    UPDATE news_items SET
+                        title = u.r[3],
+                        rank = CAST(u.r[4] AS INTEGER),
+                        mobile_url = u.r[5],
+                        last_crawl_time = u.r[6],
+                        crawl_count = news_items.crawl_count + CAST(u.r[2] AS INTEGER),
+                        updated_at = u.r[7],
+                        title_clean = u.r[8],
+                        title_fold = u.r[9],
+                        url_signature = u.r[10]
+                    FROM {_JSON_ROWS} AS u
+                    WHERE news_items.id = CAST(u.r[1] AS BIGINT)
+                """, [json.dumps(list(updates.values()), ensure_ascii=False)])
+            _insert_rows(conn, "title_changes", _TITLE_CHANGE_COLUMNS, title_change_rows)
+            _insert_rows(conn, "rank_history", _RANK_HISTORY_COLUMNS, rank_rows)
+
+            # 记录抓取信息（同一 date + crawl_time 覆盖）
+            updated_count = sum(row[1] for row in updates.values())
+            total_items = len(inserts) + updated_count
+            row = conn.execute("""
+                SELECT id FROM crawl_records WHERE date = CAST(? AS DATE) AND crawl_time = ?
+            """, [date, data.crawl_time]).fetchone()
+            if row:
+                crawl_record_id = row[0]
+                conn.execute("""
+                    UPDATE crawl_records SET total_items = ?, created_at = ? WHERE id = ?
+                """, [total_items, now_str, crawl_record_id])
+                conn.execute(
+                    "DELETE FROM crawl_source_status WHERE crawl_record_id = ?", [crawl_record_id]
+                )
+            else:
+                crawl_record_id = self._next_id(conn, "crawl_records")
+                conn.execute("""
+                    INSERT INTO crawl_records (id, date, crawl_time, total_items, created_at)
+                    VALUES (?, CAST(? AS DATE), ?, ?, ?)
+                """, [crawl_record_id, date, data.crawl_time, total_items, now_str])
+
+            # 成功 / 失败来源（失败优先，与 SQLite 的 INSERT OR REPLACE 顺序一致）
+            status_rows = {sid: "success" for sid in data.items}
+            for failed_id in data.failed_ids:
+                conn.execute("""
+                    INSERT INTO platforms (id, name, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT (id) DO NOTHING
+                """, [failed_id, failed_id, now_str])
+                status_rows[failed_id] = "failed"
+            _insert_rows(
+                conn, "crawl_source_status", _SOURCE_STATUS_COLUMNS,
+                [(crawl_record_id, date, sid, status) for sid, status in status_rows.items()],
+            )
+
+            conn.execute("COMMIT")
+
+            log_parts = [f"[DuckDB存储] 处理完成：新增 {len(inserts)} 条"]
+            if updates:
+                log_parts.append(f"更新 {updated_count} 条")
+            if title_changed_count > 0:
+                log_parts.append(f"标题变更 {title_changed_count} 条")
+            print("，".join(log_parts))
+            return True
+
+        except Exception as e:
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            print(f"[DuckDB存储] 保存失败: {e}")
+            return False
+
+    def _load_items(self, date: str, latest_time: Optional[str] = None) -> Tuple[Dict, Dict]:
+        """
+        读取指定日期的新闻条目（可限定 last_crawl_time）
+
+        Returns:
+            (items, id_to_name)
+        """
+        conn = self._get_connection()
+
+        where = "n.date = CAST(? AS DATE)"
+        params: List = [date]
+        if latest_time is not None:
+            where += " AND n.last_crawl_time = ?"
+            params.append(latest_time)
+
+        rows = conn.execute(f"""
+            SELECT n.id, n.title, n.platform_id, p.name,
+                   n.rank, n.url, n.mobile_url,
+                   n.first_crawl_time, n.last_crawl_time, n.crawl_count
+            FROM news_items n
+            LEFT JOIN platforms p ON n.platform_id = p.id
+            WHERE {where}
+            ORDER BY n.platform_id, n.last_crawl_time, n.id
+        """, params).fetchall()
+
+        if not rows:
+            return {}, {}
+
+        # 排名历史按分区整体读取，避免 IN (...) 超长参数
+        rank_history_map: Dict[int, List[int]] = {}
+        for news_id, rank in conn.execute("""
+            SELECT news_item_id, rank FROM rank_history
+            WHERE date = CAST(? AS DATE)
+            ORDER BY news_item_id, crawl_time
+        """, [date]).fetchall():
+            ranks = rank_history_map.setdefault(news_id, [])
+            if rank not in ranks:
+                ranks.append(rank)
+
+        items: Dict[str, List[NewsItem]] = {}
+        id_to_name: Dict[str, str] = {}
+        for row in rows:
+            platform_id = row[2]
+            platform_name = row[3] or platform_id
+            id_to_name[platform_id] = platform_name
+            items.setdefault(platform_id, []).append(NewsItem(
+                title=row[1],
+                source_id=platform_id,
+                source_name=platform_name,
+                rank=row[4],
+                url=row[5] or "",
+                mobile_url=row[6] or "",
+                crawl_time=row[8],
+                ranks=rank_history_map.get(row[0], [row[4]]),
+                first_time=row[7],
+                last_time=row[8],
+                count=row[9],
+            ))
+
+        return items, id_to_name
+
+    def _get_latest_crawl_time(self, date: str) -> Optional[str]:
+        row = self._get_connection().execute("""
+            SELECT MAX(crawl_time) FROM crawl_records WHERE date = CAST(? AS DATE)
+        """, [date]).fetchone()
+        return row[0] if row else None
+
+    def get_today_all_data(self, date: Optional[str] = None) -> Optional[NewsData]:
+        """
+        获取指定日期的所有新闻数据（合并后）
+
+        Args:
+            date: 日期字符串，默认为今天
+
+        Returns:
+            合并后的新闻数据
+        """
+        try:
+            target_date = self._format_date_folder(date)
+            items, id_to_name = self._load_items(target_date)
+            if not items:
+                return None
+
+            failed_ids = [row[0] for row in self._get_connection().execute("""
+                SELECT DISTINCT platform_id FROM crawl_source_status
+                WHERE date = CAST(? AS DATE) AND status = 'failed'
+            """, [target_date]).fetchall()]
+
+            crawl_time = self._get_latest_crawl_time(target_date) or self._format_time_filename()
+
+            return NewsData(
+                date=target_date,
+                crawl_time=crawl_time,
+                items=items,
+                id_to_name=id_to_name,
+                failed_ids=failed_ids,
+            )
+
+        except Exception as e:
+            print(f"[DuckDB存储] 读取数据失败: {e}")
+            return None
+
+    def get_latest_crawl_data(self, date: Optional[str] = None) -> Optional[NewsData]:
+        """
+        获取最新一次抓取的数据
+
+        Args:
+            date: 日期字符串，默认为今天
+
+        Returns:
+            最新抓取的新闻数据
+        """
+        try:
+            target_date = self._format_date_folder(date)
+            latest_time = self._get_latest_crawl_time(target_date)
+            if not latest_time:
+                return None
+
+            items, id_to_name = self._load_items(target_date, latest_time)
+            if not items:
+                return None
+
+            failed_ids = [row[0] for row in self._get_connection().execute("""
+                SELECT css.platform_id
+                FROM crawl_source_status css
+                JOIN crawl_records cr ON css.crawl_record_id = cr.id
+                WHERE cr.date = CAST(? AS DATE) AND cr.crawl_time = ? AND css.status = 'failed'
+            """, [target_date, latest_time]).fetchall()]
+
+            return NewsData(
+                date=target_date,
+                crawl_time=latest_time,
+                items=items,
+                id_to_name=id_to_name,
+                failed_ids=failed_ids,
+            )
+
+        except Exception as e:
+            print(f"[DuckDB存储] 获取最新数据失败: {e}")
+            return None
+
+    def detect_new_titles(self, current_data: NewsData) -> Dict[str, Dict]:
+        """
+        检测新增的标题
+
+        与 SQLite 后端逻辑一致：只有在更早批次中从未出现过的标题才算新增，
+        但历史标题集合直接由 SQL 过滤得到，不加载整天数据。
+
+        Args:
+            current_data: 当前抓取的数据
+
+        Returns:
+            新增的标题数据 {source_id: {title: NewsItem}}
+        """
+        try:
+            conn = self._get_connection()
+            target_date = self._format_date_folder(current_data.date)
+
+            row = conn.execute("""
+                SELECT COUNT(*) FROM news_items WHERE date = CAST(? AS DATE)
+            """, [target_date]).fetchone()
+            if not row or row[0] == 0:
+                # 没有历史数据，所有都是新的
+                return {
+                    source_id: {item.title: item for item in news_list}
+                    for source_id, news_list in current_data.items.items()
+                }
+
+            historical_titles: Dict[str, set] = {}
+            for platform_id, title in conn.execute("""
+                SELECT DISTINCT platform_id, title FROM news_items
+                WHERE date = CAST(? AS DATE) AND first_crawl_time < ?
+            """, [target_date, current_data.crawl_time]).fetchall():
+                historical_titles.setdefault(platform_id, set()).add(title)
+
+            if not historical_titles:
+                # 第一次抓取，没有"新增"概念
+                return {}
+
+            new_titles: Dict[str, Dict] = {}
+            for source_id, news_list in current_data.items.items():
+                hist_set = historical_titles.get(source_id, set())
+                for item in news_list:
+                    if item.title not in hist_set:
+                        new_titles.setdefault(source_id, {})[item.title] = item
+
+            return new_titles
+
+        except Exception as e:
+            print(f"[DuckDB存储] 检测新标题失败: {e}")
+            return {}
+
+    def save_txt_snapshot(self, data: NewsData) -> Optional[str]:
+        """保存 TXT 快照（写入本地日期目录）"""
+        return self._file_backend.save_txt_snapshot(data)
+
+    def save_html_report(self, html_content: str, filename: str, is_summary: bool = False) -> Optional[str]:
+        """保存 HTML 报告（写入本地日期目录）"""
+        return self._file_backend.save_html_report(html_content, filename, is_summary)
+
+    def is_first_crawl_today(self, date: Optional[str] = None) -> bool:
+        """
+        检查是否是当天第一次抓取
+
+        Args:
+            date: 日期字符串，默认为今天
+
+        Returns:
+            是否是第一次抓取
+        """
+        try:
+            row = self._get_connection().execute("""
+                SELECT COUNT(*) FROM crawl_records WHERE date = CAST(? AS DATE)
+            """, [self._format_date_folder(date)]).fetchone()
+            return (row[0] if row else 0) <= 1
+        except Exception as e:
+            print(f"[DuckDB存储] 检查首次抓取失败: {e}")
+            return True
+
+    def get_crawl_times(self, date: Optional[str] = None) -> List[str]:
+        """
+        获取指定日期的所有抓取时间列表
+
+        Args:
+            date: 日期字符串，默认为今天
+
+        Returns:
+            抓取时间列表（按时间排序）
+        """
+        try:
+            rows = self._get_connection().execute("""
+                SELECT crawl_time FROM crawl_records
+                WHERE date = CAST(? AS DATE) ORDER BY crawl_time
+            """, [self._format_date_folder(date)]).fetchall()
+            return [row[0] for row in rows]
+        except Exception as e:
+            print(f"[DuckDB存储] 获取抓取时间列表失败: {e}")
+            return []
+
+    def list_dates(self) -> List[str]:
+        """
+        列出数据库中所有有数据的日期
+
+        Returns:
+            日期字符串列表（YYYY-MM-DD，倒序）
+        """
+        rows = self._get_connection().execute("""
+            SELECT DISTINCT CAST(date AS VARCHAR) FROM crawl_records ORDER BY 1 DESC
+        """).fetchall()
+        return [row[0] for row in rows]
+
+    def delete_date(self, date: str) -> None:
+        """删除指定日期分区的全部数据"""
+        conn = self._get_connection()
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            for table in _DATE_PARTITIONED_TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE date = CAST(? AS DATE)", [date])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def cleanup(self) -> None:
+        """清理资源（关闭数据库连接）"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+                print(f"[DuckDB存储] 关闭数据库连接: {self.db_path}")
+            except Exception as e:
+                print(f"[DuckDB存储] 关闭连接失败 {self.db_path}: {e}")
+            self._conn = None
+
+    def cleanup_old_data(self, retention_days: int) -> int:
+        """
+        清理过期数据（按日期分区删除，同时清理本地 TXT/HTML 日期目录）
+
+        Args:
+            retention_days: 保留天数（0 表示不清理）
+
+        Returns:
+            删除的日期数量
+        """
+        if retention_days <= 0:
+            return 0
+
+        cutoff = (self._get_configured_time() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+
+        try:
+            conn = self._get_connection()
+            expired = [row[0] for row in conn.execute("""
+                SELECT DISTINCT CAST(date AS VARCHAR) FROM news_items WHERE date < CAST(? AS DATE)
+                UNION
+                SELECT DISTINCT CAST(date AS VARCHAR) FROM crawl_records WHERE date < CAST(? AS DATE)
+            """, [cutoff, cutoff]).fetchall()]
+
+            if expired:
+                conn.execute("BEGIN TRANSACTION")
+                try:
+                    for table in _DATE_PARTITIONED_TABLES:
+                        conn.execute(f"DELETE FROM {table} WHERE date < CAST(? AS DATE)", [cutoff])
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+
+                for date_str in sorted(expired):
+                    print(f"[DuckDB存储] 清理过期数据: {date_str}")
+                print(f"[DuckDB存储] 共清理 {len(expired)} 个过期日期")
+
+            # TXT/HTML 文件目录
+            self._file_backend.cleanup_old_data(retention_days)
+            return len(expired)
+
+        except Exception as e:
+            print(f"[DuckDB存储] 清理过期数据失败: {e}")
+            return 0
+
+    def has_pushed_today(self, date: Optional[str] = None) -> bool:
+        """
+        检查指定日期是否已推送过
+
+        Args:
+            date: 日期字符串（YYYY-MM-DD），默认为今天
+
+        Returns:
+            是否已推送
+        """
+        try:
+            row = self._get_connection().execute("""
+                SELECT pushed FROM push_records WHERE date = CAST(? AS DATE)
+            """, [self._format_date_folder(date)]).fetchone()
+            return bool(row[0]) if row else False
+        except Exception as e:
+            print(f"[DuckDB存储] 检查推送记录失败: {e}")
+            return False
+
+    def record_push(self, report_type: str, date: Optional[str] = None) -> bool:
+        """
+        记录推送
+
+        Args:
+            report_type: 报告类型
+            date: 日期字符串（YYYY-MM-DD），默认为今天
+
+        Returns:
+            是否记录成功
+        """
+        try:
+            target_date = self._format_date_folder(date)
+            now_str = self._get_configured_time().strftime("%Y-%m-%d %H:%M:%S")
+
+            self._get_connection().execute("""
+                INSERT INTO push_records (date, pushed, push_time, report_type, created_at)
+                VALUES (CAST(? AS DATE), 1, ?, ?, ?)
+                ON CONFLICT (date) DO UPDATE SET
+                    pushed = 1,
+                    push_time = excluded.push_time,
+                    report_type = excluded.report_type
+            """, [target_date, now_str, report_type, now_str])
+
+            print(f"[DuckDB存储] 推送记录已保存: {report_type} at {now_str}")
+            return True
+
+        except Exception as e:
+            print(f"[DuckDB存储] 记录推送失败: {e}")
+            return False
+
+    # === 推送队列（notification_outbox） ===
+
+    def _select_outbox(self, where: str, params: List, tail: str = "") -> List[Dict]:
+        """按条件查询推送批次（列与 storage/outbox.py 一致）"""
+        cursor = self._get_connection().execute(
+            f"SELECT {', '.join(OUTBOX_SELECT_COLUMNS)} FROM notification_outbox WHERE {where} {tail}",
+            params,
+        )
+        return [dict(zip(OUTBOX_SELECT_COLUMNS, row)) for row in cursor.fetchall()]
+
+    def outbox_enqueue(self, rows: List[Dict], date: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+        """推送批次入队（幂等键已存在时忽略）"""
+        if not rows:
+            return {}
+        try:
+            conn = self._get_connection()
+            target_date = self._format_date_folder(date)
+            next_id = self._next_id(conn, "notification_outbox")
+            conn.executemany(
+                f"INSERT OR IGNORE INTO notification_outbox "
+                f"(id, date, {', '.join(OUTBOX_INSERT_COLUMNS)}) "
+                f"VALUES (?, CAST(? AS DATE), {', '.join('?' for _ in OUTBOX_INSERT_COLUMNS)})",
+                [
+                    [next_id + i, target_date] + [row[column] for column in OUTBOX_INSERT_COLUMNS]
+                    for i, row in enumerate(rows)
+                ],
+            )
+            keys = [row["idempotency_key"] for row in rows]
+            stored = self._select_outbox(
+                f"date = CAST(? AS DATE) AND idempotency_key IN ({', '.join('?' for _ in keys)})",
+                [target_date] + keys,
+            )
+            return {row["idempotency_key"]: row for row in stored}
+        except Exception as e:
+            print(f"[DuckDB存储] 推送批次入队失败: {e}")
+            return None
+
+    def outbox_pending(
+        self, account_key: str, now_str: str, date: Optional[str] = None
+    ) -> List[Dict]:
+        """查询某账号已到重试时间的失败批次（只返回 attempts > 0 的行，按入队顺序）"""
+        try:
+            return self._select_outbox(
+                "date = CAST(? AS DATE) AND account_key = ? AND status = 'pending' AND attempts > 0 "
+                "AND (next_attempt_at IS NULL OR next_attempt_at <= ?)",
+                [self._format_date_folder(date), account_key, now_str],
+                "ORDER BY id LIMIT 100",
+            )
+        except Exception as e:
+            print(f"[DuckDB存储] 查询待发送批次失败: {e}")
+            return []
+
+    def outbox_update(
+        self, idempotency_key: str, changes: Dict, date: Optional[str] = None
+    ) -> bool:
+        """更新推送批次的发送状态"""
+        columns = [column for column in OUTBOX_UPDATE_COLUMNS if column in changes]
+        if not columns:
+            return False
+        try:
+            row = self._get_connection().execute(
+                f"UPDATE notification_outbox SET {', '.join(f'{c} = ?' for c in columns)} "
+                "WHERE date = CAST(? AS DATE) AND idempotency_key = ?",
+                [changes[column] for column in columns]
+                + [self._format_date_folder(date), idempotency_key],
+            ).fetchone()
+            return bool(row and row[0])
+        except Exception as e:
+            print(f"[DuckDB存储] 更新推送批次状态失败: {e}")
+            return False
+
+    # === 推送指纹 ===
+
+    def get_notification_fingerprint(
+        self, channel: str, report_type: str, date: Optional[str] = None
+    ) -> Optional[Dict]:
+        """获取某渠道、某报告类型最近一次送达的报告指纹"""
+        try:
+            row = self._get_connection().execute("""
+                SELECT fingerprint, full_sent_at, updated_at FROM notification_fingerprints
+                WHERE date = CAST(? AS DATE) AND channel = ? AND report_type = ?
+            """, [self._format_date_folder(date), channel, report_type]).fetchone()
+        except Exception as e:
+            print(f"[DuckDB存储] 读取推送指纹失败: {e}")
+            return None
+        if row is None:
+            return None
+        return {"fingerprint": row[0], "full_sent_at": row[1], "updated_at": row[2]}
+
+    def save_notification_fingerprint(
+        self,
+        channel: str,
+        report_type: str,
+        fingerprint: str,
+        full_sent_at: Optional[str] = None,
+        date: Optional[str] = None,
+    ) -> bool:
+        """保存报告指纹（full_sent_at 为 None 时保留原值）"""
+        try:
+            now_str = self._get_configured_time().strftime("%Y-%m-%d %H:%M:%S")
+            self._get_connection().execute("""
+                INSERT INTO notification_fingerprints
+                    (date, channel, report_type, fingerprint, full_sent_at, updated_at)
+                VALUES (CAST(? AS DATE), ?, ?, ?, ?, ?)
+                ON CONFLICT (date, channel, report_type) DO UPDATE SET
+                    fingerprint = excluded.fingerprint,
+                    full_sent_at = COALESCE(excluded.full_sent_at, notification_fingerprints.full_sent_at),
+                    updated_at = excluded.updated_at
+            """, [self._format_date_folder(date), channel, report_type, fingerprint, full_sent_at, now_str])
+            return True
+        except Exception as e:
+            print(f"[DuckDB存储] 保存推送指纹失败: {e}")
+            return False
+
+    def import_sqlite_day(self, sqlite_path: str, date: str) -> int:
+        """
+        从每日 SQLite 文件导入一天的数据（ID 重新分配，同目录下的分片一并导入）
+
+        Args:
+            sqlite_path: news.db 路径
+            date: 日期（YYYY-MM-DD）
+
+        Returns:
+            导入的新闻条目数量
+        """
+        src = connect_merged(Path(sqlite_path))
+        conn = self._get_connection()
+        try:
+            conn.execute("BEGIN TRANSACTION")
+
+            platform_rows = src.execute("SELECT id, name, updated_at FROM platforms").fetchall()
+            _insert_rows(
+                conn, "platforms", ("id", "name", "updated_at"),
+                [(r[0], r[1], str(r[2]) if r[2] is not None else None) for r in platform_rows],
+                "ON CONFLICT (id) DO UPDATE SET name = excluded.name",
+            )
+
+            id_offset = self._next_id(conn, "news_items")
+            news_rows = src.execute("""
+                SELECT id, title, platform_id, rank, url, mobile_url,
+                       first_crawl_time, last_crawl_time, crawl_count, created_at, updated_at
+                FROM news_items
+            """).fetchall()
+            _insert_rows(conn, "news_items", _NEWS_ITEM_COLUMNS, [
+                (r[0] + id_offset, date, r[1], r[2], r[3], r[4] or "", r[5] or "",
+                 r[6], r[7], r[8], r[9], r[10],
+                 *title_forms(r[1]), url_forms(r[4] or "", r[2])[1])
+                for r in news_rows
+            ])
+
+            rank_rows = src.execute(
+                "SELECT news_item_id, rank, crawl_time, created_at FROM rank_history"
+            ).fetchall()
+            _insert_rows(
+                conn, "rank_history", _RANK_HISTORY_COLUMNS,
+                [(r[0] + id_offset, date, r[1], r[2], r[3]) for r in rank_rows],
+            )
+
+            change_rows = src.execute(
+                "SELECT news_item_id, old_title, new_title, changed_at FROM title_changes"
+            ).fetchall()
+            _insert_rows(
+                conn, "title_changes", _TITLE_CHANGE_COLUMNS,
+                [(r[0] + id_offset, date, r[1], r[2], r[3]) for r in change_rows],
+            )
+
+            record_offset = self._next_id(conn, "crawl_records")
+            record_rows = src.execute(
+                "SELECT id, crawl_time, total_items, created_at FROM crawl_records"
+            ).fetchall()
+            _insert_rows(
+                conn, "crawl_records", ("id", "date", "crawl_time", "total_items", "created_at"),
+                [(r[0] + record_offset, date, r[1], r[2], r[3]) for r in record_rows],
+            )
+
+            status_rows = src.execute(
+                "SELECT crawl_record_id, platform_id, status FROM crawl_source_status"
+            ).fetchall()
+            _insert_rows(
+                conn, "crawl_source_status", _SOURCE_STATUS_COLUMNS,
+                [(r[0] + record_offset, date, r[1], r[2]) for r in status_rows],
+            )
+
+            push_row = src.execute(
+                "SELECT pushed, push_time, report_type, created_at FROM push_records LIMIT 1"
+            ).fetchone()
+            if push_row:
+                conn.execute("""
+                    INSERT INTO push_records (date, pushed, push_time, report_type, created_at)
+                    VALUES (CAST(? AS DATE), ?, ?, ?, ?)
+                    ON CONFLICT (date) DO NOTHING
+                """, [date, push_row[0], push_row[1], push_row[2], push_row[3]])
+
+            conn.execute("COMMIT")
+            return len(news_rows)
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            src.close()
+
+    def __del__(self):
+        """析构函数，确保关闭连接"""
+        try:
+            self.cleanup()
+        except Exception:
+            pass
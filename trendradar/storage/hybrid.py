@@ -0,0 +1,177 @@
+# coding=utf-8
+"""
+混合存储后端 - 本地 SQLite 为主 + 远程异步复制
+
+读写全部走本地 SQLite（WAL 模式），每次写入后把当天数据库快照
+写入复制日志，由后台线程异步上传到 S3 兼容存储。
+适用于 Docker 部署：本地分析速度不受对象存储影响，
+同时远程保留一份副本供 GitHub Actions / MCP Server 使用。
+"""
+
+import atexit
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from trendradar.storage.base import NewsData
+from trendradar.storage.local import LocalStorageBackend
+from trendradar.storage.upload_queue import UploadQueue
+
+
+class HybridStorageBackend(LocalStorageBackend):
+    """
+    混合存储后端
+
+    特点：
+    - 继承 LocalStorageBackend，所有读操作与本地模式一致
+    - 本地数据库启用 WAL，写入不阻塞读取
+    - save_news_data / record_push / 推送指纹写入成功后入队复制任务，合并窗口内只上传一次
+    - 推送队列的变更只记录日期，由 sync_outbox 在每次推送结束后按日期复制一次
+    - 复制日志持久化在 data_dir/.replication_journal，中断后下次运行继续上传
+    """
+
+    def __init__(
+        self,
+        remote_backend,
+        data_dir: str = "output",
+        enable_txt: bool = True,
+        enable_html: bool = True,
+        timezone: str = "Asia/Shanghai",
+        journal_dir: Optional[str] = None,
+        replication_coalesce_seconds: float = 5.0,
+    ):
+        """
+        初始化混合存储后端
+
+        Args:
+            remote_backend: 远程存储后端实例（RemoteStorageBackend，仅用于上传）
+            data_dir: 本地数据目录路径
+            enable_txt: 是否启用 TXT 快照
+            enable_html: 是否启用 HTML 报告
+            timezone: 时区配置（默认 Asia/Shanghai）
+            journal_dir: 复制日志目录（默认 data_dir/.replication_journal）
+            replication_coalesce_seconds: 复制合并窗口（秒）
+        """
+        super().__init__(
+            data_dir=data_dir,
+            enable_txt=enable_txt,
+            enable_html=enable_html,
+            timezone=timezone,
+            enable_wal=True,
+        )
+        self.remote_backend = remote_backend
+
+        journal_path = Path(journal_dir) if journal_dir else self.data_dir / ".replication_journal"
+        self._replication_queue = UploadQueue(
+            journal_dir=str(journal_path),
+            put_func=remote_backend._put_object_file,
+            delete_func=remote_backend._delete_objects,
+            coalesce_seconds=replication_coalesce_seconds,
+            log_prefix="[混合存储-复制]",
+        )
+        # 推送队列有变更、尚未复制的日期（由 sync_outbox 统一复制）
+        self._outbox_dirty_dates: Set[Optional[str]] = set()
+        # 兜底：进程退出前刷新复制队列
+        atexit.register(self._replication_queue.close)
+
+        print(f"[混合存储] 初始化完成，本地目录: {self.data_dir}，远程存储桶: {remote_backend.bucket_name}")
+
+    @property
+    def backend_name(self) -> str:
+        return "hybrid"
+
+    def _replicate(self, date: Optional[str] = None) -> bool:
+        """
+        将指定日期的本地数据库入队复制到远程
+
+        Args:
+            date: 日期字符串
+
+        Returns:
+            是否已入队
+        """
+        db_path = self._get_db_path(date)
+        if not db_path.exists():
+            return False
+
+        r2_key = self.remote_backend._get_remote_db_key(date)
+        if self._replication_queue.enqueue_sqlite(r2_key, db_path):
+            return True
+
+        print(f"[混合存储] 复制任务入队失败: {r2_key}")
+        return False
+
+    def save_news_data(self, data: NewsData) -> bool:
+        """保存新闻数据到本地 SQLite，并异步复制到远程"""
+        if not super().save_news_data(data):
+            return False
+        self._replicate(data.date)
+        return True
+
+    def record_push(self, report_type: str, date: Optional[str] = None) -> bool:
+        """记录推送到本地 SQLite，并异步复制到远程"""
+        if not super().record_push(report_type, date):
+            return False
+        self._replicate(date)
+        return True
+
+    def outbox_enqueue(self, rows: List[Dict], date: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+        """推送批次入队到本地 SQLite（复制推迟到 sync_outbox）"""
+        result = super().outbox_enqueue(rows, date)
+        if result is not None:
+            self._outbox_dirty_dates.add(date)
+        return result
+
+    def outbox_update(self, idempotency_key: str, changes: Dict, date: Optional[str] = None) -> bool:
+        """更新推送批次状态（复制推迟到 sync_outbox）"""
+        if not super().outbox_update(idempotency_key, changes, date):
+            return False
+        self._outbox_dirty_dates.add(date)
+        return True
+
+    def sync_outbox(self) -> None:
+        """将推送队列的变更复制到远程（每个日期的数据库入队一次）"""
+        dates, self._outbox_dirty_dates = self._outbox_dirty_dates, set()
+        for date in dates:
+            if not self._replicate(date):
+                self._outbox_dirty_dates.add(date)
+
+    def save_notification_fingerprint(
+        self,
+        channel: str,
+        report_type: str,
+        fingerprint: str,
+        full_sent_at: Optional[str] = None,
+        date: Optional[str] = None,
+    ) -> bool:
+        """保存报告指纹到本地 SQLite，并异步复制到远程"""
+        if not super().save_notification_fingerprint(channel, report_type, fingerprint, full_sent_at, date):
+            return False
+        self._replicate(date)
+        return True
+
+    def flush_replication(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有复制任务完成
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+
+        Returns:
+            是否全部完成
+        """
+        return self._replication_queue.flush(timeout)
+
+    def cleanup(self) -> None:
+        """清理资源（刷新复制队列、关闭本地连接、清理远程临时目录）"""
+        if getattr(self, "_outbox_dirty_dates", None):
+            self.sync_outbox()
+
+        replication_queue = getattr(self, "_replication_queue", None)
+        if replication_queue:
+            replication_queue.close()
+
+        super().cleanup()
+
+        remote_backend = getattr(self, "remote_backend", None)
+        if remote_backend:
+            remote_backend.cleanup()
@@ -13,13 +13,58 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from trendradar.storage.base import StorageBackend, NewsItem, NewsData
+from trendradar.storage.base import (
+    StorageBackend,
+    NewsItem,
+    NewsData,
+    NORMALIZED_NEWS_COLUMNS,
+)
 from trendradar.utils.time import (
     get_configured_time,
     format_date_folder,
     format_time_filename,
 )
-from trendradar.utils.url import normalize_url
+from trendradar.storage.outbox import (
+    enqueue_outbox_rows,
+    select_fingerprint,
+    select_pending_outbox,
+    update_outbox_row,
+    upsert_fingerprint,
+)
+from trendradar.utils.text import title_forms, register_title_forms
+from trendradar.utils.url import url_forms
+
+
+def sqlite_read_only_uri(db_path) -> str:
+    """SQLite 只读连接 URI（文件不存在时连接报错，而不是创建空库）"""
+    return Path(db_path).resolve().as_uri() + "?mode=ro"
+
+
+def migrate_news_items_columns(conn, schema: str = "main") -> bool:
+    """
+    为旧数据库的 news_items 表补充规范化列（新数据库由 schema.sql 直接创建）
+
+    Args:
+        conn: SQLite 连接
+        schema: 数据库名（ATTACH 的分片为 shardN）
+
+    Returns:
+        表中是否具备全部规范化列（只读连接无法迁移时为 False）
+    """
+    existing = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(news_items)")}
+    missing = [column for column in NORMALIZED_NEWS_COLUMNS if column not in existing]
+    if not existing or not missing:
+        return bool(existing)
+    try:
+        for column in missing:
+            conn.execute(
+                f"ALTER TABLE {schema}.news_items ADD COLUMN {column} TEXT DEFAULT ''"
+            )
+        conn.commit()
+        return True
+    except sqlite3.Error:
+        # 只读连接（如 MCP Server）无法迁移，调用方回退为按需计算
+        return False
 
 
 class LocalStorageBackend(StorageBackend):
@@ -38,6 +83,8 @@ class LocalStorageBackend(StorageBackend):
         enable_txt: bool = True,
         enable_html: bool = True,
         timezone: str = "Asia/Shanghai",
+        enable_wal: bool = False,
+        read_only: bool = False,
     ):
         """
         初始化本地存储后端
@@ -47,11 +94,15 @@ class LocalStorageBackend(StorageBackend):
             enable_txt: 是否启用 TXT 快照
             enable_html: 是否启用 HTML 报告
             timezone: 时区配置（默认 Asia/Shanghai）
+            enable_wal: 是否使用 WAL 日志模式（读写并发更好）
+            read_only: 只读打开数据库（mode=ro，不建表、不迁移，用于租户进程读取共享数据）
         """
         self.data_dir = Path(data_dir)
         self.enable_txt = enable_txt
         self.enable_html = enable_html
         self.timezone = timezone
+        self.enable_wal = enable_wal
+        self.read_only = read_only
         self._db_connections: Dict[str, sqlite3.Connection] = {}
 
     @property
@@ -86,8 +137,25 @@ class LocalStorageBackend(StorageBackend):
         db_path = str(self._get_db_path(date))
 
         if db_path not in self._db_connections:
-            conn = sqlite3.connect(db_path)
+            if self.read_only:
+                if Path(db_path).exists():
+                    conn = sqlite3.connect(
+                        sqlite_read_only_uri(db_path), uri=True, check_same_thread=False
+                    )
+                else:
+                    # 数据库尚未创建（如分片模式下分片 0 没有数据）：使用空的内存库，不创建文件
+                    conn = sqlite3.connect(":memory:", uri=True, check_same_thread=False)
+                    self._init_tables(conn)
+                conn.row_factory = sqlite3.Row
+                self._db_connections[db_path] = conn
+                return conn
+
+            # 推送队列会在并发推送线程中读写（由 NotificationOutbox 加锁串行访问）
+            conn = sqlite3.connect(db_path, check_same_thread=False)
             conn.row_factory = sqlite3.Row
+            if self.enable_wal:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
             self._init_tables(conn)
             self._db_connections[db_path] = conn
 
@@ -105,6 +173,7 @@ class LocalStorageBackend(StorageBackend):
             with open(schema_path, "r", encoding="utf-8") as f:
                 schema_sql = f.read()
             conn.executescript(schema_sql)
+            migrate_news_items_columns(conn)
         else:
             raise FileNotFoundError(f"Schema file not found: {schema_path}")
         
@@ -148,8 +217,9 @@ class LocalStorageBackend(StorageBackend):
 
                 for item in news_list:
                     try:
-                        # 标准化 URL（去除动态参数，如微博的 band_rank）
-                        normalized_url = normalize_url(item.url, source_id) if item.url else ""
+                        # 规范化形式只在入库时计算一次（标准化 URL 去除微博 band_rank 等动态参数）
+                        normalized_url, url_signature = url_forms(item.url, source_id)
+                        title_clean, title_fold = title_forms(item.title)
 
                         # 检查是否已存在（通过标准化 URL + platform_id）
                         if normalized_url:
@@ -188,10 +258,14 @@ class LocalStorageBackend(StorageBackend):
                                         mobile_url = ?,
                                         last_crawl_time = ?,
                                         crawl_count = crawl_count + 1,
-                                        updated_at = ?
+                                        updated_at = ?,
+                                        title_clean = ?,
+                                        title_fold = ?,
+                                        url_signature = ?
                                     WHERE id = ?
                                 """, (item.title, item.rank, item.mobile_url,
-                                      data.crawl_time, now_str, existing_id))
+                                      data.crawl_time, now_str, title_clean, title_fold,
+                                      url_signature, existing_id))
                                 updated_count += 1
                             else:
                                 # 不存在，插入新记录（存储标准化后的 URL）
@@ -199,11 +273,13 @@ class LocalStorageBackend(StorageBackend):
                                     INSERT INTO news_items
                                     (title, platform_id, rank, url, mobile_url,
                                      first_crawl_time, last_crawl_time, crawl_count,
-                                     created_at, updated_at)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                                     created_at, updated_at,
+                                     title_clean, title_fold, url_signature)
+                                    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
                                 """, (item.title, source_id, item.rank, normalized_url,
                                       item.mobile_url, data.crawl_time, data.crawl_time,
-                                      now_str, now_str))
+                                      now_str, now_str, title_clean, title_fold,
+                                      url_signature))
                                 new_id = cursor.lastrowid
                                 # 记录初始排名
                                 cursor.execute("""
@@ -218,11 +294,12 @@ class LocalStorageBackend(StorageBackend):
                                 INSERT INTO news_items
                                 (title, platform_id, rank, url, mobile_url,
                                  first_crawl_time, last_crawl_time, crawl_count,
-                                 created_at, updated_at)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                                 created_at, updated_at,
+                                 title_clean, title_fold, url_signature)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, '')
                             """, (item.title, source_id, item.rank, "",
                                   item.mobile_url, data.crawl_time, data.crawl_time,
-                                  now_str, now_str))
+                                  now_str, now_str, title_clean, title_fold))
                             new_id = cursor.lastrowid
                             # 记录初始排名
                             cursor.execute("""
@@ -312,7 +389,8 @@ class LocalStorageBackend(StorageBackend):
             cursor.execute("""
                 SELECT n.id, n.title, n.platform_id, p.name as platform_name,
                        n.rank, n.url, n.mobile_url,
-                       n.first_crawl_time, n.last_crawl_time, n.crawl_count
+                       n.first_crawl_time, n.last_crawl_time, n.crawl_count,
+                       n.title_clean, n.title_fold
                 FROM news_items n
                 LEFT JOIN platforms p ON n.platform_id = p.id
                 ORDER BY n.platform_id, n.last_crawl_time
@@ -350,6 +428,8 @@ class LocalStorageBackend(StorageBackend):
                 news_id = row[0]
                 platform_id = row[2]
                 title = row[1]
+                # 预填规范化形式，后续匹配 / 渲染不再重复计算
+                register_title_forms(title, row[10], row[11])
                 platform_name = row[3] or platform_id
 
                 id_to_name[platform_id] = platform_name
@@ -407,6 +487,81 @@ class LocalStorageBackend(StorageBackend):
             print(f"[本地存储] 读取数据失败: {e}")
             return None
 
+    def get_news_rows_since(
+        self, since_crawl_time: str = "", date: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        增量读取新闻行（供增量分析状态使用）
+
+        每次抓取都会把出现的新闻的 last_crawl_time 更新为本次抓取时间，
+        因此 last_crawl_time >= since_crawl_time 的行覆盖了自上次读取以来的全部变化。
+
+        Args:
+            since_crawl_time: 起始抓取时间（HH-MM），空串表示读取全部
+            date: 日期字符串，默认为今天
+
+        Returns:
+            {"total": 新闻总行数, "platforms": {id: name},
+             "rows": [(id, title, platform_id, rank, url, mobile_url,
+                       first_time, last_time, count, ranks), ...]}，
+            数据库不存在返回 None
+        """
+        try:
+            db_path = self._get_db_path(date)
+            if not db_path.exists():
+                return None
+
+            conn = self._get_connection(date)
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT COUNT(*) FROM news_items")
+            total = cursor.fetchone()[0]
+
+            cursor.execute("SELECT id, name FROM platforms")
+            platforms = {row[0]: row[1] for row in cursor.fetchall()}
+
+            cursor.execute("""
+                SELECT id, title, platform_id, rank, url, mobile_url,
+                       first_crawl_time, last_crawl_time, crawl_count,
+                       title_clean, title_fold
+                FROM news_items
+                WHERE last_crawl_time >= ?
+            """, (since_crawl_time,))
+            news_rows = cursor.fetchall()
+            for row in news_rows:
+                register_title_forms(row[1], row[9], row[10])
+
+            # 只查询变化行的排名历史（去重并保持时间顺序，与 get_today_all_data 一致）
+            rank_history_map: Dict[int, List[int]] = {}
+            if news_rows:
+                cursor.execute("""
+                    SELECT rh.news_item_id, rh.rank FROM rank_history rh
+                    JOIN news_items n ON n.id = rh.news_item_id
+                    WHERE n.last_crawl_time >= ?
+                    ORDER BY rh.news_item_id, rh.crawl_time
+                """, (since_crawl_time,))
+                for news_id, rank in cursor.fetchall():
+                    ranks = rank_history_map.setdefault(news_id, [])
+                    if rank not in ranks:
+                        ranks.append(rank)
+
+            rows = [
+                (
+                    row[0], row[1], row[2], row[3], row[4] or "", row[5] or "",
+                    row[6], row[7], row[8], rank_history_map.get(row[0], [row[3]]),
+                )
+                for row in news_rows
+            ]
+            return {"total": total, "platforms": platforms, "rows": rows}
+
+        except Exception as e:
+            print(f"[本地存储] 增量读取数据失败: {e}")
+            return None
+
+    def get_analysis_state_path(self, date: Optional[str] = None) -> Optional[Path]:
+        """增量分析状态文件与当天数据库放在同一目录"""
+        return self._get_db_path(date).parent / "analysis_state.jsonl"
+
     def get_latest_crawl_data(self, date: Optional[str] = None) -> Optional[NewsData]:
         """
         获取最新一次抓取的数据
@@ -884,6 +1039,69 @@ class LocalStorageBackend(StorageBackend):
             print(f"[本地存储] 记录推送失败: {e}")
             return False
 
+    # === 推送队列 ===
+
+    def outbox_enqueue(self, rows: List[Dict], date: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+        """推送批次入队（幂等键已存在时忽略）"""
+        try:
+            return enqueue_outbox_rows(self._get_connection(date), rows)
+        except Exception as e:
+            print(f"[本地存储] 推送批次入队失败: {e}")
+            return None
+
+    def outbox_pending(
+        self, account_key: str, now_str: str, date: Optional[str] = None
+    ) -> List[Dict]:
+        """查询某账号已到重试时间的待发送批次（该日期没有数据库时返回空列表）"""
+        if date and not (self.data_dir / self._format_date_folder(date) / "news.db").exists():
+            return []
+        try:
+            return select_pending_outbox(self._get_connection(date), account_key, now_str)
+        except Exception as e:
+            print(f"[本地存储] 查询待发送批次失败: {e}")
+            return []
+
+    def outbox_update(
+        self, idempotency_key: str, changes: Dict, date: Optional[str] = None
+    ) -> bool:
+        """更新推送批次的发送状态"""
+        try:
+            return update_outbox_row(self._get_connection(date), idempotency_key, changes)
+        except Exception as e:
+            print(f"[本地存储] 更新推送批次状态失败: {e}")
+            return False
+
+    # === 推送指纹 ===
+
+    def get_notification_fingerprint(
+        self, channel: str, report_type: str, date: Optional[str] = None
+    ) -> Optional[Dict]:
+        """获取某渠道、某报告类型最近一次送达的报告指纹"""
+        try:
+            return select_fingerprint(self._get_connection(date), channel, report_type)
+        except Exception as e:
+            print(f"[本地存储] 读取推送指纹失败: {e}")
+            return None
+
+    def save_notification_fingerprint(
+        self,
+        channel: str,
+        report_type: str,
+        fingerprint: str,
+        full_sent_at: Optional[str] = None,
+        date: Optional[str] = None,
+    ) -> bool:
+        """保存报告指纹"""
+        try:
+            now_str = self._get_configured_time().strftime("%Y-%m-%d %H:%M:%S")
+            upsert_fingerprint(
+                self._get_connection(date), channel, report_type, fingerprint, full_sent_at, now_str
+            )
+            return True
+        except Exception as e:
+            print(f"[本地存储] 保存推送指纹失败: {e}")
+            return False
+
     def __del__(self):
         """析构函数，确保关闭连接"""
         self.cleanup()
@@ -6,7 +6,8 @@
 """
 
 import os
-from typing import Optional
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from trendradar.storage.base import StorageBackend, NewsData
 
@@ -21,7 +22,7 @@ class StorageManager:
 
     功能：
     - 自动检测运行环境（GitHub Actions / Docker / 本地）
-    - 根据配置选择存储后端（local / remote / auto）
+    - 根据配置选择存储后端（local / remote / hybrid / duckdb / sharded / auto）
     - 提供统一的存储接口
     - 支持从远程拉取数据到本地
     """
@@ -38,21 +39,28 @@ class StorageManager:
         pull_enabled: bool = False,
         pull_days: int = 0,
         timezone: str = "Asia/Shanghai",
+        duckdb_path: str = "",
+        sharding_config: Optional[dict] = None,
+        read_only: bool = False,
     ):
         """
         初始化存储管理器
 
         Args:
-            backend_type: 存储后端类型 (local / remote / auto)
+            backend_type: 存储后端类型 (local / remote / hybrid / duckdb / sharded / auto)
             data_dir: 本地数据目录
             enable_txt: 是否启用 TXT 快照
             enable_html: 是否启用 HTML 报告
-            remote_config: 远程存储配置（endpoint_url, bucket_name, access_key_id 等）
+            remote_config: 远程存储配置（endpoint_url, bucket_name, access_key_id, async_upload 等）
             local_retention_days: 本地数据保留天数（0 = 无限制）
             remote_retention_days: 远程数据保留天数（0 = 无限制）
             pull_enabled: 是否启用启动时自动拉取
             pull_days: 拉取最近 N 天的数据
             timezone: 时区配置（默认 Asia/Shanghai）
+            duckdb_path: DuckDB 文件路径（默认 data_dir/trendradar.duckdb）
+            sharding_config: 分片配置（shard_count, platform_groups）
+            read_only: 只读模式（租户进程）：本地数据库以 mode=ro 打开，
+                混合存储按本地只读读取，远程存储不启用异步上传（不接管主进程的上传日志）
         """
         self.backend_type = backend_type
         self.data_dir = data_dir
@@ -64,6 +72,9 @@ class StorageManager:
         self.pull_enabled = pull_enabled
         self.pull_days = pull_days
         self.timezone = timezone
+        self.duckdb_path = duckdb_path or os.path.join(data_dir, "trendradar.duckdb")
+        self.sharding_config = sharding_config or {}
+        self.read_only = read_only
 
         self._backend: Optional[StorageBackend] = None
         self._remote_backend: Optional[StorageBackend] = None
@@ -123,8 +134,16 @@ class StorageManager:
 
         return has_config
 
-    def _create_remote_backend(self) -> Optional[StorageBackend]:
-        """创建远程存储后端"""
+    def _create_remote_backend(self, async_upload: Optional[bool] = None) -> Optional[StorageBackend]:
+        """
+        创建远程存储后端
+
+        Args:
+            async_upload: 是否启用异步上传，None 表示使用配置
+        """
+        if async_upload is None:
+            async_upload = self.remote_config.get("async_upload", False) and not self.read_only
+
         try:
             from trendradar.storage.remote import RemoteStorageBackend
 
@@ -137,6 +156,9 @@ class StorageManager:
                 enable_txt=self.enable_txt,
                 enable_html=self.enable_html,
                 timezone=self.timezone,
+                async_upload=async_upload,
+                journal_dir=os.path.join(self.data_dir, ".upload_journal"),
+                upload_coalesce_seconds=self.remote_config.get("upload_coalesce_seconds", 5.0),
             )
         except ImportError as e:
             print(f"[存储管理器] 远程后端导入失败: {e}")
@@ -146,6 +168,71 @@ class StorageManager:
             print(f"[存储管理器] 远程后端初始化失败: {e}")
             return None
 
+    def _create_hybrid_backend(self) -> Optional[StorageBackend]:
+        """创建混合存储后端（本地为主，异步复制到远程）"""
+        if not self._has_remote_config():
+            print("[存储管理器] 混合存储需要远程存储配置")
+            return None
+
+        # 复制由混合后端自己的队列负责，远程后端只作为上传客户端
+        remote_backend = self._create_remote_backend(async_upload=False)
+        if remote_backend is None:
+            return None
+
+        try:
+            from trendradar.storage.hybrid import HybridStorageBackend
+
+            return HybridStorageBackend(
+                remote_backend=remote_backend,
+                data_dir=self.data_dir,
+                enable_txt=self.enable_txt,
+                enable_html=self.enable_html,
+                timezone=self.timezone,
+                replication_coalesce_seconds=self.remote_config.get("upload_coalesce_seconds", 5.0),
+            )
+        except Exception as e:
+            print(f"[存储管理器] 混合后端初始化失败: {e}")
+            remote_backend.cleanup()
+            return None
+
+    def _create_duckdb_backend(self) -> Optional[StorageBackend]:
+        """创建 DuckDB 存储后端"""
+        try:
+            from trendradar.storage.duckdb_backend import DuckDBStorageBackend
+
+            return DuckDBStorageBackend(
+                db_path=self.duckdb_path,
+                data_dir=self.data_dir,
+                enable_txt=self.enable_txt,
+                enable_html=self.enable_html,
+                timezone=self.timezone,
+            )
+        except ImportError as e:
+            print(f"[存储管理器] DuckDB 后端导入失败: {e}")
+            print("[存储管理器] 请确保已安装 duckdb: pip install duckdb")
+            return None
+        except Exception as e:
+            print(f"[存储管理器] DuckDB 后端初始化失败: {e}")
+            return None
+
+    def _create_sharded_backend(self) -> Optional[StorageBackend]:
+        """创建分片存储后端"""
+        try:
+            from trendradar.storage.sharded import ShardedStorageBackend
+
+            return ShardedStorageBackend(
+                data_dir=self.data_dir,
+                enable_txt=self.enable_txt,
+                enable_html=self.enable_html,
+                timezone=self.timezone,
+                shard_count=self.sharding_config.get("shard_count", 4),
+                platform_groups=self.sharding_config.get("platform_groups"),
+                read_only=self.read_only,
+            )
+        except Exception as e:
+            print(f"[存储管理器] 分片后端初始化失败: {e}")
+            return None
+
     def get_backend(self) -> StorageBackend:
         """获取存储后端实例"""
         if self._backend is None:
@@ -159,6 +246,34 @@ class StorageManager:
                     print("[存储管理器] 回退到本地存储")
                     resolved_type = "local"
 
+            elif resolved_type == "hybrid" and self.read_only:
+                # 只读时不创建复制队列，直接读取本地数据库
+                resolved_type = "local"
+
+            elif resolved_type == "hybrid":
+                self._backend = self._create_hybrid_backend()
+                if self._backend:
+                    print(f"[存储管理器] 使用混合存储后端 (本地目录: {self.data_dir}，异步复制到远程)")
+                else:
+                    print("[存储管理器] 回退到本地存储")
+                    resolved_type = "local"
+
+            elif resolved_type == "duckdb":
+                self._backend = self._create_duckdb_backend()
+                if self._backend:
+                    print(f"[存储管理器] 使用 DuckDB 存储后端 (数据库: {self.duckdb_path})")
+                else:
+                    print("[存储管理器] 回退到本地存储")
+                    resolved_type = "local"
+
+            elif resolved_type == "sharded":
+                self._backend = self._create_sharded_backend()
+                if self._backend:
+                    print(f"[存储管理器] 使用分片存储后端 (数据目录: {self.data_dir}，分片数: {self._backend.shard_count})")
+                else:
+                    print("[存储管理器] 回退到本地存储")
+                    resolved_type = "local"
+
             if resolved_type == "local" or self._backend is None:
                 from trendradar.storage.local import LocalStorageBackend
 
@@ -167,8 +282,10 @@ class StorageManager:
                     enable_txt=self.enable_txt,
                     enable_html=self.enable_html,
                     timezone=self.timezone,
+                    read_only=self.read_only,
                 )
-                print(f"[存储管理器] 使用本地存储后端 (数据目录: {self.data_dir})")
+                mode_note = "，只读" if self.read_only else ""
+                print(f"[存储管理器] 使用本地存储后端 (数据目录: {self.data_dir}{mode_note})")
 
         return self._backend
 
@@ -213,6 +330,14 @@ class StorageManager:
         """检测新增标题"""
         return self.get_backend().detect_new_titles(current_data)
 
+    def get_news_rows_since(self, since_crawl_time: str = "", date: Optional[str] = None) -> Optional[dict]:
+        """增量读取新闻行（后端不支持时返回 None）"""
+        return self.get_backend().get_news_rows_since(since_crawl_time, date)
+
+    def get_analysis_state_path(self, date: Optional[str] = None) -> Optional[Path]:
+        """增量分析状态文件路径（后端不支持时返回 None）"""
+        return self.get_backend().get_analysis_state_path(date)
+
     def save_txt_snapshot(self, data: NewsData) -> Optional[str]:
         """保存 TXT 快照"""
         return self.get_backend().save_txt_snapshot(data)
@@ -225,6 +350,17 @@ class StorageManager:
         """检查是否是当天第一次抓取"""
         return self.get_backend().is_first_crawl_today(date)
 
+    def flush(self) -> None:
+        """等待异步上传 / 复制队列清空，使其它进程能读到已保存的数据（同步后端无操作）"""
+        backend = self._backend
+        if backend is None:
+            return
+        upload_queue = getattr(backend, "_upload_queue", None)
+        if upload_queue is not None:
+            upload_queue.flush()
+        if hasattr(backend, "flush_replication"):
+            backend.flush_replication()
+
     def cleanup(self) -> None:
         """清理资源"""
         if self._backend:
@@ -291,6 +427,45 @@ class StorageManager:
         """
         return self.get_backend().record_push(report_type, date)
 
+    # === 推送队列相关方法 ===
+
+    def outbox_enqueue(self, rows: List[Dict], date: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+        """推送批次入队（后端不支持时返回 None）"""
+        return self.get_backend().outbox_enqueue(rows, date)
+
+    def outbox_pending(self, account_key: str, now_str: str, date: Optional[str] = None) -> List[Dict]:
+        """查询某账号已到重试时间的待发送批次"""
+        return self.get_backend().outbox_pending(account_key, now_str, date)
+
+    def outbox_update(self, idempotency_key: str, changes: Dict, date: Optional[str] = None) -> bool:
+        """更新推送批次的发送状态"""
+        return self.get_backend().outbox_update(idempotency_key, changes, date)
+
+    def sync_outbox(self) -> None:
+        """将推送队列的变更同步到远程存储（远程后端一次推送只上传一次）"""
+        self.get_backend().sync_outbox()
+
+    # === 推送指纹相关方法 ===
+
+    def get_notification_fingerprint(
+        self, channel: str, report_type: str, date: Optional[str] = None
+    ) -> Optional[Dict]:
+        """获取某渠道、某报告类型最近一次送达的报告指纹"""
+        return self.get_backend().get_notification_fingerprint(channel, report_type, date)
+
+    def save_notification_fingerprint(
+        self,
+        channel: str,
+        report_type: str,
+        fingerprint: str,
+        full_sent_at: Optional[str] = None,
+        date: Optional[str] = None,
+    ) -> bool:
+        """保存报告指纹"""
+        return self.get_backend().save_notification_fingerprint(
+            channel, report_type, fingerprint, full_sent_at, date
+        )
+
 
 def get_storage_manager(
     backend_type: str = "auto",
@@ -304,6 +479,9 @@ def get_storage_manager(
     pull_days: int = 0,
     timezone: str = "Asia/Shanghai",
     force_new: bool = False,
+    duckdb_path: str = "",
+    sharding_config: Optional[dict] = None,
+    read_only: bool = False,
 ) -> StorageManager:
     """
     获取存储管理器单例
@@ -320,6 +498,9 @@ def get_storage_manager(
         pull_days: 拉取最近 N 天的数据
         timezone: 时区配置（默认 Asia/Shanghai）
         force_new: 是否强制创建新实例
+        duckdb_path: DuckDB 文件路径（backend_type 为 duckdb 时使用）
+        sharding_config: 分片配置（backend_type 为 sharded 时使用）
+        read_only: 只读模式（租户进程读取主进程写入的数据）
 
     Returns:
         StorageManager 实例
@@ -338,6 +519,9 @@ def get_storage_manager(
             pull_enabled=pull_enabled,
             pull_days=pull_days,
             timezone=timezone,
+            duckdb_path=duckdb_path,
+            sharding_config=sharding_config,
+            read_only=read_only,
         )
 
     return _storage_manager
@@ -0,0 +1,98 @@
+# coding=utf-8
+"""
+存储迁移工具 - 每日 SQLite → DuckDB
+
+将 output/<日期>/news.db 逐日导入到单个 DuckDB 文件（分片存储的 news.shard*.db 合并后导入）。
+已存在于 DuckDB 中的日期默认跳过（可重复执行），--overwrite 时先删除再导入。
+
+用法:
+    python -m trendradar.storage.migrate --data-dir output --duckdb output/trendradar.duckdb
+"""
+
+import argparse
+import re
+from pathlib import Path
+from typing import Optional
+
+from trendradar.storage.duckdb_backend import DuckDBStorageBackend
+from trendradar.storage.sharded import get_shard_paths
+
+
+def _parse_folder_date(folder_name: str) -> Optional[str]:
+    """解析日期目录名（支持 YYYY-MM-DD 和 YYYY年MM月DD日），返回 YYYY-MM-DD"""
+    match = re.fullmatch(r'(\d{4})-(\d{2})-(\d{2})', folder_name)
+    if not match:
+        match = re.fullmatch(r'(\d{4})年(\d{2})月(\d{2})日', folder_name)
+    if not match:
+        return None
+    return f"{match.group(1)}-{match.group(2)}-{match.group(3)}"
+
+
+def migrate_sqlite_to_duckdb(
+    data_dir: str = "output",
+    duckdb_path: str = "output/trendradar.duckdb",
+    overwrite: bool = False,
+) -> int:
+    """
+    将每日 SQLite 数据库迁移到 DuckDB
+
+    Args:
+        data_dir: 每日 SQLite 所在目录
+        duckdb_path: 目标 DuckDB 文件
+        overwrite: 是否覆盖 DuckDB 中已存在的日期
+
+    Returns:
+        成功导入的日期数量
+    """
+    backend = DuckDBStorageBackend(db_path=duckdb_path, data_dir=data_dir)
+    migrated = 0
+
+    try:
+        existing_dates = set(backend.list_dates())
+
+        for date_folder in sorted(Path(data_dir).iterdir()):
+            if not date_folder.is_dir() or date_folder.name.startswith('.'):
+                continue
+
+            date_str = _parse_folder_date(date_folder.name)
+            sqlite_path = date_folder / "news.db"
+            if not date_str:
+                continue
+            if not sqlite_path.exists():
+                # 分片存储中 news.db 是分片 0，缺失时无法合并其余分片
+                if get_shard_paths(sqlite_path):
+                    print(f"[迁移] 跳过 {date_str}：存在分片文件但缺少 news.db（分片 0），无法合并导入")
+                continue
+
+            if date_str in existing_dates:
+                if not overwrite:
+                    print(f"[迁移] 跳过（已存在）: {date_str}")
+                    continue
+                backend.delete_date(date_str)
+
+            try:
+                count = backend.import_sqlite_day(str(sqlite_path), date_str)
+                migrated += 1
+                print(f"[迁移] 已导入 {date_str}: {count} 条新闻")
+            except Exception as e:
+                print(f"[迁移] 导入失败 {date_str}: {e}")
+
+        print(f"[迁移] 完成，共导入 {migrated} 天 -> {duckdb_path}")
+        return migrated
+
+    finally:
+        backend.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="将 output/*/news.db 迁移到 DuckDB")
+    parser.add_argument("--data-dir", default="output", help="每日 SQLite 数据目录（默认 output）")
+    parser.add_argument("--duckdb", default="output/trendradar.duckdb", help="目标 DuckDB 文件")
+    parser.add_argument("--overwrite", action="store_true", help="覆盖已存在的日期")
+    args = parser.parse_args()
+
+    migrate_sqlite_to_duckdb(args.data_dir, args.duckdb, overwrite=args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# coding=utf-8
+"""
+推送队列（notification_outbox 表）和推送指纹（notification_fingerprints 表）的 SQLite 读写
+
+表结构定义在 schema.sql 中，与 push_records 位于同一个当天数据库。
+本地、远程、混合后端共用这些函数，各自负责连接获取和写入后的同步。
+"""
+
+import sqlite3
+from typing import Dict, List, Optional
+
+# 入队时写入的列
+OUTBOX_INSERT_COLUMNS = (
+    "idempotency_key", "channel", "account_key", "report_type", "batch_num",
+    "batch_total", "body", "is_json", "headers", "created_at",
+)
+
+# 读取时返回的列
+OUTBOX_SELECT_COLUMNS = OUTBOX_INSERT_COLUMNS + (
+    "id", "status", "attempts", "next_attempt_at", "last_error", "delivered_at",
+)
+
+# 可更新的列
+OUTBOX_UPDATE_COLUMNS = ("status", "attempts", "next_attempt_at", "last_error", "delivered_at")
+
+
+def _rows_to_dicts(rows: List[tuple]) -> List[Dict]:
+    return [dict(zip(OUTBOX_SELECT_COLUMNS, row)) for row in rows]
+
+
+def enqueue_outbox_rows(conn: sqlite3.Connection, rows: List[Dict]) -> Dict[str, Dict]:
+    """
+    批次入队（幂等键已存在时忽略）
+
+    Args:
+        conn: 当天数据库连接
+        rows: 待入队的行（包含 OUTBOX_INSERT_COLUMNS）
+
+    Returns:
+        幂等键 -> 数据库中的行（含已存在行的状态，同一报告实例重复入队时去重）
+    """
+    if not rows:
+        return {}
+
+    placeholders = ", ".join("?" for _ in OUTBOX_INSERT_COLUMNS)
+    conn.executemany(
+        f"INSERT OR IGNORE INTO notification_outbox ({', '.join(OUTBOX_INSERT_COLUMNS)}) "
+        f"VALUES ({placeholders})",
+        [tuple(row[column] for column in OUTBOX_INSERT_COLUMNS) for row in rows],
+    )
+    conn.commit()
+
+    keys = [row["idempotency_key"] for row in rows]
+    key_placeholders = ", ".join("?" for _ in keys)
+    cursor = conn.execute(
+        f"SELECT {', '.join(OUTBOX_SELECT_COLUMNS)} FROM notification_outbox "
+        f"WHERE idempotency_key IN ({key_placeholders})",
+        keys,
+    )
+    return {row["idempotency_key"]: row for row in _rows_to_dicts(cursor.fetchall())}
+
+
+def select_pending_outbox(
+    conn: sqlite3.Connection, account_key: str, now_str: str, limit: int = 100
+) -> List[Dict]:
+    """
+    查询某账号已到重试时间的失败批次（按入队顺序）
+
+    只返回发送失败过的批次（attempts > 0）；入队后尚未尝试的批次属于正在推送的报告，不补发。
+
+    Args:
+        conn: 数据库连接
+        account_key: 账号哈希
+        now_str: 当前时间（YYYY-MM-DD HH:MM:SS）
+        limit: 最多返回条数
+
+    Returns:
+        待发送的行列表
+    """
+    cursor = conn.execute(
+        f"SELECT {', '.join(OUTBOX_SELECT_COLUMNS)} FROM notification_outbox "
+        "WHERE account_key = ? AND status = 'pending' AND attempts > 0 "
+        "AND (next_attempt_at IS NULL OR next_attempt_at <= ?) "
+        "ORDER BY id LIMIT ?",
+        (account_key, now_str, limit),
+    )
+    return _rows_to_dicts(cursor.fetchall())
+
+
+def update_outbox_row(
+    conn: sqlite3.Connection, idempotency_key: str, changes: Dict
+) -> bool:
+    """
+    更新批次的发送状态
+
+    Args:
+        conn: 数据库连接
+        idempotency_key: 幂等键
+        changes: 要更新的列（OUTBOX_UPDATE_COLUMNS 的子集）
+
+    Returns:
+        是否更新了记录
+    """
+    columns = [column for column in OUTBOX_UPDATE_COLUMNS if column in changes]
+    if not columns:
+        return False
+    cursor = conn.execute(
+        f"UPDATE notification_outbox SET {', '.join(f'{c} = ?' for c in columns)} "
+        "WHERE idempotency_key = ?",
+        [changes[column] for column in columns] + [idempotency_key],
+    )
+    conn.commit()
+    return cursor.rowcount > 0
+
+
+def select_fingerprint(conn: sqlite3.Connection, channel: str, report_type: str) -> Optional[Dict]:
+    """
+    查询某渠道、某报告类型最近一次送达的报告指纹
+
+    Returns:
+        {"fingerprint", "full_sent_at", "updated_at"}，没有记录时返回 None
+    """
+    row = conn.execute(
+        "SELECT fingerprint, full_sent_at, updated_at FROM notification_fingerprints "
+        "WHERE channel = ? AND report_type = ?",
+        (channel, report_type),
+    ).fetchone()
+    if row is None:
+        return None
+    return {"fingerprint": row[0], "full_sent_at": row[1], "updated_at": row[2]}
+
+
+def upsert_fingerprint(
+    conn: sqlite3.Connection,
+    channel: str,
+    report_type: str,
+    fingerprint: str,
+    full_sent_at: Optional[str],
+    updated_at: str,
+) -> None:
+    """保存报告指纹（full_sent_at 为 None 时保留原值）"""
+    conn.execute(
+        "INSERT INTO notification_fingerprints "
+        "(channel, report_type, fingerprint, full_sent_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(channel, report_type) DO UPDATE SET "
+        "fingerprint = excluded.fingerprint, "
+        "full_sent_at = COALESCE(excluded.full_sent_at, notification_fingerprints.full_sent_at), "
+        "updated_at = excluded.updated_at",
+        (channel, report_type, fingerprint, full_sent_at, updated_at),
+    )
+    conn.commit()
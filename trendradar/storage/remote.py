@@ -5,8 +5,10 @@
 支持 Cloudflare R2、阿里云 OSS、腾讯云 COS、AWS S3、MinIO 等
 使用 S3 兼容 API (boto3) 访问对象存储
 数据流程：下载当天 SQLite → 合并新数据 → 上传回远程
+启用异步上传时，上传由 UploadQueue 在后台线程完成，不阻塞抓取和推送
 """
 
+import atexit
 import pytz
 import re
 import shutil
@@ -15,7 +17,7 @@ import tempfile
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 try:
     import boto3
@@ -28,13 +30,27 @@ except ImportError:
     BotoConfig = None
     ClientError = Exception
 
-from trendradar.storage.base import StorageBackend, NewsItem, NewsData
+from trendradar.storage.base import (
+    StorageBackend,
+    NewsItem,
+    NewsData,
+)
+from trendradar.storage.local import migrate_news_items_columns
+from trendradar.storage.outbox import (
+    enqueue_outbox_rows,
+    select_fingerprint,
+    select_pending_outbox,
+    update_outbox_row,
+    upsert_fingerprint,
+)
+from trendradar.storage.upload_queue import UploadQueue
 from trendradar.utils.time import (
     get_configured_time,
     format_date_folder,
     format_time_filename,
 )
-from trendradar.utils.url import normalize_url
+from trendradar.utils.text import title_forms, register_title_forms
+from trendradar.utils.url import url_forms
 
 
 class RemoteStorageBackend(StorageBackend):
@@ -47,6 +63,7 @@ class RemoteStorageBackend(StorageBackend):
     - 下载 SQLite 到临时目录进行操作
     - 支持数据合并和上传
     - 支持从远程拉取历史数据到本地
+    - 支持异步上传（本地日志 + 后台线程，合并窗口内的多次写入只上传一次）
     - 运行结束后自动清理临时文件
     """
 
@@ -61,6 +78,9 @@ class RemoteStorageBackend(StorageBackend):
         enable_html: bool = True,
         temp_dir: Optional[str] = None,
         timezone: str = "Asia/Shanghai",
+        async_upload: bool = False,
+        journal_dir: Optional[str] = None,
+        upload_coalesce_seconds: float = 5.0,
     ):
         """
         初始化远程存储后端
@@ -75,6 +95,9 @@ class RemoteStorageBackend(StorageBackend):
             enable_html: 是否启用 HTML 报告
             temp_dir: 临时目录路径（默认使用系统临时目录）
             timezone: 时区配置（默认 Asia/Shanghai）
+            async_upload: 是否启用异步上传队列
+            journal_dir: 上传日志目录（需持久化，默认系统临时目录下的固定路径）
+            upload_coalesce_seconds: 上传合并窗口（秒）
         """
         if not HAS_BOTO3:
             raise ImportError("远程存储后端需要安装 boto3: pip install boto3")
@@ -117,8 +140,28 @@ class RemoteStorageBackend(StorageBackend):
         # 跟踪下载的文件（用于清理）
         self._downloaded_files: List[Path] = []
         self._db_connections: Dict[str, sqlite3.Connection] = {}
+        # 推送队列有未同步变更的日期（由 sync_outbox 统一上传）
+        self._outbox_dirty_dates: Set[Optional[str]] = set()
+
+        # 异步上传队列（日志目录不能放在 temp_dir 下，temp_dir 会在 cleanup 时删除）
+        self._upload_queue: Optional[UploadQueue] = None
+        if async_upload:
+            journal_path = (
+                Path(journal_dir) if journal_dir
+                else Path(tempfile.gettempdir()) / "trendradar_upload_journal"
+            )
+            self._upload_queue = UploadQueue(
+                journal_dir=str(journal_path),
+                put_func=self._put_object_file,
+                delete_func=self._delete_objects,
+                coalesce_seconds=upload_coalesce_seconds,
+                log_prefix="[远程存储-上传队列]",
+            )
+            # 兜底：进程退出前刷新队列
+            atexit.register(self._upload_queue.close)
 
-        print(f"[远程存储] 初始化完成，存储桶: {bucket_name}，签名版本: {signature_version}")
+        mode_desc = "异步上传" if self._upload_queue else "同步上传"
+        print(f"[远程存储] 初始化完成，存储桶: {bucket_name}，签名版本: {signature_version}，{mode_desc}")
 
     @property
     def backend_name(self) -> str:
@@ -232,9 +275,40 @@ class RemoteStorageBackend(StorageBackend):
         Returns:
             是否上传成功
         """
+        return self._put_object_file(self._get_remote_db_key(date), self._get_local_db_path(date))
+
+    def _sync_sqlite(self, date: Optional[str] = None) -> bool:
+        """
+        同步本地 SQLite 到远程存储
+
+        启用异步上传时只写入上传日志（由后台线程上传），否则直接上传。
+
+        Args:
+            date: 日期字符串
+
+        Returns:
+            是否已上传（同步）或已入队（异步）
+        """
+        if self._upload_queue is None:
+            return self._upload_sqlite(date)
+
         local_path = self._get_local_db_path(date)
-        r2_key = self._get_remote_db_key(date)
+        if not local_path.exists():
+            print(f"[远程存储] 本地文件不存在，无法上传: {local_path}")
+            return False
+        return self._upload_queue.enqueue_sqlite(self._get_remote_db_key(date), local_path)
+
+    def _put_object_file(self, r2_key: str, local_path: Path) -> bool:
+        """
+        上传本地文件到远程存储
 
+        Args:
+            r2_key: 远程对象键
+            local_path: 本地文件路径
+
+        Returns:
+            是否上传成功
+        """
         if not local_path.exists():
             print(f"[远程存储] 本地文件不存在，无法上传: {local_path}")
             return False
@@ -272,6 +346,31 @@ class RemoteStorageBackend(StorageBackend):
             print(f"[远程存储] 上传失败: {e}")
             return False
 
+    def _delete_objects(self, keys: List[str]) -> bool:
+        """
+        批量删除远程对象（每次最多 1000 个）
+
+        Args:
+            keys: 远程对象键列表
+
+        Returns:
+            是否全部删除成功
+        """
+        success = True
+        batch_size = 1000
+        for i in range(0, len(keys), batch_size):
+            batch = [{'Key': key} for key in keys[i:i + batch_size]]
+            try:
+                self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': batch}
+                )
+                print(f"[远程存储] 删除 {len(batch)} 个对象")
+            except Exception as e:
+                print(f"[远程存储] 批量删除失败: {e}")
+                success = False
+        return success
+
     def _get_connection(self, date: Optional[str] = None) -> sqlite3.Connection:
         """获取数据库连接"""
         local_path = self._get_local_db_path(date)
@@ -281,11 +380,14 @@ class RemoteStorageBackend(StorageBackend):
             # 确保目录存在
             local_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # 如果本地不存在，尝试从远程存储下载
+            # 如果本地不存在，优先使用上传日志中未上传的快照，否则从远程存储下载
             if not local_path.exists():
-                self._download_sqlite(date)
+                r2_key = self._get_remote_db_key(date)
+                if not (self._upload_queue and self._upload_queue.restore_pending(r2_key, local_path)):
+                    self._download_sqlite(date)
 
-            conn = sqlite3.connect(db_path)
+            # 推送队列会在并发推送线程中读写（由 NotificationOutbox 加锁串行访问）
+            conn = sqlite3.connect(db_path, check_same_thread=False)
             conn.row_factory = sqlite3.Row
             self._init_tables(conn)
             self._db_connections[db_path] = conn
@@ -304,6 +406,7 @@ class RemoteStorageBackend(StorageBackend):
             with open(schema_path, "r", encoding="utf-8") as f:
                 schema_sql = f.read()
             conn.executescript(schema_sql)
+            migrate_news_items_columns(conn)
         else:
             raise FileNotFoundError(f"Schema file not found: {schema_path}")
 
@@ -356,8 +459,9 @@ class RemoteStorageBackend(StorageBackend):
 
                 for item in news_list:
                     try:
-                        # 标准化 URL（去除动态参数，如微博的 band_rank）
-                        normalized_url = normalize_url(item.url, source_id) if item.url else ""
+                        # 规范化形式只在入库时计算一次（标准化 URL 去除微博 band_rank 等动态参数）
+                        normalized_url, url_signature = url_forms(item.url, source_id)
+                        title_clean, title_fold = title_forms(item.title)
 
                         # 检查是否已存在（通过标准化 URL + platform_id）
                         if normalized_url:
@@ -396,10 +500,14 @@ class RemoteStorageBackend(StorageBackend):
                                         mobile_url = ?,
                                         last_crawl_time = ?,
                                         crawl_count = crawl_count + 1,
-                                        updated_at = ?
+                                        updated_at = ?,
+                                        title_clean = ?,
+                                        title_fold = ?,
+                                        url_signature = ?
                                     WHERE id = ?
                                 """, (item.title, item.rank, item.mobile_url,
-                                      data.crawl_time, now_str, existing_id))
+                                      data.crawl_time, now_str, title_clean, title_fold,
+                                      url_signature, existing_id))
                                 updated_count += 1
                             else:
                                 # 不存在，插入新记录（存储标准化后的 URL）
@@ -407,11 +515,13 @@ class RemoteStorageBackend(StorageBackend):
                                     INSERT INTO news_items
                                     (title, platform_id, rank, url, mobile_url,
                                      first_crawl_time, last_crawl_time, crawl_count,
-                                     created_at, updated_at)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                                     created_at, updated_at,
+                                     title_clean, title_fold, url_signature)
+                                    VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
                                 """, (item.title, source_id, item.rank, normalized_url,
                                       item.mobile_url, data.crawl_time, data.crawl_time,
-                                      now_str, now_str))
+                                      now_str, now_str, title_clean, title_fold,
+                                      url_signature))
                                 new_id = cursor.lastrowid
                                 # 记录初始排名
                                 cursor.execute("""
@@ -426,11 +536,12 @@ class RemoteStorageBackend(StorageBackend):
                                 INSERT INTO news_items
                                 (title, platform_id, rank, url, mobile_url,
                                  first_crawl_time, last_crawl_time, crawl_count,
-                                 created_at, updated_at)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                                 created_at, updated_at,
+                                 title_clean, title_fold, url_signature)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, '')
                             """, (item.title, source_id, item.rank, "",
                                   item.mobile_url, data.crawl_time, data.crawl_time,
-                                  now_str, now_str))
+                                  now_str, now_str, title_clean, title_fold))
                             new_id = cursor.lastrowid
                             # 记录初始排名
                             cursor.execute("""
@@ -498,9 +609,12 @@ class RemoteStorageBackend(StorageBackend):
             log_parts.append(f"(去重后总计: {final_count} 条)")
             print("，".join(log_parts))
 
-            # 上传到远程存储
-            if self._upload_sqlite(data.date):
-                print(f"[远程存储] 数据已同步到远程存储")
+            # 上传到远程存储（异步模式下仅入队）
+            if self._sync_sqlite(data.date):
+                if self._upload_queue:
+                    print("[远程存储] 数据已写入上传队列，后台同步到远程存储")
+                else:
+                    print("[远程存储] 数据已同步到远程存储")
                 return True
             else:
                 print(f"[远程存储] 上传远程存储失败")
@@ -520,7 +634,8 @@ class RemoteStorageBackend(StorageBackend):
             cursor.execute("""
                 SELECT n.id, n.title, n.platform_id, p.name as platform_name,
                        n.rank, n.url, n.mobile_url,
-                       n.first_crawl_time, n.last_crawl_time, n.crawl_count
+                       n.first_crawl_time, n.last_crawl_time, n.crawl_count,
+                       n.title_clean, n.title_fold
                 FROM news_items n
                 LEFT JOIN platforms p ON n.platform_id = p.id
                 ORDER BY n.platform_id, n.last_crawl_time
@@ -558,6 +673,8 @@ class RemoteStorageBackend(StorageBackend):
                 news_id = row[0]
                 platform_id = row[2]
                 title = row[1]
+                # 预填规范化形式，后续匹配 / 渲染不再重复计算
+                register_title_forms(title, row[10], row[11])
                 platform_name = row[3] or platform_id
 
                 id_to_name[platform_id] = platform_name
@@ -839,6 +956,15 @@ class RemoteStorageBackend(StorageBackend):
         if sys.meta_path is None:
             return
 
+        # 兜底：上传尚未同步的推送队列状态
+        if getattr(self, "_outbox_dirty_dates", None):
+            self.sync_outbox()
+
+        # 等待上传队列刷新完成（日志目录独立于临时目录，未完成的任务会保留）
+        upload_queue = getattr(self, "_upload_queue", None)
+        if upload_queue:
+            upload_queue.close()
+
         # 关闭数据库连接
         db_connections = getattr(self, "_db_connections", {})
         for db_path, conn in list(db_connections.items()):
@@ -930,19 +1056,13 @@ class RemoteStorageBackend(StorageBackend):
                         objects_to_delete.append({'Key': key})
                         deleted_dates.add(date_str)
 
-            # 批量删除对象（每次最多 1000 个）
+            # 批量删除对象（异步模式下写入上传队列）
             if objects_to_delete:
-                batch_size = 1000
-                for i in range(0, len(objects_to_delete), batch_size):
-                    batch = objects_to_delete[i:i + batch_size]
-                    try:
-                        self.s3_client.delete_objects(
-                            Bucket=self.bucket_name,
-                            Delete={'Objects': batch}
-                        )
-                        print(f"[远程存储] 删除 {len(batch)} 个对象")
-                    except Exception as e:
-                        print(f"[远程存储] 批量删除失败: {e}")
+                keys = [obj['Key'] for obj in objects_to_delete]
+                if self._upload_queue:
+                    self._upload_queue.enqueue_delete(keys)
+                else:
+                    self._delete_objects(keys)
 
                 deleted_count = len(deleted_dates)
                 for date_str in sorted(deleted_dates):
@@ -1016,9 +1136,12 @@ class RemoteStorageBackend(StorageBackend):
 
             print(f"[远程存储] 推送记录已保存: {report_type} at {now_str}")
 
-            # 上传到远程存储 确保记录持久化
-            if self._upload_sqlite(date):
-                print(f"[远程存储] 推送记录已同步到远程存储")
+            # 上传到远程存储 确保记录持久化（异步模式下仅入队）
+            if self._sync_sqlite(date):
+                if self._upload_queue:
+                    print("[远程存储] 推送记录已写入上传队列")
+                else:
+                    print("[远程存储] 推送记录已同步到远程存储")
                 return True
             else:
                 print(f"[远程存储] 推送记录同步到远程存储失败")
@@ -1028,6 +1151,83 @@ class RemoteStorageBackend(StorageBackend):
             print(f"[远程存储] 记录推送失败: {e}")
             return False
 
+    # === 推送队列 ===
+
+    def outbox_enqueue(self, rows: List[Dict], date: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+        """推送批次入队（只写本地数据库，由 sync_outbox 统一同步到远程存储）"""
+        try:
+            result = enqueue_outbox_rows(self._get_connection(date), rows)
+            self._outbox_dirty_dates.add(date)
+            return result
+        except Exception as e:
+            print(f"[远程存储] 推送批次入队失败: {e}")
+            return None
+
+    def outbox_pending(
+        self, account_key: str, now_str: str, date: Optional[str] = None
+    ) -> List[Dict]:
+        """查询某账号已到重试时间的待发送批次（只查询本次运行已下载的数据库）"""
+        if date and not self._get_local_db_path(date).exists():
+            return []
+        try:
+            return select_pending_outbox(self._get_connection(date), account_key, now_str)
+        except Exception as e:
+            print(f"[远程存储] 查询待发送批次失败: {e}")
+            return []
+
+    def outbox_update(
+        self, idempotency_key: str, changes: Dict, date: Optional[str] = None
+    ) -> bool:
+        """更新推送批次的发送状态（只写本地数据库，由 sync_outbox 统一同步到远程存储）"""
+        try:
+            updated = update_outbox_row(self._get_connection(date), idempotency_key, changes)
+            if updated:
+                self._outbox_dirty_dates.add(date)
+            return updated
+        except Exception as e:
+            print(f"[远程存储] 更新推送批次状态失败: {e}")
+            return False
+
+    def sync_outbox(self) -> None:
+        """将推送队列的变更同步到远程存储（每个日期的数据库上传一次）"""
+        dates, self._outbox_dirty_dates = self._outbox_dirty_dates, set()
+        for date in dates:
+            if not self._sync_sqlite(date):
+                print(f"[远程存储] 推送队列同步失败: {date or '今天'}")
+                self._outbox_dirty_dates.add(date)
+
+    # === 推送指纹 ===
+
+    def get_notification_fingerprint(
+        self, channel: str, report_type: str, date: Optional[str] = None
+    ) -> Optional[Dict]:
+        """获取某渠道、某报告类型最近一次送达的报告指纹"""
+        try:
+            return select_fingerprint(self._get_connection(date), channel, report_type)
+        except Exception as e:
+            print(f"[远程存储] 读取推送指纹失败: {e}")
+            return None
+
+    def save_notification_fingerprint(
+        self,
+        channel: str,
+        report_type: str,
+        fingerprint: str,
+        full_sent_at: Optional[str] = None,
+        date: Optional[str] = None,
+    ) -> bool:
+        """保存报告指纹，并同步到远程存储"""
+        try:
+            now_str = self._get_configured_time().strftime("%Y-%m-%d %H:%M:%S")
+            upsert_fingerprint(
+                self._get_connection(date), channel, report_type, fingerprint, full_sent_at, now_str
+            )
+            self._sync_sqlite(date)
+            return True
+        except Exception as e:
+            print(f"[远程存储] 保存推送指纹失败: {e}")
+            return False
+
     def __del__(self):
         """析构函数"""
         # 检查 Python 是否正在关闭
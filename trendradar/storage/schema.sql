@@ -27,6 +27,10 @@ CREATE TABLE IF NOT EXISTS news_items (
     crawl_count INTEGER DEFAULT 1,       -- 抓取次数
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- 规范化列（入库时计算一次，读取时预填进程内驻留表）
+    title_clean TEXT DEFAULT '',         -- 清理换行和连续空白后的标题
+    title_fold TEXT DEFAULT '',          -- 小写标题（频率词匹配、搜索使用）
+    url_signature TEXT DEFAULT '',       -- 标准化 URL 的签名
     FOREIGN KEY (platform_id) REFERENCES platforms(id)
 );
 
@@ -93,6 +97,43 @@ CREATE TABLE IF NOT EXISTS push_records (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- ============================================
+-- 推送队列表（outbox）
+-- 每个批次先入队再发送，失败的批次在之后的运行中按退避时间重试
+-- account_key 为账号（Webhook 等）的哈希，不保存 URL 和令牌
+-- ============================================
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    channel TEXT NOT NULL,
+    account_key TEXT NOT NULL,
+    report_type TEXT,
+    batch_num INTEGER,
+    batch_total INTEGER,
+    body BLOB NOT NULL,
+    is_json INTEGER DEFAULT 1,
+    headers TEXT DEFAULT '{}',
+    status TEXT DEFAULT 'pending',  -- pending / delivered / dead
+    attempts INTEGER DEFAULT 0,
+    next_attempt_at TEXT,
+    last_error TEXT,
+    created_at TEXT,
+    delivered_at TEXT
+);
+
+-- ============================================
+-- 推送指纹表
+-- 每个渠道、每种报告类型最近一次送达的报告结构（JSON），用于增量推送
+-- ============================================
+CREATE TABLE IF NOT EXISTS notification_fingerprints (
+    channel TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    full_sent_at TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (channel, report_type)
+);
+
 -- ============================================
 -- 索引定义
 -- ============================================
@@ -115,3 +156,6 @@ CREATE INDEX IF NOT EXISTS idx_crawl_status_record ON crawl_source_status(crawl_
 
 -- 排名历史索引
 CREATE INDEX IF NOT EXISTS idx_rank_history_news ON rank_history(news_item_id);
+
+-- 推送队列索引（按账号查找待发送批次）
+CREATE INDEX IF NOT EXISTS idx_outbox_account ON notification_outbox(account_key, status);
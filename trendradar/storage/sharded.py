@@ -0,0 +1,338 @@
+# coding=utf-8
+"""
+分片存储后端 - 按平台分组写入多个 SQLite 文件
+
+每天的数据按平台分组写入多个分片文件，每个分片有独立的写线程和连接，
+多个平台分组的写入可以并行进行，不再共用一个大事务：
+- 分片 0: <日期>/news.db（同时保存推送记录）
+- 分片 N: <日期>/news.shard<N>.db
+
+读取时通过 connect_merged() 把所有分片 ATTACH 到 news.db 的连接上，
+并用同名 TEMP VIEW 覆盖 news_items / rank_history 等表，
+现有的 SQL（包括 MCP Server 的查询）无需修改即可读到合并后的数据。
+"""
+
+import sqlite3
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from trendradar.storage.base import NewsData, NORMALIZED_NEWS_COLUMNS
+from trendradar.storage.local import (
+    LocalStorageBackend,
+    migrate_news_items_columns,
+    sqlite_read_only_uri,
+)
+
+
+SHARD_FILE_PATTERN = "news.shard*.db"
+
+
+def get_shard_paths(db_path: Path) -> List[Path]:
+    """
+    获取与 news.db 同目录的附加分片文件（按分片号排序）
+
+    Args:
+        db_path: 主数据库（分片 0）路径
+
+    Returns:
+        附加分片文件路径列表
+    """
+    def shard_index(path: Path) -> int:
+        try:
+            return int(path.name[len("news.shard"):-len(".db")])
+        except ValueError:
+            return 0
+
+    return sorted(db_path.parent.glob(SHARD_FILE_PATTERN), key=shard_index)
+
+
+def attach_shards(
+    conn: sqlite3.Connection, shard_paths: List[Path], read_only: bool = False
+) -> None:
+    """
+    将分片 ATTACH 到连接上，并创建覆盖同名表的合并视图
+
+    ID 映射为 原ID * 分片数 + 分片号，保证合并后唯一且排名历史能正确关联；
+    crawl_records 按 crawl_time 合并，crawl_source_status 关联到合并后的记录 ID。
+
+    Args:
+        conn: 主数据库（分片 0）连接
+        shard_paths: 附加分片文件路径
+        read_only: 以只读 URI 挂载（连接需以 uri=True 打开）
+    """
+    if not shard_paths:
+        return
+
+    schemas = ["main"]
+    for index, path in enumerate(shard_paths, start=1):
+        schema = f"shard{index}"
+        target = sqlite_read_only_uri(path) if read_only else str(path)
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (target,))
+        schemas.append(schema)
+
+    count = len(schemas)
+
+    # 规范化列：无法迁移的旧分片（如只读连接）用空串代替，读取方会按需计算
+    normalized_columns = {
+        schema: (
+            ", ".join(NORMALIZED_NEWS_COLUMNS)
+            if migrate_news_items_columns(conn, schema)
+            else ", ".join(f"'' AS {column}" for column in NORMALIZED_NEWS_COLUMNS)
+        )
+        for schema in schemas
+    }
+
+    def union(select_sql: str) -> str:
+        return "\nUNION ALL\n".join(
+            select_sql.format(
+                schema=schema, shard=shard, count=count,
+                normalized=normalized_columns[schema],
+            )
+            for shard, schema in enumerate(schemas)
+        )
+
+    conn.executescript(f"""
+        CREATE TEMP VIEW news_items AS
+        {union('''SELECT id * {count} + {shard} AS id, title, platform_id, rank, url, mobile_url,
+                   first_crawl_time, last_crawl_time, crawl_count, created_at, updated_at,
+                   {normalized}
+            FROM {schema}.news_items''')};
+
+        CREATE TEMP VIEW rank_history AS
+        {union('''SELECT id * {count} + {shard} AS id, news_item_id * {count} + {shard} AS news_item_id,
+                   rank, crawl_time, created_at
+            FROM {schema}.rank_history''')};
+
+        CREATE TEMP VIEW title_changes AS
+        {union('''SELECT id * {count} + {shard} AS id, news_item_id * {count} + {shard} AS news_item_id,
+                   old_title, new_title, changed_at
+            FROM {schema}.title_changes''')};
+
+        CREATE TEMP VIEW platforms AS
+        SELECT id, MAX(name) AS name, MAX(is_active) AS is_active, MAX(updated_at) AS updated_at
+        FROM ({union('SELECT id, name, is_active, updated_at FROM {schema}.platforms')})
+        GROUP BY id;
+
+        CREATE TEMP VIEW crawl_records AS
+        SELECT MIN(id) AS id, crawl_time, SUM(total_items) AS total_items, MIN(created_at) AS created_at
+        FROM ({union('SELECT id * {count} + {shard} AS id, crawl_time, total_items, created_at FROM {schema}.crawl_records')})
+        GROUP BY crawl_time;
+
+        CREATE TEMP VIEW crawl_source_status AS
+        SELECT merged.id AS crawl_record_id, s.platform_id, s.status
+        FROM ({union('''SELECT cr.crawl_time, css.platform_id, css.status
+            FROM {schema}.crawl_source_status css
+            JOIN {schema}.crawl_records cr ON css.crawl_record_id = cr.id''')}) s
+        JOIN crawl_records merged ON merged.crawl_time = s.crawl_time;
+    """)
+
+
+def connect_merged(db_path: Path) -> sqlite3.Connection:
+    """
+    打开某天的数据库，自动合并同目录下的分片
+
+    没有分片文件时等价于 sqlite3.connect(db_path)。
+
+    Args:
+        db_path: news.db 路径
+
+    Returns:
+        数据库连接（分片存在时表名解析到合并视图）
+    """
+    conn = sqlite3.connect(str(db_path))
+    attach_shards(conn, get_shard_paths(Path(db_path)))
+    return conn
+
+
+class _ShardWriter(LocalStorageBackend):
+    """单个分片的写入器（只在所属分片的写线程中使用）"""
+
+    def __init__(self, shard_file: str, **kwargs):
+        super().__init__(**kwargs)
+        self.shard_file = shard_file
+
+    def _get_db_path(self, date: Optional[str] = None) -> Path:
+        date_folder = self._format_date_folder(date)
+        db_dir = self.data_dir / date_folder
+        db_dir.mkdir(parents=True, exist_ok=True)
+        return db_dir / self.shard_file
+
+    def __del__(self):
+        # 连接在写线程中关闭，这里不做处理
+        pass
+
+
+class ShardedStorageBackend(LocalStorageBackend):
+    """
+    分片存储后端
+
+    特点：
+    - 平台按分组（或 crc32 哈希）映射到固定分片
+    - 每个分片一个单线程执行器，连接只在该线程创建和使用
+    - save_news_data 把数据按分片拆开并行写入，各分片独立提交
+    - 读取（含推送记录）继承 LocalStorageBackend，连接上挂载合并视图
+    """
+
+    def __init__(
+        self,
+        data_dir: str = "output",
+        enable_txt: bool = True,
+        enable_html: bool = True,
+        timezone: str = "Asia/Shanghai",
+        shard_count: int = 4,
+        platform_groups: Optional[List[List[str]]] = None,
+        read_only: bool = False,
+    ):
+        """
+        初始化分片存储后端
+
+        Args:
+            data_dir: 数据目录路径
+            enable_txt: 是否启用 TXT 快照
+            enable_html: 是否启用 HTML 报告
+            timezone: 时区配置（默认 Asia/Shanghai）
+            shard_count: 分片数量（未配置 platform_groups 时按哈希分配）
+            platform_groups: 平台分组，第 i 组写入分片 i，未列出的平台写入分片 0
+            read_only: 只读打开合并读取连接（写入器不会被使用）
+        """
+        super().__init__(
+            data_dir=data_dir,
+            enable_txt=enable_txt,
+            enable_html=enable_html,
+            timezone=timezone,
+            enable_wal=True,
+            read_only=read_only,
+        )
+
+        self.platform_groups = [list(group) for group in (platform_groups or []) if group]
+        self._group_index: Dict[str, int] = {
+            platform_id: index
+            for index, group in enumerate(self.platform_groups)
+            for platform_id in group
+        }
+        self.shard_count = max(1, len(self.platform_groups) or shard_count)
+
+        self._writers: List[_ShardWriter] = []
+        self._executors: List[ThreadPoolExecutor] = []
+        for index in range(self.shard_count):
+            shard_file = "news.db" if index == 0 else f"news.shard{index}.db"
+            self._writers.append(_ShardWriter(
+                shard_file=shard_file,
+                data_dir=data_dir,
+                enable_txt=False,
+                enable_html=False,
+                timezone=timezone,
+                enable_wal=True,
+            ))
+            self._executors.append(
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"trendradar-shard{index}")
+            )
+
+    @property
+    def backend_name(self) -> str:
+        return "sharded"
+
+    def get_shard_index(self, platform_id: str) -> int:
+        """获取平台所属的分片号"""
+        if self.platform_groups:
+            return self._group_index.get(platform_id, 0)
+        return zlib.crc32(platform_id.encode("utf-8")) % self.shard_count
+
+    def _get_connection(self, date: Optional[str] = None) -> sqlite3.Connection:
+        """获取合并读取连接（news.db + 所有分片视图）"""
+        db_path = str(self._get_db_path(date))
+
+        if db_path in self._db_connections:
+            return self._db_connections[db_path]
+
+        conn = super()._get_connection(date)
+        attach_shards(conn, get_shard_paths(Path(db_path)), read_only=self.read_only)
+        return conn
+
+    def _invalidate_read_connection(self, date: Optional[str] = None) -> None:
+        """新分片文件出现后需要重新挂载"""
+        db_path = str(self._get_db_path(date))
+        conn = self._db_connections.pop(db_path, None)
+        if conn:
+            conn.close()
+
+    def _split_by_shard(self, data: NewsData) -> Dict[int, NewsData]:
+        """按分片拆分新闻数据"""
+        shard_items: Dict[int, Dict] = {}
+        shard_failed: Dict[int, List[str]] = {}
+
+        for source_id, news_list in data.items.items():
+            shard_items.setdefault(self.get_shard_index(source_id), {})[source_id] = news_list
+        for failed_id in data.failed_ids:
+            shard_failed.setdefault(self.get_shard_index(failed_id), []).append(failed_id)
+
+        result = {}
+        for index in set(shard_items) | set(shard_failed):
+            items = shard_items.get(index, {})
+            failed_ids = shard_failed.get(index, [])
+            result[index] = NewsData(
+                date=data.date,
+                crawl_time=data.crawl_time,
+                items=items,
+                id_to_name={
+                    sid: name for sid, name in data.id_to_name.items()
+                    if sid in items or sid in failed_ids
+                },
+                failed_ids=failed_ids,
+            )
+        return result
+
+    def save_news_data(self, data: NewsData) -> bool:
+        """
+        按分片并行保存新闻数据
+
+        Args:
+            data: 新闻数据
+
+        Returns:
+            是否所有分片都保存成功
+        """
+        parts = self._split_by_shard(data)
+        existing_shards = set(get_shard_paths(self._get_db_path(data.date)))
+
+        futures = {
+            index: self._executors[index].submit(self._writers[index].save_news_data, part)
+            for index, part in parts.items()
+        }
+        results = {index: future.result() for index, future in futures.items()}
+
+        # 新建了分片文件时，重新挂载读取连接
+        if set(get_shard_paths(self._get_db_path(data.date))) != existing_shards:
+            self._invalidate_read_connection(data.date)
+
+        failed = [index for index, ok in results.items() if not ok]
+        if failed:
+            print(f"[分片存储] 分片 {failed} 保存失败")
+            return False
+
+        print(f"[分片存储] {len(parts)} 个分片写入完成")
+        return True
+
+    def cleanup(self) -> None:
+        """清理资源（在各写线程中关闭分片连接，关闭读取连接）"""
+        for writer, executor in zip(getattr(self, "_writers", []), getattr(self, "_executors", [])):
+            try:
+                executor.submit(writer.cleanup).result()
+            except RuntimeError:
+                # 执行器已关闭
+                pass
+        super().cleanup()
+
+    def cleanup_old_data(self, retention_days: int) -> int:
+        """清理过期数据（先关闭分片连接，避免删除目录时文件仍被占用）"""
+        for writer, executor in zip(self._writers, self._executors):
+            executor.submit(writer.cleanup).result()
+        return super().cleanup_old_data(retention_days)
+
+    def __del__(self):
+        """析构函数，确保关闭连接并停止写线程"""
+        self.cleanup()
+        for executor in getattr(self, "_executors", []):
+            executor.shutdown(wait=False)
@@ -0,0 +1,405 @@
+# coding=utf-8
+"""
+远程存储异步上传队列
+
+将远程写操作（上传 / 删除）先写入本地持久化日志（journal），
+再由后台线程批量刷到对象存储：
+- 合并窗口：同一对象键在窗口期内的多次更新只上传最后一次
+- 批量删除：同时到期的删除任务合并为一次批量删除请求
+- 失败重试：指数退避，超过最大重试次数后保留日志，下次运行继续
+- 退出刷新：close() / atexit 时等待所有待上传任务完成
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+# 操作类型
+OP_PUT = "put"
+OP_DELETE = "delete"
+
+
+@dataclass
+class _PendingUpload:
+    """待处理的上传任务（内存状态）"""
+
+    key: str
+    op: str
+    due_at: float                   # 最早执行时间（合并窗口结束）
+    generation: int = 0             # 每次入队递增，用于识别上传期间的新写入
+    attempts: int = 0               # 已失败次数
+
+
+class UploadQueue:
+    """
+    持久化的异步上传队列
+
+    日志结构（journal_dir 下）：
+    - <safe_key>.json: 任务元数据（key / op / enqueued_at）
+    - <safe_key>.blob: 待上传文件快照（仅 put 操作）
+
+    快照在入队时通过 SQLite backup API 复制，之后对原数据库的修改
+    不会影响正在上传的内容；上传完成前进程崩溃，日志会在下次启动时被重新加载。
+    """
+
+    def __init__(
+        self,
+        journal_dir: str,
+        put_func: Callable[[str, Path], bool],
+        delete_func: Callable[[List[str]], bool],
+        coalesce_seconds: float = 5.0,
+        max_retries: int = 5,
+        retry_base_delay: float = 2.0,
+        retry_max_delay: float = 60.0,
+        log_prefix: str = "[上传队列]",
+    ):
+        """
+        初始化上传队列
+
+        Args:
+            journal_dir: 持久化日志目录
+            put_func: 上传函数 (key, 文件路径) -> 是否成功
+            delete_func: 批量删除函数 (keys) -> 是否成功
+            coalesce_seconds: 合并窗口（秒）
+            max_retries: 单个任务最大重试次数
+            retry_base_delay: 重试基础延迟（秒）
+            retry_max_delay: 重试最大延迟（秒）
+            log_prefix: 日志前缀
+        """
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.put_func = put_func
+        self.delete_func = delete_func
+        self.coalesce_seconds = max(0.0, coalesce_seconds)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.log_prefix = log_prefix
+
+        self._pending: Dict[str, _PendingUpload] = {}
+        self._in_flight: set = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+
+        self._recover_journal()
+
+        self._worker = threading.Thread(
+            target=self._run, name="trendradar-upload-queue", daemon=True
+        )
+        self._worker.start()
+
+    # === 日志文件 ===
+
+    @staticmethod
+    def _safe_name(key: str) -> str:
+        """对象键转换为日志文件名"""
+        return key.replace("/", "__")
+
+    def _meta_path(self, key: str) -> Path:
+        return self.journal_dir / f"{self._safe_name(key)}.json"
+
+    def _blob_path(self, key: str) -> Path:
+        return self.journal_dir / f"{self._safe_name(key)}.blob"
+
+    def _write_meta(self, key: str, op: str) -> None:
+        """原子写入任务元数据"""
+        meta_path = self._meta_path(key)
+        tmp_path = meta_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "op": op, "enqueued_at": time.time()}, f)
+        os.replace(tmp_path, meta_path)
+
+    def _remove_journal(self, key: str) -> None:
+        """删除任务日志"""
+        for path in (self._meta_path(key), self._blob_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _recover_journal(self) -> None:
+        """加载上次运行遗留的未完成任务"""
+        recovered = 0
+        for meta_path in self.journal_dir.glob("*.json"):
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                key, op = meta["key"], meta["op"]
+            except Exception as e:
+                print(f"{self.log_prefix} 跳过损坏的日志 {meta_path.name}: {e}")
+                continue
+
+            if op == OP_PUT and not self._blob_path(key).exists():
+                self._remove_journal(key)
+                continue
+
+            self._pending[key] = _PendingUpload(key=key, op=op, due_at=time.monotonic())
+            recovered += 1
+
+        if recovered:
+            print(f"{self.log_prefix} 恢复 {recovered} 个未完成的上传任务")
+
+    # === 入队 ===
+
+    def _enqueue(self, key: str, op: str) -> None:
+        with self._cond:
+            pending = self._pending.get(key)
+            if pending:
+                # 合并：保留原有的窗口截止时间，只更新操作和代数
+                pending.op = op
+                pending.generation += 1
+                pending.attempts = 0
+            else:
+                window = 0.0 if self._flush_requested else self.coalesce_seconds
+                self._pending[key] = _PendingUpload(
+                    key=key, op=op, due_at=time.monotonic() + window
+                )
+            self._cond.notify_all()
+
+    def enqueue_sqlite(self, key: str, db_path: Path) -> bool:
+        """
+        入队一个 SQLite 数据库的上传任务
+
+        使用 backup API 复制一致的快照，调用方可继续写原数据库。
+
+        Args:
+            key: 远程对象键
+            db_path: 本地数据库路径
+
+        Returns:
+            是否已写入日志
+        """
+        blob_path = self._blob_path(key)
+        tmp_path = blob_path.with_suffix(".blob.tmp")
+        # 持有锁写日志，避免与后台线程的"上传完成 → 删除日志"交错
+        with self._cond:
+            try:
+                src = sqlite3.connect(str(db_path))
+                dst = sqlite3.connect(str(tmp_path))
+                try:
+                    src.backup(dst)
+                    # 快照统一使用 rollback 日志模式，下载方无需 -wal/-shm 文件
+                    dst.execute("PRAGMA journal_mode=DELETE")
+                finally:
+                    dst.close()
+                    src.close()
+                os.replace(tmp_path, blob_path)
+                self._write_meta(key, OP_PUT)
+            except Exception as e:
+                print(f"{self.log_prefix} 写入上传日志失败 ({key}): {e}")
+                return False
+
+            self._enqueue(key, OP_PUT)
+        return True
+
+    def enqueue_delete(self, keys: List[str]) -> bool:
+        """
+        入队删除任务
+
+        Args:
+            keys: 远程对象键列表
+
+        Returns:
+            是否已写入日志
+        """
+        with self._cond:
+            try:
+                for key in keys:
+                    self._write_meta(key, OP_DELETE)
+                    try:
+                        self._blob_path(key).unlink()
+                    except FileNotFoundError:
+                        pass
+            except Exception as e:
+                print(f"{self.log_prefix} 写入删除日志失败: {e}")
+                return False
+
+            for key in keys:
+                self._enqueue(key, OP_DELETE)
+        return True
+
+    def restore_pending(self, key: str, target_path: Path) -> bool:
+        """
+        用日志中尚未上传的快照恢复本地文件
+
+        远程对象可能落后于日志（上次运行未完成上传），此时应以日志为准。
+
+        Args:
+            key: 远程对象键
+            target_path: 目标文件路径
+
+        Returns:
+            是否已恢复
+        """
+        with self._cond:
+            pending = self._pending.get(key)
+            if not pending or pending.op != OP_PUT:
+                return False
+            blob_path = self._blob_path(key)
+            if not blob_path.exists():
+                return False
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(blob_path, target_path)
+        print(f"{self.log_prefix} 使用本地日志中未上传的快照: {key}")
+        return True
+
+    def has_pending(self, key: str) -> bool:
+        """检查对象键是否有待处理任务"""
+        with self._cond:
+            return key in self._pending or key in self._in_flight
+
+    # === 后台线程 ===
+
+    def _next_ready(self) -> Optional[_PendingUpload]:
+        """取出下一个到期任务（需持有锁）"""
+        now = time.monotonic()
+        for key, pending in self._pending.items():
+            if key in self._in_flight:
+                continue
+            if pending.due_at <= now:
+                return pending
+        return None
+
+    def _ready_deletes(self) -> List[_PendingUpload]:
+        """取出所有已到期的删除任务（需持有锁），合并为一次批量删除"""
+        now = time.monotonic()
+        return [
+            pending for key, pending in self._pending.items()
+            if key not in self._in_flight and pending.op == OP_DELETE and pending.due_at <= now
+        ]
+
+    def _wait_timeout(self) -> Optional[float]:
+        """计算距下一个到期任务的等待时间（需持有锁）"""
+        candidates = [
+            p.due_at for k, p in self._pending.items() if k not in self._in_flight
+        ]
+        if not candidates:
+            return None
+        return max(0.0, min(candidates) - time.monotonic())
+
+    def _execute(self, keys: List[str], op: str) -> bool:
+        try:
+            if op == OP_DELETE:
+                return self.delete_func(keys)
+            return self.put_func(keys[0], self._blob_path(keys[0]))
+        except Exception as e:
+            print(f"{self.log_prefix} 任务执行异常 ({', '.join(keys)}): {e}")
+            return False
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                task = self._next_ready()
+                while task is None:
+                    if self._closed and not self._pending:
+                        return
+                    self._cond.wait(timeout=self._wait_timeout())
+                    task = self._next_ready()
+
+                tasks = self._ready_deletes() if task.op == OP_DELETE else [task]
+                op = task.op
+                generations = {t.key: t.generation for t in tasks}
+                self._in_flight.update(generations)
+
+            ok = self._execute(list(generations), op)
+
+            with self._cond:
+                for key, generation in generations.items():
+                    self._complete(key, generation, ok)
+                self._cond.notify_all()
+
+    def _complete(self, key: str, generation: int, ok: bool) -> None:
+        """记录任务执行结果（需持有锁）"""
+        self._in_flight.discard(key)
+        pending = self._pending.get(key)
+        if pending is None:
+            return
+
+        if ok:
+            if pending.generation == generation:
+                # 上传期间没有新写入，任务完成
+                del self._pending[key]
+                self._remove_journal(key)
+            # 否则保留任务，下一轮上传最新快照
+        else:
+            pending.attempts += 1
+            if pending.attempts > self.max_retries:
+                print(
+                    f"{self.log_prefix} {key} 重试 {self.max_retries} 次仍失败，"
+                    f"保留日志待下次运行"
+                )
+                del self._pending[key]
+            else:
+                delay = min(
+                    self.retry_base_delay * (2 ** (pending.attempts - 1)),
+                    self.retry_max_delay,
+                )
+                pending.due_at = time.monotonic() + delay
+                print(
+                    f"{self.log_prefix} {key} 第 {pending.attempts} 次失败，"
+                    f"{delay:.1f} 秒后重试"
+                )
+
+    # === 刷新与关闭 ===
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即执行所有待处理任务并等待完成（忽略合并窗口，保留重试）
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+
+        Returns:
+            是否全部完成
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            for pending in self._pending.values():
+                pending.due_at = min(pending.due_at, time.monotonic())
+            self._cond.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    if not self._worker.is_alive():
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(timeout=remaining)
+                return not self._pending and not self._in_flight
+            finally:
+                self._flush_requested = False
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        刷新所有任务并停止后台线程
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            是否全部完成
+        """
+        if self._closed:
+            return True
+
+        done = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            if not done:
+                # 未完成的任务保留在日志中，下次运行恢复
+                self._pending.clear()
+            self._cond.notify_all()
+        self._worker.join(timeout=5)
+
+        if not done:
+            print(f"{self.log_prefix} 退出时仍有未完成的上传，已保留日志: {self.journal_dir}")
+        return done
@@ -10,7 +10,13 @@ from trendradar.utils.time import (
     get_current_time_display,
     convert_time_for_display,
 )
-from trendradar.utils.url import normalize_url, get_url_signature
+from trendradar.utils.url import normalize_url, get_url_signature, get_url_digest, url_forms
+from trendradar.utils.text import (
+    title_forms,
+    clean_title_text,
+    fold_title,
+    register_title_forms,
+)
 
 __all__ = [
     "get_configured_time",
@@ -20,4 +26,10 @@ __all__ = [
     "convert_time_for_display",
     "normalize_url",
     "get_url_signature",
+    "get_url_digest",
+    "url_forms",
+    "title_forms",
+    "clean_title_text",
+    "fold_title",
+    "register_title_forms",
 ]
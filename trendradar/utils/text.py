@@ -0,0 +1,79 @@
+# coding=utf-8
+"""
+标题文本规范化模块
+
+同一标题会被 TXT 保存、频率词匹配、统计分析、报告渲染、MCP 搜索反复清理和转小写。
+这里在抓取入库（或从数据库读取）时对每个标题计算一次规范化形式，并驻留在进程内的表中，
+后续各环节直接查表：
+- title_forms: (清理后的标题, 小写标题)
+- clean_title_text: 清理换行和连续空白后的标题
+- fold_title: 标题的小写形式（频率词匹配、搜索比较使用）
+- register_title_forms: 用数据库中保存的规范化列预填驻留表
+"""
+
+import re
+import sys
+from typing import Dict, Tuple
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# 驻留表上限，超过后整体清空（全天标题通常只有数千到数万条）
+MAX_INTERNED_TITLES = 200_000
+
+_title_forms: Dict[str, Tuple[str, str]] = {}
+
+
+def _compute_forms(title: str) -> Tuple[str, str]:
+    cleaned = _WHITESPACE_PATTERN.sub(" ", title).strip()
+    folded = title.lower()
+    return sys.intern(cleaned), sys.intern(folded)
+
+
+def _store(title: str, forms: Tuple[str, str]) -> None:
+    if len(_title_forms) >= MAX_INTERNED_TITLES:
+        _title_forms.clear()
+    _title_forms[sys.intern(title)] = forms
+
+
+def title_forms(title: str) -> Tuple[str, str]:
+    """
+    获取标题的规范化形式（首次计算后驻留）
+
+    Args:
+        title: 原始标题
+
+    Returns:
+        (清理后的标题, 小写标题)。小写形式基于原始标题，与频率词匹配的语义一致。
+    """
+    forms = _title_forms.get(title)
+    if forms is None:
+        if not isinstance(title, str):
+            return _compute_forms(str(title))
+        forms = _compute_forms(title)
+        _store(title, forms)
+    return forms
+
+
+def clean_title_text(title: str) -> str:
+    """清理标题：换行和连续空白合并为单个空格，去除首尾空白"""
+    return title_forms(title)[0]
+
+
+def fold_title(title: str) -> str:
+    """标题的小写形式"""
+    return title_forms(title)[1]
+
+
+def register_title_forms(title: str, cleaned: str, folded: str) -> None:
+    """
+    预填驻留表（从数据库读取已保存的规范化列时调用）
+
+    列为空（旧数据库迁移前写入的行）时忽略，之后按需计算。
+    """
+    if cleaned and folded and title not in _title_forms:
+        _store(title, (sys.intern(cleaned), sys.intern(folded)))
+
+
+def clear_title_forms() -> None:
+    """清空驻留表"""
+    _title_forms.clear()
@@ -3,11 +3,16 @@
 URL 处理工具模块
 
 提供 URL 标准化功能，用于去重时消除动态参数的影响：
-- normalize_url: 标准化 URL，去除动态参数
+- normalize_url: 标准化 URL，去除动态参数（结果按 (url, platform_id) 缓存）
+- get_url_signature: URL 签名（即标准化 URL）
+- get_url_digest: 标准化 URL 的 16 位十六进制摘要（入库的 url_signature 列）
+- url_forms: 一次得到 (标准化 URL, 摘要)，入库时使用
 """
 
+import hashlib
+from functools import lru_cache
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
-from typing import Dict, Set
+from typing import Dict, Set, Tuple
 
 
 # 各平台需要移除的特定参数
@@ -34,7 +39,24 @@ COMMON_TRACKING_PARAMS: Set[str] = {
     "share_token", "share_id", "share_from",
 }
 
+# 缓存容量：全天的新闻 URL 数量通常在数万以内
+URL_CACHE_SIZE = 65536
 
+
+def _params_to_remove(platform_id: str) -> Set[str]:
+    """需要移除的参数名（小写）"""
+    params = {p.lower() for p in COMMON_TRACKING_PARAMS}
+    params.update(p.lower() for p in PLATFORM_PARAMS_TO_REMOVE.get(platform_id, ()))
+    return params
+
+
+_PARAMS_TO_REMOVE: Dict[str, Set[str]] = {
+    platform_id: _params_to_remove(platform_id) for platform_id in PLATFORM_PARAMS_TO_REMOVE
+}
+_COMMON_PARAMS_TO_REMOVE: Set[str] = _params_to_remove("")
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def normalize_url(url: str, platform_id: str = "") -> str:
     """
     标准化 URL，去除动态参数
@@ -75,21 +97,14 @@ def normalize_url(url: str, platform_id: str = "") -> str:
         # 解析查询参数
         params = parse_qs(parsed.query, keep_blank_values=True)
 
-        # 收集需要移除的参数（使用小写进行比较）
-        params_to_remove: Set[str] = set()
-
-        # 添加通用追踪参数
-        params_to_remove.update(COMMON_TRACKING_PARAMS)
-
-        # 添加平台特定参数
-        if platform_id and platform_id in PLATFORM_PARAMS_TO_REMOVE:
-            params_to_remove.update(PLATFORM_PARAMS_TO_REMOVE[platform_id])
+        # 需要移除的参数（通用追踪参数 + 平台特定参数，均为小写）
+        params_to_remove = _PARAMS_TO_REMOVE.get(platform_id, _COMMON_PARAMS_TO_REMOVE)
 
         # 过滤参数（参数名转小写进行比较）
         filtered_params = {
             key: values
             for key, values in params.items()
-            if key.lower() not in {p.lower() for p in params_to_remove}
+            if key.lower() not in params_to_remove
         }
 
         # 如果过滤后没有参数了，返回不带查询字符串的 URL
@@ -144,3 +159,36 @@ def get_url_signature(url: str, platform_id: str = "") -> str:
         URL 签名字符串
     """
     return normalize_url(url, platform_id)
+
+
+def get_url_digest(url: str, platform_id: str = "") -> str:
+    """
+    获取标准化 URL 的 16 位十六进制摘要（与数据库 url_signature 列一致）
+
+    Args:
+        url: 原始 URL
+        platform_id: 平台 ID
+
+    Returns:
+        摘要字符串（空 URL 返回空串）
+    """
+    return url_forms(url, platform_id)[1]
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def url_forms(url: str, platform_id: str = "") -> Tuple[str, str]:
+    """
+    一次计算 URL 的规范化形式（入库时使用，结果缓存）
+
+    Args:
+        url: 原始 URL
+        platform_id: 平台 ID
+
+    Returns:
+        (标准化 URL, URL 摘要)，空 URL 返回 ("", "")
+    """
+    if not url:
+        return "", ""
+    normalized = normalize_url(url, platform_id)
+    signature = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+    return normalized, signature